@@ -9,6 +9,12 @@ from controllers.analyze_data_router import api_router as analysis_router
 from controllers.report_router import api_router as report_router
 from controllers.datasets_router import api_router as datasets_router
 from controllers.prompts_router import api_router as prompts_router  # New import
+from controllers.jobs_router import api_router as jobs_router
+from research_components.jobs import get_default_job_queue
+from utils.evaluation_orchestrator import get_default_orchestrator
+from utils.async_logging import configure_logging
+import threading
+from tools.research.common.fetcher import get_default_async_fetcher
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -40,6 +46,31 @@ app.include_router(analysis_router, prefix="/api", tags=["Analysis"])
 app.include_router(report_router, prefix="/api/generate-report", tags=["Report"])
 app.include_router(datasets_router, prefix="/api", tags=["Datasets"])
 app.include_router(prompts_router, prefix="/api", tags=["Prompts"])  # Add the prompts router
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
+
+@app.on_event("startup")
+def start_logging():
+    # Log records are written by a background thread (see utils.async_logging)
+    configure_logging()
+
+@app.on_event("startup")
+def start_job_workers():
+    # Also resumes jobs that were queued or running when the server stopped
+    get_default_job_queue()
+
+@app.on_event("startup")
+def warm_evaluators():
+    # Spawning evaluator processes takes a few seconds; do it off the startup path
+    threading.Thread(target=get_default_orchestrator().warm, daemon=True).start()
+
+@app.on_event("shutdown")
+async def close_http_sessions():
+    await get_default_async_fetcher().aclose()
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    # Running jobs are interrupted with the process and requeued on next start
+    get_default_job_queue().stop(timeout=0)
 
 @app.get("/", response_class=HTMLResponse)
 async def read_index():
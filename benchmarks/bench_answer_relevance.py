@@ -0,0 +1,72 @@
+"""
+AnswerRelevanceEvaluator: one two-document TF-IDF fit per sentence (as
+sentence relevance used to be scored) versus the single-fit
+calculate_similarities, at several answer sizes. Both run the full
+evaluation and must agree on off_topic_sentences and context_alignment_score.
+
+Usage:
+    python -m benchmarks.bench_answer_relevance --sentences 50 500 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_evaluations import QUERY
+
+
+def answer(sentences: int):
+    from benchmarks.stub_server import synthetic_article
+    from tools.research.common.extraction import get_extractor
+    from tools.research.common.model_schemas import ResearchToolOutput
+
+    extractor = get_extractor()
+    pool, i = [], 0
+    while len(pool) < sentences:
+        text = extractor.extract(synthetic_article(i, paragraphs=30)).text
+        pool.extend(s.strip() + "." for s in text.split(".") if s.strip())
+        i += 1
+    return ResearchToolOutput(content=[], summary=" ".join(pool[:sentences]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    os.chdir(tempfile.mkdtemp(prefix="bench-relevance-"))
+    import logging
+    logging.disable(logging.CRITICAL)
+    from utils.answer_relevance import AnswerRelevanceEvaluator
+    from utils.nlp_preprocessing import PreprocessedDocument
+
+    class PerSentenceEvaluator(AnswerRelevanceEvaluator):
+        def calculate_similarities(self, query, texts):
+            return [self.calculate_similarity(query, text) for text in texts]
+
+    per_sentence, batched = PerSentenceEvaluator(), AnswerRelevanceEvaluator()
+    print(f"{'sentences':>10}{'per-sentence (s)':>18}{'single fit (s)':>16}{'speedup':>9}  same fields")
+    for count in args.sentences:
+        output = answer(count)
+        document = PreprocessedDocument(output).prepare()
+        timings, results = [], []
+        for evaluator in (per_sentence, batched):
+            start = time.perf_counter()
+            results.append(evaluator.evaluate_answer_relevance(output, QUERY, document)[1])
+            timings.append(time.perf_counter() - start)
+        expected, actual = results
+        same = (expected["off_topic_sentences"] == actual["off_topic_sentences"]
+                and abs(expected["context_alignment_score"] - actual["context_alignment_score"]) < 1e-12)
+        print(f"{expected['total_sentences']:>10}{timings[0]:>18.3f}{timings[1]:>16.3f}"
+              f"{timings[0] / timings[1]:>9.0f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Backfill ingest into ContentDB: --articles synthetic articles whose ids come
+from a feed, so a share of them (--popular) reuse a handful of popular ids,
+then the same backfill re-ingested with updated bodies.
+
+Compares the previous upsert_doc (probe id, id_1, id_2, ... for a free id,
+SELECT the URL, INSERT ... ON CONFLICT(id), commit per document), the
+current upsert_doc called per document, and one upsert_docs call. The
+previous loop re-keys every re-ingested article and then trips the UNIQUE
+url constraint, so its second pass is not run. Files are written to a
+temporary directory.
+
+Usage:
+    python -m benchmarks.bench_bulk_ingest --articles 10000 --popular 0.2
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+POPULAR_IDS = 20
+
+
+def articles(count: int, popular: float, rng: random.Random, revision: int = 0):
+    from tools.research.common.model_schemas import ContentItem
+
+    docs = []
+    for i in range(count):
+        doc_id = f"feed-{rng.randrange(POPULAR_IDS)}" if rng.random() < popular else f"article-{i}"
+        docs.append(ContentItem(id=doc_id, url=f"https://news.example.com/{i}", title=f"Article {i} r{revision}",
+                                snippet=f"Summary of article {i}", content=f"Body of article {i}. " * 100,
+                                source="backfill"))
+    return docs
+
+
+def previous_upsert(db, doc) -> bool:
+    """upsert_doc as it was before upsert_docs."""
+    with db.lock:
+        cursor = db.conn.cursor()
+        cursor.execute("SELECT 1 FROM content WHERE id = ?", (doc.id,))
+        id_exists = cursor.fetchone() is not None
+        if id_exists:
+            base_id = doc.id
+            counter = 1
+            while id_exists:
+                new_id = f"{base_id}_{counter}"
+                cursor.execute("SELECT 1 FROM content WHERE id = ?", (new_id,))
+                id_exists = cursor.fetchone() is not None
+                counter += 1
+            doc.id = new_id
+        cursor.execute("SELECT 1 FROM content WHERE url = ?", (doc.url,))
+        is_new = cursor.fetchone() is None
+        cursor.execute(
+            """
+            INSERT INTO content (id, url, title, snippet, content, source)
+            VALUES (:id, :url, :title, :snippet, :content, :source)
+            ON CONFLICT(id) DO UPDATE SET
+                title=excluded.title, snippet=excluded.snippet, content=excluded.content, source=excluded.source
+            """,
+            doc.to_dict(),
+        )
+        db.conn.commit()
+        return is_new
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--popular", type=float, default=0.2, help="share of articles reusing a popular id")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+    from research_components.db import ContentDB
+
+    def fresh_db(name):
+        db = ContentDB(os.path.join(workdir, name, "content.db"))
+        db.pool.max_delay = 0  # commit per call, as before write-behind
+        return db
+
+    try:
+        print(f"{'method':>22}{'first pass (s)':>16}{'re-ingest (s)':>15}{'inserted':>10}{'updated':>9}")
+
+        db = fresh_db("previous")
+        docs = articles(args.articles, args.popular, random.Random(args.seed))
+        inserted, first = timed(lambda: sum(previous_upsert(db, doc) for doc in docs))
+        print(f"{'previous upsert_doc':>22}{first:>16.2f}{'-':>15}{inserted:>10}{'-':>9}")
+        db.close()
+
+        db = fresh_db("per-doc")
+        docs = articles(args.articles, args.popular, random.Random(args.seed))
+        inserted, first = timed(lambda: sum(db.upsert_doc(doc) for doc in docs))
+        docs = articles(args.articles, args.popular, random.Random(args.seed), revision=1)
+        reinserted, second = timed(lambda: sum(db.upsert_doc(doc) for doc in docs))
+        print(f"{'upsert_doc':>22}{first:>16.2f}{second:>15.2f}{inserted:>10}{args.articles - reinserted:>9}")
+        db.close()
+
+        db = fresh_db("bulk")
+        counts, first = timed(lambda: db.upsert_docs(articles(args.articles, args.popular, random.Random(args.seed))))
+        again, second = timed(lambda: db.upsert_docs(
+            articles(args.articles, args.popular, random.Random(args.seed), revision=1)))
+        print(f"{'upsert_docs':>22}{first:>16.2f}{second:>15.2f}{counts['inserted']:>10}{again['updated']:>9}")
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
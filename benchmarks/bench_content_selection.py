@@ -0,0 +1,98 @@
+"""
+Content selection prompt for ResearchTask._select_content at growing content
+tables: formatting every stored item (what the task did) versus the BM25
+shortlist from ContentDB.search_content. Reports the time to build the
+prompt, its size (what the LLM selection call pays for) and how many of 10
+planted on-topic items the shortlist keeps, plus the one-off cost of
+indexing an existing table.
+
+Documents are synthetic (title, snippet and a ~2 KB body drawn from a
+shared vocabulary). Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_content_selection --rows 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_trace_store import timed
+
+TOPIC = "feeding behaviour of reef sharks during coral spawning"
+PLANTED = 10
+VOCABULARY = (
+    "ocean forest river desert climate migration population habitat species predator prey "
+    "breeding nesting season temperature rainfall drought conservation survey sampling genetic "
+    "diversity wetland grassland mountain island coastal estuary pollution plastic fishing "
+    "tourism policy funding research data model analysis trend decline recovery growth"
+).split()
+
+
+def synthetic_rows(count: int, rng: random.Random):
+    for i in range(count):
+        words = rng.choices(VOCABULARY, k=320)
+        if i % (count // PLANTED) == 0:
+            # On-topic: the topic's words spread through the body
+            words[::40] = ["reef", "sharks", "feeding", "coral", "spawning", "behaviour", "reef", "sharks"]
+            title = f"Reef sharks feeding at coral spawning events ({i})"
+        else:
+            title = " ".join(rng.choices(VOCABULARY, k=6)).capitalize()
+        body = " ".join(words)
+        yield (f"doc-{i}", f"https://example.com/{i}", title, body[:150], body, "web")
+
+
+def prompt_for(items) -> str:
+    return "\n".join(f"ID: {item.id}\nTitle: {item.title}\nSummary: {item.snippet}\n" for item in items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--shortlist", type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-selection-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.INFO)
+    from utils.db import ContentDB
+
+    try:
+        print(f"{'rows':>7}{'index build (s)':>17}{'all items (ms)':>16}{'prompt (KB)':>13}"
+              f"{'shortlist (ms)':>16}{'prompt (KB)':>13}{'planted kept':>14}")
+        for count in args.rows:
+            path = os.path.join(workdir, f"content-{count}", "content.db")
+            ContentDB(path).close()
+            # Load the rows as an existing, unindexed table, then time indexing it on open
+            conn = sqlite3.connect(path)
+            conn.executescript("DROP TRIGGER content_fts_insert; DROP TRIGGER content_fts_delete; "
+                               "DROP TRIGGER content_fts_update; DROP TABLE content_fts;")
+            conn.executemany("INSERT INTO content (id, url, title, snippet, content, source) VALUES (?, ?, ?, ?, ?, ?)",
+                             synthetic_rows(count, random.Random(count)))
+            conn.commit()
+            conn.close()
+            db, build_seconds = timed(lambda: ContentDB(path))
+
+            full_prompt, full_seconds = timed(lambda: prompt_for(db.get_content(exclude_ids=[])))
+            shortlist, search_seconds = timed(lambda: db.search_content(TOPIC, limit=args.shortlist, exclude_ids=["doc-0"]))
+            short_prompt = prompt_for(shortlist)
+            kept = sum(1 for item in shortlist if item.title.startswith("Reef sharks"))
+            print(f"{count:>7}{build_seconds:>17.2f}{full_seconds * 1000:>16.1f}{len(full_prompt) / 1024:>13.0f}"
+                  f"{search_seconds * 1000:>16.1f}{len(short_prompt) / 1024:>13.1f}{kept:>11}/{PLANTED - 1}")
+            db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
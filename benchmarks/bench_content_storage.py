@@ -0,0 +1,211 @@
+"""
+Document storage before and after bodies moved to content_bodies: --docs
+synthetic pages with ~--body-kb KB bodies (sentences over a Zipf-distributed
+vocabulary), stored in the previous layout (body inline in content.content,
+search index over the content table) and through ContentDB (bodies
+compressed with CONTENT_BODY_CODEC, loaded lazily).
+
+Reports the database size (documents, search index, file), ingest time,
+the time to list every document's metadata (get_content, what
+_select_content formats) and the bytes that listing reads from the database
+file (with SQLite's cache and mmap off, from /proc/self/io), and --lookups
+random get_doc_by_id calls using only the title, then reading the body too.
+Timed reads run on a warm page cache, so they show CPU rather than disk
+latency. Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_content_storage --docs 10000 --body-kb 8 --lookups 2000
+"""
+import argparse
+import itertools
+import os
+import random
+import shutil
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+VOCABULARY_SIZE = 5000
+PREVIOUS_COLUMNS = ["id", "url", "title", "snippet", "content", "source"]
+
+# The search index as it was over the content table
+PREVIOUS_SEARCH_INDEX = """
+    CREATE VIRTUAL TABLE content_fts USING fts5(
+        title, snippet, content,
+        content='content', content_rowid='rowid',
+        tokenize='porter unicode61'
+    );
+
+    CREATE TRIGGER content_fts_insert AFTER INSERT ON content BEGIN
+        INSERT INTO content_fts(rowid, title, snippet, content)
+        VALUES (new.rowid, new.title, new.snippet, new.content);
+    END;
+"""
+
+
+def pages(count: int, body_kb: int, rng: random.Random):
+    from tools.research.common.model_schemas import ContentItem
+
+    words = sorted({"".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+                    for _ in range(VOCABULARY_SIZE)})
+    rng.shuffle(words)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    docs = []
+    for i in range(count):
+        sentences, size = [], 0
+        while size < body_kb * 1024:
+            sentence = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(8, 24)))
+            if rng.random() < 0.2:
+                sentence += f" {rng.randint(1, 100000)}"
+            sentences.append(sentence.capitalize() + ".")
+            size += len(sentence) + 2
+        body = " ".join(sentences)
+        docs.append(ContentItem(id=f"doc-{i}", url=f"https://example.com/{i}", title=sentences[0][:80],
+                                snippet=body[:150], content=body, source="web"))
+    return docs
+
+
+def previous_db(path: str):
+    """A database in the previous layout: created as ContentDB does, then the body table undone."""
+    from utils.db import ContentDB
+
+    ContentDB(path).close()
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "DROP TRIGGER content_fts_insert; DROP TRIGGER content_fts_delete; DROP TRIGGER content_fts_update; "
+        "DROP TRIGGER content_bodies_fts_insert; DROP TRIGGER content_bodies_fts_delete; "
+        "DROP TRIGGER content_bodies_fts_update; DROP TABLE content_fts; DROP VIEW content_text; "
+        "DROP TABLE content_bodies;" + PREVIOUS_SEARCH_INDEX
+    )
+    return conn
+
+
+def sizes(conn: sqlite3.Connection, path: str):
+    """MB of document storage (content, content_bodies) and search index, and of the file."""
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    try:
+        by_table = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+    except sqlite3.OperationalError:  # dbstat is compiled out
+        by_table = {}
+    docs = sum(size for name, size in by_table.items() if name.startswith(("content", "sqlite_autoindex_content"))
+               and not name.startswith("content_fts"))
+    index = sum(size for name, size in by_table.items() if name.startswith("content_fts"))
+    return docs / 2 ** 20, index / 2 ** 20, os.path.getsize(path) / 2 ** 20
+
+
+def listing_read_mb(path: str, sql: str) -> float:
+    """MB read(2) from the database file by one uncached run of `sql` (Linux only; else nan)."""
+    def read_chars():
+        with open("/proc/self/io") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("rchar"))
+
+    try:
+        read_chars()
+    except OSError:
+        return float("nan")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA mmap_size = 0")
+    conn.execute("PRAGMA cache_size = -64")
+    before = read_chars()
+    conn.execute(sql).fetchall()
+    read = read_chars() - before
+    conn.close()
+    return read / 2 ** 20
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--body-kb", type=int, default=8)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-storage-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+    from tools.research.common.model_schemas import ContentItem
+    from utils.content_store import BODY_CODEC
+    from utils.db import _CONTENT_COLUMNS, ContentDB
+    from utils.sqlite_pool import SQLitePool
+
+    try:
+        docs = pages(args.docs, args.body_kb, random.Random(args.seed))
+        ids = [doc.id for doc in random.Random(args.seed + 1).choices(docs, k=args.lookups)]
+        results = {}
+
+        # Previous layout: rows with their bodies, read with every column
+        # through the same connection pool ContentDB uses
+        path = os.path.join(workdir, "previous", "content.db")
+        conn = previous_db(path)
+        pool = SQLitePool(path)
+        _, ingest = timed(lambda: (conn.executemany(
+            f"INSERT INTO content ({', '.join(PREVIOUS_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            [tuple(getattr(doc, column) for column in PREVIOUS_COLUMNS) for doc in docs]), conn.commit()))
+
+        def previous_get(doc_id):
+            with pool.read(fresh=True) as reader:
+                row = reader.execute(f"SELECT {', '.join(PREVIOUS_COLUMNS)} FROM content WHERE id = ?",
+                                     (doc_id,)).fetchone()
+            return ContentItem(**dict(zip(PREVIOUS_COLUMNS, row)))
+
+        list_sql = f"SELECT {', '.join(PREVIOUS_COLUMNS)} FROM content ORDER BY created_at DESC, rowid DESC"
+
+        def previous_list():
+            with pool.read() as reader:
+                rows = reader.execute(list_sql).fetchall()
+            return [ContentItem(**dict(zip(PREVIOUS_COLUMNS, row))) for row in rows]
+
+        results["previous (inline)"] = (
+            sizes(conn, path), ingest,
+            timed(previous_list)[1], listing_read_mb(path, list_sql),
+            timed(lambda: [previous_get(doc_id).title for doc_id in ids])[1],
+            timed(lambda: [previous_get(doc_id).content for doc_id in ids])[1],
+        )
+        pool.close()
+        conn.close()
+
+        # Current layout, through ContentDB
+        path = os.path.join(workdir, "current", "content.db")
+        db = ContentDB(path)
+        _, ingest = timed(lambda: (db.upsert_docs(docs), db.flush()))
+        with db.lock:
+            storage = sizes(db.conn, path)
+        results[f"bodies ({BODY_CODEC}, lazy)"] = (
+            storage, ingest,
+            timed(lambda: db.get_content())[1],
+            listing_read_mb(path, f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content "
+                                  "ORDER BY created_at DESC, rowid DESC"),
+            timed(lambda: [db.get_doc_by_id(doc_id).title for doc_id in ids])[1],
+            timed(lambda: [db.get_doc_by_id(doc_id).content for doc_id in ids])[1],
+        )
+        db.close()
+
+        print(f"{args.docs} documents, {sum(len(doc.content) for doc in docs) / 2 ** 20:.0f} MB of body text")
+        print(f"{'layout':>20}{'docs (MB)':>11}{'index (MB)':>12}{'file (MB)':>11}{'ingest (s)':>12}"
+              f"{'list all (ms)':>15}{'list read (MB)':>16}{'lookup title (ms)':>19}{'lookup body (ms)':>18}")
+        for name, ((docs_mb, index_mb, file_mb), ingest, listing, read_mb, title, body) in results.items():
+            print(f"{name:>20}{docs_mb:>11.1f}{index_mb:>12.1f}{file_mb:>11.1f}{ingest:>12.2f}"
+                  f"{listing * 1000:>15.1f}{read_mb:>16.1f}{title * 1000:>19.1f}{body * 1000:>18.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
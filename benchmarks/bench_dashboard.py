@@ -0,0 +1,77 @@
+"""
+Streamlit dashboard render times with the cached data layer: the first
+render of a session (cold caches), a rerun with nothing changed (what every
+widget interaction pays), a rerun after new traces are appended, and a
+switch to another tab.
+
+Runs main.py headless through streamlit.testing against synthetic traces
+(indexed beforehand) and a throwaway database in a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_dashboard --traces 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_trace_store import write_traces
+
+
+def timed_run(app) -> float:
+    start = time.perf_counter()
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--append", type=int, default=100, help="traces appended before the second rerun")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-dashboard-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    os.environ["DB_PATH"] = os.path.join(workdir, "data", "content.db")
+    import logging
+    logging.disable(logging.WARNING)
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    import research_agent.trace_store as trace_store
+
+    print(f"{'traces':>9}{'cold (s)':>10}{'rerun (ms)':>12}{'+' + str(args.append) + ' traces (ms)':>20}{'tab switch (ms)':>17}")
+    for count in args.traces:
+        path = os.path.join(workdir, f"traces-{count}.jsonl")
+        os.environ["RESEARCH_TRACES_FILE"] = path
+        rng = random.Random(count)
+        write_traces(path, 0, count, datetime(2025, 1, 1), rng)
+        # Index up front so the cold render measures the page, not the migration
+        trace_store.TraceStore(path).refresh()
+
+        # Start like a new server process
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        trace_store._default_store = None
+        app = AppTest.from_file(os.path.join(REPO_ROOT, "main.py"), default_timeout=600)
+        cold = timed_run(app)
+        rerun = timed_run(app)
+        write_traces(path, count, args.append, datetime(2025, 1, 1), rng)
+        appended = timed_run(app)
+        app.radio(key="main_tab").set_value("Summary Agent")
+        switch = timed_run(app)
+        print(f"{count:>9}{cold:>10.2f}{rerun * 1000:>12.1f}{appended * 1000:>20.1f}{switch * 1000:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
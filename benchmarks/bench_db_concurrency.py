@@ -0,0 +1,145 @@
+"""
+ContentDB under mixed load: writer threads storing automated test results
+(what run_tool does after each query) while reader threads run the
+dashboard's analytics queries (rollups, score distribution, recent results).
+
+Compares the previous storage setup (one rollback-journal connection,
+default pragmas, every read and write behind the same lock) with the WAL
+pool (pooled reader connections, one writer, tuned pragmas). Writers are
+paced at --write-rate stores per second each, so both setups read tables of
+the same size; a setup that cannot keep the pace shows it in writes/s.
+Reports write and read throughput, write latency and read latency
+percentiles. Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_db_concurrency --writers 2 --write-rate 50 --readers 1 4 8 --seconds 3
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+SEED_ROWS = 5000
+
+
+def test_details(i: int) -> dict:
+    timestamp = (datetime(2024, 1, 1) + timedelta(minutes=7 * i)).isoformat()
+    score = (i * 37 % 100) / 100
+    return {
+        'timestamp': timestamp,
+        'rouge_scores': {'rouge1': score, 'rouge2': score / 2, 'rougeL': score},
+        'semantic_similarity': score,
+        'hallucination_score': 1 - score,
+        'suspicious_segments': [],
+    }
+
+
+def open_db(path: str, pooled: bool):
+    from research_components.db import ContentDB
+
+    db = ContentDB(path)
+    if not pooled:
+        # The previous setup: rollback journal, default pragmas, reads behind the write lock
+        db.conn.executescript("PRAGMA journal_mode = DELETE; PRAGMA synchronous = FULL; "
+                              "PRAGMA cache_size = -2000; PRAGMA mmap_size = 0;")
+        db.pool.wal = False
+    return db
+
+
+def run(db, writers: int, write_rate: float, readers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    write_latencies = [[] for _ in range(writers)]
+    latencies = [[] for _ in range(readers)]
+
+    def write(slot: int):
+        i = SEED_ROWS + slot * 1_000_000
+        next_write = time.perf_counter()
+        while not stop.wait(max(0.0, next_write - time.perf_counter())):
+            details = test_details(i)
+            start = time.perf_counter()
+            db.store_test_results(f"benchmark query {i % 50}", details['semantic_similarity'], details)
+            write_latencies[slot].append(time.perf_counter() - start)
+            next_write += 1 / write_rate
+            i += 1
+
+    def read(slot: int):
+        queries = [
+            lambda: db.get_evaluation_rollups('automated_tests', start='2024-01-01'),
+            lambda: db.get_score_distribution('automated_tests'),
+            lambda: db.get_test_results(limit=50),
+            lambda: db.get_test_results(query="query 7", limit=20),
+        ]
+        n = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            queries[n % len(queries)]()
+            latencies[slot].append(time.perf_counter() - start)
+            n += 1
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    # get_test_results prints its column names on every call
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    writes = np.array([value for slot in write_latencies for value in slot]) * 1000
+    reads = np.array([value for slot in latencies for value in slot]) * 1000
+    return {
+        'writes/s': len(writes) / seconds,
+        'write p95 (ms)': float(np.percentile(writes, 95)) if len(writes) else 0.0,
+        'reads/s': len(reads) / seconds,
+        'read p50 (ms)': float(np.percentile(reads, 50)) if len(reads) else 0.0,
+        'read p95 (ms)': float(np.percentile(reads, 95)) if len(reads) else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--write-rate", type=float, default=50.0, help="stores per second per writer")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-db-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    try:
+        columns = ['writes/s', 'write p95 (ms)', 'reads/s', 'read p50 (ms)', 'read p95 (ms)']
+        print(f"{'setup':>10}{'readers':>9}" + "".join(f"{column:>15}" for column in columns))
+        for setup, pooled in (("single", False), ("wal pool", True)):
+            path = os.path.join(workdir, setup.replace(" ", "-"), "content.db")
+            db = open_db(path, pooled)
+            for i in range(SEED_ROWS):
+                details = test_details(i)
+                db.store_test_results(f"benchmark query {i % 50}", details['semantic_similarity'], details)
+            for readers in args.readers:
+                stats = run(db, args.writers, args.write_rate, readers, args.seconds)
+                print(f"{setup:>10}{readers:>9}" + "".join(f"{stats[column]:>15.1f}" for column in columns))
+            db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
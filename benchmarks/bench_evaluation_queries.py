@@ -0,0 +1,151 @@
+"""
+Dashboard queries over the evaluation history before and after the schema
+migrations (utils.migrations): --rows evaluation rows spread over the six
+evaluation tables, timestamps over the last year, ~300 bytes of JSON detail
+per row.
+
+The database is seeded in the previous schema (no recorded_at column or
+indexes), each dashboard query is timed with the previous SQL (ORDER BY
+timestamp, datetime(timestamp) windows), the migrations are applied by
+opening it with ContentDB (timed), and the queries are timed again with the
+current SQL. Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_evaluation_queries --rows 1000000 --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+DISTINCT_QUERIES = 5000
+
+
+def previous_schema(path: str) -> None:
+    """Create the tables as ContentDB does, then undo the migrations."""
+    from research_components.db import ContentDB
+    from utils.migrations import EVALUATION_TABLES
+
+    ContentDB(path).close()
+    conn = sqlite3.connect(path)
+    for table in EVALUATION_TABLES:
+        conn.execute(f"DROP INDEX idx_{table}_recorded_at")
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN recorded_at")
+    conn.executescript("DROP INDEX idx_content_created_at; DROP TABLE schema_migrations; DROP TABLE sqlite_stat1;")
+    conn.commit()
+    conn.close()
+
+
+def seed(path: str, rows: int, rng: random.Random) -> None:
+    from utils.migrations import EVALUATION_TABLES
+
+    conn = sqlite3.connect(path)
+    now = datetime.now()
+    detail = json.dumps([{"claim": f"claim {i}", "verified": i % 2 == 0, "source": "https://example.com"}
+                         for i in range(5)])
+    per_table = rows // len(EVALUATION_TABLES)
+    for table in EVALUATION_TABLES:
+        columns = [(row[1], (row[2] or "").upper()) for row in conn.execute(f"PRAGMA table_info({table})")
+                   if row[1] != "id"]
+
+        def value(name, kind, i):
+            if name == "query":
+                return f"research question {rng.randrange(DISTINCT_QUERIES)}"
+            if name == "timestamp":
+                stamp = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                # Evaluators store ISO timestamps; some tables default to CURRENT_TIMESTAMP
+                return stamp.isoformat() if i % 4 else stamp.strftime("%Y-%m-%d %H:%M:%S")
+            if kind == "TEXT":
+                return detail
+            if kind in ("INTEGER", "BOOLEAN"):
+                return rng.randrange(20)
+            return rng.random()
+
+        names = [name for name, _ in columns]
+        sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+        conn.executemany(sql, ([value(name, kind, i) for name, kind in columns] for i in range(per_table)))
+        conn.commit()
+    conn.close()
+
+
+def dashboard_queries(ts: str, window: str):
+    """(label, sql, params) per dashboard query; `ts` is the ordering column, `window` the time filter."""
+    from utils.migrations import EVALUATION_TABLES
+
+    queries = []
+    for table in EVALUATION_TABLES:
+        queries.append((f"{table} recent", f"SELECT * FROM {table} ORDER BY {ts} DESC LIMIT ?", (50,)))
+        queries.append((f"{table} by query", f"SELECT * FROM {table} WHERE query LIKE ? ORDER BY {ts} DESC LIMIT ?",
+                        ("%research question 17%", 10)))
+    queries.append(("analysis summary (30 days)",
+                    f"SELECT AVG(numerical_accuracy), AVG(overall_score), COUNT(*) FROM analysis_evaluations "
+                    f"WHERE {window} >= datetime('now', ?)", ("-30 days",)))
+    return queries
+
+
+def time_queries(path: str, queries, repeat: int):
+    conn = sqlite3.connect(path)
+    timings = []
+    for _, sql, params in queries:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            runs.append(time.perf_counter() - start)
+        timings.append(statistics.median(runs) * 1000)
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-evaluations-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+    from research_components.db import ContentDB
+
+    try:
+        path = os.path.join(workdir, "db", "content.db")
+        previous_schema(path)
+        start = time.perf_counter()
+        seed(path, args.rows, random.Random(args.seed))
+        print(f"Seeded {args.rows} evaluation rows in {time.perf_counter() - start:.1f}s")
+
+        previous = dashboard_queries("timestamp", "datetime(timestamp)")
+        before = time_queries(path, previous, args.repeat)
+
+        start = time.perf_counter()
+        ContentDB(path).close()
+        print(f"Migrations applied on open in {time.perf_counter() - start:.1f}s")
+
+        current = dashboard_queries("recorded_at", "recorded_at")
+        after = time_queries(path, current, args.repeat)
+
+        print(f"{'query':>46}{'before (ms)':>13}{'after (ms)':>12}{'speedup':>9}")
+        for (label, _, _), old, new in zip(current, before, after):
+            print(f"{label:>46}{old:>13.2f}{new:>12.2f}{old / new:>8.0f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Wall time of the General Agent evaluations on one research output:
+sequential (as run_tool used to run them) versus the EvaluationOrchestrator
+with a thread pool and with a process pool.
+
+The research output is built from synthetic articles (see stub_server) with a
+summary stitched from their sentences, so no network access is needed.
+
+Usage:
+    python -m benchmarks.bench_evaluations --sources 10 --summary-sentences 40 --rounds 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+QUERY = "What do the new findings mean for long-term industry planning?"
+
+
+def build_output(sources: int, summary_sentences: int):
+    from benchmarks.stub_server import synthetic_article
+    from tools.research.common.extraction import get_extractor
+    from tools.research.common.model_schemas import ContentItem, ResearchToolOutput
+
+    extractor = get_extractor()
+    content = []
+    for i in range(sources):
+        page = extractor.extract(synthetic_article(i, paragraphs=30))
+        content.append(ContentItem(
+            url=f"https://news{i % 4}.example.com/2024/story/{i}",
+            title=page.title,
+            snippet="Researchers reported new findings.",
+            content=page.text
+        ))
+    sentences = [s.strip() + "." for item in content for s in item.content.split(".") if s.strip()]
+    summary = " ".join(sentences[i * 7 % len(sentences)] for i in range(summary_sentences))
+    return ResearchToolOutput(content=content, summary=summary)
+
+
+def evaluator_calls(output):
+    from research_components.research import _content_for_tests
+    from utils.nlp_preprocessing import preprocess_research_output
+    import logging
+
+    document = preprocess_research_output(output)
+    return {
+        "factual_accuracy": (output, document),
+        "source_coverage": (output, document),
+        "logical_coherence": (output, document),
+        "answer_relevance": (output, QUERY, document),
+        "automated_tests": (_content_for_tests(output, logging.getLogger(__name__)), QUERY),
+    }
+
+
+def run_sequential(calls):
+    from utils.evaluation_orchestrator import _run_evaluator
+
+    timings = {}
+    for name, args in calls.items():
+        _, timings[name] = _run_evaluator(name, args)
+    return timings
+
+
+def run_orchestrated(orchestrator, calls):
+    outcomes = orchestrator.run(calls)
+    failed = {name: o.error for name, o in outcomes.items() if not o.ok}
+    if failed:
+        raise RuntimeError(f"Evaluations failed: {failed}")
+    return {name: o.elapsed for name, o in outcomes.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--summary-sentences", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=min(5, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    # Importing research_components opens ./data/content.db and the relevance
+    # evaluator logs to ./logs; keep both out of the checkout
+    os.chdir(tempfile.mkdtemp(prefix="bench-evaluations-"))
+    import logging
+    from utils.evaluation_orchestrator import EvaluationOrchestrator
+
+    output = build_output(args.sources, args.summary_sentences)
+    calls = evaluator_calls(output)
+    logging.disable(logging.INFO)
+    print(f"{args.sources} sources, {args.summary_sentences} summary sentences, "
+          f"{args.workers} workers, {os.cpu_count()} CPUs\n")
+
+    thread_orchestrator = EvaluationOrchestrator(max_workers=args.workers, use_processes=False, timeout=600)
+    process_orchestrator = EvaluationOrchestrator(max_workers=args.workers, use_processes=True, timeout=600)
+    process_orchestrator.warm()
+    modes = {
+        "sequential": lambda: run_sequential(calls),
+        "threads": lambda: run_orchestrated(thread_orchestrator, calls),
+        "processes": lambda: run_orchestrated(process_orchestrator, calls),
+    }
+
+    results = {}
+    for mode, fn in modes.items():
+        fn()  # warm-up: builds evaluators and fills import caches
+        walls, per_evaluator = [], []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            per_evaluator.append(fn())
+            walls.append(time.perf_counter() - start)
+        results[mode] = (statistics.median(walls), per_evaluator[-1])
+
+    process_orchestrator.close()
+    thread_orchestrator.close()
+
+    baseline = results["sequential"][0]
+    names = list(calls)
+    print(f"{'mode':<12}{'wall (s)':>10}{'speedup':>9}  " + "".join(f"{n[:12]:>14}" for n in names))
+    for mode, (wall, timings) in results.items():
+        print(f"{mode:<12}{wall:>10.2f}{baseline / wall:>9.1f}  " + "".join(f"{timings[n]:>14.2f}" for n in names))
+
+
+if __name__ == "__main__":
+    main()
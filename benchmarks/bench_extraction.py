@@ -0,0 +1,106 @@
+"""
+Throughput and peak memory of the main-content extractors over the saved HTML
+fixtures in benchmarks/fixtures/html.
+
+Each strategy runs in a fresh subprocess so peak RSS is not polluted by the
+other strategies. Peak memory is reported two ways: tracemalloc (Python heap
+only) and growth of the process's max RSS (includes libxml2's C allocations).
+
+Usage:
+    python -m benchmarks.bench_extraction --rounds 20 --strategies soup lxml
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+
+def load_corpus(directory: str):
+    paths = sorted(glob.glob(os.path.join(directory, "*.html")))
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            corpus.append((os.path.basename(path), f.read()))
+    return corpus
+
+
+def _max_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_strategy(name: str, directory: str, rounds: int, queue) -> None:
+    from tools.research.common.extraction import get_extractor
+
+    extractor = get_extractor(name)
+    corpus = load_corpus(directory)
+    # Warm-up pass, also records what each page yields
+    outputs = {}
+    for filename, html in corpus:
+        result = extractor.extract(html)
+        outputs[filename] = (result.strategy, len(result.text)) if result else None
+
+    rss_before = _max_rss_kb()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html in corpus:
+            extractor.extract(html)
+    wall = time.perf_counter() - start
+    rss_growth = _max_rss_kb() - rss_before
+
+    tracemalloc.start()
+    for _, html in corpus:
+        extractor.extract(html)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        "strategy": name,
+        "pages": rounds * len(corpus),
+        "wall": wall,
+        "heap_peak_kb": heap_peak / 1024,
+        "rss_growth_kb": rss_growth,
+        "outputs": outputs,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the corpus per strategy")
+    parser.add_argument("--strategies", nargs="+", default=["soup", "lxml"])
+    parser.add_argument("--fixtures", default=FIXTURES)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.fixtures)
+    size_kb = sum(len(html) for _, html in corpus) / 1024
+    print(f"Corpus: {len(corpus)} pages, {size_kb:.0f} KiB, {args.rounds} rounds\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in args.strategies:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_strategy, args=(name, args.fixtures, args.rounds, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    baseline = results[0]
+    print(f"{'strategy':<12}{'pages/s':>10}{'speedup':>10}{'heap peak (KiB)':>18}{'RSS growth (KiB)':>18}")
+    for r in results:
+        rate = r["pages"] / r["wall"]
+        speedup = rate / (baseline["pages"] / baseline["wall"])
+        print(f"{r['strategy']:<12}{rate:>10.1f}{speedup:>10.1f}{r['heap_peak_kb']:>18.0f}{r['rss_growth_kb']:>18.0f}")
+
+    print("\nPer-page result (strategy, chars):")
+    for filename, _ in corpus:
+        cells = "  ".join(f"{r['strategy']}={r['outputs'][filename]}" for r in results)
+        agree = len({str(r["outputs"][filename]) for r in results}) == 1
+        print(f"  {filename:<28}{cells}{'' if agree else '  <- differs'}")
+
+
+if __name__ == "__main__":
+    main()
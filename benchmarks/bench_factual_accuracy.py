@@ -0,0 +1,97 @@
+"""
+FactualAccuracyEvaluator: the per-pair claim scoring it used to do (two
+spaCy parses and a Doc.similarity for every claim x source and claim x claim
+pair) versus the batched engine (every text parsed once, all pairs scored by
+matrix products). Checks both produce the same claim details.
+
+The shared pipeline is spacy.blank('en'), which has neither word vectors nor
+a parser, so out of the box there are no claims and every similarity is 0.
+The benchmark loads random vectors for the synthetic articles' vocabulary and
+treats every summary sentence as a claim, as a parsed pipeline would.
+
+Usage:
+    python -m benchmarks.bench_factual_accuracy --sources 10 --summary-sentences 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_evaluations import build_output
+
+
+def load_random_vectors(nlp, text: str, width: int = 64, seed: int = 0) -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    for word in sorted({token.text for token in nlp(text)}):
+        nlp.vocab.set_vector(word, rng.normal(size=width).astype("float32"))
+
+
+def per_pair(evaluator, claims, sources):
+    """The evaluator's previous scoring loop, one _check_entailment per pair."""
+    details, contradicting = [], 0
+    for claim in claims:
+        max_score, best_source = 0, None
+        for source in sources:
+            score = evaluator._check_entailment(claim, source["text"])
+            if score > max_score:
+                max_score, best_source = score, source
+        for other_claim in claims:
+            if other_claim != claim and evaluator._check_entailment(claim, other_claim) < 0.3:
+                contradicting += 1
+                break
+        details.append({"claim": claim, "score": max_score,
+                        "best_source": best_source["url"] if best_source else None})
+    return details, contradicting
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--summary-sentences", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    os.chdir(tempfile.mkdtemp(prefix="bench-factual-"))
+    warnings.filterwarnings("ignore", module="spacy")
+    from utils.evaluation import FactualAccuracyEvaluator
+    from utils.nlp_preprocessing import PreprocessedDocument, nlp
+
+    output = build_output(args.sources, args.summary_sentences)
+    load_random_vectors(nlp, output.get_full_text())
+    document = PreprocessedDocument(output)
+    document.summary.claims = list(document.summary.sentences)
+    claims = document.summary.claims
+    sources = [{"text": text, "url": url} for text, url in zip(document.source_texts, document.source_urls)]
+    evaluator = FactualAccuracyEvaluator()
+    print(f"{len(claims)} claims, {len(sources)} sources "
+          f"({sum(len(s['text']) for s in sources) // len(sources)} chars each)\n")
+
+    start = time.perf_counter()
+    expected, expected_contradicting = per_pair(evaluator, claims, sources)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, details = evaluator.evaluate_factual_accuracy(output, document)
+    batched_seconds = time.perf_counter() - start
+
+    same = (
+        [d["best_source"] for d in expected] == [d["best_source"] for d in details["claim_details"]]
+        and all(abs(a["score"] - b["score"]) < 1e-6 for a, b in zip(expected, details["claim_details"]))
+        and expected_contradicting == details["contradicting_claims"]
+    )
+    print(f"{'per-pair':<10}{loop_seconds:>8.2f}s")
+    print(f"{'batched':<10}{batched_seconds:>8.2f}s  ({loop_seconds / batched_seconds:.0f}x)")
+    print(f"same claim details: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Evaluation writes per research request: run_tool stores factual accuracy,
+source coverage, logical coherence, answer relevance and automated test
+results one after another, plus the documents it fetched. Compares a commit
+(and fsync) per write (WRITE_BEHIND_MAX_DELAY=0, the previous behaviour)
+with write-behind group commits, for --threads concurrent requests.
+
+Reports requests per second, the time a request spends in its stores
+(p50/p95) and how many writes each commit carried. The database is written
+to a temporary directory, so the fsync cost is the local disk's.
+
+Usage:
+    python -m benchmarks.bench_group_commit --requests 200 --threads 1 4 16 --docs 5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+
+def store_request(db, n: int, docs: int) -> None:
+    from tools.research.common.model_schemas import ContentItem
+
+    query = f"benchmark query {n}"
+    timestamp = datetime.now().isoformat()
+    for i in range(docs):
+        db.upsert_doc(ContentItem(id=f"doc-{n}-{i}", url=f"https://example.com/{n}/{i}", title="Result",
+                                  snippet="Snippet", content="Body " * 200, source="web"))
+    db.store_accuracy_evaluation({'query': query, 'timestamp': timestamp, 'factual_score': 0.8,
+                                  'claim_details': [{'claim': 'x', 'verified': True}] * 5})
+    db.store_source_coverage({'query': query, 'timestamp': timestamp, 'coverage_score': 0.7,
+                              'missed_sources': ['https://example.org'], 'unique_domains': 4})
+    db.store_logical_coherence({'query': query, 'timestamp': timestamp, 'coherence_score': 0.9,
+                                'rough_transitions': [], 'total_sentences': 40})
+    db.store_answer_relevance({'query': query, 'timestamp': timestamp, 'relevance_score': 0.85,
+                               'off_topic_sentences': [], 'total_sentences': 40})
+    db.store_test_results(query, 0.75, {
+        'timestamp': timestamp,
+        'rouge_scores': {'rouge1': 0.5, 'rouge2': 0.3, 'rougeL': 0.45},
+        'semantic_similarity': 0.8,
+        'hallucination_score': 0.1,
+        'suspicious_segments': [],
+    })
+
+
+def run(path: str, max_delay: float, requests: int, threads: int, docs: int) -> dict:
+    from research_components.db import ContentDB
+
+    db = ContentDB(path)
+    db.pool.max_delay = max_delay
+
+    commits = []
+    commit_pending = db.pool._commit_pending
+
+    def counted_commit():
+        commits.append(db.pool._pending)
+        commit_pending()
+    db.pool._commit_pending = counted_commit
+
+    per_thread = max(1, requests // threads)
+    durations = [[] for _ in range(threads)]
+
+    def worker(slot: int):
+        for i in range(per_thread):
+            start = time.perf_counter()
+            store_request(db, slot * per_thread + i, docs)
+            durations[slot].append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    db.close()  # durable: the last group is committed here
+    elapsed = time.perf_counter() - start
+
+    ms = np.array([d for slot in durations for d in slot]) * 1000
+    return {
+        'requests/s': per_thread * threads / elapsed,
+        'stores p50 (ms)': float(np.percentile(ms, 50)),
+        'stores p95 (ms)': float(np.percentile(ms, 95)),
+        'writes/commit': sum(commits) / max(1, len(commits)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--docs", type=int, default=5, help="documents upserted per request")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-commit-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    try:
+        columns = ['requests/s', 'stores p50 (ms)', 'stores p95 (ms)', 'writes/commit']
+        print(f"{'commits':>14}{'threads':>9}" + "".join(f"{column:>17}" for column in columns))
+        for threads in args.threads:
+            for name, max_delay in (("per write", 0.0), ("group (50ms)", 0.05)):
+                path = os.path.join(workdir, f"{name.split()[0]}-{threads}", "content.db")
+                stats = run(path, max_delay, args.requests, threads, args.docs)
+                print(f"{name:>14}{threads:>9}" + "".join(f"{stats[column]:>17.1f}" for column in columns))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Per-request logging overhead on the hot paths: LLM usage recording
+(model_wrapper + TokenUsageTracker), ContentDB document lookups and the
+answer relevance evaluator's text extraction, under
+
+- sync DEBUG: what run_tool used to install (root at DEBUG, console and file
+  handlers written on the calling thread)
+- sync INFO: the same handlers at INFO
+- queue INFO: utils.async_logging.configure_logging (records handed to a
+  background writer)
+
+against a floor with logging disabled. Requests run on --threads threads at
+once, as in the API. Log files and the database go to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_logging --requests 200 --threads 1 8
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+LLM_CALLS = 12
+LOOKUPS = 60
+ITEMS = 40
+
+
+def make_request(db, evaluator, token_tracker_cls, record_usage, items):
+    def request():
+        tracker = token_tracker_cls()
+        for i in range(LLM_CALLS):
+            usage = SimpleNamespace(prompt_tokens=900, completion_tokens=200, total_tokens=1100)
+            record_usage(usage, "llama3-70b-8192", time.time() - 0.5, SimpleNamespace(id="research"), tracker)
+        tracker.get_usage_stats()
+        for i in range(LOOKUPS):
+            db.get_doc_by_url(f"https://example.com/{i}")
+        evaluator._extract_text_from_output(items)
+    return request
+
+
+def run(request, requests: int, threads: int) -> float:
+    """Mean wall time per request, in microseconds."""
+    per_thread = max(1, requests // threads)
+
+    def worker():
+        for _ in range(per_thread):
+            request()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-logging-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    from research_components.db import ContentDB
+    from utils.answer_relevance import AnswerRelevanceEvaluator
+    from utils.async_logging import configure_logging, stop_logging
+    from utils.model_wrapper import _record_usage
+    from utils.token_tracking import TokenUsageTracker
+
+    db = ContentDB(os.path.join(workdir, "content.db"))
+    evaluator = AnswerRelevanceEvaluator()
+    items = [SimpleNamespace(text=f"Coral reef fish species {i} feed on plankton near the reef edge.")
+             for i in range(ITEMS)]
+    request = make_request(db, evaluator, TokenUsageTracker, _record_usage, items)
+    devnull = open(os.devnull, "w")
+    root = logging.getLogger()
+
+    def sync_handlers(level):
+        stop_logging()
+        logging.disable(logging.NOTSET)
+        formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s - %(filename)s:%(lineno)d')
+        handlers = [logging.StreamHandler(devnull), logging.FileHandler(os.path.join(workdir, "sync.log"))]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        root.handlers = handlers
+        root.setLevel(level)
+
+    def queue_handlers():
+        stop_logging()
+        logging.disable(logging.NOTSET)
+        root.handlers = []
+        listener = configure_logging(level="INFO", log_file=os.path.join(workdir, "queue.log"), console=False)
+        listener.handlers += (logging.StreamHandler(devnull),)
+
+    def disabled():
+        stop_logging()
+        logging.disable(logging.CRITICAL)
+
+    configs = [
+        ("disabled", disabled),
+        ("sync DEBUG", lambda: sync_handlers(logging.DEBUG)),
+        ("sync INFO", lambda: sync_handlers(logging.INFO)),
+        ("queue INFO", queue_handlers),
+    ]
+    try:
+        request()  # warm up
+        print(f"{'threads':>8}" + "".join(f"{name + ' (us)':>18}" for name, _ in configs) + f"{'overhead before':>17}{'overhead after':>16}")
+        for threads in args.threads:
+            timings = []
+            for name, setup in configs:
+                setup()
+                timings.append(run(request, args.requests, threads))
+            stop_logging()
+            floor = timings[0]
+            print(f"{threads:>8}" + "".join(f"{t:>18.0f}" for t in timings)
+                  + f"{timings[1] - floor:>16.0f}us{timings[3] - floor:>14.0f}us")
+    finally:
+        stop_logging()
+        db.close()
+        devnull.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
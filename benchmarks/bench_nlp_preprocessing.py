@@ -0,0 +1,97 @@
+"""
+CPU time per evaluated research output for the four text evaluators
+(factual accuracy, source coverage, logical coherence, answer relevance):
+each evaluator preprocessing the output itself, as they used to, versus all of
+them sharing one PreprocessedDocument (utils.nlp_preprocessing).
+
+Evaluators run sequentially in this process so that process CPU time is
+attributable to them. The research output is synthetic (see
+bench_evaluations); --no-summary evaluates the raw content instead, which is
+what the evaluators fall back to when the agent produced no summary.
+
+Usage:
+    python -m benchmarks.bench_nlp_preprocessing --sources 10 --summary-sentences 40 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_evaluations import QUERY, build_output
+
+EVALUATORS = ["factual_accuracy", "source_coverage", "logical_coherence", "answer_relevance"]
+
+
+def evaluate(output, shared: bool):
+    """Run the evaluators once; returns (scores, CPU seconds by stage)."""
+    from utils.evaluation_orchestrator import _get_evaluator, EVALUATORS as SPECS
+    from utils.nlp_preprocessing import preprocess_research_output
+
+    cpu = {}
+    document = None
+    if shared:
+        start = time.process_time()
+        document = preprocess_research_output(output)
+        cpu["preprocess"] = time.process_time() - start
+
+    scores = {}
+    for name in EVALUATORS:
+        method = getattr(_get_evaluator(name), SPECS[name].method)
+        args = (output, QUERY) if name == "answer_relevance" else (output,)
+        if document is not None:
+            args += (document,)
+        start = time.process_time()
+        scores[name], _ = method(*args)
+        cpu[name] = time.process_time() - start
+    return scores, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--summary-sentences", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--no-summary", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    # The relevance evaluator writes its log file relative to the cwd
+    os.chdir(tempfile.mkdtemp(prefix="bench-nlp-"))
+    import logging
+    logging.disable(logging.INFO)
+
+    output = build_output(args.sources, args.summary_sentences)
+    if args.no_summary:
+        output.summary = ""
+    print(f"{args.sources} sources, "
+          f"{'no summary' if args.no_summary else f'{args.summary_sentences} summary sentences'}, "
+          f"median of {args.rounds} rounds\n")
+
+    results = {}
+    for mode, shared in (("separate", False), ("shared", True)):
+        evaluate(output, shared)  # warm-up: builds evaluators, fills caches
+        rounds = [evaluate(output, shared) for _ in range(args.rounds)]
+        totals = [sum(cpu.values()) for _, cpu in rounds]
+        stages = {stage: statistics.median(cpu[stage] for _, cpu in rounds) for stage in rounds[0][1]}
+        results[mode] = (statistics.median(totals), stages, rounds[-1][0])
+
+    if results["separate"][2] != results["shared"][2]:
+        print(f"WARNING: scores differ: {results['separate'][2]} vs {results['shared'][2]}")
+
+    stages = ["preprocess"] + EVALUATORS
+    print(f"{'mode':<10}{'CPU (s)':>9}{'saved':>8}  " + "".join(f"{s[:12]:>14}" for s in stages))
+    baseline = results["separate"][0]
+    for mode, (total, timings, _) in results.items():
+        print(f"{mode:<10}{total:>9.3f}{1 - total / baseline:>8.0%}  "
+              + "".join(f"{timings[s]:>14.3f}" if s in timings else f"{'-':>14}" for s in stages))
+
+
+if __name__ == "__main__":
+    main()
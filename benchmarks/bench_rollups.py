@@ -0,0 +1,131 @@
+"""
+Dashboard aggregation at growing history sizes: grouping every trace by day
+in pandas (as display_general_analysis and display_analysis did on each
+render) versus reading the TraceStore rollups, and averaging every stored
+evaluation versus reading the ContentDB daily rollups.
+
+Traces span one day per 500 traces; evaluations one day per 200. Rollups
+are maintained while the history is written, so the rollup timings are what
+a page render pays. Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_rollups --traces 10000 100000 --evaluations 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_trace_store import synthetic_trace, timed
+
+
+def pandas_trace_summary(path: str):
+    """The per-render work of the old dashboard: parse every trace, group by day."""
+    import pandas as pd
+
+    with open(path) as f:
+        traces = [json.loads(line) for line in f]
+    df = pd.DataFrame([{
+        'date': datetime.fromisoformat(t['start_time']).date(),
+        'success': t.get('success', False),
+        'duration': t.get('duration', 0),
+        'content_new': t.get('content_new', 0),
+        'content_reused': t.get('content_reused', 0)
+    } for t in traces])
+    by_date = df.groupby('date').agg({'success': ['count', lambda x: x.sum() / len(x) * 100]})
+    return len(by_date), df['duration'].mean(), df['success'].mean() * 100
+
+
+def rollup_trace_summary(store):
+    daily = store.rollups(refresh=False)
+    totals = store.rollups(group_by=(), refresh=False)[0]
+    return len(daily), totals['avg_duration'], totals['success_rate']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--evaluations", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    workdir = tempfile.mkdtemp(prefix="bench-rollups-")
+    os.chdir(workdir)
+    import logging
+    logging.disable(logging.INFO)
+    import pandas as pd
+    from research_agent.trace_store import TraceStore
+    from research_components.db import ContentDB
+
+    start = datetime(2025, 1, 1)
+    try:
+        print("Traces")
+        print(f"{'traces':>9}{'days':>6}{'pandas (ms)':>13}{'rollups (ms)':>14}{'speedup':>9}{'same':>6}")
+        for count in args.traces:
+            path = os.path.join(workdir, f"traces-{count}.jsonl")
+            rng = random.Random(count)
+            with open(path, "w") as f:
+                for i in range(count):
+                    trace = synthetic_trace(i, start, rng)
+                    trace["start_time"] = (start + timedelta(days=i // 500, seconds=i % 500)).isoformat()
+                    f.write(json.dumps(trace) + "\n")
+            store = TraceStore(path)
+            store.refresh()
+
+            expected, pandas_seconds = timed(lambda: pandas_trace_summary(path))
+            actual, rollup_seconds = timed(lambda: rollup_trace_summary(store))
+            same = expected[0] == actual[0] and all(abs(a - b) < 1e-6 for a, b in zip(expected[1:], actual[1:]))
+            print(f"{count:>9}{actual[0]:>6}{pandas_seconds * 1000:>13.1f}{rollup_seconds * 1000:>14.2f}"
+                  f"{pandas_seconds / rollup_seconds:>8.0f}x{str(same):>6}")
+            store.close()
+
+        print("\nEvaluations (factual accuracy)")
+        print(f"{'rows':>9}{'days':>6}{'store (ms/row)':>16}{'pandas (ms)':>13}{'rollups (ms)':>14}{'speedup':>9}{'same':>6}")
+        for count in args.evaluations:
+            db = ContentDB(os.path.join(workdir, f"content-{count}.db"))
+            rng = random.Random(count)
+            store_start = time.perf_counter()
+            for i in range(count):
+                db.store_accuracy_evaluation({
+                    'query': f'question {i}',
+                    'timestamp': (start + timedelta(days=i // 200, seconds=i % 200)).isoformat(),
+                    'factual_score': rng.random(),
+                    'citation_accuracy': rng.random(),
+                    'verified_claims': rng.randint(0, 10),
+                    'contradicting_claims': rng.randint(0, 3)
+                })
+            store_seconds = (time.perf_counter() - store_start) / count
+
+            def pandas_summary():
+                df = pd.DataFrame(db.get_accuracy_evaluations(limit=count))
+                by_day = df.groupby(df['timestamp'].str[:10])['factual_score'].mean()
+                return len(by_day), df['factual_score'].mean(), df['verified_claims'].sum()
+
+            def rollup_summary():
+                daily = db.get_evaluation_rollups('factual_accuracy')
+                summary = db.get_evaluation_rollups('factual_accuracy', by_day=False)[0]
+                db.get_score_distribution('factual_accuracy')
+                return len(daily), summary['factual_score'], summary['verified_claims_total']
+
+            expected, pandas_seconds = timed(pandas_summary)
+            actual, rollup_seconds = timed(rollup_summary)
+            same = expected[0] == actual[0] and all(abs(a - b) < 1e-6 for a, b in zip(expected[1:], actual[1:]))
+            print(f"{count:>9}{actual[0]:>6}{store_seconds * 1000:>16.3f}{pandas_seconds * 1000:>13.1f}"
+                  f"{rollup_seconds * 1000:>14.2f}{pandas_seconds / rollup_seconds:>8.0f}x{str(same):>6}")
+            db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+SourceCoverageEvaluator cross-referencing: one cosine_similarity call per
+source pair (as it used to be computed) versus the blocked sparse product,
+at several source counts; plus MinHash near-duplicate detection, checked
+against exact shingle Jaccard similarity.
+
+Source texts are drawn from a Zipf-distributed vocabulary (the stub
+server's articles all repeat one paragraph, so every pair would be a
+duplicate). A quarter of the sources are lightly edited copies of others,
+as happens with syndicated news.
+
+Usage:
+    python -m benchmarks.bench_source_coverage --sources 10 52 200 500 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from itertools import combinations
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def build_output(sources: int, words: int = 600, seed: int = 0):
+    import numpy as np
+    from tools.research.common.model_schemas import ContentItem, ResearchToolOutput
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([f"term{i}" for i in range(20000)])
+    originals = sources - sources // 4
+    texts = [" ".join(vocabulary[np.minimum(rng.zipf(1.3, size=words), len(vocabulary)) - 1])
+             for _ in range(originals)]
+    for i in range(sources - originals):
+        words = texts[i * 3 % originals].split()
+        texts.append(" ".join(words[:-20] + ["Syndicated", "copy", str(i)]))
+    return ResearchToolOutput(content=[
+        ContentItem(url=f"https://news{i % 7}.example.com/story/{i}", title=f"Story {i}",
+                    snippet="", content=text)
+        for i, text in enumerate(texts)
+    ], summary="")
+
+
+def pairwise_count(vectors, threshold: float = 0.3) -> int:
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    return int(sum(cosine_similarity(vectors[i:i + 1], vectors[j:j + 1])[0][0] > threshold
+                   for i, j in combinations(range(vectors.shape[0]), 2)))
+
+
+def exact_near_duplicates(texts, threshold: float):
+    from utils.near_duplicates import shingles
+
+    sets = [shingles(text) for text in texts]
+    return {(i, j) for i, j in combinations(range(len(sets)), 2)
+            if len(sets[i] & sets[j]) / max(len(sets[i] | sets[j]), 1) >= threshold}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, nargs="+", default=[10, 52, 200, 500, 2000])
+    parser.add_argument("--pairwise-limit", type=int, default=200,
+                        help="skip the per-pair loop above this many sources (it is quadratic)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    os.chdir(tempfile.mkdtemp(prefix="bench-coverage-"))
+    from utils.nlp_preprocessing import PreprocessedDocument
+    from utils.source_coverage import SourceCoverageEvaluator, count_similar_pairs
+
+    evaluator = SourceCoverageEvaluator()
+    print(f"{'sources':>8}{'pairwise (s)':>14}{'sparse (s)':>12}{'speedup':>9}{'same':>6}"
+          f"{'minhash (s)':>13}{'exact (s)':>11}{'dups found/exact':>18}")
+    for count in args.sources:
+        document = PreprocessedDocument(build_output(count)).prepare()
+        vectors, texts = document.source_vectors, document.non_empty_source_texts
+
+        expected, pairwise_seconds = None, float("nan")
+        if count <= args.pairwise_limit:
+            start = time.perf_counter()
+            expected = pairwise_count(vectors)
+            pairwise_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = count_similar_pairs(vectors)
+        sparse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = {(i, j) for i, j, _ in evaluator.find_near_duplicates(texts)}
+        minhash_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = exact_near_duplicates(texts, evaluator.near_duplicate_threshold)
+        exact_seconds = time.perf_counter() - start
+
+        print(f"{count:>8}{pairwise_seconds:>14.3f}{sparse_seconds:>12.4f}"
+              f"{pairwise_seconds / sparse_seconds:>8.0f}x{str(expected == actual) if expected is not None else '-':>6}"
+              f"{minhash_seconds:>13.3f}{exact_seconds:>11.3f}"
+              f"{f'{len(found & exact)}/{len(exact)} (+{len(found - exact)})':>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Time-to-first-byte of the summary: buffered POST /api/generate-summary/
+versus the streaming POST /api/generate-summary/stream, against the local
+stubs (see load_test_api). Also checks that streamed completions still record
+the provider's exact token usage for both OpenAI and Groq.
+
+Usage:
+    python -m benchmarks.bench_streaming --requests 5 --llm-latency 3.0
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from benchmarks.load_test_api import serve, use_stub_services
+from benchmarks.stub_server import ResearchStubServer
+
+
+def build_app():
+    from fastapi import FastAPI
+    from controllers.generate_summary_router import api_router as summary_router
+    from tools.research.common.fetcher import get_default_async_fetcher
+
+    app = FastAPI()
+    app.include_router(summary_router, prefix="/api/generate-summary")
+
+    @app.on_event("shutdown")
+    async def close_http_sessions():
+        await get_default_async_fetcher().aclose()
+
+    return app
+
+
+class UsageRecorder:
+    """Stands in for TokenUsageTracker to capture one call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def add_usage(self, prompt_tokens, completion_tokens, model, prompt_id=None, **timing):
+        self.calls.append((prompt_tokens, completion_tokens))
+
+
+def check_usage() -> None:
+    from utils.model_wrapper import stream_model_wrapper
+
+    for host in ("openai", "groq"):
+        recorder = UsageRecorder()
+        text = "".join(stream_model_wrapper("system", "user", None, model="stub", host=host, token_tracker=recorder))
+        print(f"{host:<8} streamed {len(text)} chars, recorded usage (prompt, completion): {recorder.calls}")
+
+
+async def buffered(client, query: str):
+    start = time.perf_counter()
+    response = await client.post("/api/generate-summary/", json={"query": query})
+    total = time.perf_counter() - start
+    return {"ok": response.status_code == 200, "first": total, "total": total}
+
+
+async def streamed(client, query: str):
+    start = time.perf_counter()
+    first = None
+    ok = False
+    async with client.stream("POST", "/api/generate-summary/stream", json={"query": query}) as response:
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "token" and first is None:
+                    first = time.perf_counter() - start
+                elif event == "done":
+                    ok = bool(json.loads(line[len("data: "):]).get("summary"))
+    total = time.perf_counter() - start
+    return {"ok": ok, "first": first if first is not None else total, "total": total}
+
+
+async def drive(base_url: str, requests: int):
+    import httpx
+
+    results = {"buffered": [], "streamed": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        for i in range(requests):
+            # Distinct queries so both modes scrape and summarize from scratch
+            results["buffered"].append(await buffered(client, f"buffered streaming query {i}"))
+            results["streamed"].append(await streamed(client, f"streamed streaming query {i}"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=3.0, help="seconds to generate a full completion")
+    parser.add_argument("--llm-ttft", type=float, default=0.3, help="seconds to the first streamed token")
+    args = parser.parse_args()
+
+    stub = ResearchStubServer(articles=5000, latency=0.1, llm_latency=args.llm_latency, llm_ttft=args.llm_ttft)
+    with stub:
+        use_stub_services(stub)
+        server, thread, base_url = serve(build_app())
+        check_usage()
+        results = asyncio.run(drive(base_url, args.requests))
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    print(f"\n{args.requests} requests each, LLM {args.llm_latency}s total / {args.llm_ttft}s to first token")
+    print(f"{'mode':<10}{'ok':>5}{'first byte p50 (s)':>20}{'total p50 (s)':>16}")
+    for mode, rows in results.items():
+        print(f"{mode:<10}{sum(r['ok'] for r in rows):>5}"
+              f"{statistics.median(r['first'] for r in rows):>20.2f}"
+              f"{statistics.median(r['total'] for r in rows):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+TaskScheduler makespan on synthetic research outlines: mock tasks sleep for
+a random (log-normal) latency instead of searching and calling LLMs. Each
+shape runs under the previous scheduler (4 workers, tasks started in the
+order they became ready) and the DAG engine, both capped at the same 4
+workers (isolating critical-path-first ordering) and with its pool sized to
+the outline, against the critical path as the lower bound.
+
+Shapes:
+    wide     one topic fanning out to 48 sections, then a synthesis
+    deep     6 chains of 8 dependent steps, then a synthesis
+    outline  topic -> 6 sections -> 4 subsections each -> section summaries -> report
+    skewed   40 independent leaves listed before a 10-step chain
+    random   120 tasks, each depending on up to 3 earlier ones
+
+Usage:
+    python -m benchmarks.bench_task_scheduler --latency 0.05 --seed 7
+"""
+import argparse
+import concurrent.futures
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+class MockTask:
+    def __init__(self, id: str, dependencies: List[str], latency: float):
+        self.id = id
+        self.dependencies = dependencies
+        self.latency = latency
+
+    def execute(self, db, state, tools):
+        from research_agent.research_task import TaskResult
+
+        missing = [dep for dep in self.dependencies if dep not in state]
+        if missing:
+            return TaskResult(id=self.id, error=f"missing dependencies {missing}")
+        time.sleep(self.latency)
+        return TaskResult(id=self.id, result=f"notes for {self.id}", error="")
+
+
+def shapes(rng: random.Random) -> Dict[str, List[tuple]]:
+    """(id, dependencies) per task for each outline shape."""
+    wide = [("topic", [])] + [(f"section-{i}", ["topic"]) for i in range(48)]
+    wide.append(("synthesis", [f"section-{i}" for i in range(48)]))
+
+    deep = []
+    for chain in range(6):
+        deep += [(f"c{chain}-{step}", [f"c{chain}-{step - 1}"] if step else []) for step in range(8)]
+    deep.append(("synthesis", [f"c{chain}-7" for chain in range(6)]))
+
+    outline = [("topic", [])]
+    for s in range(6):
+        outline.append((f"s{s}", ["topic"]))
+        outline += [(f"s{s}.{k}", [f"s{s}"]) for k in range(4)]
+        outline.append((f"s{s}-summary", [f"s{s}.{k}" for k in range(4)]))
+    outline.append(("report", [f"s{s}-summary" for s in range(6)]))
+
+    skewed = [(f"leaf-{i}", []) for i in range(40)]
+    skewed += [(f"step-{i}", [f"step-{i - 1}"] if i else []) for i in range(10)]
+
+    random_dag = []
+    for i in range(120):
+        deps = rng.sample(range(i), k=min(i, rng.randint(0, 3))) if i else []
+        random_dag.append((f"t{i}", [f"t{d}" for d in deps]))
+
+    return {"wide": wide, "deep": deep, "outline": outline, "skewed": skewed, "random": random_dag}
+
+
+def critical_path(tasks: List[MockTask]) -> float:
+    finish: Dict[str, float] = {}
+    for task in tasks:  # shapes list dependencies before dependents
+        finish[task.id] = task.latency + max((finish[dep] for dep in task.dependencies), default=0.0)
+    return max(finish.values())
+
+
+def previous_scheduler(tasks: List[MockTask], max_workers: int = 4) -> float:
+    """The scheduler as it was: fixed pool, dependents submitted in completion order."""
+    task_map = {task.id: task for task in tasks}
+    in_degree = {task.id: len(task.dependencies) for task in tasks}
+    dependents: Dict[str, List[str]] = {task.id: [] for task in tasks}
+    for task in tasks:
+        for dep in task.dependencies:
+            dependents[dep].append(task.id)
+    state = {}
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {task.id: executor.submit(task.execute, None, state, []) for task in tasks if not task.dependencies}
+        while futures:
+            done, _ = concurrent.futures.wait(futures.values(), return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                state[result.id] = result
+                for dependent_id in dependents[result.id]:
+                    in_degree[dependent_id] -= 1
+                    if in_degree[dependent_id] == 0:
+                        futures[dependent_id] = executor.submit(task_map[dependent_id].execute, None, state, [])
+                del futures[result.id]
+    return time.perf_counter() - start
+
+
+def run_engine(scheduler):
+    start = time.perf_counter()
+    scheduler.execute()
+    elapsed = time.perf_counter() - start
+    failed = [result.id for result in scheduler.get_results() if result.error]
+    assert not failed and len(scheduler.get_results()) == len(scheduler.tasks), failed
+    return elapsed, scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.05, help="median task latency in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-scheduler-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.WARNING)
+    from research_agent.research_task_scheduler import TaskScheduler
+    from utils.db import ContentDB
+
+    db = ContentDB(os.path.join(workdir, "db", "content.db"))
+    rng = random.Random(args.seed)
+    print(f"{'shape':>8}{'tasks':>7}{'critical path (s)':>19}{'previous (s)':>14}{'engine, 4 (s)':>15}"
+          f"{'workers':>9}{'engine (s)':>12}{'speedup':>9}")
+    for name, spec in shapes(rng).items():
+        tasks = [MockTask(task_id, deps, args.latency * rng.lognormvariate(0, 0.6)) for task_id, deps in spec]
+        before = previous_scheduler(tasks)
+        capped, _ = run_engine(TaskScheduler(tasks, tools=[], max_workers=4, db=db))
+        after, scheduler = run_engine(TaskScheduler(tasks, tools=[], db=db))
+        print(f"{name:>8}{len(tasks):>7}{critical_path(tasks):>19.2f}{before:>14.2f}{capped:>15.2f}"
+              f"{scheduler.max_workers:>9}{after:>12.2f}{before / after:>8.1f}x")
+    db.conn.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Trace log access at 10k / 100k / 1M traces: the full JSONL scan that
+load_research_history used to do on every call, versus the TraceStore index
+(one-off migration, incremental refresh after new traces are appended, and
+filtered/paged queries).
+
+Traces are synthetic, about 500 bytes each (real ones are ~9 KB, which only
+makes the full scan slower). Files are written to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_trace_store --traces 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+TOOLS = ["General Agent", "Analysis Agent", "Amazon Agent", "Marine Agent"]
+PROMPTS = ["research.txt", "summary.txt", None]
+
+
+def synthetic_trace(i: int, start: datetime, rng: random.Random) -> dict:
+    begin = start + timedelta(seconds=i * 30)
+    success = rng.random() > 0.1
+    return {
+        "trace_id": f"trace-{i}",
+        "query": f"synthetic research question number {i}",
+        "start_time": begin.isoformat(),
+        "tool": rng.choice(TOOLS),
+        "prompt_used": rng.choice(PROMPTS),
+        "tools_used": ["General Agent"],
+        "duration": round(rng.uniform(2, 60), 3),
+        "error": None if success else "Synthetic failure",
+        "success": success,
+        "processing_steps": ["Content processed - New: 5, Reused: 3"],
+        "token_usage": {"model": "llama3-70b-8192", "tokens": {"input": 900, "output": 120, "total": 1020},
+                        "processing": {"time": 3.2, "speed": 318.7}, "cost": 0.00066},
+        "content_new": 5,
+        "content_reused": 3,
+    }
+
+
+def write_traces(path: str, start_index: int, count: int, start: datetime, rng: random.Random) -> None:
+    with open(path, "a") as f:
+        for i in range(start_index, start_index + count):
+            f.write(json.dumps(synthetic_trace(i, start, rng)) + "\n")
+
+
+def full_scan(path: str) -> int:
+    with open(path) as f:
+        return len([json.loads(line) for line in f])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--append", type=int, default=100, help="traces appended before the incremental refresh")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.INFO)
+    from research_agent.trace_store import TraceStore
+
+    workdir = tempfile.mkdtemp(prefix="bench-traces-")
+    start = datetime(2025, 1, 1)
+    print(f"{'traces':>9}{'file MB':>9}{'full scan (s)':>15}{'migrate (s)':>13}"
+          f"{'refresh +' + str(args.append) + ' (ms)':>20}{'page (ms)':>11}{'count (ms)':>12}")
+    try:
+        for count in args.traces:
+            path = os.path.join(workdir, f"traces-{count}.jsonl")
+            rng = random.Random(count)
+            write_traces(path, 0, count, start, rng)
+
+            _, scan_seconds = timed(lambda: full_scan(path))
+            store = TraceStore(path)
+            _, migrate_seconds = timed(store.refresh)
+
+            write_traces(path, count, args.append, start, rng)
+            added, refresh_seconds = timed(store.refresh)
+            assert added == args.append, added
+
+            # A dashboard page: the 50 most recent failed Analysis Agent runs
+            page, page_seconds = timed(lambda: store.query(
+                refresh=False, tool="Analysis Agent", success=False, limit=50
+            ))
+            assert len(page) == 50 and all(not t["success"] for t in page)
+            _, count_seconds = timed(lambda: store.count(tool="General Agent", start=start.isoformat()))
+
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{count:>9}{size_mb:>9.0f}{scan_seconds:>15.2f}{migrate_seconds:>13.2f}"
+                  f"{refresh_seconds * 1000:>20.1f}{page_seconds * 1000:>11.1f}{count_seconds * 1000:>12.1f}")
+            store.close()
+            os.remove(path)
+            os.remove(store.index_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Regression check for concurrent writes from several ContentDB instances
+(each with its own SQLitePool) on one database file, as separate processes
+or tools opening their own ContentDB produce. Each round's database starts
+with --writes source coverage evaluations and no evaluation rollups, as
+one predating them would. --threads threads then open their own ContentDB
+on it, all at once, and make --writes rounds of upsert_doc (which reads
+before it writes) and store_source_coverage. Every open and write must
+succeed: a write transaction that cannot get the database's write lock has
+to wait for it (BUSY_TIMEOUT) rather than fail with "database is locked".
+The rollups must be backfilled once, not by every opener, and count each
+evaluation exactly once.
+
+Prints the failures and exits with status 1 if there are any. Files are
+written to a temporary directory.
+
+Usage:
+    python -m benchmarks.check_db_concurrency --threads 4 --writes 10 --rounds 5
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+def coverage(thread: int, i: int) -> dict:
+    return {
+        'query': f"check query {thread}-{i}",
+        'timestamp': f"2024-01-{1 + i % 28:02d}T12:00:00",
+        'coverage_score': (thread * 31 + i * 7) % 100 / 100,
+        'missed_sources': [],
+        'total_sources': 5,
+        'unique_domains': 3,
+    }
+
+
+def run(path: str, threads: int, writes: int) -> list:
+    """Failures of one round of concurrent writers on the database at `path`."""
+    from research_components.db import ContentDB
+    from tools.research.common.model_schemas import ContentItem
+
+    db = ContentDB(path)
+    try:
+        for i in range(writes):
+            db.store_source_coverage(coverage(threads, i))
+    finally:
+        db.close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("DELETE FROM evaluation_rollups")
+        conn.execute("DELETE FROM evaluation_score_buckets")
+    conn.close()
+
+    failures = []
+    failures_lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def fail(message: str):
+        with failures_lock:
+            failures.append(message)
+
+    def write(thread: int):
+        start.wait()
+        try:
+            db = ContentDB(path)
+        except Exception as e:
+            fail(f"thread {thread}: ContentDB(): {e!r}")
+            return
+        try:
+            for i in range(writes):
+                doc = ContentItem(url=f"https://example.com/{thread}/{i}", title=f"Page {thread}-{i}",
+                                  snippet="snippet", content="body text " * 200, source="web")
+                try:
+                    if not db.upsert_doc(doc):
+                        fail(f"thread {thread}: upsert_doc {i} returned False")
+                except Exception as e:
+                    fail(f"thread {thread}: upsert_doc {i}: {e!r}")
+                if db.store_source_coverage(coverage(thread, i)) == -1:
+                    fail(f"thread {thread}: store_source_coverage {i} failed")
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=write, args=(thread,)) for thread in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    expected = (threads + 1) * writes
+    db = ContentDB(path)
+    try:
+        stored = len(db.get_source_coverage_evaluations(limit=expected * 2))
+        rollups = db.get_evaluation_rollups('source_coverage', by_day=False)
+        counted = rollups[0]['count'] if rollups else 0
+    finally:
+        db.close()
+    if not failures and stored != expected:
+        failures.append(f"{stored} of {expected} source coverage evaluations stored")
+    if not failures and counted != expected:
+        failures.append(f"rollups count {counted} of {expected} source coverage evaluations")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--writes", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="check-db-")
+    os.chdir(workdir)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("GROQ_API_KEY", "gsk-bench")
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    failed = 0
+    try:
+        for round_ in range(args.rounds):
+            path = os.path.join(workdir, f"round-{round_}", "content.db")
+            failures = run(path, args.threads, args.writes)
+            print(f"round {round_ + 1}: {len(failures)} failures")
+            for failure in failures:
+                print(f"  {failure}")
+            failed += bool(failures)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{failed} of {args.rounds} rounds failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Load test of the research endpoint against local stubs of Serper, OpenAI,
+Groq and the news sites, so no network access or API keys are needed.
+
+A single uvicorn worker serves two routes backed by the same GeneralAgent:
+
+    async   POST /api/generate-summary/   (the real router, awaits arun_tool)
+    legacy  POST /legacy/generate-summary (calls the blocking run_tool inside
+                                           an async handler, as before)
+
+and each is driven with a fixed number of concurrent clients, reporting
+requests/sec and latency percentiles.
+
+Usage:
+    python -m benchmarks.load_test_api --requests 20 --concurrency 10 --llm-latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stub_server import ResearchStubServer
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def use_stub_services(stub: ResearchStubServer) -> str:
+    """
+    Point every external client at the stub and move into a scratch directory
+    (the content cache, traces and logs are written relative to the cwd).
+    Must run before the application modules are imported.
+
+    Returns:
+        str: The scratch directory
+    """
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-stub",
+        "GROQ_API_KEY": "gsk-stub",
+        "SERPER_API_KEY": "serper-stub",
+        "OPENAI_BASE_URL": f"{stub.base_url}/v1",
+        "GROQ_BASE_URL": stub.base_url,
+        "SERPER_API_URL": stub.base_url,
+        # Every stub page lives on one host; do not throttle it like a real site
+        "SCRAPE_PER_DOMAIN_CONCURRENCY": "64",
+        "SCRAPE_DOMAIN_DELAY": "0",
+    })
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    os.chdir(workdir)
+    return workdir
+
+
+def serve(app):
+    """Run `app` under uvicorn in a background thread; returns (server, thread, base_url)."""
+    import logging
+    import uvicorn
+
+    logging.getLogger().setLevel(logging.WARNING)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def build_app():
+    """Import the application only after the stub endpoints are configured."""
+    from fastapi import FastAPI, HTTPException
+    from controllers.generate_summary_router import api_router as summary_router, ResearchRequest
+    from research_components.research import run_tool
+    from tools import GeneralAgent
+    from tools.research.common.fetcher import get_default_async_fetcher
+
+    app = FastAPI()
+    app.include_router(summary_router, prefix="/api/generate-summary")
+
+    @app.on_event("shutdown")
+    async def close_http_sessions():
+        await get_default_async_fetcher().aclose()
+
+    @app.post("/legacy/generate-summary")
+    async def legacy_generate_summary(request: ResearchRequest):
+        tool = GeneralAgent(include_summary=True, prompt_name=request.prompt_name)
+        result, trace = run_tool(tool_name=request.tool_name, query=request.query, tool=tool)
+        if not result:
+            raise HTTPException(status_code=400, detail="Research failed")
+        return {"summary": result.summary, "content": len(result.content)}
+
+    return app
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def drive(base_url: str, path: str, total: int, concurrency: int, label: str):
+    import httpx
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json={"query": f"{label} load test query {i}"})
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        wall = time.perf_counter() - start
+
+    return {
+        "mode": label,
+        "requests": total,
+        "errors": errors,
+        "rps": total / wall,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "max": max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["legacy", "async"], choices=["legacy", "async"])
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--search-latency", type=float, default=0.3)
+    parser.add_argument("--page-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    stub = ResearchStubServer(
+        articles=5000,
+        latency=args.page_latency,
+        search_latency=args.search_latency,
+        llm_latency=args.llm_latency
+    )
+    with stub:
+        workdir = use_stub_services(stub)
+        server, thread, base_url = serve(build_app())
+
+        paths = {"legacy": "/legacy/generate-summary", "async": "/api/generate-summary/"}
+        results = []
+        for mode in args.modes:
+            results.append(asyncio.run(drive(base_url, paths[mode], args.requests, args.concurrency, mode)))
+
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    print(f"\n{args.requests} requests, concurrency {args.concurrency}, "
+          f"LLM {args.llm_latency}s / search {args.search_latency}s / page {args.page_latency}s (work dir {workdir})")
+    print(f"{'mode':<10}{'ok':>6}{'req/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}{'max (s)':>10}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['requests'] - r['errors']:>6}{r['rps']:>10.2f}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['max']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
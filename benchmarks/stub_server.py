@@ -0,0 +1,245 @@
+"""
+Local HTTP stub servers used by the benchmarks so they can run offline.
+"""
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+PARAGRAPH = (
+    "Researchers reported on Tuesday that the new findings could reshape how "
+    "the industry approaches long-term planning, citing data gathered over "
+    "several years from dozens of independent sources."
+)
+
+
+def synthetic_article(index: int, paragraphs: int = 12) -> str:
+    """Render a news-like HTML page with navigation boilerplate around an article."""
+    body = "\n".join(f"<p>{PARAGRAPH} (article {index}, paragraph {i})</p>" for i in range(paragraphs))
+    return f"""<!DOCTYPE html>
+<html><head><title>Synthetic article {index}</title>
+<script>var tracking = {{id: {index}}};</script><style>body {{ font-family: sans-serif; }}</style></head>
+<body>
+<nav><a href="/">Home</a> <a href="/world">World</a> <a href="/business">Business</a></nav>
+<header><h1>Synthetic article {index}</h1></header>
+<article>{body}</article>
+<aside><ul><li>Related story one</li><li>Related story two</li></ul></aside>
+<footer>Copyright Example News</footer>
+</body></html>"""
+
+
+class ArticleServer:
+    """
+    Serves `/article/<n>` pages with a fixed artificial latency. Each article
+    carries a stable ETag and honours If-None-Match with a 304.
+
+    Args:
+        articles: Number of articles to serve
+        latency: Seconds to sleep before answering each request
+    """
+
+    def __init__(self, articles: int = 10, latency: float = 0.2):
+        self.articles = articles
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._counter_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment so keep-alive connections
+            # do not stall on Nagle/delayed-ACK.
+            wbufsize = 64 * 1024
+
+            def do_GET(self):
+                with server._counter_lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+                try:
+                    index = int(self.path.rstrip('/').rsplit('/', 1)[-1])
+                except ValueError:
+                    index = -1
+                if not 0 <= index < server.articles:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"article-{index}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._counter_lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                payload = synthetic_article(index).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_json(self, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> List[str]:
+        return [f"{self.base_url}/article/{i}" for i in range(self.articles)]
+
+    def __enter__(self) -> "ArticleServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ResearchStubServer(ArticleServer):
+    """
+    Offline stand-in for every external service the research pipeline calls:
+    Serper news search (`POST /news`), OpenAI and Groq chat completions
+    (`POST /v1/chat/completions`, `POST /openai/v1/chat/completions`) and the
+    news articles themselves (`GET /article/<n>`).
+
+    Search results are derived from the query so different queries hit
+    different articles. Point the clients at it with SERPER_API_URL,
+    OPENAI_BASE_URL=<base_url>/v1 and GROQ_BASE_URL=<base_url>.
+
+    Args:
+        articles: Number of articles to serve
+        latency: Seconds to sleep before answering each article request
+        search_latency: Seconds to sleep before answering a search
+        llm_latency: Seconds to sleep before answering a completion; streamed
+            completions spread their tokens over the same total time
+        results_per_search: News items returned per search
+        llm_ttft: Seconds before the first token of a streamed completion
+    """
+
+    def __init__(
+        self,
+        articles: int = 1000,
+        latency: float = 0.1,
+        search_latency: float = 0.3,
+        llm_latency: float = 1.0,
+        results_per_search: int = 10,
+        llm_ttft: float = 0.2
+    ):
+        self.search_latency = search_latency
+        self.llm_latency = llm_latency
+        self.results_per_search = results_per_search
+        self.llm_ttft = min(llm_ttft, llm_latency)
+        super().__init__(articles, latency)
+
+    def _handler_class(self):
+        server = self
+        base = super()._handler_class()
+
+        class Handler(base):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with server._counter_lock:
+                    server.requests += 1
+
+                if self.path.rstrip('/').endswith("/news"):
+                    time.sleep(server.search_latency)
+                    offset = zlib.crc32(request.get("q", "").encode()) % server.articles
+                    news = [
+                        {
+                            "title": f"Synthetic article {(offset + i) % server.articles}",
+                            "link": f"{server.base_url}/article/{(offset + i) % server.articles}",
+                            "snippet": "Researchers reported new findings.",
+                            "date": "1 day ago",
+                            "source": "Example News"
+                        }
+                        for i in range(server.results_per_search)
+                    ]
+                    self.send_json({"news": news})
+                elif self.path.endswith("/chat/completions") and request.get("stream"):
+                    self.stream_completion(request)
+                elif self.path.endswith("/chat/completions"):
+                    time.sleep(server.llm_latency)
+                    if "response_format" in request:
+                        content = json.dumps({"sources": [0, 1, 2, 3, 4]})
+                    else:
+                        content = "Summary of the search results grouped by theme. " * 20
+                    self.send_json({
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": request.get("model", "stub"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop"
+                        }],
+                        "usage": {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200}
+                    })
+                else:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def stream_completion(self, request: dict) -> None:
+                # OpenAI-style SSE chunks; usage arrives on a final chunk, under
+                # x_groq for the Groq route and as `usage` when requested via
+                # stream_options for the OpenAI route.
+                text = "Summary of the search results grouped by theme. "
+                words = [text[i:i + 8] for i in range(0, len(text), 8)] * 20
+                base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": request.get("model", "stub")}
+                usage = {"prompt_tokens": 1000, "completion_tokens": len(words), "total_tokens": 1000 + len(words)}
+                interval = (server.llm_latency - server.llm_ttft) / max(1, len(words) - 1)
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                time.sleep(server.llm_ttft)
+                for i, word in enumerate(words):
+                    if i:
+                        time.sleep(interval)
+                    chunk = {**base, "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                    self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+
+                final = {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+                if self.path.startswith("/openai/"):
+                    final["x_groq"] = {"id": "req-stub", "usage": usage}
+                    self.write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+                else:
+                    self.write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+                    if request.get("stream_options", {}).get("include_usage"):
+                        self.write_chunk(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+                self.write_chunk(b"data: [DONE]\n\n")
+                self.write_chunk(b"")
+
+        return Handler
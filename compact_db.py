@@ -0,0 +1,125 @@
+import os
+import argparse
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import sqlite3
+from typing import Dict, Optional
+from utils.content_store import BODY_CODEC, CODECS, body_row, decompress_body, register_functions
+from utils.migrations import migrate
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bodies recompressed per transaction
+BATCH_SIZE = 500
+
+
+def _file_size(db_path: str) -> int:
+    """Bytes on disk of the database and its write-ahead log."""
+    return sum(os.path.getsize(path) for path in (db_path, f"{db_path}-wal") if os.path.exists(path))
+
+
+def compact_database(
+    db_path: str,
+    codec: Optional[str] = None,
+    level: Optional[int] = None,
+    recompress_all: bool = False,
+    vacuum: bool = True
+) -> Dict[str, int]:
+    """
+    Recompress stored document bodies and reclaim free space, offline.
+
+    Pending schema migrations are applied first (moving bodies still stored
+    inline in content.content to content_bodies). Bodies stored with another
+    codec are then recompressed with `codec`, the database is VACUUMed, and
+    the content search index, keyed by rowids VACUUM may renumber, is
+    rebuilt. Run it while the application is stopped: VACUUM needs the
+    database to itself.
+
+    Args:
+        db_path: Path to the SQLite database file
+        codec: Codec to store bodies with (default: CONTENT_BODY_CODEC)
+        level: Compression level (default: CONTENT_ZSTD_LEVEL / CONTENT_ZLIB_LEVEL)
+        recompress_all: Also recompress bodies already stored with `codec`,
+            e.g. after changing the level
+        vacuum: Whether to VACUUM and rebuild the search index
+
+    Returns:
+        Dict[str, int]: 'recompressed' bodies, their 'body_bytes' (uncompressed)
+            and 'stored_bytes', and the file size 'before' and 'after' in bytes
+    """
+    codec = codec or BODY_CODEC
+    stats = {'recompressed': 0, 'body_bytes': 0, 'stored_bytes': 0, 'before': _file_size(db_path), 'after': 0}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        register_functions(conn)
+        applied = migrate(conn)
+        if applied:
+            logger.info(f"Applied schema migrations {applied}")
+
+        last_rowid = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, doc_id, codec, body FROM content_bodies WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (last_rowid, BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            updates = []
+            for rowid, doc_id, stored_codec, body in rows:
+                if stored_codec == codec and not recompress_all:
+                    continue
+                _, new_codec, _, new_body = body_row(doc_id, decompress_body(stored_codec, body), codec, level)
+                if (new_codec, new_body) != (stored_codec, body):
+                    updates.append((new_codec, new_body, rowid))
+            conn.executemany("UPDATE content_bodies SET codec = ?, body = ? WHERE rowid = ?", updates)
+            conn.commit()
+            stats['recompressed'] += len(updates)
+        logger.info(f"Recompressed {stats['recompressed']} document bodies with {codec}")
+
+        if vacuum:
+            search_index = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'content_fts'").fetchone()
+            if search_index:
+                # Emptied before VACUUM and rebuilt after it, so the old
+                # index pages are not left behind as free pages
+                conn.execute("INSERT INTO content_fts(content_fts) VALUES ('delete-all')")
+                conn.commit()
+            logger.info("Vacuuming database")
+            conn.execute("VACUUM")
+            if search_index:
+                logger.info("Rebuilding content search index")
+                conn.execute("INSERT INTO content_fts(content_fts) VALUES ('rebuild')")
+                conn.commit()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        body_bytes, stored_bytes = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(SUM(length(body)), 0) FROM content_bodies"
+        ).fetchone()
+        stats['body_bytes'] = body_bytes
+        stats['stored_bytes'] = stored_bytes
+    finally:
+        conn.close()
+
+    stats['after'] = _file_size(db_path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompress stored document bodies and compact the content database")
+    parser.add_argument("db_path", nargs="?", default=os.getenv('DB_PATH', './data/content.db'))
+    parser.add_argument("--codec", choices=CODECS, help=f"codec to store bodies with (default: {BODY_CODEC})")
+    parser.add_argument("--level", type=int, help="compression level")
+    parser.add_argument("--all", action="store_true", help="recompress bodies already stored with the codec")
+    parser.add_argument("--no-vacuum", action="store_true", help="only recompress; do not VACUUM")
+    args = parser.parse_args()
+
+    stats = compact_database(args.db_path, args.codec, args.level, args.all, not args.no_vacuum)
+    ratio = stats['stored_bytes'] / stats['body_bytes'] if stats['body_bytes'] else 1.0
+    print(f"Recompressed {stats['recompressed']} bodies; bodies stored in {stats['stored_bytes']} of "
+          f"{stats['body_bytes']} bytes ({ratio:.0%}); database {stats['before']} -> {stats['after']} bytes")
+
+
+if __name__ == "__main__":
+    main()
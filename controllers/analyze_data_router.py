@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from tools import AnalysisAgent, PromptLoader
-from research_components.research import run_tool
+from research_components.research import arun_tool
 
 api_router = APIRouter()
 
@@ -54,7 +54,7 @@ async def generate_analysis(request: AnalyzeRequest):
             )
         
         # Run analysis with additional parameters
-        result, trace = run_tool(
+        result, trace = await arun_tool(
             tool_name=request.tool_name,
             query=request.query,
             dataset=request.dataset,
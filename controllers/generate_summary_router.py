@@ -1,9 +1,14 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
+import logging
 
 from tools import GeneralAgent, PromptLoader
-from research_components.research import run_tool
+from research_components.research import arun_tool
+from research_components.jobs import summarize_result
+from utils.sse import format_sse, SSE_HEADERS
 
 api_router = APIRouter()
 
@@ -32,7 +37,7 @@ async def generate_summary(request: ResearchRequest):
         )
         
         # Run research
-        result, trace = run_tool(
+        result, trace = await arun_tool(
             tool_name=request.tool_name,
             query=request.query,
             tool=tool
@@ -59,6 +64,72 @@ async def generate_summary(request: ResearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@api_router.post("/stream")
+async def stream_summary(request: ResearchRequest):
+    """
+    Run research and stream the summary as Server-Sent Events while it is
+    generated. Events: "progress" (stage, progress), "token" (text) for each
+    summary token, "evaluation" (name, score) as each evaluator finishes, then
+    "done" with the sources and scores, or "error".
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def push(event: str, data: dict) -> None:
+        # Evaluators report from worker threads
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    tool = GeneralAgent(
+        include_summary=True,
+        prompt_name=request.prompt_name,
+        summary_callback=lambda token: push("token", {"text": token})
+    )
+
+    def forward(event: str, data: dict) -> None:
+        # The full summary is already delivered token by token
+        if event != "summary":
+            push(event, data)
+
+    # The run is not cancelled if the client goes away, so its trace and
+    # evaluations are still recorded
+    task = asyncio.create_task(arun_tool(
+        tool_name=request.tool_name,
+        query=request.query,
+        tool=tool,
+        prompt_name=request.prompt_name,
+        progress_callback=forward,
+        background_evaluation=False
+    ))
+
+    async def stream():
+        while True:
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                event, data = getter.result()
+                yield format_sse(event, data)
+                continue
+            getter.cancel()
+            break
+
+        while not events.empty():
+            event, data = events.get_nowait()
+            yield format_sse(event, data)
+
+        try:
+            result, trace = task.result()
+        except Exception as e:
+            logging.error(f"Streaming research failed: {str(e)}", exc_info=True)
+            yield format_sse("error", {"detail": str(e)})
+            return
+        if result:
+            yield format_sse("done", summarize_result(result, trace))
+        else:
+            yield format_sse("error", {"detail": trace.data.get("error") or "Research failed"})
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @api_router.get("/prompts", response_model=PromptListResponse)
 async def get_available_prompts():
     """
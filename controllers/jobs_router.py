@@ -0,0 +1,150 @@
+from fastapi import APIRouter, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+import asyncio
+
+from research_components.jobs import get_default_job_queue, TERMINAL_STATES
+from utils.sse import format_sse, SSE_HEADERS, SSE_KEEPALIVE
+
+api_router = APIRouter()
+
+class JobRequest(BaseModel):
+    """Request model for submitting a research job."""
+    query: str
+    tool_name: Optional[str] = "General Agent"
+    prompt_name: Optional[str] = "research.txt"
+    dataset: Optional[str] = None
+
+class JobSubmitResponse(BaseModel):
+    """Response model for a submitted job."""
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+    result_url: str
+
+class JobStatusResponse(BaseModel):
+    """Response model for job status polling."""
+    job_id: str
+    status: str
+    stage: Optional[str] = None
+    progress: float = 0.0
+    queue_position: Optional[int] = None
+    query: str
+    tool_name: str
+    created_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+class JobResultResponse(BaseModel):
+    """Response model for a finished job."""
+    job_id: str
+    summary: Optional[str] = None
+    sources: List[dict]
+    scores: Dict[str, Any]
+    duration: Optional[float] = None
+    content_new: Optional[int] = None
+    content_reused: Optional[int] = None
+    prompt_used: Optional[str] = None
+
+def _get_job_or_404(job_id: str) -> dict:
+    job = get_default_job_queue().store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@api_router.post("/", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a research job and return immediately. Poll the status URL or
+    subscribe to the events URL for progress.
+    """
+    try:
+        queue = get_default_job_queue()
+        job_id = await asyncio.to_thread(
+            queue.submit, request.tool_name, request.query, request.prompt_name, request.dataset
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error submitting job: {str(e)}")
+
+    base = f"/api/jobs/{job_id}"
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": base,
+        "events_url": f"{base}/events",
+        "result_url": f"{base}/result"
+    }
+
+@api_router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    job = await asyncio.to_thread(_get_job_or_404, job_id)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"] or 0.0,
+        "queue_position": get_default_job_queue().position(job_id),
+        "query": job["query"],
+        "tool_name": job["tool_name"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "error": job["error"]
+    }
+
+@api_router.get("/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str):
+    job = await asyncio.to_thread(_get_job_or_404, job_id)
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"] or "Research failed")
+    if job["status"] not in TERMINAL_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return {"job_id": job_id, **job["result"]}
+
+@api_router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events stream of a job's progress, summary and evaluation
+    events. Events carry their sequence number as the SSE id, so a client that
+    reconnects with Last-Event-ID resumes where it left off. The stream ends
+    after the job's final status event.
+    """
+    await asyncio.to_thread(_get_job_or_404, job_id)
+    store = get_default_job_queue().store
+    try:
+        after = int(last_event_id) if last_event_id else 0
+    except ValueError:
+        after = 0
+
+    async def events():
+        nonlocal after
+        # Woken on this loop when the job logs an event, so an open stream
+        # does not hold a worker thread between events
+        wakeup = store.subscribe(job_id)
+        try:
+            while not await request.is_disconnected():
+                wakeup.clear()
+                batch = await asyncio.to_thread(store.events_after, job_id, after)
+                if not batch:
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), 15.0)
+                    except asyncio.TimeoutError:
+                        # Comment line keeps proxies from closing an idle connection
+                        yield SSE_KEEPALIVE
+                    continue
+                for event in batch:
+                    after = event["seq"]
+                    yield format_sse(event["event"], event["data"], event["seq"])
+                    if event["event"] == "status" and event["data"].get("status") in TERMINAL_STATES:
+                        return
+        finally:
+            store.unsubscribe(job_id, wakeup)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -4,6 +4,7 @@ import sqlite3
 import json
 import logging
 from datetime import datetime
+from utils.content_store import register_functions
 
 def export_db_to_csv(db_path: str, output_dir: str):
     """
@@ -19,6 +20,7 @@ def export_db_to_csv(db_path: str, output_dir: str):
         
     # Connect to database
     conn = sqlite3.connect(db_path)
+    register_functions(conn)
     cursor = conn.cursor()
     
     # Get list of all tables
@@ -28,13 +30,19 @@ def export_db_to_csv(db_path: str, output_dir: str):
     for table in tables:
         table_name = table[0]
         
-        # Get column names
-        cursor.execute(f"PRAGMA table_info({table_name});")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        # Get all rows
-        cursor.execute(f"SELECT * FROM {table_name};")
-        rows = cursor.fetchall()
+        if table_name == 'content_bodies':
+            # Document bodies are stored compressed; export them as text
+            columns = ['doc_id', 'size', 'body']
+            cursor.execute("SELECT doc_id, size, content_body(codec, body) FROM content_bodies;")
+            rows = cursor.fetchall()
+        else:
+            # Get column names
+            cursor.execute(f"PRAGMA table_info({table_name});")
+            columns = [column[1] for column in cursor.fetchall()]
+
+            # Get all rows
+            cursor.execute(f"SELECT * FROM {table_name};")
+            rows = cursor.fetchall()
         
         # Create CSV file
         output_file = os.path.join(output_dir, f"{table_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
@@ -6,6 +6,7 @@ import json
 from datetime import datetime
 from dotenv import load_dotenv
 from research_components.db import ContentDB
+from utils.migrations import migrate
 from tools.research.common.model_schemas import ContentItem
 
 # Load environment variables
@@ -125,6 +126,12 @@ def initialize_database(db: ContentDB):
                 );
             """)
 
+        # Indexes and columns added since these tables were first defined
+        with db.lock:
+            applied = migrate(db.conn)
+        if applied:
+            logger.info(f"Applied schema migrations {applied}")
+
         db_size = os.path.getsize(db_path)
         if db_size == 0:
             logger.info(f"Adding sample document to {db_path}")  
@@ -140,7 +147,11 @@ if __name__ == "__main__":
     db_path = os.getenv('DB_PATH', './data/content.db') 
     init_db = os.getenv('INIT_DB', 'false').lower() == 'true'
     
+    # Opening the database applies pending schema migrations
     db = ContentDB(db_path)
+    with db.lock:
+        version = db.conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0]
+    logger.info(f"Database schema at version {version}")
     
     if init_db:
         logger.info("INIT_DB is true. Running database initialization.") 
@@ -4,17 +4,23 @@ import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 from datetime import datetime
 
-from research_components.database import get_db_connection
 from research_components.research import run_tool
 from research_components.components import display_analytics
 from research_components.components import (
     display_analytics, 
     display_analysis,
     display_general_analysis,
-    GeneralAgent, 
-    PromptManager
+    lazy_tabs,
+    GeneralAgent
 )
-from research_components.utils import setup_logging, load_research_history
+from research_components.cache import (
+    CachedContentDB,
+    CachedTraceStore,
+    get_content_db,
+    get_prompt_manager,
+    get_trace_store
+)
+from research_components.utils import setup_logging
 from research_components.styles import apply_custom_styles
 
 def main():
@@ -32,8 +38,8 @@ def main():
     if st.session_state.dark_mode:
         apply_custom_styles()
 
-    # Initialize PromptManager
-    prompt_manager = PromptManager(
+    # PromptManager is cached across reruns and reloaded when its YAML changes
+    prompt_manager = get_prompt_manager(
         agent_type="general",
         config_path="prompts"
     )
@@ -44,14 +50,13 @@ def main():
     # Title and main layout
     st.title("🔍 Research Agent Analysis")
 
-    # Main tabs for the entire interface
-    main_tab1, main_tab2, main_tab3 = st.tabs(["General Analytics", "Data Analysis Agent", "Summary Agent"])
+    # Main tabs for the entire interface; only the selected one loads its data
+    selected_tab = lazy_tabs(["General Analytics", "Data Analysis Agent", "Summary Agent"], key="main_tab")
     
     
-    with main_tab1:
-        # Load traces and display analytics immediately
-        traces = load_research_history()
-        display_general_analysis(traces)
+    if selected_tab == "General Analytics":
+        # Display analytics from the trace rollups
+        display_general_analysis(CachedTraceStore(get_trace_store()))
 
     # Footer
     st.markdown("---")
@@ -60,11 +65,9 @@ def main():
     [Documentation](https://github.com/yourusername/research-agent/docs)
     """)
 
-    with main_tab2:
-        # Load traces and display analytics immediately
-        traces = load_research_history()
-        db = get_db_connection()
-        display_analysis(traces, db)
+    if selected_tab == "Data Analysis Agent":
+        # Display analytics from the trace and evaluation rollups
+        display_analysis(CachedTraceStore(get_trace_store()), CachedContentDB(get_content_db()))
 
     # Footer
     st.markdown("---")
@@ -73,11 +76,9 @@ def main():
     [Documentation](https://github.com/yourusername/research-agent/docs)
     """)
 
-    with main_tab3:
-        # Load traces and display analytics immediately
-        traces = load_research_history()
-        db = get_db_connection()
-        display_analytics(traces, db)
+    if selected_tab == "Summary Agent":
+        # Display analytics from the evaluation rollups
+        display_analytics(CachedContentDB(get_content_db()))
 
     # Footer
     st.markdown("---")
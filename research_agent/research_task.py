@@ -1,14 +1,16 @@
 from utils.model_wrapper import model_wrapper
 from utils.json_model_wrapper import json_model_wrapper
 from utils.db import ContentDB
+from utils.fetch_cache import FetchCache
 from tools.research.common.model_schemas import ContentItem
-from langchain_community.document_loaders import WebBaseLoader
+from tools.research.common.fetcher import get_default_fetcher
+from tools.research.common.extraction import get_extractor
 from langchain_core.messages import HumanMessage
-from typing import List, Dict, Any, Optional, Type
+from typing import List, Dict, Any, Mapping, Optional, Type
 from langchain_openai import ChatOpenAI
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-from prompts import Prompt
+from prompt import Prompt
 import openai
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
@@ -18,10 +20,12 @@ import os
 
 oc = openai.Client()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Candidates the content index shortlists for the LLM selection call, so the
+# prompt stays the same size however much content is stored
+SELECTION_SHORTLIST = int(os.getenv("RESEARCH_SELECTION_SHORTLIST", "30"))
+
 class TaskResult(BaseModel):
     """Result of a research task"""
     result: Optional[str] = ""
@@ -171,7 +175,7 @@ class ResearchTask:
     def execute(
         self,
         db: ContentDB,
-        state: Dict[str, TaskResult],
+        state: Mapping[str, TaskResult],
         tools: List[BaseTool],
     ) -> TaskResult:
         """
@@ -179,7 +183,7 @@ class ResearchTask:
         
         Args:
             db: Content database for research
-            state: Current state of all task results
+            state: Read-only results of the tasks this one depends on
             tools: Available research tools
             
         Returns:
@@ -210,7 +214,7 @@ class ResearchTask:
 
             # Process URLs if present
             self.context.update_progress(self.id, 0.4, "Processing web content")
-            web_content = self._process_web_content(selected_content)
+            web_content = self._process_web_content(db, selected_content)
             
             # Extract information
             self.context.update_progress(self.id, 0.6, "Extracting information")
@@ -222,7 +226,7 @@ class ResearchTask:
                 # Try to get more content if needed
                 additional_content = self._select_content(db, used_content_ids + [c.id for c in selected_content])
                 if additional_content:
-                    additional_notes = self._extract_notes(additional_content, self._process_web_content(additional_content))
+                    additional_notes = self._extract_notes(additional_content, self._process_web_content(db, additional_content))
                     extracted_notes = self._synthesize_information(extracted_notes, additional_notes, previous_findings)
                     selected_content.extend(additional_content)
 
@@ -258,14 +262,22 @@ class ResearchTask:
         Select relevant content items from the database
         """
         try:
-            # Get available content
-            available_content = db.get_content(exclude_ids=exclude_ids)
+            # Shortlist the best matches for the topic, topped up with recent
+            # content when too few share its words
+            available_content = db.search_content(
+                self.research_topic, limit=SELECTION_SHORTLIST, exclude_ids=exclude_ids
+            )
+            if len(available_content) < self.min_content_items:
+                available_content += db.get_content(
+                    exclude_ids=list(exclude_ids) + [item.id for item in available_content],
+                    limit=self.min_content_items - len(available_content)
+                )
             if not available_content:
                 return []
 
             # Prepare content for selection
             content_items = "\n".join([
-                f"ID: {item.id}\nTitle: {item.title}\nSummary: {item.summary}\n"
+                f"ID: {item.id}\nTitle: {item.title}\nSummary: {item.snippet}\n"
                 for item in available_content
             ])
 
@@ -291,9 +303,11 @@ class ResearchTask:
             # Ensure minimum content
             if len(selected_content) < self.min_content_items:
                 additional_needed = self.min_content_items - len(selected_content)
+                # Compared by id: item equality would load every body
+                chosen_ids = {item.id for item in selected_content}
                 remaining_content = [
                     item for item in available_content 
-                    if item not in selected_content
+                    if item.id not in chosen_ids
                 ][:additional_needed]
                 selected_content.extend(remaining_content)
 
@@ -303,19 +317,34 @@ class ResearchTask:
             logger.error(f"Error selecting content: {str(e)}")
             return []
 
-    def _process_web_content(self, content_items: List[ContentItem]) -> Dict[str, str]:
+    def _process_web_content(self, db: ContentDB, content_items: List[ContentItem]) -> Dict[str, str]:
         """
-        Process web content from URLs in content items
+        Process web content from URLs in content items, reusing cached pages
+        from the content database where they are still fresh
         """
+        items_by_url = {item.url: item for item in content_items if getattr(item, 'url', None)}
+        if not items_by_url:
+            return {}
+
+        extractor = get_extractor()
+
+        def parse(url: str, html: str) -> Optional[ContentItem]:
+            extracted = extractor.extract(html)
+            text = extracted.text if extracted else extractor.extract_page_text(html)
+            if not text:
+                return None
+            title = extracted.title if extracted else items_by_url[url].title
+            return ContentItem(url=url, title=title, content=text, source=items_by_url[url].source)
+
         web_content = {}
-        for item in content_items:
-            if hasattr(item, 'url') and item.url:
-                try:
-                    loader = WebBaseLoader(item.url)
-                    docs = loader.load()
-                    web_content[str(item.id)] = "\n".join([doc.page_content for doc in docs])
-                except Exception as e:
-                    logger.warning(f"Error loading URL {item.url}: {str(e)}")
+        try:
+            cache = FetchCache(db)
+            pages = cache.fetch_all(list(items_by_url), get_default_fetcher(), parse)
+            for url, page in pages.items():
+                web_content[str(items_by_url[url].id)] = page.content
+            logger.info(f"Web content cache stats: {cache.snapshot()}")
+        except Exception as e:
+            logger.warning(f"Error loading web content: {str(e)}")
         return web_content
 
     def _extract_notes(self, content_items: List[ContentItem], web_content: Dict[str, str]) -> str:
@@ -329,7 +358,7 @@ class ResearchTask:
                 item_content = f"Title: {item.title}\n"
                 if hasattr(item, 'content'):
                     item_content += f"Content: {item.content}\n"
-                if str(item.id) in web_content:
+                if str(item.id) in web_content and web_content[str(item.id)] != item.content:
                     item_content += f"Web Content: {web_content[str(item.id)]}\n"
                 combined_content.append(item_content)
 
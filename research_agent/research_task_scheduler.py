@@ -4,20 +4,45 @@ from utils.db import ContentDB
 
 from langchain.tools import BaseTool
 from collections import defaultdict
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional
 
 import concurrent.futures
+import heapq
+import time
 import traceback
 import threading
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import os
 
+# Upper bound on concurrent tasks; the pool is sized to the widest level of
+# the DAG below it. Tasks are I/O bound (search, scraping, LLM calls).
+DEFAULT_MAX_WORKERS = int(os.getenv("RESEARCH_SCHEDULER_MAX_WORKERS", "16"))
+
+# Seconds a task may run before it is failed and its dependents cancelled
+# (0: no deadline). A task's own `timeout` attribute takes precedence.
+DEFAULT_TASK_TIMEOUT = float(os.getenv("RESEARCH_TASK_TIMEOUT", "0"))
+
+# Seconds between checks for cancel() while tasks are running
+CANCEL_POLL_INTERVAL = 0.25
+
+# Seconds between checks for submitted tasks waiting for a worker (their
+# deadline starts when they get one)
+START_POLL_INTERVAL = 0.05
+
 
 class TaskScheduler:
     """
     Schedules and manages the execution of a set of research tasks, taking into account their dependencies.
 
+    Ready tasks are started critical-path first: the task with the most
+    transitive dependents, then the longest chain below it, goes first, so
+    the tasks that unblock the most work are never stuck behind leaves.
+    Each task receives a read-only snapshot of its dependencies' results;
+    all scheduler state is owned by the thread calling execute(). A task
+    that fails or misses its deadline cancels everything downstream of it.
+
     Attributes:
         tasks (List[ResearchTask]): List of research tasks to be scheduled.
         tools (List[BaseTool]): List of tools to be used in tasks.
@@ -26,14 +51,18 @@ class TaskScheduler:
         dependents (defaultdict): Tracks task dependents.
         in_degree (defaultdict): Tracks task dependencies count.
         task_map (Dict): Maps task IDs to task objects for fast lookup.
-        executor (ThreadPoolExecutor): Thread pool executor for concurrent task execution.
-        lock (threading.Lock): Lock for thread-safe operations.
+        priority (Dict[str, tuple]): Sort key of each task; lower runs first.
+        max_workers (int): Size of the thread pool used by execute().
+        lock (threading.Lock): Guards `state` for readers on other threads.
     """
 
     def __init__(
         self,
         tasks: List[ResearchTask],  # List of research tasks to be scheduled
         tools: List[BaseTool],  # List of tools to be used in tasks
+        max_workers: Optional[int] = None,
+        task_timeout: Optional[float] = None,
+        db: Optional[ContentDB] = None
     ):
         """
         Initializes the TaskScheduler with a list of tasks and tools.
@@ -41,18 +70,36 @@ class TaskScheduler:
         Args:
             tasks (List[ResearchTask]): The tasks to be executed.
             tools (List[BaseTool]): The tools available for task execution.
+            max_workers (Optional[int]): Concurrency cap (default:
+                RESEARCH_SCHEDULER_MAX_WORKERS, 16); the pool is sized to
+                the widest level of the DAG up to this cap.
+            task_timeout (Optional[float]): Default per-task deadline in
+                seconds (default: RESEARCH_TASK_TIMEOUT; 0 or None for none).
+            db (Optional[ContentDB]): Content database (default: db/content.db
+                next to this module).
+
+        Raises:
+            ValueError: On duplicate task IDs, unknown dependencies or cycles.
         """
         self.tasks: List[ResearchTask] = tasks
         self.state: Dict[str, TaskResult] = {}
-        current_folder = os.path.dirname(os.path.abspath(__file__))
-        self.db: ContentDB = ContentDB(current_folder + "/db/content.db")
+        if db is None:
+            current_folder = os.path.dirname(os.path.abspath(__file__))
+            db = ContentDB(current_folder + "/db/content.db")
+        self.db: ContentDB = db
         self.tools: List[BaseTool] = tools
         self.dependents = defaultdict(list)
         self.in_degree = defaultdict(int)
         self.task_map = {task.id: task for task in tasks}
+        if len(self.task_map) != len(tasks):
+            raise ValueError("Task IDs must be unique")
         self.setup_dependencies()
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        self.priority = self._critical_path_priorities()
+        cap = max_workers or DEFAULT_MAX_WORKERS
+        self.max_workers = max(1, min(cap, self._widest_level()))
+        self.task_timeout = DEFAULT_TASK_TIMEOUT if task_timeout is None else task_timeout
         self.lock = threading.Lock()
+        self._cancelled = threading.Event()
 
     def setup_dependencies(self) -> None:
         """
@@ -61,65 +108,197 @@ class TaskScheduler:
         for task in self.tasks:
             self.in_degree[task.id] = len(task.dependencies)
             for dep in task.dependencies:
+                if dep not in self.task_map:
+                    raise ValueError(f"Task {task.id} depends on unknown task {dep}")
                 self.dependents[dep].append(task.id)
 
-    def execute_task(self, task: ResearchTask) -> TaskResult:
+    def _topological_order(self) -> List[str]:
+        in_degree = {task.id: len(task.dependencies) for task in self.tasks}
+        order = [task_id for task_id, degree in in_degree.items() if degree == 0]
+        for task_id in order:
+            for dependent_id in self.dependents[task_id]:
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
+                    order.append(dependent_id)
+        if len(order) != len(self.tasks):
+            raise ValueError("Task dependencies contain a cycle")
+        return order
+
+    def _critical_path_priorities(self) -> Dict[str, tuple]:
+        """
+        Sort key per task: most transitive dependents first, then the longest
+        chain of dependents, then submission order.
+        """
+        order = self._topological_order()
+        self._levels = {}
+        for task_id in order:
+            deps = self.task_map[task_id].dependencies
+            self._levels[task_id] = 1 + max((self._levels[dep] for dep in deps), default=-1)
+
+        # Descendant sets as bitmasks so shared descendants are counted once
+        position = {task_id: i for i, task_id in enumerate(order)}
+        descendants: Dict[str, int] = {}
+        chain: Dict[str, int] = {}
+        for task_id in reversed(order):
+            mask = 0
+            longest = 0
+            for dependent_id in self.dependents[task_id]:
+                mask |= descendants[dependent_id] | (1 << position[dependent_id])
+                longest = max(longest, chain[dependent_id] + 1)
+            descendants[task_id] = mask
+            chain[task_id] = longest
+        submission = {task.id: i for i, task in enumerate(self.tasks)}
+        return {
+            task_id: (-bin(descendants[task_id]).count("1"), -chain[task_id], submission[task_id])
+            for task_id in order
+        }
+
+    def _widest_level(self) -> int:
+        widths = defaultdict(int)
+        for level in self._levels.values():
+            widths[level] += 1
+        return max(widths.values(), default=1)
+
+    def _timeout(self, task: ResearchTask) -> Optional[float]:
+        return getattr(task, "timeout", None) or self.task_timeout or None
+
+    def execute_task(self, task: ResearchTask, state: Mapping[str, TaskResult]) -> TaskResult:
         """
         Executes a single task and returns the result.
 
         Args:
             task (ResearchTask): The task to be executed.
+            state (Mapping[str, TaskResult]): Read-only results of the task's
+                dependencies.
 
         Returns:
             TaskResult: The result of the executed task.
         """
         try:
-            result: TaskResult = task.execute(self.db, self.state, self.tools)
+            result: TaskResult = task.execute(self.db, state, self.tools)
             return result
         except Exception:
             logging.error(f"Error executing task {task.id}: {traceback.format_exc()}")
             return TaskResult(id=task.id, error=f"{traceback.format_exc()}")
 
+    def cancel(self) -> None:
+        """
+        Stop scheduling: no further tasks start and running ones are
+        abandoned; unfinished tasks are recorded as cancelled. Safe to call
+        from any thread while execute() runs.
+        """
+        self._cancelled.set()
+
+    def _record(self, result: TaskResult) -> None:
+        with self.lock:
+            self.state[result.id] = result
+
+    def _cancel_dependents(self, task_id: str, reason: str) -> int:
+        """Record every not yet finished transitive dependent of a task as cancelled."""
+        cancelled = 0
+        stack = list(self.dependents[task_id])
+        while stack:
+            dependent_id = stack.pop()
+            if dependent_id in self.state:
+                continue
+            self._record(TaskResult(id=dependent_id, error=f"Cancelled: {reason}"))
+            cancelled += 1
+            stack.extend(self.dependents[dependent_id])
+        return cancelled
+
     def execute(self) -> None:
         """
         Executes all tasks in the scheduler, respecting their dependencies.
         """
-        futures = {}
-        # Find tasks with no dependencies and submit them for execution
-        for task in [t for t in self.tasks if self.in_degree[t.id] == 0]:
-            logging.info(f"Executing task {task.id}")
-            future = self.executor.submit(self.execute_task, task)
-            futures[task.id] = future
-
-        while futures:
-            # Wait for the first task to complete
-            done, _ = concurrent.futures.wait(
-                futures.values(), return_when=concurrent.futures.FIRST_COMPLETED
-            )
-            for future in done:
-                result = future.result()
-                task_id = result.id
-
-                with self.lock:
-                    self.state[task_id] = result
-
-                    # Check dependent tasks and update their in-degree
+        in_degree = dict(self.in_degree)
+        ready = [(self.priority[task.id], task.id) for task in self.tasks if in_degree[task.id] == 0]
+        heapq.heapify(ready)
+        running: Dict[concurrent.futures.Future, tuple] = {}
+        # When each running future got a worker (None: still queued)
+        started: Dict[concurrent.futures.Future, Optional[float]] = {}
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="research-task"
+        )
+        logging.info(f"Executing {len(self.tasks)} tasks with {self.max_workers} workers")
+
+        try:
+            while ready or running:
+                # Fill free workers with the highest-priority ready tasks
+                while ready and len(running) < self.max_workers and not self._cancelled.is_set():
+                    _, task_id = heapq.heappop(ready)
+                    if task_id in self.state:  # cancelled while waiting
+                        continue
+                    task = self.task_map[task_id]
+                    snapshot = MappingProxyType({dep: self.state[dep] for dep in task.dependencies})
+                    logging.info(f"Executing task {task_id}")
+                    future = executor.submit(self.execute_task, task, snapshot)
+                    running[future] = (task_id, self._timeout(task))
+                    started[future] = None
+
+                if self._cancelled.is_set() or not running:
+                    break
+
+                # A task's deadline starts when a worker picks it up, not when
+                # it is submitted
+                now = time.monotonic()
+                for future in running:
+                    if started[future] is None and (future.running() or future.done()):
+                        started[future] = now
+
+                # Wake for the nearest deadline, and periodically to notice cancel()
+                # or a queued task starting
+                deadlines = [
+                    started[future] + limit for future, (_, limit) in running.items()
+                    if limit is not None and started[future] is not None
+                ]
+                timeout = CANCEL_POLL_INTERVAL
+                if any(start is None for start in started.values()):
+                    timeout = START_POLL_INTERVAL
+                if deadlines:
+                    timeout = min(timeout, max(0.0, min(deadlines) - time.monotonic()))
+                done, _ = concurrent.futures.wait(
+                    running, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                finished = [(future, future.result()) for future in done]
+                now = time.monotonic()
+                for future, (task_id, limit) in list(running.items()):
+                    if future in done or limit is None or started[future] is None:
+                        continue
+                    if now >= started[future] + limit:
+                        # Threads cannot be interrupted: the task's result is
+                        # discarded. Its thread stays busy until the task
+                        # returns, so the pool gets one more to take its place.
+                        executor._max_workers += 1
+                        logging.error(f"Task {task_id} missed its deadline")
+                        finished.append((future, TaskResult(id=task_id, error="Timed out")))
+
+                for future, result in finished:
+                    task_id, _ = running.pop(future)
+                    del started[future]
+                    self._record(result)
+                    if result.error:
+                        cancelled = self._cancel_dependents(task_id, f"dependency {task_id} failed")
+                        if cancelled:
+                            logging.warning(f"Task {task_id} failed; cancelled {cancelled} dependent tasks")
+                        continue
                     for dependent_id in self.dependents[task_id]:
-                        self.in_degree[dependent_id] -= 1
-                        if self.in_degree[dependent_id] == 0:
-                            dependent_task = self.task_map[dependent_id]
-                            logging.info(
-                                f"Executing dependent task {dependent_task.id}"
-                            )
-                            future = self.executor.submit(
-                                self.execute_task, dependent_task
-                            )
-                            futures[dependent_task.id] = future
-
-                del futures[task_id]
-
-        logging.info("All tasks executed.")
-        self.executor.shutdown()
+                        in_degree[dependent_id] -= 1
+                        if in_degree[dependent_id] == 0 and dependent_id not in self.state:
+                            heapq.heappush(ready, (self.priority[dependent_id], dependent_id))
+
+            if self._cancelled.is_set():
+                for future in running:
+                    future.cancel()
+                for task in self.tasks:
+                    if task.id not in self.state:
+                        self._record(TaskResult(id=task.id, error="Cancelled"))
+                logging.warning("Task execution cancelled.")
+            else:
+                logging.info("All tasks executed.")
+        finally:
+            # Abandoned (timed out or cancelled) tasks finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def get_results(self) -> List[TaskResult]:
         """
@@ -128,4 +307,5 @@ class TaskScheduler:
         Returns:
             List[TaskResult]: A list of task results.
         """
-        return list(self.state.values())
+        with self.lock:
+            return list(self.state.values())
@@ -0,0 +1,557 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import argparse
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.rollups import duration_bucket, histogram_percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACES_FILE = "research_traces.jsonl"
+
+# Bytes read per step while indexing new lines
+READ_CHUNK = 4 * 1024 * 1024
+# Bytes at the start of the log whose hash detects a replaced file
+HEAD_BYTES = 4096
+# Bumped when the rollup tables change shape; an index built by an older
+# version is rebuilt so its rollups cover the whole log
+ROLLUP_VERSION = "1"
+
+ROLLUP_DIMENSIONS = ("day", "tool", "prompt_used")
+ROLLUP_SUMS = (
+    "count", "successes", "duration_count", "duration_sum", "tokens_input",
+    "tokens_output", "cost", "content_new", "content_reused", "overall_score_sum"
+)
+
+
+def trace_fields(data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[int], Optional[float]]:
+    """
+    The indexed columns of one trace: start_time, tool, prompt_used, success
+    and duration.
+
+    Older traces have no `prompt_used`; their first `prompts_used` entry is
+    indexed instead. Traces without `success` count as successful when they
+    recorded no error.
+    """
+    prompt_used = data.get("prompt_used")
+    if not prompt_used and data.get("prompts_used"):
+        prompt_used = data["prompts_used"][0].get("prompt_id")
+    success = data.get("success")
+    if success is None:
+        success = data.get("error") is None
+    duration = data.get("duration")
+    return (
+        data.get("start_time") or data.get("timestamp"),
+        data.get("tool"),
+        prompt_used,
+        int(bool(success)),
+        float(duration) if isinstance(duration, (int, float)) else None
+    )
+
+
+def _number(value: Any) -> float:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0
+
+
+def trace_rollup_values(data: Dict[str, Any]) -> Tuple[float, ...]:
+    """
+    What one trace adds to its rollup row, besides count, successes and
+    duration: input and output tokens, cost, new and reused content, and the
+    analysis overall_score (0 when the trace has none).
+    """
+    token_usage = data.get("token_usage")
+    token_usage = token_usage if isinstance(token_usage, dict) else {}
+    tokens = token_usage.get("tokens")
+    tokens = tokens if isinstance(tokens, dict) else {}
+    analysis_metrics = data.get("analysis_metrics")
+    overall_score = analysis_metrics.get("overall_score") if isinstance(analysis_metrics, dict) else None
+    return (
+        _number(tokens.get("input")),
+        _number(tokens.get("output")),
+        _number(token_usage.get("cost")),
+        _number(data.get("content_new")),
+        _number(data.get("content_reused")),
+        _number(overall_score)
+    )
+
+
+class TraceStore:
+    """
+    Indexed access to the append-only research trace log.
+
+    The JSONL file stays the source of truth: CustomTracer keeps appending one
+    line per trace. A SQLite index next to it holds, per trace, the byte
+    offset and length of its line plus the fields dashboards filter on
+    (start_time, tool, prompt_used, success), each with a time-ordered index.
+    `refresh` parses only the lines appended since the last call, and
+    `query` reads just the lines of the requested page.
+
+    The same refresh folds each new trace into per-day/tool/prompt rollups
+    (counts, successes, durations with a histogram for percentiles, tokens,
+    cost, content and analysis scores), which `rollups` reads without
+    touching the traces.
+
+    If the log is truncated or replaced, the index is rebuilt from scratch.
+
+    Args:
+        traces_file: Path of the JSONL trace log
+        index_path: Path of the index database (default: <traces_file>.index.db)
+    """
+
+    def __init__(self, traces_file: str = DEFAULT_TRACES_FILE, index_path: Optional[str] = None):
+        self.traces_file = traces_file
+        self.index_path = index_path or f"{traces_file}.index.db"
+        self.lock = threading.Lock()
+
+        # Autocommit mode; refresh opens its own write transaction so several
+        # processes can share one index
+        self.conn = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS traces (
+                    seq INTEGER PRIMARY KEY,
+                    trace_id TEXT,
+                    start_time TEXT,
+                    tool TEXT,
+                    prompt_used TEXT,
+                    success INTEGER,
+                    duration REAL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_traces_start ON traces(start_time);
+                CREATE INDEX IF NOT EXISTS idx_traces_tool ON traces(tool, start_time);
+                CREATE INDEX IF NOT EXISTS idx_traces_prompt ON traces(prompt_used, start_time);
+                CREATE INDEX IF NOT EXISTS idx_traces_success ON traces(success, start_time);
+                CREATE INDEX IF NOT EXISTS idx_traces_trace_id ON traces(trace_id);
+
+                CREATE TABLE IF NOT EXISTS index_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+
+                CREATE TABLE IF NOT EXISTS trace_rollups (
+                    day TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    prompt_used TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    successes INTEGER NOT NULL,
+                    duration_count INTEGER NOT NULL,
+                    duration_sum REAL NOT NULL,
+                    tokens_input INTEGER NOT NULL,
+                    tokens_output INTEGER NOT NULL,
+                    cost REAL NOT NULL,
+                    content_new INTEGER NOT NULL,
+                    content_reused INTEGER NOT NULL,
+                    overall_score_sum REAL NOT NULL,
+                    PRIMARY KEY (day, tool, prompt_used)
+                );
+
+                CREATE TABLE IF NOT EXISTS trace_duration_buckets (
+                    day TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    prompt_used TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (day, tool, prompt_used, bucket)
+                );
+            """)
+
+    def _clear(self, generation: int) -> None:
+        self.conn.execute("DELETE FROM traces")
+        self.conn.execute("DELETE FROM trace_rollups")
+        self.conn.execute("DELETE FROM trace_duration_buckets")
+        self.conn.execute("DELETE FROM index_state")
+        self.conn.execute("INSERT INTO index_state (key, value) VALUES ('generation', ?)", (str(generation + 1),))
+
+    def generation(self) -> int:
+        """
+        Incremented whenever the index is rebuilt. Sequence numbers are only
+        comparable within one generation.
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM index_state WHERE key = 'generation'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def _state(self) -> Dict[str, str]:
+        return {row["key"]: row["value"] for row in self.conn.execute("SELECT key, value FROM index_state")}
+
+    def _head_hash(self, f, length: int) -> str:
+        f.seek(0)
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+    def refresh(self) -> int:
+        """
+        Index the traces appended to the log since the last refresh.
+
+        A trailing line without its newline (a write in progress) is left for
+        the next refresh; lines that are not valid JSON are skipped.
+
+        Returns:
+            int: Number of newly indexed traces
+        """
+        if not os.path.exists(self.traces_file):
+            return 0
+
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._index_new_lines()
+                self.conn.execute("COMMIT")
+                return added
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _index_new_lines(self) -> int:
+        state = self._state()
+        indexed = int(state.get("indexed_bytes", 0))
+        head_length = int(state.get("head_length", 0))
+
+        with open(self.traces_file, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if indexed and (size < indexed or self._head_hash(f, head_length) != state.get("head_hash")):
+                logger.warning(f"{self.traces_file} was truncated or replaced; rebuilding its index")
+                self._clear(int(state.get("generation", 0)))
+                indexed = 0
+            elif indexed and state.get("rollup_version") != ROLLUP_VERSION:
+                logger.info(f"Rebuilding the index of {self.traces_file} to compute its rollups")
+                self._clear(int(state.get("generation", 0)))
+                indexed = 0
+            if size == indexed:
+                return 0
+
+            added = 0
+            offset = indexed
+            f.seek(offset)
+            pending = b""
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                rows = []
+                rollups: Dict[Tuple[str, str, str], List[float]] = {}
+                buckets: Dict[Tuple[str, str, str, int], int] = {}
+                for line in lines:
+                    length = len(line) + 1
+                    if line.strip():
+                        try:
+                            data = json.loads(line)
+                            fields = trace_fields(data)
+                            values = trace_rollup_values(data)
+                        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                            logger.error(f"Invalid JSON in trace file at byte {offset}")
+                        else:
+                            rows.append((data.get("trace_id"), *fields, offset, length))
+                            self._fold(rollups, buckets, fields, values)
+                    offset += length
+                self.conn.executemany(
+                    """
+                    INSERT INTO traces (trace_id, start_time, tool, prompt_used, success, duration, offset, length)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                self._write_rollups(rollups, buckets)
+                added += len(rows)
+
+            head_length = min(HEAD_BYTES, offset)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO index_state (key, value) VALUES (?, ?)",
+                [("indexed_bytes", str(offset)),
+                 ("rollup_version", ROLLUP_VERSION),
+                 ("head_length", str(head_length)),
+                 ("head_hash", self._head_hash(f, head_length))]
+            )
+
+        if added:
+            logger.info(f"Indexed {added} new traces from {self.traces_file}")
+        return added
+
+    @staticmethod
+    def _fold(
+        rollups: Dict[Tuple[str, str, str], List[float]],
+        buckets: Dict[Tuple[str, str, str, int], int],
+        fields: Tuple[Optional[str], Optional[str], Optional[str], Optional[int], Optional[float]],
+        values: Tuple[float, ...]
+    ) -> None:
+        start_time, tool, prompt_used, success, duration = fields
+        # Rollup keys are never NULL, so missing values share the '' row
+        key = ((start_time or "")[:10], tool or "", prompt_used or "")
+        sums = rollups.setdefault(key, [0] * len(ROLLUP_SUMS))
+        sums[0] += 1
+        sums[1] += success
+        if duration is not None:
+            sums[2] += 1
+            sums[3] += duration
+            bucket = key + (duration_bucket(duration),)
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+        for position, value in enumerate(values, start=4):
+            sums[position] += value
+
+    def _write_rollups(
+        self,
+        rollups: Dict[Tuple[str, str, str], List[float]],
+        buckets: Dict[Tuple[str, str, str, int], int]
+    ) -> None:
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_SUMS)
+        self.conn.executemany(
+            f"""
+            INSERT INTO trace_rollups ({", ".join(ROLLUP_DIMENSIONS + ROLLUP_SUMS)})
+            VALUES ({", ".join("?" * (len(ROLLUP_DIMENSIONS) + len(ROLLUP_SUMS)))})
+            ON CONFLICT (day, tool, prompt_used) DO UPDATE SET {updates}
+            """,
+            [key + tuple(sums) for key, sums in rollups.items()]
+        )
+        self.conn.executemany(
+            """
+            INSERT INTO trace_duration_buckets (day, tool, prompt_used, bucket, count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (day, tool, prompt_used, bucket) DO UPDATE SET count = count + excluded.count
+            """,
+            [key + (count,) for key, count in buckets.items()]
+        )
+
+    def _where(
+        self,
+        start: Optional[str],
+        end: Optional[str],
+        tool: Optional[str],
+        prompt_used: Optional[str],
+        success: Optional[bool],
+        after_seq: Optional[int]
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for clause, value in (
+            ("start_time >= ?", start),
+            ("start_time < ?", end),
+            ("tool = ?", tool),
+            ("prompt_used = ?", prompt_used),
+            ("success = ?", None if success is None else int(success)),
+            ("seq > ?", after_seq),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_index(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        tool: Optional[str] = None,
+        prompt_used: Optional[str] = None,
+        success: Optional[bool] = None,
+        after_seq: Optional[int] = None,
+        limit: Optional[int] = 100,
+        offset: int = 0,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Index rows matching the filters, without reading the traces.
+
+        Args:
+            start: Earliest start_time (ISO format, inclusive)
+            end: Latest start_time (ISO format, exclusive)
+            tool: Tool name
+            prompt_used: Prompt file name
+            success: Only successful (True) or failed (False) traces
+            after_seq: Only traces indexed after this sequence number
+            limit: Page size (None: no limit)
+            offset: Rows to skip, for paging
+            newest_first: Order by start_time descending rather than ascending
+
+        Returns:
+            List[Dict[str, Any]]: Rows with seq, trace_id, start_time, tool,
+                prompt_used, success, duration, offset and length
+        """
+        where, params = self._where(start, end, tool, prompt_used, success, after_seq)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT * FROM traces{where} ORDER BY start_time {order}, seq {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def read(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Parse the traces of index rows (in the order given)."""
+        traces: Dict[int, Dict[str, Any]] = {}
+        with open(self.traces_file, "rb") as f:
+            # Read in file order; the page may be in any order
+            for row in sorted(rows, key=lambda r: r["offset"]):
+                f.seek(row["offset"])
+                traces[row["seq"]] = json.loads(f.read(row["length"]))
+        return [traces[row["seq"]] for row in rows]
+
+    def query(self, refresh: bool = True, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        One page of traces matching the filters of `query_index`.
+
+        Args:
+            refresh: Index newly appended traces first
+            **filters: Arguments of `query_index`
+
+        Returns:
+            List[Dict[str, Any]]: Trace data dicts
+        """
+        if refresh:
+            self.refresh()
+        return self.read(self.query_index(**filters))
+
+    def count(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        tool: Optional[str] = None,
+        prompt_used: Optional[str] = None,
+        success: Optional[bool] = None
+    ) -> int:
+        """Number of indexed traces matching the filters."""
+        where, params = self._where(start, end, tool, prompt_used, success, None)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM traces{where}", params).fetchone()[0]
+
+    def rollups(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        tool: Optional[str] = None,
+        prompt_used: Optional[str] = None,
+        group_by: Sequence[str] = ("day",),
+        refresh: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregated trace metrics, read from the rollups rather than the traces.
+
+        Args:
+            start: Earliest day (ISO date or datetime, inclusive)
+            end: Latest day (ISO date or datetime, exclusive)
+            tool: Only this tool
+            prompt_used: Only this prompt file
+            group_by: Any of "day", "tool" and "prompt_used"; () returns a
+                single row for everything matched
+            refresh: Index newly appended traces first
+
+        Returns:
+            List[Dict[str, Any]]: One row per group (ordered by the group
+                columns; '' stands for a missing day, tool or prompt) with
+                count, successes, success_rate (%), avg_duration,
+                p50_duration, p95_duration (estimated from the duration
+                histogram), tokens_input, tokens_output, cost, content_new,
+                content_reused and avg_overall_score (traces without an
+                analysis score count as 0)
+        """
+        unknown = [column for column in group_by if column not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Cannot group trace rollups by {unknown}")
+        if refresh:
+            self.refresh()
+
+        clauses, params = [], []
+        for clause, value in (
+            ("day >= ?", start[:10] if start else None),
+            ("day < ?", end[:10] if end else None),
+            ("tool = ?", tool),
+            ("prompt_used = ?", prompt_used),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        columns = ", ".join(group_by)
+        select = f"{columns}, " if group_by else ""
+        group = f" GROUP BY {columns} ORDER BY {columns}" if group_by else ""
+
+        sums = ", ".join(f"SUM({column}) AS {column}" for column in ROLLUP_SUMS)
+        with self.lock:
+            rows = [dict(row) for row in self.conn.execute(
+                f"SELECT {select}{sums} FROM trace_rollups{where}{group}", params
+            )]
+            histograms: Dict[Tuple, Dict[int, int]] = {}
+            for row in self.conn.execute(
+                f"SELECT {select}bucket, SUM(count) AS count FROM trace_duration_buckets{where}"
+                f" GROUP BY {select}bucket", params
+            ):
+                key = tuple(row[column] for column in group_by)
+                histograms.setdefault(key, {})[row["bucket"]] = row["count"]
+
+        results = []
+        for row in rows:
+            count = row["count"]
+            if not count:
+                continue
+            histogram = histograms.get(tuple(row[column] for column in group_by), {})
+            row["success_rate"] = row["successes"] / count * 100
+            row["avg_duration"] = row["duration_sum"] / row["duration_count"] if row["duration_count"] else None
+            row["p50_duration"] = histogram_percentile(histogram, 50)
+            row["p95_duration"] = histogram_percentile(histogram, 95)
+            row["avg_overall_score"] = row.pop("overall_score_sum") / count
+            results.append(row)
+        return results
+
+    def tail(self, after_seq: int = 0, batch_size: int = 1000) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (seq, trace) for every trace indexed after `after_seq`, in log
+        order. Call `refresh` first to pick up new lines.
+        """
+        while True:
+            with self.lock:
+                rows = [dict(row) for row in self.conn.execute(
+                    "SELECT * FROM traces WHERE seq > ? ORDER BY seq LIMIT ?", (after_seq, batch_size)
+                )]
+            if not rows:
+                return
+            for row, trace in zip(rows, self.read(rows)):
+                yield row["seq"], trace
+            after_seq = rows[-1]["seq"]
+
+    def rebuild(self) -> int:
+        """Drop the index and re-index the whole log; returns the number of traces."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._clear(int(self._state().get("generation", 0)))
+            self.conn.execute("COMMIT")
+        return self.refresh()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+_default_store: Optional[TraceStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_trace_store() -> TraceStore:
+    """Return the process-wide store for RESEARCH_TRACES_FILE (default ./research_traces.jsonl)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TraceStore(os.getenv("RESEARCH_TRACES_FILE", DEFAULT_TRACES_FILE))
+        return _default_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the index of a research trace log")
+    parser.add_argument("traces_file", nargs="?", default=os.getenv("RESEARCH_TRACES_FILE", DEFAULT_TRACES_FILE))
+    parser.add_argument("--rebuild", action="store_true", help="re-index the whole log")
+    args = parser.parse_args()
+
+    store = TraceStore(args.traces_file)
+    added = store.rebuild() if args.rebuild else store.refresh()
+    print(f"Indexed {added} new traces; {store.count()} in {store.index_path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,19 @@
 from datetime import datetime
 import json
+import os
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import time
 import uuid
 from typing import Dict, List, Optional, Any
 from utils.token_tracking import TokenUsageTracker
+from research_agent.trace_store import DEFAULT_TRACES_FILE
 
 class QueryTrace:
-    _token_tracker = None  # Class level token tracker
-    
     def __init__(self, query: str):
         self.trace_id = str(uuid.uuid4())
-        if QueryTrace._token_tracker is None:
-            QueryTrace._token_tracker = TokenUsageTracker()
-        self.token_tracker = QueryTrace._token_tracker
+        # Per-trace ledger; rolls up into the process-wide usage aggregate
+        self.token_tracker = TokenUsageTracker()
         self.timestamp = datetime.now()  # Add timestamp as instance attribute
         self.data = {
             "trace_id": self.trace_id,
@@ -87,14 +86,8 @@ class QueryTrace:
 
 class CustomTracer:
     def __init__(self):
-        self.traces_file = "research_traces.jsonl"
+        self.traces_file = os.getenv("RESEARCH_TRACES_FILE", DEFAULT_TRACES_FILE)
         self.prompt_traces_file = "prompt_traces.jsonl"  
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - [%(trace_id)s] - %(message)s',
-            filename='research_detailed.log'
-        )
         self.logger = logging.getLogger(__name__)
     
     def log_prompt_usage(self, trace: QueryTrace, prompt_id: str, variables: dict, result: str, metadata: dict):
@@ -1,4 +1,4 @@
-from .research import run_tool
+from .research import run_tool, arun_tool
 from .components import (
     display_analytics,
     display_prompt_analytics, 
@@ -16,6 +16,7 @@ from .styles import apply_custom_styles
 
 __all__ = [
     'run_tool',
+    'arun_tool',
     'ContentDB',
     'display_analytics',
     'display_prompt_analytics',
@@ -0,0 +1,115 @@
+import os
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from typing import Any, Dict, List, Sequence, Tuple
+
+import streamlit as st
+
+from prompt.prompt_manager import PromptManager
+from research_agent.trace_store import TraceStore, get_default_trace_store
+from .database import get_db_connection
+from .db import ContentDB
+
+logger = logging.getLogger(__name__)
+
+# Streamlit reruns the whole script on every widget interaction. Connections
+# and parsed configuration are kept across reruns with st.cache_resource;
+# query results are kept with st.cache_data, keyed on a cheap invalidation
+# key (the trace log's size and mtime, the database's change counter) so a
+# rerun only recomputes what actually changed.
+
+
+def _file_key(path: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return -1, -1
+
+
+@st.cache_resource(show_spinner=False)
+def _prompt_manager(agent_type: str, config_path: str, file_key: Tuple[int, int]) -> PromptManager:
+    logger.info(f"Loading {agent_type} prompts from {config_path}")
+    return PromptManager(agent_type=agent_type, config_path=config_path)
+
+
+def get_prompt_manager(agent_type: str, config_path: str) -> PromptManager:
+    """PromptManager shared across reruns; reloaded when its YAML file changes."""
+    prompts_file = os.path.join(config_path, f"{agent_type}_prompts.yaml")
+    return _prompt_manager(agent_type, config_path, _file_key(prompts_file))
+
+
+@st.cache_resource(show_spinner=False)
+def get_content_db() -> ContentDB:
+    """The app's ContentDB connection, opened once per server process."""
+    db = get_db_connection()
+    if db is None:
+        # Raised rather than returned so the failure is not cached
+        raise RuntimeError("Database connection is unavailable")
+    return db
+
+
+@st.cache_resource(show_spinner=False)
+def get_trace_store() -> TraceStore:
+    """The app's TraceStore, opened once per server process."""
+    return get_default_trace_store()
+
+
+@st.cache_data(show_spinner=False)
+def _trace_rollups(_store: TraceStore, traces_file: str, file_key: Tuple[int, int],
+                   group_by: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    return _store.rollups(group_by=group_by)
+
+
+@st.cache_data(show_spinner=False)
+def _db_read(_db: ContentDB, db_key: Tuple[int, int, int], method: str,
+             args: Tuple[Any, ...], kwargs: Tuple[Tuple[str, Any], ...]) -> Any:
+    return getattr(_db, method)(*args, **dict(kwargs))
+
+
+class CachedTraceStore:
+    """
+    Read-only view of a TraceStore whose rollups are cached across reruns
+    until the trace log changes.
+
+    Args:
+        store: The underlying store
+    """
+
+    def __init__(self, store: TraceStore):
+        self.store = store
+        # Computed once per rerun; every read in the rerun shares it
+        self.key = _file_key(store.traces_file)
+
+    def rollups(self, group_by: Sequence[str] = ("day",), refresh: bool = True) -> List[Dict[str, Any]]:
+        """TraceStore.rollups over the whole log; `refresh` is implied by the cache key."""
+        return _trace_rollups(self.store, self.store.traces_file, self.key, tuple(group_by))
+
+
+class CachedContentDB:
+    """
+    Read-only view of a ContentDB whose dashboard queries are cached across
+    reruns until the database changes (see ContentDB.change_counter).
+
+    Args:
+        db: The underlying database
+    """
+
+    def __init__(self, db: ContentDB):
+        self.db = db
+        self.key = (id(db),) + db.change_counter()
+
+    def _read(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return _db_read(self.db, self.key, method, args, tuple(sorted(kwargs.items())))
+
+    def get_evaluation_rollups(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._read('get_evaluation_rollups', *args, **kwargs)
+
+    def get_score_distribution(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._read('get_score_distribution', *args, **kwargs)
+
+    def get_test_results(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._read('get_test_results', *args, **kwargs)
+
+    def get_analysis_evaluations(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        return self._read('get_analysis_evaluations', *args, **kwargs)
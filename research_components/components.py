@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
 from typing import List
 
 from .db import ContentDB
 from research_agent.tracers import QueryTrace
+from research_agent.trace_store import TraceStore
 from tools import GeneralAgent
 from prompt.prompt_manager import PromptManager
 from .utils import load_research_history
@@ -13,7 +13,6 @@ import logging
 import pandas as pd
 import streamlit as st
 import plotly.express as px
-from datetime import datetime
 from typing import List
 import time
 from typing import Dict, Any
@@ -56,7 +55,16 @@ def display_token_usage(trace: QueryTrace, show_visualizations: bool = True):
                 "Token Speed (tokens/s)",
                 f"{token_stats.get('processing', {}).get('speed', 0):.2f}"
             )
-        
+
+        latency = token_stats.get('timing', {}).get('latency', {})
+        if latency.get('count'):
+            latency_cols = st.columns(4)
+            for col, label in zip(latency_cols, ('p50', 'p95', 'p99')):
+                with col:
+                    st.metric(f"Call Latency {label} (s)", f"{latency[label]:.2f}")
+            with latency_cols[3]:
+                st.metric("Retries", token_stats['timing'].get('retries', 0))
+
         # Cost analysis
         st.subheader("Cost Analysis")
         st.metric(
@@ -188,257 +196,224 @@ def enhance_trace_visualization(traces: List[QueryTrace]):
             else:
                 st.info("No detailed information available for this step.")
 
-db_path = "./data/content.db"  # Set your database path
-content_db = ContentDB(db_path)
+
+def lazy_tabs(labels: List[str], key: str) -> str:
+    """
+    Tab-like selector that renders only the chosen tab.
+
+    st.tabs runs the body of every tab on each rerun and hides all but one;
+    branching on the returned label computes just the visible one.
+
+    Args:
+        labels: Tab labels
+        key: Widget key, so the selection survives reruns
+
+    Returns:
+        str: The selected label
+    """
+    return st.radio(" ", labels, key=key, horizontal=True, label_visibility="collapsed")
 
 
-def display_analytics(traces: List[QueryTrace], content_db: ContentDB):
+def _display_score_charts(content_db: ContentDB, evaluator: str, score_column: str,
+                          distribution_title: str, timeline_title: str) -> List[Dict[str, Any]]:
     """
-    Display detailed analytics including token usage, processing steps, and content validation.
+    Plot the score distribution and daily mean of one evaluator from its rollups.
+
+    Returns:
+        List[Dict[str, Any]]: The daily rollups, for further charts
     """
-    if not traces:
-        st.info("No research history available yet. Run some searches to see analytics!")
-        return
+    distribution = content_db.get_score_distribution(evaluator)
+    if distribution:
+        distribution_df = pd.DataFrame(distribution)
+        fig_distribution = px.bar(
+            distribution_df,
+            x='bucket_start',
+            y='count',
+            title=distribution_title,
+            labels={'bucket_start': score_column, 'count': 'Count'}
+        )
+        fig_distribution.update_traces(width=distribution_df['bucket_end'][0] - distribution_df['bucket_start'][0])
+        st.plotly_chart(fig_distribution, use_container_width=True)
+
+    daily = [row for row in content_db.get_evaluation_rollups(evaluator) if row['day']]
+    if daily:
+        fig_timeline = px.line(
+            pd.DataFrame(daily),
+            x='day',
+            y=score_column,
+            title=timeline_title,
+            markers=True
+        )
+        st.plotly_chart(fig_timeline, use_container_width=True)
+    return daily
+
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+def display_analytics(content_db: ContentDB):
+    """
+    Display evaluation analytics from the daily rollups kept by ContentDB.
+    """
+    selected = lazy_tabs([
         "Factual Accuracy",
         "Source Coverage",
         "Logical Coherence",
         "Answer Relevance",
         "Automated Tests"
-    ])
+    ], key="analytics_tab")
 
-    with tab1:
+    if selected == "Factual Accuracy":
         try:
-            accuracy_evals = content_db.get_accuracy_evaluations(limit=50)
-            if accuracy_evals:
-                accuracy_df = pd.DataFrame(accuracy_evals)
+            accuracy_summary = content_db.get_evaluation_rollups('factual_accuracy', by_day=False)
+            if accuracy_summary:
+                summary = accuracy_summary[0]
                 
                 metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
                 with metrics_col1:
-                    avg_factual_score = accuracy_df['factual_score'].mean()
-                    st.metric("Avg Factual Score", f"{avg_factual_score:.2f}")
+                    st.metric("Avg Factual Score", f"{summary['factual_score'] or 0:.2f}")
                 with metrics_col2:
-                    avg_citation_accuracy = accuracy_df['citation_accuracy'].mean()
-                    st.metric("Avg Citation Accuracy", f"{avg_citation_accuracy:.2%}")
+                    st.metric("Avg Citation Accuracy", f"{summary['citation_accuracy'] or 0:.2%}")
                 with metrics_col3:
-                    verified_claims = accuracy_df['verified_claims'].sum()
-                    st.metric("Verified Claims", f"{verified_claims:,}")
+                    st.metric("Verified Claims", f"{int(summary['verified_claims_total']):,}")
                 with metrics_col4:
-                    contradicting_claims = accuracy_df['contradicting_claims'].sum()
-                    st.metric("Contradicting Claims", f"{contradicting_claims:,}")
+                    st.metric("Contradicting Claims", f"{int(summary['contradicting_claims_total']):,}")
                 
-                fig_score_dist = px.histogram(
-                    accuracy_df,
-                    x='factual_score',
-                    title='Distribution of Factual Scores',
-                    nbins=20
+                _display_score_charts(
+                    content_db, 'factual_accuracy', 'factual_score',
+                    'Distribution of Factual Scores', 'Factual Accuracy Over Time'
                 )
-                st.plotly_chart(fig_score_dist, use_container_width=True)
-                
-                fig_timeline = px.line(
-                    accuracy_df.sort_values('timestamp'),
-                    x='timestamp',
-                    y='factual_score',
-                    title='Factual Accuracy Over Time'
-                )
-                st.plotly_chart(fig_timeline, use_container_width=True)
             else:
                 st.info("No factual accuracy data available yet.")
         except Exception as e:
             st.error(f"Error displaying factual accuracy analytics: {str(e)}")
-    with tab2:
+    if selected == "Source Coverage":
         try:
-            coverage_evals = content_db.get_source_coverage_evaluations(limit=50)
-            if coverage_evals:
-                coverage_df = pd.DataFrame(coverage_evals)
+            coverage_summary = content_db.get_evaluation_rollups('source_coverage', by_day=False)
+            if coverage_summary:
+                summary = coverage_summary[0]
                 metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
                 with metrics_col1:
-                    avg_coverage = coverage_df['coverage_score'].mean()
-                    st.metric("Avg Coverage Score", f"{avg_coverage:.2f}")
+                    st.metric("Avg Coverage Score", f"{summary['coverage_score'] or 0:.2f}")
                 with metrics_col2:
-                    avg_diversity = coverage_df['diversity_score'].mean()
-                    st.metric("Avg Source Diversity", f"{avg_diversity:.2f}")
+                    st.metric("Avg Source Diversity", f"{summary['diversity_score'] or 0:.2f}")
                 with metrics_col3:
-                    unique_domains = coverage_df['unique_domains'].sum()
-                    st.metric("Unique Domains", f"{unique_domains:,}")
+                    st.metric("Unique Domains", f"{int(summary['unique_domains_total']):,}")
                 with metrics_col4:
-                    avg_source_depth = coverage_df['source_depth'].mean()
-                    st.metric("Avg Source Depth", f"{avg_source_depth:.2f}")
-                
-                fig = px.histogram(
-                    coverage_df,
-                    x='coverage_score',
-                    title='Coverage Score Distribution'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    st.metric("Avg Source Depth", f"{summary['source_depth'] or 0:.2f}")
                 
-                fig_timeline = px.line(
-                    coverage_df.sort_values('timestamp'),
-                    x='timestamp',
-                    y='coverage_score',
-                    title='Source Coverage Over Time'
+                _display_score_charts(
+                    content_db, 'source_coverage', 'coverage_score',
+                    'Coverage Score Distribution', 'Source Coverage Over Time'
                 )
-                st.plotly_chart(fig_timeline, use_container_width=True)
             else:
                 st.info("No source coverage data available yet.")
         except Exception as e:
             st.error(f"Error displaying coverage analytics: {str(e)}")
 
-    with tab3:
+    if selected == "Logical Coherence":
         try:
-            coherence_evals = content_db.get_logical_coherence_evaluations(limit=50)
-            if coherence_evals:
-                coherence_df = pd.DataFrame(coherence_evals)
-                
-                # Convert timestamp strings to datetime objects if not already datetime
-                if coherence_df['timestamp'].dtype != 'datetime64[ns]':
-                    coherence_df['timestamp'] = pd.to_datetime(coherence_df['timestamp'])
+            coherence_summary = content_db.get_evaluation_rollups('logical_coherence', by_day=False)
+            if coherence_summary:
+                summary = coherence_summary[0]
                 
                 # Display metrics in columns
                 metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
                 with metrics_col1:
-                    avg_coherence = coherence_df['coherence_score'].mean()
-                    st.metric("Avg Coherence Score", f"{avg_coherence:.2f}")
+                    st.metric("Avg Coherence Score", f"{summary['coherence_score'] or 0:.2f}")
                 with metrics_col2:
-                    avg_topic_coherence = coherence_df['topic_coherence'].mean()
-                    st.metric("Topic Coherence", f"{avg_topic_coherence:.2f}")
+                    st.metric("Topic Coherence", f"{summary['topic_coherence'] or 0:.2f}")
                 with metrics_col3:
-                    logical_fallacies = coherence_df['logical_fallacies_count'].sum()
-                    st.metric("Logical Fallacies", f"{logical_fallacies:,}")
+                    st.metric("Logical Fallacies", f"{int(summary['logical_fallacies_count_total']):,}")
                 with metrics_col4:
-                    idea_progression = coherence_df['idea_progression_score'].mean()
-                    st.metric("Idea Progression", f"{idea_progression:.2f}")
+                    st.metric("Idea Progression", f"{summary['idea_progression_score'] or 0:.2f}")
                 
-                # Create histogram with improved formatting
-                fig_hist = px.histogram(
-                    coherence_df,
-                    x='coherence_score',
-                    title='Coherence Score Distribution',
-                    nbins=20,
-                    labels={'coherence_score': 'Coherence Score', 'count': 'Count'}
+                coherence_daily = _display_score_charts(
+                    content_db, 'logical_coherence', 'coherence_score',
+                    'Coherence Score Distribution', 'Logical Coherence Over Time'
                 )
-                fig_hist.update_layout(
-                    xaxis_title="Coherence Score",
-                    yaxis_title="Count"
-                )
-                st.plotly_chart(fig_hist, use_container_width=True)
-                
-                # Create timeline with improved formatting
-                fig_timeline = px.line(
-                    coherence_df.sort_values('timestamp'),
-                    x='timestamp',
-                    y='coherence_score',
-                    title='Logical Coherence Over Time'
-                )
-                fig_timeline.update_layout(
-                    xaxis_title="Time",
-                    yaxis_title="Coherence Score",
-                    hovermode='x unified'
-                )
-                st.plotly_chart(fig_timeline, use_container_width=True)
                 
                 # Add expandable detailed statistics
-                with st.expander("View Detailed Statistics"):
-                    st.dataframe(
-                        coherence_df[[
-                            'timestamp', 'query', 'coherence_score', 
-                            'topic_coherence', 'logical_fallacies_count', 
-                            'idea_progression_score'
-                        ]]
-                        .sort_values('timestamp', ascending=False)
-                        .style.format({
-                            'coherence_score': '{:.2f}',
-                            'topic_coherence': '{:.2f}',
-                            'idea_progression_score': '{:.2f}'
-                        })
-                    )
+                if coherence_daily:
+                    with st.expander("View Detailed Statistics"):
+                        st.dataframe(
+                            pd.DataFrame(coherence_daily)[[
+                                'day', 'count', 'coherence_score',
+                                'topic_coherence', 'logical_fallacies_count_total',
+                                'idea_progression_score'
+                            ]]
+                            .sort_values('day', ascending=False)
+                            .style.format({
+                                'coherence_score': '{:.2f}',
+                                'topic_coherence': '{:.2f}',
+                                'logical_fallacies_count_total': '{:.0f}',
+                                'idea_progression_score': '{:.2f}'
+                            })
+                        )
             else:
                 st.info("No logical coherence data available yet.")
         except Exception as e:
             st.error(f"Error displaying coherence analytics: {str(e)}")
             logging.error(f"Error in coherence analytics: {str(e)}", exc_info=True)
 
-    with tab4:
+    if selected == "Answer Relevance":
         try:
-            relevance_evals = content_db.get_answer_relevance_evaluations(limit=50)
-            if relevance_evals:
-                relevance_df = pd.DataFrame(relevance_evals)
+            relevance_summary = content_db.get_evaluation_rollups('answer_relevance', by_day=False)
+            if relevance_summary:
+                summary = relevance_summary[0]
                 metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
                 with metrics_col1:
-                    avg_relevance = relevance_df['relevance_score'].mean()
-                    st.metric("Avg Relevance Score", f"{avg_relevance:.2f}")
+                    st.metric("Avg Relevance Score", f"{summary['relevance_score'] or 0:.2f}")
                 with metrics_col2:
-                    semantic_similarity = relevance_df['semantic_similarity'].mean()
-                    st.metric("Semantic Similarity", f"{semantic_similarity:.2f}")
+                    st.metric("Semantic Similarity", f"{summary['semantic_similarity'] or 0:.2f}")
                 with metrics_col3:
-                    info_density = relevance_df['information_density'].mean()
-                    st.metric("Info Density", f"{info_density:.2f}")
+                    st.metric("Info Density", f"{summary['information_density'] or 0:.2f}")
                 with metrics_col4:
-                    context_alignment = relevance_df['context_alignment_score'].mean()
-                    st.metric("Context Alignment", f"{context_alignment:.2f}")
-                
-                fig = px.histogram(
-                    relevance_df,
-                    x='relevance_score',
-                    title='Relevance Score Distribution'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                    st.metric("Context Alignment", f"{summary['context_alignment_score'] or 0:.2f}")
                 
-                fig_timeline = px.line(
-                    relevance_df.sort_values('timestamp'),
-                    x='timestamp',
-                    y='relevance_score',
-                    title='Answer Relevance Over Time'
+                _display_score_charts(
+                    content_db, 'answer_relevance', 'relevance_score',
+                    'Relevance Score Distribution', 'Answer Relevance Over Time'
                 )
-                st.plotly_chart(fig_timeline, use_container_width=True)
             else:
                 st.info("No answer relevance data available yet.")
         except Exception as e:
             st.error(f"Error displaying relevance analytics: {str(e)}")
                 
 
-    with tab5:
+    if selected == "Automated Tests":
         try:
-            automated_test_results = content_db.get_test_results(limit=50)
-            if automated_test_results:
-                test_df = pd.DataFrame(automated_test_results)
+            test_summary = content_db.get_evaluation_rollups('automated_tests', by_day=False)
+            if test_summary:
+                summary = test_summary[0]
                 
                 test_metrics_col1, test_metrics_col2, test_metrics_col3, test_metrics_col4 = st.columns(4)
                 with test_metrics_col1:
-                    avg_rouge1 = test_df['rouge1_score'].mean()
-                    st.metric("Avg ROUGE-1", f"{avg_rouge1:.3f}")
+                    st.metric("Avg ROUGE-1", f"{summary['rouge1_score'] or 0:.3f}")
                 with test_metrics_col2:
-                    avg_rouge2 = test_df['rouge2_score'].mean()
-                    st.metric("Avg ROUGE-2", f"{avg_rouge2:.3f}")
+                    st.metric("Avg ROUGE-2", f"{summary['rouge2_score'] or 0:.3f}")
                 with test_metrics_col3:
-                    avg_semantic = test_df['semantic_similarity'].mean()
-                    st.metric("Semantic Similarity", f"{avg_semantic:.3f}")
+                    st.metric("Semantic Similarity", f"{summary['semantic_similarity'] or 0:.3f}")
                 with test_metrics_col4:
-                    avg_hallucination = test_df['hallucination_score'].mean()
-                    st.metric("Hallucination Score", f"{avg_hallucination:.3f}")
+                    st.metric("Hallucination Score", f"{summary['hallucination_score'] or 0:.3f}")
                 
-                fig_scores = px.box(
-                    test_df,
-                    y=['rouge1_score', 'rouge2_score', 'semantic_similarity', 'hallucination_score'],
-                    title="Test Score Distributions"
+                test_daily = _display_score_charts(
+                    content_db, 'automated_tests', 'overall_score',
+                    'Overall Test Score Distribution', 'Overall Test Score Trend'
                 )
-                st.plotly_chart(fig_scores, use_container_width=True)
-                
-                fig_trend = px.line(
-                    test_df.sort_values('timestamp'),
-                    x='timestamp',
-                    y='overall_score',
-                    title="Overall Test Score Trend"
-                )
-                st.plotly_chart(fig_trend, use_container_width=True)
+                if test_daily:
+                    fig_scores = px.line(
+                        pd.DataFrame(test_daily),
+                        x='day',
+                        y=['rouge1_score', 'rouge2_score', 'semantic_similarity', 'hallucination_score'],
+                        title="Daily Test Scores"
+                    )
+                    st.plotly_chart(fig_scores, use_container_width=True)
                 
-                if any(len(segs) > 0 for segs in test_df['suspicious_segments']):
+                recent_tests = content_db.get_test_results(limit=5)
+                if any(test['suspicious_segments'] for test in recent_tests):
                     st.subheader("Recent Suspicious Segments")
-                    for idx, row in test_df.head(5).iterrows():
-                        if row['suspicious_segments']:
-                            st.markdown(f"**Query:** {row['query']}")
-                            for segment in row['suspicious_segments']:
+                    for test in recent_tests:
+                        if test['suspicious_segments']:
+                            st.markdown(f"**Query:** {test['query']}")
+                            for segment in test['suspicious_segments']:
                                 st.warning(f"• {segment}")
                             st.markdown("---")
             else:
@@ -448,123 +423,127 @@ def display_analytics(traces: List[QueryTrace], content_db: ContentDB):
 
         
 
-def display_general_analysis(traces: List[QueryTrace]):
+def display_general_analysis(trace_store: TraceStore):
     """
-    Display general analytics metrics including success rate and basic statistics.
+    Display general analytics metrics including success rate and basic statistics,
+    read from the trace store's daily rollups.
     """
-    if not traces:
+    daily = trace_store.rollups()
+    if not daily:
         st.info("No research history available yet. Run some searches to see analytics!")
         return
-        
-    df = pd.DataFrame([{
-        'date': datetime.fromisoformat(t.data['start_time']).date(),
-        'success': t.data.get('success', False),
-        'duration': t.data.get('duration', 0),
-        'content_new': t.data.get('content_new', 0), 
-        'content_reused': t.data.get('content_reused', 0)
-    } for t in traces])
+    totals = trace_store.rollups(group_by=(), refresh=False)[0]
    
     st.subheader("📈 Success Rate Over Time")
-    success_by_date = df.groupby('date').agg({
-        'success': ['count', lambda x: x.sum() / len(x) * 100]
-    }).reset_index()
-    success_by_date.columns = ['date', 'total', 'success_rate']
+    success_by_date = pd.DataFrame([row for row in daily if row['day']])
     
-    fig_success = px.line(
-        success_by_date,
-        x='date',
-        y='success_rate',
-        title='Success Rate Trend'
-    )
-    st.plotly_chart(fig_success, use_container_width=True)
+    if not success_by_date.empty:
+        fig_success = px.line(
+            success_by_date,
+            x='day',
+            y='success_rate',
+            title='Success Rate Trend'
+        )
+        st.plotly_chart(fig_success, use_container_width=True)
 
     st.subheader("📊 Research Statistics")
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Researches", len(traces))
+        st.metric("Total Researches", totals['count'])
     with col2:
-        st.metric("Average Duration", f"{df['duration'].mean():.2f}s")
+        st.metric("Average Duration", f"{totals['avg_duration'] or 0:.2f}s")
     with col3:
-        success_rate = (df['success'].sum() / len(df)) * 100
-        st.metric("Success Rate", f"{success_rate:.1f}%")
+        st.metric("Success Rate", f"{totals['success_rate']:.1f}%")
     with col4:
-        total_content = df['content_new'].sum() + df['content_reused'].sum()
-        st.metric("Total Content Processed", total_content)
-def display_analysis(traces: List[QueryTrace], content_db: ContentDB):
+        total_content = totals['content_new'] + totals['content_reused']
+        st.metric("Total Content Processed", f"{int(total_content):,}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Median Duration", f"{totals['p50_duration'] or 0:.2f}s")
+    with col2:
+        st.metric("P95 Duration", f"{totals['p95_duration'] or 0:.2f}s")
+    with col3:
+        total_tokens = totals['tokens_input'] + totals['tokens_output']
+        st.metric("Total Tokens", f"{int(total_tokens):,}")
+    with col4:
+        st.metric("Total Cost", f"${totals['cost']:.4f}")
+
+    by_tool = trace_store.rollups(group_by=('tool',), refresh=False)
+    if by_tool:
+        st.subheader("🧰 By Tool")
+        tool_df = pd.DataFrame(by_tool)
+        tool_df['tool'] = tool_df['tool'].replace('', 'Unknown')
+        st.dataframe(
+            tool_df[['tool', 'count', 'success_rate', 'p50_duration', 'p95_duration', 'cost']],
+            use_container_width=True,
+            hide_index=True
+        )
+def display_analysis(trace_store: TraceStore, content_db: ContentDB):
     """Display analysis metrics and visualizations with comprehensive logging."""
     
     start_time = time.time()
     logger.info("Starting display_analysis function")
     
-    if not traces:
+    daily = trace_store.rollups()
+    if not daily:
         logger.warning("No analysis traces available")
         st.info("No analysis history available yet. Run some analyses to see metrics!")
         return
+    totals = trace_store.rollups(group_by=(), refresh=False)[0]
 
-    logger.info(f"Processing {len(traces)} analysis traces")
+    logger.info(f"Processing rollups of {totals['count']} analysis traces over {len(daily)} days")
 
     try:
-        tab1, tab2, tab3, tab4 = st.tabs([
+        selected = lazy_tabs([
             "Analysis Overview",
             "Numerical Accuracy",
             "Query Understanding",
             "Validation & Reasoning"
-        ])
-        logger.debug("Created tab structure successfully")
+        ], key="analysis_tab")
+        logger.debug(f"Rendering the {selected} tab")
 
-        with tab1:
+        if selected == "Analysis Overview":
             logger.info("Processing Analysis Overview tab")
             try:
-                # Create DataFrame from traces
-                df = pd.DataFrame([{
-                    'date': datetime.fromisoformat(t.data['start_time']).date(),
-                    'success': t.data.get('success', False),
-                    'duration': t.data.get('duration', 0),
-                    'overall_score': t.data.get('analysis_metrics', {}).get('overall_score', 0)
-                } for t in traces])
-                logger.debug(f"Created main DataFrame with {len(df)} rows")
-                
                 st.subheader("📈 Analysis Performance Over Time")
                 
-                # Calculate performance metrics
-                success_by_date = df.groupby('date').agg({
-                    'success': ['count', lambda x: x.sum() / len(x) * 100],
-                    'overall_score': 'mean'
-                }).reset_index()
-                success_by_date.columns = ['date', 'total_analyses', 'success_rate', 'avg_score']
-                logger.debug(f"Calculated performance metrics for {len(success_by_date)} dates")
+                # Daily performance metrics, already aggregated by the trace store
+                success_by_date = pd.DataFrame([row for row in daily if row['day']])
+                logger.debug(f"Read performance metrics for {len(success_by_date)} dates")
                 
                 # Create performance trend plot
                 try:
-                    fig_performance = px.line(
-                        success_by_date,
-                        x='date',
-                        y=['success_rate', 'avg_score'],
-                        title='Analysis Performance Trends',
-                        labels={'value': 'Percentage', 'variable': 'Metric'},
-                        color_discrete_map={'success_rate': '#2E86C1', 'avg_score': '#27AE60'}
-                    )
-                    st.plotly_chart(fig_performance, use_container_width=True)
-                    logger.debug("Successfully created performance trend plot")
+                    if not success_by_date.empty:
+                        fig_performance = px.line(
+                            success_by_date.rename(columns={'avg_overall_score': 'avg_score'}),
+                            x='day',
+                            y=['success_rate', 'avg_score'],
+                            title='Analysis Performance Trends',
+                            labels={'value': 'Percentage', 'variable': 'Metric'},
+                            color_discrete_map={'success_rate': '#2E86C1', 'avg_score': '#27AE60'}
+                        )
+                        st.plotly_chart(fig_performance, use_container_width=True)
+                        logger.debug("Successfully created performance trend plot")
                 except Exception as e:
                     logger.error(f"Error creating performance plot: {str(e)}", exc_info=True)
                     st.error("Unable to display performance trend plot")
 
                 # Display statistics
-                logger.debug("Calculating summary statistics")
+                logger.debug("Reading summary statistics")
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Total Analyses", len(traces))
+                    st.metric("Total Analyses", totals['count'])
                 with col2:
-                    avg_duration = df['duration'].mean()
+                    avg_duration = totals['avg_duration'] or 0
                     st.metric("Average Duration", f"{avg_duration:.2f}s")
                     logger.info(f"Average analysis duration: {avg_duration:.2f}s")
                 with col3:
-                    success_rate = (df['success'].sum() / len(df)) * 100
+                    success_rate = totals['success_rate']
                     st.metric("Success Rate", f"{success_rate:.1f}%")
                     logger.info(f"Overall success rate: {success_rate:.1f}%")
                 with col4:
-                    avg_score = df['overall_score'].mean()
+                    avg_score = totals['avg_overall_score']
                     st.metric("Avg Overall Score", f"{avg_score:.2f}")
                     logger.info(f"Average overall score: {avg_score:.2f}")
 
@@ -572,40 +551,38 @@ def display_analysis(traces: List[QueryTrace], content_db: ContentDB):
                 logger.error(f"Error processing Analysis Overview tab: {str(e)}", exc_info=True)
                 st.error("Error processing analysis overview")
 
-        with tab2:
+        if selected != "Analysis Overview":
+            analysis_summary = content_db.get_evaluation_rollups('analysis', by_day=False)
+            analysis_daily = [row for row in content_db.get_evaluation_rollups('analysis') if row['day']]
+            logger.debug(f"Read analysis evaluation rollups for {len(analysis_daily)} days")
+
+        if selected == "Numerical Accuracy":
             logger.info("Processing Numerical Accuracy tab")
             try:
                 st.subheader("🔢 Numerical Accuracy Metrics")
-                analysis_evals = content_db.get_analysis_evaluations(limit=50)
-                logger.debug(f"Retrieved {len(analysis_evals) if analysis_evals else 0} analysis evaluations")
                 
-                if analysis_evals:
-                    metrics_df = pd.DataFrame([{
-                        'timestamp': eval_data['timestamp'],
-                        'numerical_accuracy': eval_data['numerical_accuracy'],
-                        'term_coverage': eval_data['term_coverage']
-                    } for eval_data in analysis_evals])
-                    logger.debug(f"Created metrics DataFrame with {len(metrics_df)} rows")
-                    
+                if analysis_summary:
+                    summary = analysis_summary[0]
                     col1, col2 = st.columns(2)
                     with col1:
-                        avg_accuracy = metrics_df['numerical_accuracy'].mean()
+                        avg_accuracy = summary['numerical_accuracy'] or 0
                         st.metric("Avg Numerical Accuracy", f"{avg_accuracy:.2f}")
                         logger.info(f"Average numerical accuracy: {avg_accuracy:.2f}")
                     with col2:
-                        avg_coverage = metrics_df['term_coverage'].mean()
+                        avg_coverage = summary['term_coverage'] or 0
                         st.metric("Avg Term Coverage", f"{avg_coverage:.2f}")
                         logger.info(f"Average term coverage: {avg_coverage:.2f}")
                     
                     try:
-                        fig_accuracy = px.line(
-                            metrics_df.sort_values('timestamp'),
-                            x='timestamp',
-                            y='numerical_accuracy',
-                            title='Numerical Accuracy Trend'
-                        )
-                        st.plotly_chart(fig_accuracy, use_container_width=True)
-                        logger.debug("Successfully created numerical accuracy trend plot")
+                        if analysis_daily:
+                            fig_accuracy = px.line(
+                                pd.DataFrame(analysis_daily),
+                                x='day',
+                                y='numerical_accuracy',
+                                title='Numerical Accuracy Trend'
+                            )
+                            st.plotly_chart(fig_accuracy, use_container_width=True)
+                            logger.debug("Successfully created numerical accuracy trend plot")
                     except Exception as e:
                         logger.error(f"Error creating accuracy plot: {str(e)}", exc_info=True)
                         st.error("Unable to display accuracy trend plot")
@@ -613,7 +590,7 @@ def display_analysis(traces: List[QueryTrace], content_db: ContentDB):
                     # Display calculation examples
                     logger.debug("Processing calculation examples")
                     st.subheader("Recent Calculation Examples")
-                    for eval_data in analysis_evals[:5]:
+                    for eval_data in content_db.get_analysis_evaluations(limit=5):
                         if eval_data.get('calculation_examples'):
                             logger.debug(f"Displaying examples for query: {eval_data['query'][:50]}...")
                             st.markdown(f"**Query:** {eval_data['query']}")
@@ -625,37 +602,30 @@ def display_analysis(traces: List[QueryTrace], content_db: ContentDB):
                 logger.error(f"Error processing Numerical Accuracy tab: {str(e)}", exc_info=True)
                 st.error("Error processing numerical accuracy metrics")
 
-        with tab3:
+        if selected == "Query Understanding":
             logger.info("Processing Query Understanding tab")
             try:
                 st.subheader("🎯 Query Understanding Analysis")
-                if analysis_evals:
-                    understanding_df = pd.DataFrame([{
-                        'timestamp': eval_data['timestamp'],
-                        'query_understanding': eval_data['query_understanding'],
-                        'analytical_elements': len(eval_data.get('analytical_elements', {}))
-                    } for eval_data in analysis_evals])
-                    logger.debug(f"Created understanding DataFrame with {len(understanding_df)} rows")
-                    
+                if analysis_summary:
+                    summary = analysis_summary[0]
                     col1, col2 = st.columns(2)
                     with col1:
-                        avg_understanding = understanding_df['query_understanding'].mean()
+                        avg_understanding = summary['query_understanding'] or 0
                         st.metric("Avg Query Understanding", f"{avg_understanding:.2f}")
                         logger.info(f"Average query understanding score: {avg_understanding:.2f}")
                     with col2:
-                        avg_elements = understanding_df['analytical_elements'].mean()
-                        st.metric("Avg Analytical Elements", f"{avg_elements:.1f}")
-                        logger.info(f"Average analytical elements: {avg_elements:.1f}")
+                        st.metric("Analyses Evaluated", f"{summary['count']:,}")
                     
                     try:
-                        fig_understanding = px.line(
-                            understanding_df.sort_values('timestamp'),
-                            x='timestamp',
-                            y='query_understanding',
-                            title='Query Understanding Score Trend'
-                        )
-                        st.plotly_chart(fig_understanding, use_container_width=True)
-                        logger.debug("Successfully created query understanding trend plot")
+                        if analysis_daily:
+                            fig_understanding = px.line(
+                                pd.DataFrame(analysis_daily),
+                                x='day',
+                                y='query_understanding',
+                                title='Query Understanding Score Trend'
+                            )
+                            st.plotly_chart(fig_understanding, use_container_width=True)
+                            logger.debug("Successfully created query understanding trend plot")
                     except Exception as e:
                         logger.error(f"Error creating understanding plot: {str(e)}", exc_info=True)
                         st.error("Unable to display query understanding trend plot")
@@ -664,44 +634,40 @@ def display_analysis(traces: List[QueryTrace], content_db: ContentDB):
                 logger.error(f"Error processing Query Understanding tab: {str(e)}", exc_info=True)
                 st.error("Error processing query understanding analysis")
 
-        with tab4:
+        if selected == "Validation & Reasoning":
             logger.info("Processing Validation & Reasoning tab")
             try:
                 st.subheader("🔍 Validation & Reasoning Metrics")
-                if analysis_evals:
-                    validation_df = pd.DataFrame([{
-                        'timestamp': eval_data['timestamp'],
-                        'data_validation': eval_data['data_validation'],
-                        'reasoning_transparency': eval_data['reasoning_transparency']
-                    } for eval_data in analysis_evals])
-                    logger.debug(f"Created validation DataFrame with {len(validation_df)} rows")
-                    
+                if analysis_summary:
+                    summary = analysis_summary[0]
                     col1, col2 = st.columns(2)
                     with col1:
-                        avg_validation = validation_df['data_validation'].mean()
+                        avg_validation = summary['data_validation'] or 0
                         st.metric("Avg Data Validation", f"{avg_validation:.2f}")
                         logger.info(f"Average data validation score: {avg_validation:.2f}")
                     with col2:
-                        avg_transparency = validation_df['reasoning_transparency'].mean()
+                        avg_transparency = summary['reasoning_transparency'] or 0
                         st.metric("Avg Reasoning Transparency", f"{avg_transparency:.2f}")
                         logger.info(f"Average reasoning transparency: {avg_transparency:.2f}")
                     
                     try:
-                        fig_validation = px.box(
-                            validation_df,
-                            y=['data_validation', 'reasoning_transparency'],
-                            title='Distribution of Validation Metrics'
-                        )
-                        st.plotly_chart(fig_validation, use_container_width=True)
-                        logger.debug("Successfully created validation metrics distribution plot")
+                        if analysis_daily:
+                            fig_validation = px.line(
+                                pd.DataFrame(analysis_daily),
+                                x='day',
+                                y=['data_validation', 'reasoning_transparency'],
+                                title='Validation Metrics Trend'
+                            )
+                            st.plotly_chart(fig_validation, use_container_width=True)
+                            logger.debug("Successfully created validation metrics trend plot")
                     except Exception as e:
                         logger.error(f"Error creating validation plot: {str(e)}", exc_info=True)
-                        st.error("Unable to display validation metrics distribution")
+                        st.error("Unable to display validation metrics trend")
                     
                     # Display validation checks
                     logger.debug("Processing recent validation checks")
                     st.subheader("Recent Validation Checks")
-                    for eval_data in analysis_evals[:5]:
+                    for eval_data in content_db.get_analysis_evaluations(limit=5):
                         if eval_data.get('validation_checks'):
                             logger.debug(f"Displaying validation checks for query: {eval_data['query'][:50]}...")
                             st.markdown(f"**Query:** {eval_data['query']}")
@@ -1,27 +1,85 @@
 from tools.research.common.model_schemas import ContentItem
 from typing import Optional, Dict, Any, List
-import threading
+import hashlib
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import sqlite3
 import os
 import json
 from datetime import datetime
+from utils.sqlite_pool import SQLitePool
+from utils.migrations import migrate
+from utils.content_store import BODY_UPSERT_SQL, body_row, read_body, register_functions
+from utils.rollups import SCORE_BUCKETS, score_bucket, score_bucket_bounds
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the entry point (utils.async_logging)
 logger = logging.getLogger(__name__)
 
+# Evaluations rolled up per day: evaluator -> (table, score column whose
+# distribution is kept, metrics summed for means and totals)
+EVALUATION_ROLLUPS = {
+    'factual_accuracy': ('factual_accuracy', 'factual_score', [
+        'factual_score', 'citation_accuracy', 'verified_claims', 'contradicting_claims'
+    ]),
+    'source_coverage': ('source_coverage_evaluations', 'coverage_score', [
+        'coverage_score', 'diversity_score', 'unique_domains', 'source_depth'
+    ]),
+    'logical_coherence': ('logical_coherence_evaluations', 'coherence_score', [
+        'coherence_score', 'topic_coherence', 'logical_fallacies_count', 'idea_progression_score'
+    ]),
+    'answer_relevance': ('answer_relevance_evaluations', 'relevance_score', [
+        'relevance_score', 'semantic_similarity', 'information_density', 'context_alignment_score'
+    ]),
+    'automated_tests': ('automated_tests', 'overall_score', [
+        'overall_score', 'rouge1_score', 'rouge2_score', 'semantic_similarity', 'hallucination_score'
+    ]),
+    'analysis': ('analysis_evaluations', 'overall_score', [
+        'overall_score', 'numerical_accuracy', 'term_coverage', 'query_understanding',
+        'data_validation', 'reasoning_transparency'
+    ])
+}
+
+# Content metadata: bodies are stored apart and loaded lazily (see utils.content_store)
+_CONTENT_COLUMNS = ["id", "url", "title", "snippet", "source"]
+
+# Documents per id/URL lookup in upsert_docs (well under SQLite's variable limit)
+_UPSERT_CHUNK = 500
+
+# One statement for new and stored documents: a stored URL keeps its id. The
+# body goes to content_bodies; content.content only held it before that.
+_UPSERT_SQL = """
+    INSERT INTO content (id, url, title, snippet, content, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title = excluded.title,
+        snippet = excluded.snippet,
+        content = excluded.content,
+        source = excluded.source
+"""
+
+
+def _url_hash(url: str) -> str:
+    """Deterministic document id for a URL."""
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
 class ContentDB:
     def __init__(self, db_path: str):
           # Initial breakpoint
-        self.lock = threading.Lock()
-        
         db_dir = os.path.dirname(db_path)
         if not os.path.exists(db_dir):
-            os.makedirs(db_dir)
+            # exist_ok: another ContentDB may be creating it at the same time
+            os.makedirs(db_dir, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL database: reads use pooled reader connections; every write
+        # goes through the single writer `conn`, serialized by `lock`, and
+        # is group-committed (see SQLitePool; flush() forces a commit)
+        # content_body() is used by the search index triggers utils.db adds
+        self.pool = SQLitePool(db_path, on_connect=register_functions)
+        self.conn = self.pool.writer
+        self.lock = self.pool.write_lock
+        # Body loader shared by the lazy items this database returns
+        self._load_body = self.get_body
 
         with self.lock:
             self.conn.executescript("""
@@ -129,137 +187,265 @@ class ContentDB:
                     information_density REAL,
                     context_alignment_score REAL
                 );
+
+                CREATE TABLE IF NOT EXISTS evaluation_rollups (
+                    day TEXT NOT NULL,
+                    evaluator TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    PRIMARY KEY (day, evaluator, metric)
+                );
+
+                CREATE TABLE IF NOT EXISTS evaluation_score_buckets (
+                    day TEXT NOT NULL,
+                    evaluator TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (day, evaluator, bucket)
+                );
             """)
             self.conn.commit()
-                
+            migrate(self.conn)
+            self._backfill_evaluation_rollups()
+
+    def _backfill_evaluation_rollups(self) -> None:
+        """Build the rollups from the evaluation tables when a database predates them. Caller holds the lock."""
+        if self.conn.execute("SELECT 1 FROM evaluation_rollups LIMIT 1").fetchone():
+            return
+        # IMMEDIATE, and checked again inside: another connection opening the
+        # database at the same time may have built the rollups, or folded a
+        # new evaluation into them, since the check above
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.conn.execute("SELECT 1 FROM evaluation_rollups LIMIT 1").fetchone():
+                self.conn.rollback()
+                return
+            day = "substr(COALESCE(timestamp, ''), 1, 10)"
+            for evaluator, (table, score_column, metrics) in EVALUATION_ROLLUPS.items():
+                for metric in metrics:
+                    self.conn.execute(
+                        f"""
+                        INSERT INTO evaluation_rollups (day, evaluator, metric, count, total)
+                        SELECT {day}, ?, ?, COUNT({metric}), COALESCE(SUM({metric}), 0)
+                        FROM {table}
+                        GROUP BY 1
+                        HAVING COUNT({metric}) > 0
+                        """,
+                        (evaluator, metric)
+                    )
+                self.conn.execute(
+                    f"""
+                    INSERT INTO evaluation_score_buckets (day, evaluator, bucket, count)
+                    SELECT {day}, ?, MIN(MAX(CAST({score_column} * {SCORE_BUCKETS} AS INTEGER), 0), {SCORE_BUCKETS - 1}), COUNT(*)
+                    FROM {table}
+                    WHERE {score_column} IS NOT NULL
+                    GROUP BY 1, 3
+                    """,
+                    (evaluator,)
+                )
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def _fold_evaluation(self, evaluator: str, row: Dict[str, Any]) -> None:
+        """
+        Add one stored evaluation to the daily rollups, in the caller's
+        transaction. Caller holds the lock.
+
+        Args:
+            evaluator: Key of EVALUATION_ROLLUPS
+            row: Column values of the stored evaluation, including timestamp
+        """
+        _, score_column, metrics = EVALUATION_ROLLUPS[evaluator]
+        day = str(row.get('timestamp') or '')[:10]
+        values = [(day, evaluator, metric, row[metric]) for metric in metrics
+                  if isinstance(row.get(metric), (int, float))]
+        self.conn.executemany(
+            """
+            INSERT INTO evaluation_rollups (day, evaluator, metric, count, total)
+            VALUES (?, ?, ?, 1, ?)
+            ON CONFLICT (day, evaluator, metric) DO UPDATE SET
+                count = count + 1,
+                total = total + excluded.total
+            """,
+            values
+        )
+        if isinstance(row.get(score_column), (int, float)):
+            self.conn.execute(
+                """
+                INSERT INTO evaluation_score_buckets (day, evaluator, bucket, count)
+                VALUES (?, ?, ?, 1)
+                ON CONFLICT (day, evaluator, bucket) DO UPDATE SET count = count + 1
+                """,
+                (day, evaluator, score_bucket(row[score_column]))
+            )
+
+    def _lazy_item(self, row: tuple) -> ContentItem:
+        """A ContentItem from a _CONTENT_COLUMNS row; its body is read on first access."""
+        return ContentItem.lazy(self._load_body, **dict(zip(_CONTENT_COLUMNS, row)))
+
+    def get_body(self, id: str) -> str:
+        """
+        The body of a stored document, decompressed.
+
+        Args:
+            id: Document ID
+
+        Returns:
+            str: The body ("" if the document has none or is gone)
+        """
+        with self.pool.read(fresh=True) as conn:
+            return read_body(conn, id)
+
     def get_doc_by_id(self, id: str) -> Optional[ContentItem]:
           # Breakpoint before ID retrieval
-        logger.info(f"Retrieving document with ID: {id}")
+        logger.debug(f"Retrieving document with ID: {id}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read(fresh=True) as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, url, title, snippet, content, source FROM content WHERE id = ?",
+                f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content WHERE id = ?",
                 (id,),
             )
             row = cursor.fetchone()
-            return (
-                ContentItem(
-                    **dict(
-                        zip(["id", "url", "title", "snippet", "content", "source"], row)
-                    )
-                )
-                if row
-                else None
-            )
+        return self._lazy_item(row) if row else None
 
     def get_doc_by_url(self, url: str) -> Optional[ContentItem]:
           # Breakpoint before URL retrieval
-        logger.info(f"Retrieving document with URL: {url}")
+        logger.debug(f"Retrieving document with URL: {url}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read(fresh=True) as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, url, title, snippet, content, source FROM content WHERE url = ?",
+                f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content WHERE url = ?",
                 (url,),
             )
             row = cursor.fetchone()
-            return (
-                ContentItem(
-                    **dict(
-                        zip(["id", "url", "title", "snippet", "content", "source"], row)
-                    )
-                )
-                if row
-                else None
-            )
+        return self._lazy_item(row) if row else None
 
     def upsert_doc(self, doc: ContentItem) -> bool:
-          # Breakpoint before upsert
-        logger.info(f"Upserting document: {doc.id}")
-        
-        with self.lock:
-            cursor = self.conn.cursor()
+        """
+        Insert or update one document, keyed by URL (see upsert_docs).
+
+        Returns:
+            bool: True if the document was new, False if its URL was stored
+        """
+        return self.upsert_docs([doc])['inserted'] == 1
+
+    def upsert_docs(self, docs: List[ContentItem]) -> Dict[str, int]:
+        """
+        Insert or update documents in one transaction, keyed by URL.
+
+        A document whose URL is stored updates that row and takes its id. A
+        new document keeps its id unless another URL holds it, in which case
+        the id gets a suffix hashed from its URL; documents without an id
+        get a URL hash. Ids are therefore deterministic, and each document's
+        `id` is set to the id it is stored under. When a URL repeats within
+        `docs` the last copy wins.
+
+        Args:
+            docs: Documents to store
+
+        Returns:
+            Dict[str, int]: Numbers of 'inserted' and 'updated' documents
+
+        Raises:
+            sqlite3.IntegrityError: If the batch cannot be stored (nothing is written)
+        """
+        counts = {'inserted': 0, 'updated': 0}
+        if not docs:
+            return counts
+
+        # Compressed before taking the write lock (this also loads lazy bodies)
+        bodies = [body_row(doc.id, doc.content) for doc in docs]
+
+        with self.pool.write():
             try:
-                # Check if document with this ID already exists
-                cursor.execute("SELECT 1 FROM content WHERE id = ?", (doc.id,))
-                id_exists = cursor.fetchone() is not None
-                
-                # If ID exists, generate a new unique ID
-                if id_exists:
-                    base_id = doc.id
-                    counter = 1
-                    while id_exists:
-                        new_id = f"{base_id}_{counter}"
-                        cursor.execute("SELECT 1 FROM content WHERE id = ?", (new_id,))
-                        id_exists = cursor.fetchone() is not None
-                        counter += 1
-                    doc.id = new_id
-                    logging.info(f"Generated new ID for document: {doc.id}")
-
-                # Check if URL exists (for determining if this is an insert or update)
-                cursor.execute("SELECT 1 FROM content WHERE url = ?", (doc.url,))
-                is_new = cursor.fetchone() is None
-
-                # Insert or update the document
-                cursor.execute(
-                    """
-                    INSERT INTO content (id, url, title, snippet, content, source)
-                    VALUES (:id, :url, :title, :snippet, :content, :source)
-                    ON CONFLICT(id) DO UPDATE SET  
-                        title=excluded.title,
-                        snippet=excluded.snippet,
-                        content=excluded.content,
-                        source=excluded.source
-                    """,
-                    doc.to_dict(),
-                )
-                self.conn.commit()
-                logging.info(f"Document {'inserted' if is_new else 'updated'} successfully: {doc.id}")
-                  # Breakpoint after upsert
-                return is_new
-                
+                # Ids and URLs already stored, looked up in chunks
+                ids_by_url: Dict[str, str] = {}
+                urls_by_id: Dict[str, str] = {}
+                for start in range(0, len(docs), _UPSERT_CHUNK):
+                    chunk = docs[start:start + _UPSERT_CHUNK]
+                    for column, keys in (('url', [doc.url for doc in chunk]), ('id', [doc.id for doc in chunk if doc.id])):
+                        if not keys:
+                            continue
+                        placeholders = ', '.join('?' * len(keys))
+                        for doc_id, url in self.conn.execute(
+                            f"SELECT id, url FROM content WHERE {column} IN ({placeholders})", keys
+                        ):
+                            ids_by_url[url] = doc_id
+                            urls_by_id[doc_id] = url
+
+                rows = []
+                body_rows = []
+                for doc, body in zip(docs, bodies):
+                    if doc.url in ids_by_url:
+                        doc.id = ids_by_url[doc.url]
+                        counts['updated'] += 1
+                    else:
+                        doc_id = doc.id or _url_hash(doc.url)
+                        if urls_by_id.get(doc_id, doc.url) != doc.url:
+                            doc_id = f"{doc_id}_{_url_hash(doc.url)[:8]}"
+                        doc.id = doc_id
+                        ids_by_url[doc.url] = doc_id
+                        urls_by_id[doc_id] = doc.url
+                        counts['inserted'] += 1
+                    rows.append((doc.id, doc.url, doc.title, doc.snippet, "", doc.source))
+                    body_rows.append((doc.id,) + body[1:])
+
+                # Bodies first: a new row is then indexed for search once, with its body
+                self.conn.executemany(BODY_UPSERT_SQL, body_rows)
+                self.conn.executemany(_UPSERT_SQL, rows)
+                self.pool.commit()
+                logger.debug(f"Upserted {len(docs)} documents: {counts['inserted']} inserted, {counts['updated']} updated")
+                return counts
+
             except sqlite3.IntegrityError as e:
-                logging.error(f"Error inserting/updating document: {e}")
-                self.conn.rollback()
+                logger.error(f"Error inserting/updating documents: {e}")
+                self.pool.rollback()
                 raise
 
     def store_source_coverage(self, data: Dict[str, Any]) -> int:
           # Breakpoint before storing source coverage
         logger.info("Storing source coverage evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
+                insert_data = {
+                    'query': data.get('query', 'Unknown'),
+                    'timestamp': data.get('timestamp', datetime.now().isoformat()),
+                    'coverage_score': data.get('coverage_score', 0.0),
+                    'coverage_ratio': data.get('coverage_ratio', 0.0),
+                    'diversity_score': data.get('diversity_score', 0.0),
+                    'missed_sources': json.dumps(data.get('missed_sources', [])),
+                    'total_sources': data.get('total_sources', 0),
+                    'unique_domains': data.get('unique_domains', 0),
+                    'source_depth': data.get('source_depth', 0.0),
+                    'cross_referencing_score': data.get('cross_referencing_score', 0.0),
+                    'domain_variety_score': data.get('domain_variety_score', 0.0)
+                }
                 cursor = self.conn.cursor()
                 cursor.execute(
                     """
                     INSERT INTO source_coverage_evaluations 
-                    (query, coverage_score, coverage_ratio, diversity_score, 
+                    (query, timestamp, coverage_score, coverage_ratio, diversity_score, 
                         missed_sources, total_sources, unique_domains, source_depth, 
                         cross_referencing_score, domain_variety_score)
-                    VALUES (:query, :coverage_score, :coverage_ratio, :diversity_score, 
+                    VALUES (:query, :timestamp, :coverage_score, :coverage_ratio, :diversity_score, 
                             :missed_sources, :total_sources, :unique_domains, :source_depth, 
                             :cross_referencing_score, :domain_variety_score)
                     """,
-                    {
-                        'query': data.get('query', 'Unknown'),
-                        'coverage_score': data.get('coverage_score', 0.0),
-                        'coverage_ratio': data.get('coverage_ratio', 0.0),
-                        'diversity_score': data.get('diversity_score', 0.0),
-                        'missed_sources': json.dumps(data.get('missed_sources', [])),
-                        'total_sources': data.get('total_sources', 0),
-                        'unique_domains': data.get('unique_domains', 0),
-                        'source_depth': data.get('source_depth', 0.0),
-                        'cross_referencing_score': data.get('cross_referencing_score', 0.0),
-                        'domain_variety_score': data.get('domain_variety_score', 0.0)
-                    }
+                    insert_data
                 )
-                self.conn.commit()
+                self._fold_evaluation('source_coverage', insert_data)
+                self.pool.commit()
                   # Breakpoint after storing source coverage
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logging.error(f"Error storing source coverage: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
             
     def store_test_results(self, query: str, overall_score: float, details: Dict[str, Any]) -> int:
@@ -278,7 +464,7 @@ class ContentDB:
         logger.info("Starting to store test results")
         logger.debug(f"Input parameters - Query length: {len(query)}, Score: {overall_score}")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 # Log the details being stored
                 logger.debug("Preparing test details for storage:")
@@ -319,21 +505,29 @@ class ContentDB:
                     details['hallucination_score'],
                     suspicious_segments_json
                 ))
+                self._fold_evaluation('automated_tests', {
+                    'timestamp': details['timestamp'],
+                    'overall_score': overall_score,
+                    'rouge1_score': details['rouge_scores']['rouge1'],
+                    'rouge2_score': details['rouge_scores']['rouge2'],
+                    'semantic_similarity': details['semantic_similarity'],
+                    'hallucination_score': details['hallucination_score']
+                })
                 
                 # Commit the transaction
-                self.conn.commit()
+                self.pool.commit()
                 row_id = cursor.lastrowid
                 logger.info(f"Successfully stored test results with ID: {row_id}")
                 return row_id
                 
             except sqlite3.Error as sql_err:
                 logger.error(f"SQLite error storing test results: {sql_err}", exc_info=True)
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
                 
             except Exception as e:
                 logger.error(f"Unexpected error storing test results: {e}", exc_info=True)
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
             
             finally:
@@ -345,46 +539,49 @@ class ContentDB:
           # Breakpoint before storing answer relevance
         logger.info("Storing answer relevance evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
+                insert_data = {
+                    'query': data.get('query', 'Unknown'),
+                    'timestamp': data.get('timestamp', datetime.now().isoformat()),
+                    'relevance_score': data.get('relevance_score', 0.0),
+                    'semantic_similarity': data.get('semantic_similarity', 0.0),
+                    'entity_coverage': data.get('entity_coverage', 0.0),
+                    'keyword_coverage': data.get('keyword_coverage', 0.0),
+                    'topic_focus': data.get('topic_focus', 0.0),
+                    'off_topic_sentences': json.dumps(data.get('off_topic_sentences', [])),
+                    'total_sentences': data.get('total_sentences', 0),
+                    'query_match_percentage': data.get('query_match_percentage', 0.0),
+                    'information_density': data.get('information_density', 0.0),
+                    'context_alignment_score': data.get('context_alignment_score', 0.0)
+                }
                 cursor = self.conn.cursor()
                 cursor.execute(
                     """
                     INSERT INTO answer_relevance_evaluations 
-                    (query, relevance_score, semantic_similarity, entity_coverage, 
+                    (query, timestamp, relevance_score, semantic_similarity, entity_coverage, 
                      keyword_coverage, topic_focus, off_topic_sentences, total_sentences,
                      query_match_percentage, information_density, context_alignment_score)
-                    VALUES (:query, :relevance_score, :semantic_similarity, :entity_coverage, 
+                    VALUES (:query, :timestamp, :relevance_score, :semantic_similarity, :entity_coverage, 
                             :keyword_coverage, :topic_focus, :off_topic_sentences, :total_sentences,
                             :query_match_percentage, :information_density, :context_alignment_score)
                     """,
-                    {
-                        'query': data.get('query', 'Unknown'),
-                        'relevance_score': data.get('relevance_score', 0.0),
-                        'semantic_similarity': data.get('semantic_similarity', 0.0),
-                        'entity_coverage': data.get('entity_coverage', 0.0),
-                        'keyword_coverage': data.get('keyword_coverage', 0.0),
-                        'topic_focus': data.get('topic_focus', 0.0),
-                        'off_topic_sentences': json.dumps(data.get('off_topic_sentences', [])),
-                        'total_sentences': data.get('total_sentences', 0),
-                        'query_match_percentage': data.get('query_match_percentage', 0.0),
-                        'information_density': data.get('information_density', 0.0),
-                        'context_alignment_score': data.get('context_alignment_score', 0.0)
-                    }
+                    insert_data
                 )
-                self.conn.commit()
+                self._fold_evaluation('answer_relevance', insert_data)
+                self.pool.commit()
                   # Breakpoint after storing answer relevance
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logging.error(f"Error storing answer relevance: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
                 
     def store_accuracy_evaluation(self, accuracy_data: Dict[str, Any]):
           # Breakpoint before storing accuracy evaluation
         logger.info("Storing accuracy evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 insert_data = {
                     'query': accuracy_data.get('query', 'Unknown'),
@@ -415,32 +612,33 @@ class ContentDB:
                     """,
                     insert_data
                 )
+                self._fold_evaluation('factual_accuracy', insert_data)
                 
-                self.conn.commit()
+                self.pool.commit()
                   # Breakpoint after storing accuracy evaluation
                 return cursor.lastrowid
             except Exception as e:
                 logger.error(f"Error storing factual accuracy: {str(e)}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return None
     def get_test_results(self, query: str = None, limit: int = 50):
-        with self.lock:
+        with self.pool.read() as conn:
             try:
                 if query:
-                    cursor = self.conn.execute(
+                    cursor = conn.execute(
                         """
                         SELECT * FROM automated_tests 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
                     )
                 else:
-                    cursor = self.conn.execute(
+                    cursor = conn.execute(
                         """
                         SELECT * FROM automated_tests 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """,
                         (limit,)
@@ -462,8 +660,8 @@ class ContentDB:
         # Breakpoint before retrieving accuracy evaluations
         logger.info(f"Retrieving accuracy evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -474,7 +672,7 @@ class ContentDB:
                         source_credibility_score, fact_check_coverage
                         FROM factual_accuracy 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -487,7 +685,7 @@ class ContentDB:
                         verified_claims, unverified_claims, 
                         source_credibility_score, fact_check_coverage
                         FROM factual_accuracy 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (limit,)
@@ -515,8 +713,8 @@ class ContentDB:
         # Breakpoint before retrieving source coverage evaluations
         logger.info(f"Retrieving source coverage evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -527,7 +725,7 @@ class ContentDB:
                             cross_referencing_score, domain_variety_score
                         FROM source_coverage_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
@@ -540,7 +738,7 @@ class ContentDB:
                             unique_domains, source_depth, 
                             cross_referencing_score, domain_variety_score
                         FROM source_coverage_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (limit,)
@@ -568,8 +766,24 @@ class ContentDB:
     def store_logical_coherence(self, data: Dict[str, Any]) -> int:
         logger.info("Storing logical coherence evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
+                insert_data = {
+                    'query': data.get('query', 'Unknown'),
+                    'timestamp': data.get('timestamp', datetime.now().isoformat()),
+                    'coherence_score': data.get('coherence_score', 0.0),
+                    'flow_score': data.get('flow_score', 0.0),
+                    'has_argument_structure': data.get('has_argument_structure', False),
+                    'has_discourse_markers': data.get('has_discourse_markers', False),
+                    'paragraph_score': data.get('paragraph_score', 0.0),
+                    'rough_transitions': json.dumps(data.get('rough_transitions', [])),
+                    'total_sentences': data.get('total_sentences', 0),
+                    'total_paragraphs': data.get('total_paragraphs', 0),
+                    'semantic_connection_score': data.get('semantic_connection_score', 0.0),
+                    'idea_progression_score': data.get('idea_progression_score', 0.0),
+                    'logical_fallacies_count': data.get('logical_fallacies_count', 0),
+                    'topic_coherence': data.get('topic_coherence', 0.0)
+                }
                 cursor = self.conn.cursor()
                 cursor.execute(
                     """
@@ -583,36 +797,22 @@ class ContentDB:
                             :total_sentences, :total_paragraphs, :semantic_connection_score, 
                             :idea_progression_score, :logical_fallacies_count, :topic_coherence)
                     """,
-                    {
-                        'query': data.get('query', 'Unknown'),
-                        'timestamp': data.get('timestamp', datetime.now().isoformat()),
-                        'coherence_score': data.get('coherence_score', 0.0),
-                        'flow_score': data.get('flow_score', 0.0),
-                        'has_argument_structure': data.get('has_argument_structure', False),
-                        'has_discourse_markers': data.get('has_discourse_markers', False),
-                        'paragraph_score': data.get('paragraph_score', 0.0),
-                        'rough_transitions': json.dumps(data.get('rough_transitions', [])),
-                        'total_sentences': data.get('total_sentences', 0),
-                        'total_paragraphs': data.get('total_paragraphs', 0),
-                        'semantic_connection_score': data.get('semantic_connection_score', 0.0),
-                        'idea_progression_score': data.get('idea_progression_score', 0.0),
-                        'logical_fallacies_count': data.get('logical_fallacies_count', 0),
-                        'topic_coherence': data.get('topic_coherence', 0.0)
-                    }
+                    insert_data
                 )
-                self.conn.commit()
+                self._fold_evaluation('logical_coherence', insert_data)
+                self.pool.commit()
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logger.error(f"Error storing logical coherence: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
 
     # 3. Get Function
     def get_logical_coherence_evaluations(self, query: Optional[str] = None, limit: int = 50):
         logger.info(f"Retrieving logical coherence evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -625,7 +825,7 @@ class ContentDB:
                         logical_fallacies_count, topic_coherence
                         FROM logical_coherence_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
@@ -640,7 +840,7 @@ class ContentDB:
                         semantic_connection_score, idea_progression_score,
                         logical_fallacies_count, topic_coherence
                         FROM logical_coherence_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (limit,)
@@ -669,8 +869,8 @@ class ContentDB:
         # Breakpoint before retrieving answer relevance evaluations
         logger.info(f"Retrieving answer relevance evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -681,7 +881,7 @@ class ContentDB:
                             information_density, context_alignment_score
                         FROM answer_relevance_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -694,7 +894,7 @@ class ContentDB:
                             off_topic_sentences, total_sentences, query_match_percentage, 
                             information_density, context_alignment_score
                         FROM answer_relevance_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """, 
                         (limit,)
@@ -722,7 +922,7 @@ class ContentDB:
         """Store analysis evaluation results in the database."""
         logger.info("Storing analysis evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 insert_data = {
                     'query': evaluation_data.get('query', 'Unknown'),
@@ -750,28 +950,29 @@ class ContentDB:
                         :calculation_examples, :analytical_elements, :validation_checks, :term_coverage
                     )
                 """, insert_data)
+                self._fold_evaluation('analysis', insert_data)
                 
-                self.conn.commit()
+                self.pool.commit()
                 return cursor.lastrowid
                 
             except Exception as e:
                 logger.error(f"Error storing analysis evaluation: {str(e)}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
 
     def get_analysis_evaluations(self, query: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Retrieve analysis evaluation results from the database."""
         logger.info(f"Retrieving analysis evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
                         """
                         SELECT * FROM analysis_evaluations 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -780,7 +981,7 @@ class ContentDB:
                     cursor.execute(
                         """
                         SELECT * FROM analysis_evaluations 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (limit,)
@@ -817,8 +1018,8 @@ class ContentDB:
         """Get summary statistics of analysis metrics over a time period"""
         logger.info(f"Getting analysis metrics summary for last {days} days")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 cursor.execute(
                     """
@@ -830,7 +1031,7 @@ class ContentDB:
                         AVG(overall_score) as avg_overall_score,
                         COUNT(*) as total_analyses
                     FROM analysis_evaluations
-                    WHERE datetime(timestamp) >= datetime('now', ?)
+                    WHERE recorded_at >= datetime('now', ?)
                     """,
                     (f'-{days} days',)
                 )
@@ -848,25 +1049,136 @@ class ContentDB:
                     'avg_overall_score': 0.0,
                     'total_analyses': 0
                 }
-                    
+
+    def change_counter(self) -> tuple:
+        """
+        Changes when the database does: (data_version, total_changes).
+
+        data_version moves when another connection commits; total_changes
+        counts this connection's own committed writes (buffered writes only
+        count once their group commit makes them visible to readers). Cheap
+        enough to poll on every dashboard render as a cache key.
+        """
+        with self.lock:
+            changes = self.pool.committed_changes if self.conn.in_transaction else self.conn.total_changes
+            return self.conn.execute("PRAGMA data_version").fetchone()[0], changes
+
+    def get_evaluation_rollups(self, evaluator: str, start: Optional[str] = None,
+                               end: Optional[str] = None, by_day: bool = True) -> List[Dict[str, Any]]:
+        """
+        Aggregated evaluation metrics, read from the daily rollups.
+
+        Args:
+            evaluator: Key of EVALUATION_ROLLUPS (e.g. 'factual_accuracy')
+            start: Earliest day (ISO date or datetime, inclusive)
+            end: Latest day (ISO date or datetime, exclusive)
+            by_day: One row per day (oldest first) rather than a single row
+
+        Returns:
+            List[Dict[str, Any]]: Rows with day (when by_day), count, and for
+                each rolled-up metric its mean (`<metric>`) and sum
+                (`<metric>_total`). Empty when nothing matched.
+        """
+        _, score_column, metrics = EVALUATION_ROLLUPS[evaluator]
+        where, params = self._rollup_where(evaluator, start, end)
+        day = "day, " if by_day else ""
+
+        with self.pool.read() as conn:
+            try:
+                cursor = conn.execute(
+                    f"SELECT {day}metric, SUM(count), SUM(total) FROM evaluation_rollups{where}"
+                    f" GROUP BY {day}metric",
+                    params
+                )
+                rows: Dict[str, Dict[str, Any]] = {}
+                for values in cursor.fetchall():
+                    key = values[0] if by_day else ''
+                    metric, count, total = values[-3:]
+                    row = rows.setdefault(key, {'day': key} if by_day else {})
+                    row[metric] = total / count if count else None
+                    row[f'{metric}_total'] = total
+                    if metric == score_column:
+                        row['count'] = count
+            except Exception as e:
+                logger.error(f"Error retrieving {evaluator} rollups: {str(e)}")
+                return []
+
+        results = []
+        for key in sorted(rows) if by_day else rows:
+            row = rows[key]
+            row.setdefault('count', 0)
+            for metric in metrics:
+                row.setdefault(metric, None)
+                row.setdefault(f'{metric}_total', 0.0)
+            results.append(row)
+        return results
+
+    def get_score_distribution(self, evaluator: str, start: Optional[str] = None,
+                               end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Histogram of an evaluator's main score, read from the daily rollups.
+
+        Args:
+            evaluator: Key of EVALUATION_ROLLUPS
+            start: Earliest day (ISO date or datetime, inclusive)
+            end: Latest day (ISO date or datetime, exclusive)
+
+        Returns:
+            List[Dict[str, Any]]: One row per non-empty bucket with
+                bucket_start, bucket_end and count
+        """
+        where, params = self._rollup_where(evaluator, start, end)
+        with self.pool.read() as conn:
+            try:
+                cursor = conn.execute(
+                    f"SELECT bucket, SUM(count) FROM evaluation_score_buckets{where}"
+                    " GROUP BY bucket ORDER BY bucket",
+                    params
+                )
+                return [
+                    dict(zip(['bucket_start', 'bucket_end'], score_bucket_bounds(bucket)), count=count)
+                    for bucket, count in cursor.fetchall()
+                ]
+            except Exception as e:
+                logger.error(f"Error retrieving {evaluator} score distribution: {str(e)}")
+                return []
+
+    def _rollup_where(self, evaluator: str, start: Optional[str], end: Optional[str]):
+        clauses, params = ["evaluator = ?"], [evaluator]
+        if start:
+            clauses.append("day >= ?")
+            params.append(start[:10])
+        if end:
+            clauses.append("day < ?")
+            params.append(end[:10])
+        return " WHERE " + " AND ".join(clauses), params
+
     def delete_doc(self, id: str):
     # Breakpoint before document deletion
         logger.info(f"Deleting document with ID: {id}")
         
-        with self.lock:
+        with self.pool.write():
             cursor = self.conn.cursor()
             cursor.execute("DELETE FROM content WHERE id = ?", (id,))
-            self.conn.commit()
+            cursor.execute("DELETE FROM content_bodies WHERE doc_id = ?", (id,))
+            self.pool.commit()
 
     def generate_snippet(self, text: str) -> str:
     # Breakpoint before snippet generation
-        logger.info(f"Generating snippet for text of length {len(text)}")
+        logger.debug(f"Generating snippet for text of length {len(text)}")
 
         return f"{text[:150]}..." 
 
+    def flush(self) -> None:
+        """
+        Commit buffered writes now, making them durable and visible to
+        readers (they are otherwise group-committed within
+        WRITE_BEHIND_MAX_DELAY).
+        """
+        self.pool.flush()
+
     def close(self):
     # Breakpoint before closing connection
         logger.info("Closing database connection")
         
-        with self.lock:
-            self.conn.close()
\ No newline at end of file
+        self.pool.close()
\ No newline at end of file
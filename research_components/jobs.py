@@ -0,0 +1,430 @@
+import os
+import json
+import asyncio
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+# Streamed summary tokens are written to the event log in batches at most this
+# often (seconds), rather than one row per token
+DELTA_FLUSH_INTERVAL = 0.2
+
+# A job interrupted this many times (e.g. because it crashes the worker) is
+# failed on the next restart instead of being requeued again
+MAX_JOB_ATTEMPTS = int(os.getenv("RESEARCH_JOB_MAX_ATTEMPTS", "3"))
+
+
+class JobStore:
+    """
+    SQLite persistence for research jobs and their event log.
+
+    Every progress checkpoint is appended to `job_events` with a per-job
+    sequence number, so a client can (re)subscribe at any point and replay
+    what it missed. Instead of polling the database, threads can block in
+    `wait_for_events` until something new is appended, and asyncio readers
+    can `subscribe` to be woken on their event loop without tying up a
+    thread.
+
+    Args:
+        db_path: Path of the jobs database file
+    """
+
+    def __init__(self, db_path: str):
+        self.lock = threading.Lock()
+        self._changed = threading.Condition(self.lock)
+        # asyncio subscribers by job id; a lock of their own, so the event
+        # loop never waits on a database write
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._subscribers_lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        with self.lock:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    tool_name TEXT,
+                    query TEXT,
+                    prompt_name TEXT,
+                    dataset TEXT,
+                    status TEXT,
+                    stage TEXT,
+                    progress REAL DEFAULT 0,
+                    attempts INTEGER DEFAULT 0,
+                    created_at REAL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT,
+                    seq INTEGER,
+                    event TEXT,
+                    data TEXT,
+                    created_at REAL,
+                    PRIMARY KEY (job_id, seq)
+                );
+            """)
+            self.conn.commit()
+
+    def create_job(self, tool_name: str, query: str, prompt_name: str, dataset: Optional[str] = None) -> str:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, tool_name, query, prompt_name, dataset, status, stage, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, tool_name, query, prompt_name, dataset, QUEUED, "Queued", time.time()),
+            )
+            self._append_event(job_id, "status", {"status": QUEUED})
+            self.conn.commit()
+            self._changed.notify_all()
+        self._notify(job_id)
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def pending_job_ids(self) -> List[str]:
+        """Jobs that still need to run, oldest first. Jobs left 'running' by a
+        previous process were interrupted and are put back in the queue, or
+        failed once they have been started MAX_JOB_ATTEMPTS times."""
+        with self.lock:
+            interrupted = self.conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            for row in interrupted:
+                job_id, attempts = row["id"], row["attempts"] or 0
+                if attempts >= MAX_JOB_ATTEMPTS:
+                    error = f"Interrupted {attempts} times; giving up"
+                    logger.warning(f"Research job {job_id}: {error}")
+                    self.conn.execute(
+                        "UPDATE jobs SET status = ?, stage = ?, finished_at = ?, error = ? WHERE id = ?",
+                        (FAILED, "Failed", time.time(), error, job_id),
+                    )
+                    self._append_event(job_id, "status", {"status": FAILED, "error": error})
+                    continue
+                self.conn.execute(
+                    "UPDATE jobs SET status = ?, stage = ?, progress = 0 WHERE id = ?",
+                    (QUEUED, "Requeued after restart", job_id),
+                )
+                self._append_event(job_id, "status", {"status": QUEUED, "requeued": True})
+            self.conn.commit()
+            pending = [row["id"] for row in self.conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            )]
+        for row in interrupted:
+            self._notify(row["id"])
+        return pending
+
+    def mark_running(self, job_id: str) -> bool:
+        """Claim a queued job. Returns False if it is no longer queued."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, "Started", time.time(), job_id, QUEUED),
+            )
+            if cursor.rowcount == 0:
+                self.conn.commit()
+                return False
+            self._append_event(job_id, "status", {"status": RUNNING})
+            self.conn.commit()
+            self._changed.notify_all()
+        self._notify(job_id)
+        return True
+
+    def finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        status = FAILED if error else SUCCEEDED
+        with self.lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, stage = ?, progress = ?, finished_at = ?, result = ?, error = ? "
+                "WHERE id = ?",
+                (status, "Failed" if error else "Completed", 1.0, time.time(),
+                 json.dumps(result, default=str) if result is not None else None, error, job_id),
+            )
+            self._append_event(job_id, "status", {"status": status, "error": error})
+            self.conn.commit()
+            self._changed.notify_all()
+        self._notify(job_id)
+
+    def add_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        """Append an event and, for progress events, update the job's stage."""
+        with self.lock:
+            if event == "progress":
+                self.conn.execute(
+                    "UPDATE jobs SET stage = COALESCE(?, stage), progress = COALESCE(?, progress) WHERE id = ?",
+                    (data.get("stage"), data.get("progress"), job_id),
+                )
+            seq = self._append_event(job_id, event, data)
+            self.conn.commit()
+            self._changed.notify_all()
+        self._notify(job_id)
+        return seq
+
+    def _append_event(self, job_id: str, event: str, data: Dict[str, Any]) -> int:
+        # Caller holds self.lock
+        row = self.conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        seq = row[0] + 1
+        self.conn.execute(
+            "INSERT INTO job_events (job_id, seq, event, data, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, seq, event, json.dumps(data, default=str), time.time()),
+        )
+        return seq
+
+    def events_after(self, job_id: str, after_seq: int = 0) -> List[Dict[str, Any]]:
+        with self.lock:
+            return self._events_after(job_id, after_seq)
+
+    def _events_after(self, job_id: str, after_seq: int) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT seq, event, data, created_at FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after_seq),
+        ).fetchall()
+        return [
+            {"seq": row["seq"], "event": row["event"], "data": json.loads(row["data"]), "created_at": row["created_at"]}
+            for row in rows
+        ]
+
+    def wait_for_events(self, job_id: str, after_seq: int = 0, timeout: float = 15.0) -> List[Dict[str, Any]]:
+        """Block until the job has events newer than `after_seq` or `timeout` expires."""
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            while True:
+                events = self._events_after(job_id, after_seq)
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                self._changed.wait(remaining)
+
+    def subscribe(self, job_id: str) -> asyncio.Event:
+        """
+        Wake-up for an asyncio reader of a job's events: the returned Event is
+        set on the calling event loop whenever the job gets a new event. Clear
+        it before each `events_after` read so no event is missed, and pass it
+        to `unsubscribe` when done. Must be called from the event loop.
+        """
+        wakeup = asyncio.Event()
+        with self._subscribers_lock:
+            self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), wakeup))
+        return wakeup
+
+    def unsubscribe(self, job_id: str, wakeup: asyncio.Event) -> None:
+        with self._subscribers_lock:
+            subscribers = self._subscribers.get(job_id, [])
+            subscribers[:] = [(loop, event) for loop, event in subscribers if event is not wakeup]
+            if not subscribers:
+                self._subscribers.pop(job_id, None)
+
+    def _notify(self, job_id: str) -> None:
+        # Called from worker threads: asyncio.Event is not thread-safe
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for loop, wakeup in subscribers:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # the subscriber's loop is closed
+                self.unsubscribe(job_id, wakeup)
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+def summarize_result(result, trace) -> Dict[str, Any]:
+    """
+    Compact, JSON-serializable job result: the summary, source metadata
+    without page bodies (those stay in the content database), and the
+    evaluation scores from the trace.
+    """
+    sources = []
+    for item in getattr(result, "content", None) or []:
+        sources.append({
+            "id": getattr(item, "id", None),
+            "title": getattr(item, "title", None),
+            "url": getattr(item, "url", None),
+            "snippet": getattr(item, "snippet", None),
+        })
+
+    data = trace.data if trace is not None else {}
+    scores = {
+        name: data[name].get("score")
+        for name in ("factual_accuracy", "source_coverage", "logical_coherence", "answer_relevance", "automated_tests")
+        if isinstance(data.get(name), dict)
+    }
+    if isinstance(data.get("analysis_metrics"), dict):
+        scores["analysis"] = data["analysis_metrics"].get("overall_score")
+
+    return {
+        "summary": getattr(result, "summary", None) or getattr(result, "analysis", None),
+        "sources": sources,
+        "scores": scores,
+        "duration": data.get("duration"),
+        "content_new": data.get("content_new"),
+        "content_reused": data.get("content_reused"),
+        "prompt_used": data.get("prompt_used"),
+    }
+
+
+class JobQueue:
+    """
+    Bounded pool of worker threads executing research jobs from a JobStore.
+
+    Jobs are claimed in submission order; queued and interrupted jobs found in
+    the store are picked up again when the queue starts, so a restart does not
+    lose work.
+
+    Args:
+        store: JobStore holding jobs and their events
+        workers: Number of jobs executed concurrently
+        runner: Callable with run_tool's signature (defaults to run_tool)
+    """
+
+    def __init__(self, store: JobStore, workers: int = 2, runner: Optional[Callable] = None):
+        self.store = store
+        self.workers = max(1, workers)
+        self.runner = runner
+        self._pending: List[str] = []
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            self._pending.extend(self.store.pending_job_ids())
+            if self._pending:
+                logger.info(f"Resuming {len(self._pending)} queued research jobs")
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"research-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop taking new jobs. Running jobs finish; queued ones stay in the store."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, tool_name: str, query: str, prompt_name: str = "research.txt", dataset: Optional[str] = None) -> str:
+        job_id = self.store.create_job(tool_name, query, prompt_name, dataset)
+        with self._cond:
+            self._pending.append(job_id)
+            self._cond.notify()
+        return job_id
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Zero-based position of a job in the local queue, or None if not queued."""
+        with self._cond:
+            try:
+                return self._pending.index(job_id)
+            except ValueError:
+                return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                job_id = self._pending.pop(0)
+            if self.store.mark_running(job_id):
+                self._run(job_id)
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get_job(job_id)
+        runner = self.runner
+        if runner is None:
+            from .research import run_tool
+            runner = run_tool
+
+        pending_text: List[str] = []
+        last_flush = [0.0]
+
+        def flush() -> None:
+            if pending_text:
+                self.store.add_event(job_id, "summary_delta", {"text": "".join(pending_text)})
+                pending_text.clear()
+            last_flush[0] = time.monotonic()
+
+        def progress(event: str, data: Dict[str, Any]) -> None:
+            if event == "summary_delta":
+                pending_text.append(data.get("text", ""))
+                if time.monotonic() - last_flush[0] >= DELTA_FLUSH_INTERVAL:
+                    flush()
+                return
+            flush()
+            self.store.add_event(job_id, event, data)
+
+        logger.info(f"Running research job {job_id}: {job['query']}")
+        try:
+            result, trace = runner(
+                tool_name=job["tool_name"],
+                query=job["query"],
+                dataset=job["dataset"],
+                prompt_name=job["prompt_name"],
+                progress_callback=progress,
+                background_evaluation=False
+            )
+            flush()
+            if result:
+                self.store.finish(job_id, result=summarize_result(result, trace))
+            else:
+                error = (trace.data.get("error") if trace is not None else None) or "Research failed"
+                self.store.finish(job_id, error=error)
+        except Exception as e:
+            logger.error(f"Research job {job_id} failed: {str(e)}", exc_info=True)
+            self.store.finish(job_id, error=str(e))
+
+
+_default_queue: Optional[JobQueue] = None
+_default_queue_lock = threading.Lock()
+
+
+def get_default_job_queue() -> JobQueue:
+    """
+    Return the process-wide job queue, started on first use. The database
+    path and worker count come from RESEARCH_JOBS_DB and RESEARCH_JOB_WORKERS;
+    RESEARCH_JOB_MAX_ATTEMPTS bounds how often an interrupted job is retried.
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            store = JobStore(os.getenv('RESEARCH_JOBS_DB', './data/jobs.db'))
+            _default_queue = JobQueue(store, workers=int(os.getenv('RESEARCH_JOB_WORKERS', '2')))
+        _default_queue.start()
+        return _default_queue
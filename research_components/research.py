@@ -1,17 +1,21 @@
 import logging
+import asyncio
+import functools
+import os
+import threading
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 from datetime import datetime
 from tools import GeneralAgent, AnalysisAgent
 from research_agent.tracers import CustomTracer, QueryTrace
-from utils.source_coverage import create_source_coverage_evaluator
-from utils.evaluation import create_factual_accuracy_evaluator
-from utils.answer_relevance import create_answer_relevance_evaluator
-from utils.logical_coherence import create_logical_coherence_evaluator
-from utils.automated_tests import create_automated_test_evaluator
-from utils.analysis_evaluator import create_analysis_evaluator
+from utils.evaluation_orchestrator import EvaluationOutcome, get_default_orchestrator
+from utils.nlp_preprocessing import preprocess_research_output
 from .db import ContentDB
+from utils.fetch_cache import FetchCache
+from utils.token_tracking import reset_token_tracker, set_token_tracker
+from utils.async_logging import configure_logging
 import json
-from typing import Optional, Dict, Any, Union, List
+from typing import Optional, Dict, Any, Union, List, Callable
+from concurrent.futures import ThreadPoolExecutor
 from tools.research.common.model_schemas import ContentItem
 
 def convert_content_items(value: Any) -> Any:
@@ -38,34 +42,50 @@ def safe_store(store_func, data: Dict[str, Any], logger: logging.Logger) -> Opti
         logger.error(f"Error in {store_func.__name__}: {str(e)}", exc_info=True)
         return None
 
-def run_tool(
-    tool_name: str, 
-    query: str, 
-    dataset: str = None, 
-    analysis_type: str = None, 
-    tool=None,
-    prompt_name: str = "research.txt"
-):
-    """
-    Execute a research or analysis tool with comprehensive tracing and evaluation.
-    Now includes detailed result printing.
-    """
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s [%(levelname)s] %(message)s - %(filename)s:%(lineno)d',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('research_tool.log', mode='a')
-        ]
-    )
-    logger = logging.getLogger(__name__)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+# With EVALUATION_MODE=background, run_tool returns as soon as the tool has
+# produced its result; evaluations, their storage and the trace are completed
+# afterwards on this executor.
+EVALUATION_MODE = os.getenv('EVALUATION_MODE', 'inline')
+_background_evaluations = ThreadPoolExecutor(
+    max_workers=int(os.getenv('EVAL_BACKGROUND_RUNS', '2')),
+    thread_name_prefix="background-evaluation"
+)
+
+# Runs share one ContentDB: its single writer group-commits the writes of
+# concurrent runs together, where per-run connections would contend for the
+# database's write lock. It stays open for the life of the process.
+RUN_DB_PATH = "./data/content.db"
+_run_db: Optional[ContentDB] = None
+_run_db_lock = threading.Lock()
+
+def _get_run_db() -> ContentDB:
+    global _run_db
+    with _run_db_lock:
+        if _run_db is None:
+            _run_db = ContentDB(RUN_DB_PATH)
+        return _run_db
+
+def _emit(progress_callback: Optional[ProgressCallback], event: str, **data) -> None:
+    """Report a checkpoint to the caller; a failing callback never fails the run."""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(event, data)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Progress callback failed for {event}: {str(e)}")
+
+def _configure_run_logging() -> logging.Logger:
+    configure_logging()
+    return logging.getLogger(__name__)
+
+def _start_trace(tool_name: str, query: str, prompt_name: str, logger: logging.Logger) -> QueryTrace:
     print(f"\n{'='*50}\nStarting Tool Execution\n{'='*50}")
     print(f"Tool: {tool_name}")
     print(f"Query: {query}")
     print(f"Prompt: {prompt_name}\n")
     
-    start_time = datetime.now()
-    db = ContentDB("./data/content.db")    
     logger.info(f"Starting tool execution - Tool: {tool_name}")
     logger.info(f"Query received: {query}")
     logger.info(f"Prompt selected: {prompt_name}")
@@ -79,370 +99,585 @@ def run_tool(
         "content_reused": 0,
         "prompt_used": prompt_name
     })
+    return trace
+
+def _init_evaluators(tool_name: str, logger: logging.Logger) -> List[str]:
+    """Names of the evaluators to run for a tool type (see utils.evaluation_orchestrator)."""
+    if tool_name == "General Agent":
+        evaluators = list(RESEARCH_EVALUATORS)
+        print(f"Evaluators for General Agent: {', '.join(evaluators)}")
+    else:
+        evaluators = ["analysis"]
+        print("Evaluator for Analysis Agent: analysis")
+    logger.info(f"Evaluators selected for {tool_name}: {evaluators}")
+    return evaluators
+
+def _prepare_general_agent(
+    tool,
+    prompt_name: str,
+    db: ContentDB,
+    trace: QueryTrace,
+    progress_callback: Optional[ProgressCallback] = None
+):
+    if tool is None:
+        tool = GeneralAgent(
+            include_summary=True, 
+            prompt_name=prompt_name
+        )
+    if hasattr(tool, "content_cache") and tool.content_cache is None:
+        tool.content_cache = FetchCache(db)
+    if progress_callback is not None and hasattr(tool, "summary_callback") and tool.summary_callback is None:
+        tool.summary_callback = lambda token: _emit(progress_callback, "summary_delta", text=token)
+    
+    trace.add_prompt_usage("general_agent_search", "general", prompt_name)
+    return tool
+
+def _prepare_analysis_agent(tool, prompt_name: str, trace: QueryTrace):
+    if tool is None:
+        tool = AnalysisAgent(
+            data_folder="./data",
+            prompt_name=prompt_name
+        )
+    
+    trace.add_prompt_usage("analysis_agent", "analysis", "")
+    return tool
+
+def _content_for_tests(result, logger: logging.Logger) -> str:
+    """Flatten the research content into the reference text for automated tests."""
+    # Handle ContentItem objects in the content list
+    if isinstance(result.content, list):
+        logger.debug("Processing list of content items")
+        content_texts = []
+        for idx, item in enumerate(result.content):
+            try:
+                if isinstance(item, ContentItem):
+                    content_texts.append(item.get_text_content())
+                    logger.debug(f"Processed ContentItem {idx + 1}")
+                else:
+                    content_texts.append(str(item))
+                    logger.debug(f"Processed non-ContentItem {idx + 1}")
+            except Exception as e:
+                logger.error(f"Error processing content item {idx + 1}: {str(e)}")
+                print(f"Error processing content item {idx + 1}: {str(e)}")
+                raise
+
+        print(f"Processed {len(content_texts)} content items for testing")
+        return ' '.join(content_texts)
+
+    print("Processed single content item for testing")
+    return str(result.content)
+
+def _record_factual_accuracy(factual_score, accuracy_details, query: str, trace: QueryTrace, db: ContentDB, logger: logging.Logger) -> None:
+    accuracy_details = convert_content_items(accuracy_details)
+    print("\n=== Factual Accuracy Results ===")
+    print(f"Score: {factual_score:.2f}")
+    print(f"Details: {json.dumps(accuracy_details, indent=2)}")
+
+    trace.data['factual_accuracy'] = {
+        'score': factual_score,
+        'details': accuracy_details
+    }
+    safe_store(db.store_accuracy_evaluation, {
+        'query': query,
+        'timestamp': datetime.now().isoformat(),
+        'factual_score': factual_score,
+        **accuracy_details
+    }, logger)
+
+def _record_source_coverage(coverage_score, coverage_details, query: str, trace: QueryTrace, db: ContentDB, logger: logging.Logger) -> None:
+    coverage_details = convert_content_items(coverage_details)
+    print("\n=== Source Coverage Results ===")
+    print(f"Score: {coverage_score:.2f}")
+    print(f"Details: {json.dumps(coverage_details, indent=2)}")
+
+    trace.data['source_coverage'] = {
+        'score': coverage_score,
+        'details': coverage_details
+    }
+    safe_store(db.store_source_coverage, {
+        'query': query,
+        'coverage_score': coverage_score,
+        **coverage_details
+    }, logger)
+
+def _record_logical_coherence(coherence_score, coherence_details, query: str, trace: QueryTrace, db: ContentDB, logger: logging.Logger) -> None:
+    coherence_details = convert_content_items(coherence_details)
+    print("\n=== Logical Coherence Results ===")
+    print(f"Score: {coherence_score:.2f}")
+    print(f"Details: {json.dumps(coherence_details, indent=2)}")
+
+    trace.data['logical_coherence'] = {
+        'score': coherence_score,
+        'details': coherence_details
+    }
+    safe_store(db.store_logical_coherence, {
+        'query': query,
+        'coherence_score': coherence_score,
+        **coherence_details
+    }, logger)
+
+def _record_answer_relevance(relevance_score, relevance_details, query: str, trace: QueryTrace, db: ContentDB, logger: logging.Logger) -> None:
+    relevance_details = convert_content_items(relevance_details)
+    print("\n=== Answer Relevance Results ===")
+    print(f"Score: {relevance_score:.2f}")
+    print("Details:")
+    print(f"- Semantic Similarity: {relevance_details.get('semantic_similarity', 0):.2f}")
+    print(f"- Entity Coverage: {relevance_details.get('entity_coverage', 0):.2f}")
+    print(f"- Keyword Coverage: {relevance_details.get('keyword_coverage', 0):.2f}")
+    print(f"- Topic Focus: {relevance_details.get('topic_focus', 0):.2f}")
+    print(f"- Information Density: {relevance_details.get('information_density', 0):.2f}")
+    print(f"- Context Alignment: {relevance_details.get('context_alignment_score', 0):.2f}")
+
+    trace.data['answer_relevance'] = {
+        'score': relevance_score,
+        'details': relevance_details
+    }
+
+    safe_store(db.store_answer_relevance, {
+        'query': query,
+        'relevance_score': relevance_score,
+        'semantic_similarity': float(relevance_details.get('semantic_similarity', 0)),
+        'entity_coverage': float(relevance_details.get('entity_coverage', 0)),
+        'keyword_coverage': float(relevance_details.get('keyword_coverage', 0)),
+        'topic_focus': float(relevance_details.get('topic_focus', 0)),
+        'off_topic_sentences': relevance_details.get('off_topic_sentences', []),
+        'total_sentences': int(relevance_details.get('total_sentences', 0)),
+        'query_match_percentage': float(relevance_details.get('query_match_percentage', 0)),
+        'information_density': float(relevance_details.get('information_density', 0)),
+        'context_alignment_score': float(relevance_details.get('context_alignment_score', 0))
+    }, logger)
+
+def _record_automated_tests(test_score, test_details, query: str, trace: QueryTrace, db: ContentDB, logger: logging.Logger) -> None:
+    print(f"\n=== Automated Test Results ===")
+    print(f"Score: {test_score:.2f}")
+    print(f"Details: {json.dumps(test_details, indent=2)}")
 
+    # Process test details
+    test_details = convert_content_items(test_details)
+
+    # Store test results in trace
+    trace.data['automated_tests'] = {
+        'score': test_score,
+        'details': test_details
+    }
+
+    # Store directly in database
+    try:
+        db.store_test_results(
+            query=query,
+            overall_score=test_score,
+            details=test_details
+        )
+        print("Successfully stored test results in database")
+
+    except Exception as db_error:
+        logger.error(f"Database storage error: {str(db_error)}")
+        print(f"Error storing results: {str(db_error)}")
+
+RESEARCH_EVALUATORS = {
+    "factual_accuracy": _record_factual_accuracy,
+    "source_coverage": _record_source_coverage,
+    "logical_coherence": _record_logical_coherence,
+    "answer_relevance": _record_answer_relevance,
+    "automated_tests": _record_automated_tests,
+}
+
+def _evaluate_research(
+    result,
+    query: str,
+    trace: QueryTrace,
+    db: ContentDB,
+    evaluators: List[str],
+    fetch_cache,
+    logger: logging.Logger,
+    progress_callback: Optional[ProgressCallback] = None
+) -> None:
+    """Record content reuse and run all evaluations for General Agent results."""
+    try:
+        content_count = len(result.content) if result.content else 0
+        print(f"\nProcessing {content_count} content items")
+        trace.data["processing_steps"].append(f"Preparing to process {content_count} content items")
+        content_reused = sum(
+            1 for item in (result.content or [])
+            if isinstance(item, ContentItem) and item.metadata.get("cache") in ("hit", "revalidated", "stale")
+        )
+        content_new = content_count - content_reused
+        trace.data.update({
+            "content_new": content_new,
+            "content_reused": content_reused,
+            "fetch_cache": fetch_cache.snapshot() if fetch_cache is not None else {},
+            "processing_steps": [f"Content processed - New: {content_new}, Reused: {content_reused}"]
+        })
+    except Exception as content_processing_error:
+        logger.error(f"Content processing failed: {content_processing_error}")
+        print(f"Error processing content: {content_processing_error}")
+        trace.data["processing_steps"].append(f"Content processing error: {content_processing_error}")
+
+    # Run all evaluations for General Agent concurrently; results are recorded
+    # in completion order by the calling thread
     try:
-        # Initialize evaluators based on tool type
-        try:
-            if tool_name == "General Agent":
-                accuracy_evaluator = create_factual_accuracy_evaluator()
-                source_coverage_evaluator = create_source_coverage_evaluator()
-                coherence_evaluator = create_logical_coherence_evaluator()
-                relevance_evaluator = create_answer_relevance_evaluator()
-                automated_test_evaluator = create_automated_test_evaluator()
-                analysis_evaluator = None
-                print("Successfully initialized all evaluators for General Agent")
+        print("\nRunning evaluations...")
+        _emit(progress_callback, "progress", stage="Running evaluations", progress=0.7)
+
+        # Sentence splitting, tokens and TF-IDF matrices are computed once
+        # here and shipped to every evaluator that reads them
+        document = None
+        if any(name != "automated_tests" for name in evaluators):
+            document = preprocess_research_output(result)
+
+        calls = {}
+        for name in evaluators:
+            if name == "answer_relevance":
+                calls[name] = (result, query, document)
+            elif name == "automated_tests":
+                logger.info("Starting automated test evaluation")
+                calls[name] = (_content_for_tests(result, logger), query)
             else:
-                analysis_evaluator = create_analysis_evaluator()
-                accuracy_evaluator = source_coverage_evaluator = coherence_evaluator = None
-                relevance_evaluator = None
-                automated_test_evaluator = None
-                print("Successfully initialized Analysis Evaluator")
-                
-        except Exception as eval_init_error:
-            logger.error(f"Evaluation tools initialization failed: {eval_init_error}")
-            print(f"Error initializing evaluators: {eval_init_error}")
-            accuracy_evaluator = source_coverage_evaluator = coherence_evaluator = relevance_evaluator = automated_test_evaluator = analysis_evaluator = None
+                calls[name] = (result, document)
+        if "automated_tests" not in calls:
+            logger.debug("Skipping automated test evaluation - no evaluator configured")
+            print("\nSkipping automated tests - no evaluator configured")
+
+        timings = trace.data.setdefault("evaluation_timings", {})
+
+        def record(outcome: EvaluationOutcome) -> None:
+            timings[outcome.name] = round(outcome.elapsed, 3)
+            if not outcome.ok:
+                print(f"\nError in {outcome.name} evaluation: {outcome.error}")
+                trace.data.setdefault("evaluation_errors", {})[outcome.name] = outcome.error
+                trace.data['evaluation_error'] = outcome.error
+                return
+            score, details = outcome.result
+            RESEARCH_EVALUATORS[outcome.name](score, details, query, trace, db, logger)
+            _emit(progress_callback, "evaluation", name=outcome.name, score=score)
+
+        get_default_orchestrator().run(calls, on_result=record)
+
+    except Exception as eval_error:
+        logger.error(f"Research evaluation failed: {eval_error}", exc_info=True)
+        print(f"\nError in evaluation process: {eval_error}")
+        trace.data['evaluation_error'] = str(eval_error)
+
+def _evaluate_analysis(
+    result,
+    query: str,
+    trace: QueryTrace,
+    db: ContentDB,
+    evaluators: List[str],
+    logger: logging.Logger,
+    progress_callback: Optional[ProgressCallback] = None
+) -> None:
+    """Run the analysis evaluator and store its metrics."""
+    try:
+        evaluation_data = {
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'analysis': convert_content_items(result.analysis),
+        }
+
+        if "analysis" in evaluators:
+            outcome = get_default_orchestrator().run({"analysis": (result, query)})["analysis"]
+            trace.data.setdefault("evaluation_timings", {})["analysis"] = round(outcome.elapsed, 3)
+            if not outcome.ok:
+                raise RuntimeError(outcome.error)
+            analysis_metrics = convert_content_items(outcome.result)
+            print("\n=== Analysis Results ===")
+            print("Analysis Metrics:")
+            print(f"- Numerical Accuracy: {analysis_metrics.get('numerical_accuracy', {}).get('score', 0.0):.2f}")
+            print(f"- Query Understanding: {analysis_metrics.get('query_understanding', {}).get('score', 0.0):.2f}")
+            print(f"- Data Validation: {analysis_metrics.get('data_validation', {}).get('score', 0.0):.2f}")
+            print(f"- Reasoning Transparency: {analysis_metrics.get('reasoning_transparency', {}).get('score', 0.0):.2f}")
+            print(f"- Overall Score: {analysis_metrics.get('overall_score', 0.0):.2f}")
+
+            trace.data['analysis_metrics'] = analysis_metrics
+            _emit(progress_callback, "evaluation", name="analysis", score=analysis_metrics.get('overall_score', 0.0))
+
+            evaluation_data.update({
+                'numerical_accuracy': float(analysis_metrics.get('numerical_accuracy', {}).get('score', 0.0)),
+                'query_understanding': float(analysis_metrics.get('query_understanding', {}).get('score', 0.0)),
+                'data_validation': float(analysis_metrics.get('data_validation', {}).get('score', 0.0)),
+                'reasoning_transparency': float(analysis_metrics.get('reasoning_transparency', {}).get('score', 0.0)),
+                'overall_score': float(analysis_metrics.get('overall_score', 0.0)),
+                'metrics_details': analysis_metrics,
+                'calculation_examples': analysis_metrics.get('numerical_accuracy', {}).get('details', {}).get('calculation_examples', []),
+                'term_coverage': float(analysis_metrics.get('query_understanding', {}).get('details', {}).get('term_coverage', 0.0)),
+                'analytical_elements': analysis_metrics.get('query_understanding', {}).get('details', {}),
+                'validation_checks': analysis_metrics.get('data_validation', {}).get('details', {}),
+                'explanation_patterns': analysis_metrics.get('reasoning_transparency', {}).get('details', {})
+            })
+
+            print("\nDetailed Metrics:")
+            print(f"- Term Coverage: {evaluation_data['term_coverage']:.2f}")
+            print("- Calculation Examples:", len(evaluation_data['calculation_examples']))
+            print("- Validation Checks:", json.dumps(evaluation_data['validation_checks'], indent=2))
+
+        safe_store(db.store_analysis_evaluation, evaluation_data, logger)
+        print("\nAnalysis results stored in database")
+
+        trace.data.update({
+            "processing_steps": ["Analysis completed successfully"],
+            "analysis_metrics": evaluation_data
+        })
+
+    except Exception as eval_error:
+        logger.error(f"Analysis evaluation failed: {eval_error}", exc_info=True)
+        print(f"\nError in analysis evaluation: {eval_error}")
+        trace.data['evaluation_error'] = str(eval_error)
+
+def _unknown_tool(tool_name: str, trace: QueryTrace, logger: logging.Logger):
+    error_msg = f"Tool {tool_name} not found"
+    logger.error(error_msg)
+    print(f"\nError: {error_msg}")
+    trace.data.update({
+        "processing_steps": [f"Error: {error_msg}"],
+        "error": error_msg,
+        "success": False
+    })
+    return None, trace
+
+def _evaluate_in_background(background_evaluation: Optional[bool]) -> bool:
+    if background_evaluation is None:
+        return EVALUATION_MODE == "background"
+    return background_evaluation
+
+def _persist_run(trace: QueryTrace, logger: logging.Logger) -> None:
+    try:
+        tracer = CustomTracer()
+        tracer.save_trace(trace)
+        print("\nTrace saved successfully")
+    except Exception as trace_save_error:
+        logger.error(f"Failed to save trace: {trace_save_error}")
+        print(f"\nError saving trace: {trace_save_error}")
+
+def _complete_deferred_evaluation(evaluate: Callable[[], None], trace: QueryTrace, logger: logging.Logger) -> None:
+    try:
+        evaluate()
+        trace.data["evaluation_status"] = "completed"
+    except Exception as e:
+        logger.error(f"Background evaluation failed: {str(e)}", exc_info=True)
+        trace.data["evaluation_status"] = "failed"
+        trace.data['evaluation_error'] = str(e)
+    finally:
+        _persist_run(trace, logger)
+
+def _finish_run(
+    tool_name: str,
+    result,
+    trace: QueryTrace,
+    start_time: datetime,
+    logger: logging.Logger,
+    deferred_evaluation: Optional[Callable[[], None]] = None
+):
+    end_time = datetime.now()
+    duration = (end_time - start_time).total_seconds()
+
+    print(f"\n{'='*50}")
+    print("Execution Complete")
+    print(f"{'='*50}")
+    print(f"Duration: {duration:.2f} seconds")
+
+    trace.data.update({
+        "duration": duration,
+        "success": True if result else False,
+        "end_time": end_time.isoformat()
+    })
+
+    try:
+        token_stats = trace.token_tracker.get_usage_stats()
+        print("\n=== Token Usage Stats ===")
+        print(f"Total Tokens: {token_stats['tokens']['total']}")
+        for model, count in token_stats['models'].items():
+            print(f"- {model}: {count} tokens")
+
+        if token_stats['tokens']['total'] > 0:
+            usage_msg = f"Total tokens used: {token_stats['tokens']['total']}"
+            logger.info(usage_msg)
+            trace.data["processing_steps"].append(usage_msg)
+    except Exception as token_error:
+        logger.warning(f"Could not retrieve token stats: {token_error}")
+        print(f"\nWarning: Could not retrieve token stats: {token_error}")
+
+    logger.info(f"{tool_name} completed successfully")
+    print(f"\n{tool_name} completed successfully")
+    trace.data["processing_steps"].append(f"{tool_name} completed successfully")
+
+    if deferred_evaluation is not None:
+        # The trace is saved once the evaluations are stored
+        trace.data["evaluation_status"] = "pending"
+        _background_evaluations.submit(_complete_deferred_evaluation, deferred_evaluation, trace, logger)
+        print("\nEvaluations continue in the background")
+        return result, trace
+
+    _persist_run(trace, logger)
+    return result, trace
+
+def _fail_run(tool_name: str, e: Exception, trace: QueryTrace, start_time: datetime, logger: logging.Logger):
+    error_msg = str(e)
+    logger.error(f"Error running {tool_name}: {error_msg}", exc_info=True)
+    print(f"\nError running {tool_name}: {error_msg}")
+
+    end_time = datetime.now()
+    duration = (end_time - start_time).total_seconds()
+
+    trace.data.update({
+        "end_time": end_time.isoformat(),
+        "duration": duration,
+        "error": error_msg,
+        "success": False,
+        "processing_steps": [f"Execution failed: {error_msg}"]
+    })
+
+    try:
+        tracer = CustomTracer()
+        tracer.save_trace(trace)
+        print("\nError trace saved")
+    except Exception as trace_save_error:
+        logger.error(f"Failed to save error trace: {trace_save_error}")
+        print(f"\nError saving trace: {trace_save_error}")
+
+    return None, trace
+
+def run_tool(
+    tool_name: str, 
+    query: str, 
+    dataset: str = None, 
+    analysis_type: str = None, 
+    tool=None,
+    prompt_name: str = "research.txt",
+    progress_callback: Optional[ProgressCallback] = None,
+    background_evaluation: Optional[bool] = None
+):
+    """
+    Execute a research or analysis tool with comprehensive tracing and evaluation.
+    Now includes detailed result printing.
+
+    `progress_callback(event, data)`, when given, is called at each checkpoint:
+    "progress" (stage, progress in 0..1), "summary_delta" (text) for each
+    streamed summary token, "summary" once the tool has produced its result,
+    and "evaluation" (name, score) as each evaluator finishes.
+
+    Evaluators run concurrently (see utils.evaluation_orchestrator). With
+    `background_evaluation` (default: EVALUATION_MODE=background) the result
+    is returned as soon as the tool finishes and the evaluations are stored,
+    and the trace saved, afterwards; trace.data["evaluation_status"] tracks them.
+    """
+    logger = _configure_run_logging()
+    start_time = datetime.now()
+    db = _get_run_db()
+    trace = _start_trace(tool_name, query, prompt_name, logger)
+    # Bill every LLM call made on behalf of this run to its trace
+    usage_token = set_token_tracker(trace.token_tracker)
+
+    try:
+        evaluators = _init_evaluators(tool_name, logger)
 
         if tool_name == "General Agent":
-            if tool is None:
-                tool = GeneralAgent(
-                    include_summary=True, 
-                    prompt_name=prompt_name
-                )
-            
-            trace.add_prompt_usage("general_agent_search", "general", prompt_name)
+            tool = _prepare_general_agent(tool, prompt_name, db, trace, progress_callback)
             print("\nExecuting General Agent query...")
+            _emit(progress_callback, "progress", stage="Researching", progress=0.1)
             result = tool.invoke(input={"query": query})
             
             if result:
-                try:
-                    content_count = len(result.content) if result.content else 0
-                    print(f"\nProcessing {content_count} content items")
-                    trace.data["processing_steps"].append(f"Preparing to process {content_count} content items")
-                    trace.data.update({
-                        "content_new": content_count,
-                        "content_reused": 0,
-                        "processing_steps": [f"Content processed - New: {content_count}, Reused: 0"]
-                    })
-                except Exception as content_processing_error:
-                    logger.error(f"Content processing failed: {content_processing_error}")
-                    print(f"Error processing content: {content_processing_error}")
-                    trace.data["processing_steps"].append(f"Content processing error: {content_processing_error}")
-            
-                # Run all evaluations for General Agent
-                try:
-                    print("\nRunning evaluations...")
-                    
-                    if accuracy_evaluator:
-                        factual_score, accuracy_details = accuracy_evaluator.evaluate_factual_accuracy(result)
-                        accuracy_details = convert_content_items(accuracy_details)
-                        print("\n=== Factual Accuracy Results ===")
-                        print(f"Score: {factual_score:.2f}")
-                        print(f"Details: {json.dumps(accuracy_details, indent=2)}")
-                        
-                        trace.data['factual_accuracy'] = {
-                            'score': factual_score,
-                            'details': accuracy_details
-                        }
-                        trace.token_tracker.add_usage(100, 50, "llama3-70b-8192", "factual_accuracy")
-                        safe_store(db.store_accuracy_evaluation, {
-                            'query': query,
-                            'timestamp': datetime.now().isoformat(),
-                            'factual_score': factual_score,
-                            **accuracy_details
-                        }, logger)
-
-                    if source_coverage_evaluator:
-                        coverage_score, coverage_details = source_coverage_evaluator.evaluate_source_coverage(result)
-                        coverage_details = convert_content_items(coverage_details)
-                        print("\n=== Source Coverage Results ===")
-                        print(f"Score: {coverage_score:.2f}")
-                        print(f"Details: {json.dumps(coverage_details, indent=2)}")
-                        
-                        trace.data['source_coverage'] = {
-                            'score': coverage_score,
-                            'details': coverage_details
-                        }
-                        trace.token_tracker.add_usage(100, 50, "llama3-70b-8192", "source_coverage")
-                        safe_store(db.store_source_coverage, {
-                            'query': query,
-                            'coverage_score': coverage_score,
-                            **coverage_details
-                        }, logger)
-
-                    if coherence_evaluator:
-                        coherence_score, coherence_details = coherence_evaluator.evaluate_logical_coherence(result)
-                        coherence_details = convert_content_items(coherence_details)
-                        print("\n=== Logical Coherence Results ===")
-                        print(f"Score: {coherence_score:.2f}")
-                        print(f"Details: {json.dumps(coherence_details, indent=2)}")
-                        
-                        trace.data['logical_coherence'] = {
-                            'score': coherence_score,
-                            'details': coherence_details
-                        }
-                        trace.token_tracker.add_usage(100, 50, "llama3-70b-8192", "logical_coherence")
-                        safe_store(db.store_logical_coherence, {
-                            'query': query,
-                            'coherence_score': coherence_score,
-                            **coherence_details
-                        }, logger)
-
-                    if relevance_evaluator:
-                        relevance_score, relevance_details = relevance_evaluator.evaluate_answer_relevance(result, query)
-                        relevance_details = convert_content_items(relevance_details)
-                        print("\n=== Answer Relevance Results ===")
-                        print(f"Score: {relevance_score:.2f}")
-                        print("Details:")
-                        print(f"- Semantic Similarity: {relevance_details.get('semantic_similarity', 0):.2f}")
-                        print(f"- Entity Coverage: {relevance_details.get('entity_coverage', 0):.2f}")
-                        print(f"- Keyword Coverage: {relevance_details.get('keyword_coverage', 0):.2f}")
-                        print(f"- Topic Focus: {relevance_details.get('topic_focus', 0):.2f}")
-                        print(f"- Information Density: {relevance_details.get('information_density', 0):.2f}")
-                        print(f"- Context Alignment: {relevance_details.get('context_alignment_score', 0):.2f}")
-                        
-                        trace.data['answer_relevance'] = {
-                            'score': relevance_score,
-                            'details': relevance_details
-                        }
-                        trace.token_tracker.add_usage(100, 50, "llama3-70b-8192", "answer_relevance")
-                        
-                        safe_store(db.store_answer_relevance, {
-                            'query': query,
-                            'relevance_score': relevance_score,
-                            'semantic_similarity': float(relevance_details.get('semantic_similarity', 0)),
-                            'entity_coverage': float(relevance_details.get('entity_coverage', 0)),
-                            'keyword_coverage': float(relevance_details.get('keyword_coverage', 0)),
-                            'topic_focus': float(relevance_details.get('topic_focus', 0)),
-                            'off_topic_sentences': relevance_details.get('off_topic_sentences', []),
-                            'total_sentences': int(relevance_details.get('total_sentences', 0)),
-                            'query_match_percentage': float(relevance_details.get('query_match_percentage', 0)),
-                            'information_density': float(relevance_details.get('information_density', 0)),
-                            'context_alignment_score': float(relevance_details.get('context_alignment_score', 0))
-                        }, logger)
-
-                    if automated_test_evaluator:
-                        try:
-                            logger.info("Starting automated test evaluation")
-                            print("\nRunning automated tests...")
-                            
-                            # Handle ContentItem objects in the content list
-                            if isinstance(result.content, list):
-                                logger.debug("Processing list of content items")
-                                content_texts = []
-                                for idx, item in enumerate(result.content):
-                                    try:
-                                        if isinstance(item, ContentItem):
-                                            content_texts.append(item.get_text_content())
-                                            logger.debug(f"Processed ContentItem {idx + 1}")
-                                        else:
-                                            content_texts.append(str(item))
-                                            logger.debug(f"Processed non-ContentItem {idx + 1}")
-                                    except Exception as e:
-                                        logger.error(f"Error processing content item {idx + 1}: {str(e)}")
-                                        print(f"Error processing content item {idx + 1}: {str(e)}")
-                                        raise
-                                
-                                content_for_test = ' '.join(content_texts)
-                                print(f"Processed {len(content_texts)} content items for testing")
-                            else:
-                                content_for_test = str(result.content)
-                                print("Processed single content item for testing")
-
-                            # Run automated tests
-                            test_score, test_details = automated_test_evaluator.evaluate_automated_tests(
-                                content_for_test, 
-                                query
-                            )
-                            print(f"\n=== Automated Test Results ===")
-                            print(f"Score: {test_score:.2f}")
-                            print(f"Details: {json.dumps(test_details, indent=2)}")
-                            
-                            # Process test details
-                            test_details = convert_content_items(test_details)
-                            
-                            # Store test results in trace
-                            trace.data['automated_tests'] = {
-                                'score': test_score,
-                                'details': test_details
-                            }
-                            
-                            # Track token usage
-                            trace.token_tracker.add_usage(100, 50, "llama3-70b-8192", "automated_tests")
-                            
-                            # Store directly in database
-                            try:
-                                db.store_test_results(
-                                    query=query,
-                                    overall_score=test_score,
-                                    details=test_details
-                                )
-                                print("Successfully stored test results in database")
-                                
-                            except Exception as db_error:
-                                logger.error(f"Database storage error: {str(db_error)}")
-                                print(f"Error storing results: {str(db_error)}")
-                                
-                        except Exception as e:
-                            logger.error(f"Error during automated test evaluation: {str(e)}", exc_info=True)
-                            print(f"Error in automated tests: {str(e)}")
-                            raise
-                    else:
-                        logger.debug("Skipping automated test evaluation - no evaluator configured")
-                        print("\nSkipping automated tests - no evaluator configured")
-
-                except Exception as eval_error:
-                    logger.error(f"Research evaluation failed: {eval_error}", exc_info=True)
-                    print(f"\nError in evaluation process: {eval_error}")
-                    trace.data['evaluation_error'] = str(eval_error)
+                _emit(progress_callback, "summary", summary=result.summary, sources=len(result.content or []))
+                evaluate = functools.partial(
+                    _evaluate_research, result, query, trace, db, evaluators,
+                    getattr(tool, "content_cache", None), logger, progress_callback
+                )
 
         elif tool_name == "Analysis Agent":
-            if tool is None:
-                tool = AnalysisAgent(
-                    data_folder="./data",
-                    prompt_name=prompt_name
-                )
-            
-            trace.add_prompt_usage("analysis_agent", "analysis", "")
+            tool = _prepare_analysis_agent(tool, prompt_name, trace)
             print("\nExecuting Analysis Agent...")
+            _emit(progress_callback, "progress", stage="Analyzing", progress=0.1)
             result = tool.invoke_analysis(input={
                 "query": query,
                 "dataset": dataset
             })
             
             if result:
-                try:
-                    evaluation_data = {
-                        'query': query,
-                        'timestamp': datetime.now().isoformat(),
-                        'analysis': convert_content_items(result.analysis),
-                    }
-
-                    if analysis_evaluator:
-                        analysis_metrics = analysis_evaluator.evaluate_analysis(result, query)
-                        analysis_metrics = convert_content_items(analysis_metrics)
-                        print("\n=== Analysis Results ===")
-                        print("Analysis Metrics:")
-                        print(f"- Numerical Accuracy: {analysis_metrics.get('numerical_accuracy', {}).get('score', 0.0):.2f}")
-                        print(f"- Query Understanding: {analysis_metrics.get('query_understanding', {}).get('score', 0.0):.2f}")
-                        print(f"- Data Validation: {analysis_metrics.get('data_validation', {}).get('score', 0.0):.2f}")
-                        print(f"- Reasoning Transparency: {analysis_metrics.get('reasoning_transparency', {}).get('score', 0.0):.2f}")
-                        print(f"- Overall Score: {analysis_metrics.get('overall_score', 0.0):.2f}")
-                        
-                        trace.data['analysis_metrics'] = analysis_metrics
-                        
-                        evaluation_data.update({
-                            'numerical_accuracy': float(analysis_metrics.get('numerical_accuracy', {}).get('score', 0.0)),
-                            'query_understanding': float(analysis_metrics.get('query_understanding', {}).get('score', 0.0)),
-                            'data_validation': float(analysis_metrics.get('data_validation', {}).get('score', 0.0)),
-                            'reasoning_transparency': float(analysis_metrics.get('reasoning_transparency', {}).get('score', 0.0)),
-                            'overall_score': float(analysis_metrics.get('overall_score', 0.0)),
-                            'metrics_details': analysis_metrics,
-                            'calculation_examples': analysis_metrics.get('numerical_accuracy', {}).get('details', {}).get('calculation_examples', []),
-                            'term_coverage': float(analysis_metrics.get('query_understanding', {}).get('details', {}).get('term_coverage', 0.0)),
-                            'analytical_elements': analysis_metrics.get('query_understanding', {}).get('details', {}),
-                            'validation_checks': analysis_metrics.get('data_validation', {}).get('details', {}),
-                            'explanation_patterns': analysis_metrics.get('reasoning_transparency', {}).get('details', {})
-                        })
-                        
-                        print("\nDetailed Metrics:")
-                        print(f"- Term Coverage: {evaluation_data['term_coverage']:.2f}")
-                        print("- Calculation Examples:", len(evaluation_data['calculation_examples']))
-                        print("- Validation Checks:", json.dumps(evaluation_data['validation_checks'], indent=2))
-                        
-                    safe_store(db.store_analysis_evaluation, evaluation_data, logger)
-                    print("\nAnalysis results stored in database")
-                    
-                    trace.data.update({
-                        "processing_steps": ["Analysis completed successfully"],
-                        "analysis_metrics": evaluation_data
-                    })
-                    
-                except Exception as eval_error:
-                    logger.error(f"Analysis evaluation failed: {eval_error}", exc_info=True)
-                    print(f"\nError in analysis evaluation: {eval_error}")
-                    trace.data['evaluation_error'] = str(eval_error)
+                _emit(progress_callback, "summary", summary=result.analysis)
+                evaluate = functools.partial(_evaluate_analysis, result, query, trace, db, evaluators, logger, progress_callback)
 
         else:
-            error_msg = f"Tool {tool_name} not found"
-            logger.error(error_msg)
-            print(f"\nError: {error_msg}")
-            trace.data.update({
-                "processing_steps": [f"Error: {error_msg}"],
-                "error": error_msg,
-                "success": False
-            })
-            db.close()
-            return None, trace
+            return _unknown_tool(tool_name, trace, logger)
 
-        # Finalize execution
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
+        deferred = None
+        if result:
+            if _evaluate_in_background(background_evaluation):
+                deferred = evaluate
+            else:
+                evaluate()
 
-        print(f"\n{'='*50}")
-        print("Execution Complete")
-        print(f"{'='*50}")
-        print(f"Duration: {duration:.2f} seconds")
+        return _finish_run(tool_name, result, trace, start_time, logger, deferred)
+    except Exception as e:
+        return _fail_run(tool_name, e, trace, start_time, logger)
+    finally:
+        reset_token_tracker(usage_token)
 
-        trace.data.update({
-            "duration": duration,
-            "success": True if result else False,
-            "end_time": end_time.isoformat()
-        })
+async def arun_tool(
+    tool_name: str, 
+    query: str, 
+    dataset: str = None, 
+    analysis_type: str = None, 
+    tool=None,
+    prompt_name: str = "research.txt",
+    progress_callback: Optional[ProgressCallback] = None,
+    background_evaluation: Optional[bool] = None
+):
+    """
+    Async counterpart of run_tool for the API. Search, scraping and LLM calls
+    are awaited; evaluators, database writes and trace persistence are
+    CPU/disk bound and run in worker threads (or, with background_evaluation,
+    after the result is returned) so the event loop keeps serving other
+    requests.
+    """
+    logger = _configure_run_logging()
+    start_time = datetime.now()
+    db = await asyncio.to_thread(_get_run_db)
+    trace = _start_trace(tool_name, query, prompt_name, logger)
+    # Scoped to this task; asyncio.to_thread calls inherit it
+    usage_token = set_token_tracker(trace.token_tracker)
 
-        try:
-            token_stats = trace.token_tracker.get_usage_stats()
-            print("\n=== Token Usage Stats ===")
-            print(f"Total Tokens: {token_stats['tokens']['total']}")
-            for model, count in token_stats['models'].items():
-                print(f"- {model}: {count} tokens")
+    try:
+        evaluators = await asyncio.to_thread(_init_evaluators, tool_name, logger)
+
+        if tool_name == "General Agent":
+            tool = await asyncio.to_thread(_prepare_general_agent, tool, prompt_name, db, trace, progress_callback)
+            print("\nExecuting General Agent query...")
+            _emit(progress_callback, "progress", stage="Researching", progress=0.1)
+            result = await tool.ainvoke(input={"query": query})
             
-            if token_stats['tokens']['total'] > 0:
-                usage_msg = f"Total tokens used: {token_stats['tokens']['total']}"
-                logger.info(usage_msg)
-                trace.data["processing_steps"].append(usage_msg)
-        except Exception as token_error:
-            logger.warning(f"Could not retrieve token stats: {token_error}")
-            print(f"\nWarning: Could not retrieve token stats: {token_error}")
-
-        logger.info(f"{tool_name} completed successfully")
-        print(f"\n{tool_name} completed successfully")
-        trace.data["processing_steps"].append(f"{tool_name} completed successfully")
-
-        try:
-            tracer = CustomTracer()
-            tracer.save_trace(trace)
-            print("\nTrace saved successfully")
-        except Exception as trace_save_error:
-            logger.error(f"Failed to save trace: {trace_save_error}")
-            print(f"\nError saving trace: {trace_save_error}")
-
-        db.close()
-        return result, trace
+            if result:
+                _emit(progress_callback, "summary", summary=result.summary, sources=len(result.content or []))
+                evaluate = functools.partial(
+                    _evaluate_research, result, query, trace, db, evaluators,
+                    getattr(tool, "content_cache", None), logger, progress_callback
+                )
+
+        elif tool_name == "Analysis Agent":
+            tool = _prepare_analysis_agent(tool, prompt_name, trace)
+            print("\nExecuting Analysis Agent...")
+            _emit(progress_callback, "progress", stage="Analyzing", progress=0.1)
+            result = await tool.ainvoke_analysis(input={
+                "query": query,
+                "dataset": dataset
+            })
+            
+            if result:
+                _emit(progress_callback, "summary", summary=result.analysis)
+                evaluate = functools.partial(_evaluate_analysis, result, query, trace, db, evaluators, logger, progress_callback)
+
+        else:
+            return await asyncio.to_thread(_unknown_tool, tool_name, trace, logger)
+
+        deferred = None
+        if result:
+            if _evaluate_in_background(background_evaluation):
+                deferred = evaluate
+            else:
+                await asyncio.to_thread(evaluate)
+
+        return await asyncio.to_thread(_finish_run, tool_name, result, trace, start_time, logger, deferred)
     except Exception as e:
-        # Main error handling block
-        error_msg = str(e)
-        logger.error(f"Error running {tool_name}: {error_msg}", exc_info=True)
-        print(f"\nError running {tool_name}: {error_msg}")
-        
-        end_time = datetime.now()
-        duration = (end_time - start_time).total_seconds()
-        
-        trace.data.update({
-            "end_time": end_time.isoformat(),
-            "duration": duration,
-            "error": error_msg,
-            "success": False,
-            "processing_steps": [f"Execution failed: {error_msg}"]
-        })
-        
-        try:
-            tracer = CustomTracer()
-            tracer.save_trace(trace)
-            print("\nError trace saved")
-        except Exception as trace_save_error:
-            logger.error(f"Failed to save error trace: {trace_save_error}")
-            print(f"\nError saving trace: {trace_save_error}")
-        
-        db.close()
-        return None, trace
\ No newline at end of file
+        return await asyncio.to_thread(_fail_run, tool_name, e, trace, start_time, logger)
+    finally:
+        reset_token_tracker(usage_token)
@@ -1,23 +1,26 @@
 import os
 import json
+import threading
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 
 from research_agent.tracers import QueryTrace
+from research_agent.trace_store import get_default_trace_store
 from utils.token_tracking import TokenUsageTracker
+from utils.async_logging import configure_logging
+
+# Traces already parsed by load_research_history, and how far into the
+# trace index they reach
+_history: List[QueryTrace] = []
+_history_lock = threading.Lock()
+_history_generation = -1
+_history_seq = 0
 
 def setup_logging():
     """Set up comprehensive logging configuration"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('research_agent.log'),
-            logging.StreamHandler()
-        ]
-    )
+    configure_logging()
     
     # Add custom log levels
     logging.addLevelName(logging.INFO, "🔵 INFO")
@@ -80,29 +83,39 @@ def get_token_usage(trace: QueryTrace) -> Dict[str, Any]:
     }
 
 def load_research_history() -> List[QueryTrace]:
+    """
+    All traces in the trace log, in the order they were saved.
+
+    Traces are parsed once per process: each call indexes and parses only the
+    traces appended since the previous one (see research_agent.trace_store).
+    """
+    global _history_generation, _history_seq
     try:
-        traces_file = 'research_traces.jsonl'
-        if not os.path.exists(traces_file):
+        store = get_default_trace_store()
+        if not os.path.exists(store.traces_file):
             return []
-            
-        traces = []
-        with open(traces_file, 'r') as f:
-            for line in f:
-                try:
-                    trace_data = json.loads(line)
-                    trace = QueryTrace(trace_data.get('query', 'Unknown'))
-                    trace.data = trace_data
 
-                    # Handle token_usage extraction
-                    token_usage = trace_data.get('token_usage', {})
-                    if token_usage:
-                        trace.token_tracker.usage_stats = token_usage
+        with _history_lock:
+            store.refresh()
+            generation = store.generation()
+            if generation != _history_generation:
+                # The log was replaced and re-indexed; start over
+                _history.clear()
+                _history_generation, _history_seq = generation, 0
 
-                    traces.append(trace)
-                except json.JSONDecodeError:
-                    logging.error(f"Invalid JSON in trace file: {line}")
-        
-        return traces
+            for seq, trace_data in store.tail(_history_seq):
+                trace = QueryTrace(trace_data.get('query', 'Unknown'))
+                trace.data = trace_data
+
+                # Handle token_usage extraction
+                token_usage = trace_data.get('token_usage', {})
+                if token_usage:
+                    trace.token_tracker.usage_stats = token_usage
+
+                _history.append(trace)
+                _history_seq = seq
+
+            return list(_history)
     except Exception as e:
         logging.error(f"Error loading traces: {str(e)}")
-        return []
\ No newline at end of file
+        return []
@@ -1,12 +1,14 @@
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import asyncio
 from datetime import datetime
-from typing import Dict, Optional, Type, Any, List
+from typing import Dict, Optional, Type, Any, List, Tuple
 import pandas as pd
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
-from utils.model_wrapper import model_wrapper
-from utils.token_tracking import TokenUsageTracker
+from utils.model_wrapper import model_wrapper, amodel_wrapper
+from utils.async_logging import configure_logging
+from utils.token_tracking import ContextTokenTracker, TokenUsageTracker, reset_token_tracker, set_token_tracker
 from prompt import Prompt
 import os
 
@@ -107,7 +109,7 @@ class AnalysisAgent(BaseTool):
     description: str = "Analyzes datasets using statistical methods"
     args_schema: Type[BaseModel] = AnalysisAgentInput
     current_prompt: Optional[Prompt] = Field(default=None)
-    token_tracker: TokenUsageTracker = Field(default_factory=TokenUsageTracker)
+    token_tracker: TokenUsageTracker = Field(default_factory=ContextTokenTracker)
     current_prompt: Optional[Prompt] = Field(default=None)  # Add this line to declare the field
     data_folder: str = Field(default="./data")  # Add data_folder as a proper field
 
@@ -142,7 +144,7 @@ class AnalysisAgent(BaseTool):
                 Return the indices of the most relevant articles."""
             )
         
-        self.token_tracker = TokenUsageTracker()
+        self.token_tracker = ContextTokenTracker()
         self.data_folder = data_folder
         
         # Ensure data folder exists
@@ -218,6 +220,73 @@ class AnalysisAgent(BaseTool):
             logging.error(f"Error in statistical analysis: {str(e)}")
             raise
 
+    def _prepare_analysis(
+        self,
+        input: Dict[str, str],
+        current_prompt: Optional[Prompt] = None
+    ) -> Tuple[AnalysisMetrics, Prompt, str]:
+        """Load the dataset, run the statistics and compile the analysis prompt."""
+        if not input or 'query' not in input or 'dataset' not in input:
+            raise ValueError("Query and dataset must be provided")
+
+        dataset_file = input['dataset']
+        available_datasets = self.get_available_datasets()
+        
+        if dataset_file not in available_datasets:
+            raise ValueError(f"Invalid dataset: {dataset_file}. Available datasets: {available_datasets}")
+
+        # Load and validate data
+        df = self.load_and_validate_data(dataset_file)
+
+        # Perform statistical analysis
+        analysis_results = self.perform_statistical_analysis(df)
+
+        # Create analysis metrics
+        metrics = AnalysisMetrics(
+            numerical_accuracy=1.0,
+            query_understanding=1.0,
+            data_validation=1.0,
+            reasoning_transparency=1.0,
+            handled_missing_data=True,
+            handled_outliers=True,
+            handled_datatypes=True,
+            handled_format_issues=True,
+            explained_steps=True,
+            stated_assumptions=True,
+            mentioned_limitations=True,
+            clear_methodology=True
+        )
+
+        # Generate analysis text
+        dataset_info = {
+            'filename': dataset_file,
+            'shape': df.shape,
+            'columns': list(df.columns),
+            'dtypes': df.dtypes.to_dict(),
+            'missing_values': df.isnull().sum().to_dict(),
+            'analysis_results': analysis_results
+        }
+
+        prompt_to_use = current_prompt or self.current_prompt
+        system_prompt = prompt_to_use.compile(
+            query=input['query'],
+            dataset_info=str(dataset_info)
+        )
+        return metrics, prompt_to_use, system_prompt
+
+    def _analysis_result(self, analysis_text: str, metrics: AnalysisMetrics) -> AnalysisResult:
+        usage = self.token_tracker.get_total_usage()
+        return AnalysisResult(
+            analysis=analysis_text,
+            metrics=metrics,
+            usage={
+                'prompt_tokens': usage['total_prompt_tokens'],
+                'completion_tokens': usage['total_completion_tokens'],
+                'total_tokens': usage['total_tokens'],
+                'model': 'llama3-70b-8192'
+            }
+        )
+
     def invoke_analysis(
         self,
         input: Dict[str, str],
@@ -227,54 +296,38 @@ class AnalysisAgent(BaseTool):
         logging.info(f"Starting analysis for query: {input.get('query', 'No query')}")
         
         try:
-            if not input or 'query' not in input or 'dataset' not in input:
-                raise ValueError("Query and dataset must be provided")
+            metrics, prompt_to_use, system_prompt = self._prepare_analysis(input, current_prompt)
 
-            dataset_file = input['dataset']
-            available_datasets = self.get_available_datasets()
-            
-            if dataset_file not in available_datasets:
-                raise ValueError(f"Invalid dataset: {dataset_file}. Available datasets: {available_datasets}")
-
-            # Load and validate data
-            df = self.load_and_validate_data(dataset_file)
-
-            # Perform statistical analysis
-            analysis_results = self.perform_statistical_analysis(df)
-
-            # Create analysis metrics
-            metrics = AnalysisMetrics(
-                numerical_accuracy=1.0,
-                query_understanding=1.0,
-                data_validation=1.0,
-                reasoning_transparency=1.0,
-                handled_missing_data=True,
-                handled_outliers=True,
-                handled_datatypes=True,
-                handled_format_issues=True,
-                explained_steps=True,
-                stated_assumptions=True,
-                mentioned_limitations=True,
-                clear_methodology=True
+            analysis_text = model_wrapper(
+                system_prompt=system_prompt,
+                prompt=prompt_to_use,
+                user_prompt=input['query'],
+                model="llama3-70b-8192",
+                host="groq",
+                temperature=0.7,
+                token_tracker=self.token_tracker
             )
 
-            # Generate analysis text
-            dataset_info = {
-                'filename': dataset_file,
-                'shape': df.shape,
-                'columns': list(df.columns),
-                'dtypes': df.dtypes.to_dict(),
-                'missing_values': df.isnull().sum().to_dict(),
-                'analysis_results': analysis_results
-            }
+            return self._analysis_result(analysis_text, metrics)
+
+        except Exception as e:
+            logging.error(f"Error in analysis: {str(e)}")
+            raise
 
-            prompt_to_use = current_prompt or self.current_prompt
-            system_prompt = prompt_to_use.compile(
-                query=input['query'],
-                dataset_info=str(dataset_info)
+    async def ainvoke_analysis(
+        self,
+        input: Dict[str, str],
+        current_prompt: Optional[Prompt] = None
+    ) -> AnalysisResult:
+        """Async counterpart of invoke_analysis; pandas work runs in a worker thread."""
+        logging.info(f"Starting async analysis for query: {input.get('query', 'No query')}")
+        
+        try:
+            metrics, prompt_to_use, system_prompt = await asyncio.to_thread(
+                self._prepare_analysis, input, current_prompt
             )
 
-            analysis_text = model_wrapper(
+            analysis_text = await amodel_wrapper(
                 system_prompt=system_prompt,
                 prompt=prompt_to_use,
                 user_prompt=input['query'],
@@ -284,16 +337,7 @@ class AnalysisAgent(BaseTool):
                 token_tracker=self.token_tracker
             )
 
-            return AnalysisResult(
-                analysis=analysis_text,
-                metrics=metrics,
-                usage={
-                    'prompt_tokens': self.token_tracker._total_prompt_tokens,
-                    'completion_tokens': self.token_tracker._total_completion_tokens,
-                    'total_tokens': self.token_tracker._total_tokens,
-                    'model': 'llama3-70b-8192'
-                }
-            )
+            return self._analysis_result(analysis_text, metrics)
 
         except Exception as e:
             logging.error(f"Error in analysis: {str(e)}")
@@ -304,14 +348,7 @@ class AnalysisAgent(BaseTool):
         return self.invoke_analysis(input=kwargs)
 
 def run_tool(tool_name: str, query: str, dataset: str = None, tool=None):
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s [%(levelname)s] %(message)s - %(filename)s:%(lineno)d',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('research_tool.log', mode='a')
-        ]
-    )
+    configure_logging()
     logger = logging.getLogger(__name__)
     
     start_time = datetime.now()
@@ -327,6 +364,7 @@ def run_tool(tool_name: str, query: str, dataset: str = None, tool=None):
         "content_new": 0,
         "content_reused": 0
     })
+    usage_token = set_token_tracker(trace.token_tracker)
 
     try:
         if tool_name == "Analysis Agent":
@@ -450,4 +488,6 @@ def run_tool(tool_name: str, query: str, dataset: str = None, tool=None):
             logger.error(f"Failed to save error trace: {trace_save_error}")
         
         db.close()
-        return None, trace
\ No newline at end of file
+        return None, trace
+    finally:
+        reset_token_tracker(usage_token)
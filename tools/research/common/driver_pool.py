@@ -0,0 +1,190 @@
+import os
+import time
+import queue
+import atexit
+import threading
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+def chrome_driver_factory() -> Any:
+    """Launch a headless Chrome with the options WebScraper has always used."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return webdriver.Chrome(options=options)
+
+
+class _PooledDriver:
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """
+    Fixed-size pool of warm browser sessions with checkout/return semantics.
+
+    Drivers are created lazily up to `size` (or eagerly via `warm()`), health
+    checked on checkout and after a failed page, and recycled once they have
+    served `max_pages` pages so long-lived browsers do not accumulate memory.
+
+    Args:
+        size: Maximum number of live browser instances
+        max_pages: Pages a driver may serve before it is replaced
+        checkout_timeout: Seconds to wait for a free driver before giving up
+        factory: Callable returning a new WebDriver (defaults to headless Chrome)
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages: int = 50,
+        checkout_timeout: float = 60.0,
+        factory: Optional[Callable[[], Any]] = None
+    ):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.checkout_timeout = checkout_timeout
+        self.factory = factory or chrome_driver_factory
+
+        self._idle: "queue.LifoQueue[_PooledDriver]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        self.stats = {"created": 0, "recycled": 0, "discarded": 0, "checkouts": 0}
+
+    def _create(self) -> _PooledDriver:
+        try:
+            pooled = _PooledDriver(self.factory())
+        except Exception:
+            with self._lock:
+                self._live -= 1
+            raise
+        with self._lock:
+            self.stats["created"] += 1
+        logging.info(f"Started browser session ({self._live}/{self.size} live)")
+        return pooled
+
+    def _destroy(self, pooled: _PooledDriver, reason: str) -> None:
+        with self._lock:
+            self._live -= 1
+            self.stats[reason] += 1
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error shutting down browser session: {str(e)}")
+
+    @staticmethod
+    def _healthy(pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _acquire(self, timeout: float) -> _PooledDriver:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    can_create = self._live < self.size
+                    if can_create:
+                        self._live += 1
+                if can_create:
+                    return self._create()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser session available within {timeout:.0f}s")
+                try:
+                    pooled = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+
+            if self._healthy(pooled):
+                return pooled
+            logging.warning("Discarding unresponsive browser session")
+            self._destroy(pooled, "discarded")
+
+    def _release(self, pooled: _PooledDriver, failed: bool) -> None:
+        pooled.pages += 1
+        if self._closed:
+            self._destroy(pooled, "recycled")
+        elif pooled.pages >= self.max_pages:
+            self._destroy(pooled, "recycled")
+        elif failed and not self._healthy(pooled):
+            self._destroy(pooled, "discarded")
+        else:
+            self._idle.put(pooled)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Borrow a driver for the duration of the `with` block. The driver is
+        always returned to the pool (or replaced) even if the block raises.
+        """
+        pooled = self._acquire(self.checkout_timeout if timeout is None else timeout)
+        with self._lock:
+            self.stats["checkouts"] += 1
+        failed = False
+        try:
+            yield pooled.driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._release(pooled, failed)
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Start up to `count` (default: pool size) browsers ahead of time."""
+        started = []
+        for _ in range(min(count or self.size, self.size)):
+            with self._lock:
+                if self._live >= self.size:
+                    break
+                self._live += 1
+            started.append(self._create())
+        for pooled in started:
+            self._idle.put(pooled)
+
+    def close(self) -> None:
+        """Quit all idle drivers; checked-out drivers are quit when returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(pooled, "recycled")
+
+
+_default_pool: Optional[DriverPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_driver_pool() -> DriverPool:
+    """
+    Return the process-wide browser pool. Tunable with SCRAPER_DRIVER_POOL_SIZE
+    and SCRAPER_DRIVER_MAX_PAGES; browsers are shut down at interpreter exit.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool(
+                size=int(os.getenv('SCRAPER_DRIVER_POOL_SIZE', '2')),
+                max_pages=int(os.getenv('SCRAPER_DRIVER_MAX_PAGES', '50'))
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
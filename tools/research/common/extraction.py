@@ -0,0 +1,255 @@
+import os
+import re
+import threading
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Type
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; the soup extractor works without it
+    etree = None
+    lxml_html = None
+
+CONTENT_CLASS = re.compile(r'(content|article|post|story)')
+BOILERPLATE_TAGS = frozenset(['script', 'style', 'meta', 'noscript', 'iframe', 'template'])
+
+
+@dataclass
+class ExtractedContent:
+    """Main content of a page."""
+    title: str
+    text: str
+    strategy: str  # 'article', 'container' or 'paragraphs'
+
+
+def _normalize(text: str) -> str:
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return re.sub(r' {2,}', ' ', text)
+
+
+class ContentExtractor:
+    """
+    Base class for main-content extractors. Implementations must be
+    stateless so a single instance can be shared across scraper threads.
+
+    Args:
+        min_length: Minimum characters of main content for a page to count
+    """
+    name = "base"
+
+    def __init__(self, min_length: int = 200):
+        self.min_length = min_length
+
+    def extract(self, html: str) -> Optional[ExtractedContent]:
+        """
+        Extract the main content of a page.
+
+        Args:
+            html: Raw HTML
+
+        Returns:
+            Optional[ExtractedContent]: Title and text, or None if no strategy
+            produced more than `min_length` characters
+        """
+        raise NotImplementedError
+
+    def extract_page_text(self, html: str) -> str:
+        """Return all visible text of a page as a single whitespace-collapsed line."""
+        raise NotImplementedError
+
+    def _select(self, title: Optional[str], candidates) -> Optional[ExtractedContent]:
+        # Strategies are tried in priority order; a weaker one is only used
+        # when the stronger ones are missing or too short.
+        content, chosen = "", None
+        for strategy, text in candidates:
+            if text:
+                content, chosen = text, strategy
+                if len(content.strip()) > self.min_length:
+                    break
+
+        content = _normalize(content)
+        if len(content.strip()) <= self.min_length:
+            return None
+        return ExtractedContent(title=title or "No title", text=content, strategy=chosen)
+
+
+class SoupExtractor(ContentExtractor):
+    """
+    The original BeautifulSoup strategies: parse the whole tree, decompose
+    boilerplate, then try <article>, a content-like container and finally
+    all paragraphs, each as a separate tree walk.
+    """
+    name = "soup"
+
+    def extract(self, html: str) -> Optional[ExtractedContent]:
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup.find_all(list(BOILERPLATE_TAGS) + ['comment']):
+            tag.decompose()
+
+        def article():
+            result = soup.find('article')
+            return result.get_text(separator='\n', strip=True) if result else ""
+
+        def container():
+            result = soup.find(['main', 'div'], class_=CONTENT_CLASS)
+            return result.get_text(separator='\n', strip=True) if result else ""
+
+        def paragraphs():
+            texts = [p.get_text(strip=True) for p in soup.find_all('p')]
+            return '\n'.join([text for text in texts if len(text.split()) > 5])
+
+        lazy = (("article", article), ("container", container), ("paragraphs", paragraphs))
+        title = soup.title.string if soup.title else None
+        return self._select(title, ((name, fn()) for name, fn in lazy))
+
+    def extract_page_text(self, html: str) -> str:
+        soup = BeautifulSoup(html, 'html.parser')
+        for script in soup(["script", "style"]):
+            script.decompose()
+        lines = (line.strip() for line in soup.get_text().splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        return ' '.join(chunk for chunk in chunks if chunk)
+
+
+class LxmlExtractor(ContentExtractor):
+    """
+    Single-pass streaming extractor built on lxml's pull parser.
+
+    The document is fed in chunks and every strategy is evaluated from the
+    same event stream: boilerplate elements are emptied as they close,
+    paragraphs are collected as they close, and finished subtrees outside the
+    candidate containers are discarded to keep memory flat. Parsing stops as
+    soon as a sufficiently long <article> has closed, so the rest of the page
+    is never tokenized.
+    """
+    name = "lxml"
+    chunk_size = 16 * 1024
+
+    def __init__(self, min_length: int = 200):
+        if etree is None:
+            raise ImportError("lxml is required for LxmlExtractor")
+        super().__init__(min_length)
+
+    @staticmethod
+    def _text(element) -> str:
+        return '\n'.join(s.strip() for s in element.itertext() if s.strip())
+
+    def extract(self, html: str) -> Optional[ExtractedContent]:
+        parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True, remove_pis=True)
+        title = None
+        article = container = None
+        article_text = container_text = None
+        paragraphs: List[str] = []
+        keep_depth = 0
+
+        def handle(events) -> bool:
+            nonlocal title, article, container, article_text, container_text, keep_depth
+            for event, element in events:
+                tag = element.tag
+                if not isinstance(tag, str):
+                    continue
+
+                if event == "start":
+                    if article is None and tag == "article":
+                        article = element
+                        keep_depth += 1
+                    elif container is None and tag in ("main", "div") and CONTENT_CLASS.search(element.get("class", "")):
+                        container = element
+                        keep_depth += 1
+                    continue
+
+                if tag in BOILERPLATE_TAGS:
+                    element.clear(keep_tail=True)
+                    continue
+                if tag == "title" and title is None:
+                    title = element.text
+                elif tag == "p":
+                    text = ''.join(s.strip() for s in element.itertext())
+                    if len(text.split()) > 5:
+                        paragraphs.append(text)
+
+                if element is article:
+                    article_text = self._text(element)
+                    keep_depth -= 1
+                    if len(article_text.strip()) > self.min_length:
+                        return True
+                elif element is container:
+                    container_text = self._text(element)
+                    keep_depth -= 1
+
+                if keep_depth == 0 and tag not in ("html", "body"):
+                    # Nothing above this element can still be a candidate, so
+                    # its subtree (and already-seen siblings) can be dropped.
+                    element.clear(keep_tail=False)
+                    parent = element.getparent()
+                    while parent is not None and element.getprevious() is not None:
+                        del parent[0]
+            return False
+
+        done = False
+        for offset in range(0, len(html), self.chunk_size):
+            parser.feed(html[offset:offset + self.chunk_size])
+            if handle(parser.read_events()):
+                done = True
+                break
+        if not done:
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                pass
+            handle(parser.read_events())
+
+        return self._select(title, (
+            ("article", article_text),
+            ("container", container_text),
+            ("paragraphs", '\n'.join(paragraphs)),
+        ))
+
+    def extract_page_text(self, html: str) -> str:
+        try:
+            root = lxml_html.fromstring(html)
+        except (etree.ParserError, ValueError):
+            return ""
+        etree.strip_elements(root, "script", "style", etree.Comment, with_tail=False)
+        return ' '.join(' '.join(root.itertext()).split())
+
+
+EXTRACTORS: Dict[str, Type[ContentExtractor]] = {
+    SoupExtractor.name: SoupExtractor,
+}
+if etree is not None:
+    EXTRACTORS[LxmlExtractor.name] = LxmlExtractor
+
+_instances: Dict[str, ContentExtractor] = {}
+_instances_lock = threading.Lock()
+
+
+def register_extractor(extractor_cls: Type[ContentExtractor]) -> None:
+    """Make an extractor selectable by name via get_extractor / HTML_EXTRACTOR."""
+    EXTRACTORS[extractor_cls.name] = extractor_cls
+
+
+def get_extractor(name: Optional[str] = None) -> ContentExtractor:
+    """
+    Return a shared extractor instance.
+
+    Args:
+        name: Registered extractor name; defaults to HTML_EXTRACTOR, then
+            'lxml' when available and 'soup' otherwise
+
+    Returns:
+        ContentExtractor: Shared extractor instance
+    """
+    name = name or os.getenv('HTML_EXTRACTOR') or ("lxml" if "lxml" in EXTRACTORS else "soup")
+    if name not in EXTRACTORS:
+        logging.warning(f"Unknown HTML extractor '{name}', falling back to soup")
+        name = "soup"
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = EXTRACTORS[name]()
+        return _instances[name]
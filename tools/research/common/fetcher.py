@@ -0,0 +1,505 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://www.google.com/'
+}
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching a single URL."""
+    url: str
+    status: Optional[int] = None
+    text: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    @property
+    def not_modified(self) -> bool:
+        return self.error is None and self.status == 304
+
+
+class _DomainGate:
+    """
+    Politeness limits for a single domain: at most `concurrency` requests in
+    flight and at least `delay` seconds between consecutive request starts.
+    """
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = threading.BoundedSemaphore(max(1, concurrency))
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def acquire(self, deadline: float) -> bool:
+        if not self.semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return False
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.delay
+        wait = start_at - now
+        if wait > 0:
+            if start_at >= deadline:
+                self.semaphore.release()
+                return False
+            time.sleep(wait)
+        return True
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+class PageFetcher:
+    """
+    Concurrent page fetcher with bounded global concurrency, per-domain
+    politeness limits, a shared keep-alive connection pool and per-request
+    deadlines.
+
+    Args:
+        max_concurrency: Maximum number of requests in flight across all domains
+        per_domain_concurrency: Maximum number of requests in flight per domain
+        per_domain_delay: Minimum seconds between request starts on the same domain
+        timeout: Connect/read timeout passed to requests (seconds)
+        deadline: Hard wall-clock budget per URL, including time spent waiting
+            for a domain slot and reading the body (seconds)
+        max_bytes: Maximum response body size to read
+        headers: Request headers (defaults to a desktop browser profile)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_domain_concurrency: int = 2,
+        per_domain_delay: float = 0.5,
+        timeout: float = 15.0,
+        deadline: float = 20.0,
+        max_bytes: int = 5 * 1024 * 1024,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_domain_concurrency = per_domain_concurrency
+        self.per_domain_delay = per_domain_delay
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=self.max_concurrency,
+            pool_maxsize=self.max_concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._gates: Dict[str, _DomainGate] = {}
+        self._gates_lock = threading.Lock()
+        # Requests in flight from every caller, not just one fetch_all batch
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+
+    def _gate_for(self, domain: str) -> _DomainGate:
+        with self._gates_lock:
+            gate = self._gates.get(domain)
+            if gate is None:
+                gate = _DomainGate(self.per_domain_concurrency, self.per_domain_delay)
+                self._gates[domain] = gate
+            return gate
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        Fetch a single URL, honouring the per-domain gate and the deadline.
+
+        Args:
+            url: URL to fetch
+            headers: Optional extra headers for this request
+
+        Returns:
+            FetchResult: Status, decoded body and headers, or the error
+        """
+        start = time.monotonic()
+        deadline = start + self.deadline
+        domain = urlparse(url).netloc
+        gate = self._gate_for(domain)
+
+        if not gate.acquire(deadline):
+            return FetchResult(url=url, error="Deadline exceeded waiting for domain slot",
+                               elapsed=time.monotonic() - start)
+        # Taken after the domain slot, so waiting out a domain's delay does
+        # not hold up requests to other domains
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            gate.release()
+            return FetchResult(url=url, error="Deadline exceeded waiting for a request slot",
+                               elapsed=time.monotonic() - start)
+        try:
+            remaining = max(0.1, deadline - time.monotonic())
+            response = self.session.get(
+                url,
+                headers=headers,
+                timeout=(min(self.timeout, remaining), min(self.timeout, remaining)),
+                stream=True,
+                verify=True
+            )
+            try:
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        logging.warning(f"Truncating {url} at {size} bytes")
+                        break
+                    if time.monotonic() > deadline:
+                        return FetchResult(url=url, status=response.status_code,
+                                           error="Deadline exceeded reading body",
+                                           elapsed=time.monotonic() - start)
+                encoding = response.encoding or 'utf-8'
+                text = b"".join(chunks).decode(encoding, errors='replace')
+            finally:
+                response.close()
+
+            error = None
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+            return FetchResult(
+                url=url,
+                status=response.status_code,
+                text=text,
+                headers=dict(response.headers),
+                error=error,
+                elapsed=time.monotonic() - start
+            )
+        except requests.exceptions.RequestException as e:
+            return FetchResult(url=url, error=str(e), elapsed=time.monotonic() - start)
+        finally:
+            self._slots.release()
+            gate.release()
+
+    def fetch_all(
+        self,
+        urls: List[str],
+        headers: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> List[FetchResult]:
+        """
+        Fetch many URLs concurrently.
+
+        Args:
+            urls: URLs to fetch; duplicates are fetched once
+            headers: Optional per-URL extra headers (e.g. conditional request headers)
+
+        Returns:
+            List[FetchResult]: One result per input URL, in input order
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return []
+
+        headers = headers or {}
+        # Concurrent batches share the fetcher's request slots, so together
+        # they stay within max_concurrency
+        workers = min(self.max_concurrency, len(unique_urls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch") as executor:
+            fetched = executor.map(lambda url: self.fetch(url, headers.get(url)), unique_urls)
+            results = dict(zip(unique_urls, fetched))
+        return [results[url] for url in urls]
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_fetcher: Optional[PageFetcher] = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_default_fetcher() -> PageFetcher:
+    """
+    Return the process-wide fetcher so keep-alive connections are shared
+    between requests. Limits can be tuned with SCRAPE_MAX_CONCURRENCY,
+    SCRAPE_PER_DOMAIN_CONCURRENCY, SCRAPE_DOMAIN_DELAY and SCRAPE_DEADLINE.
+    """
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = PageFetcher(
+                max_concurrency=int(os.getenv('SCRAPE_MAX_CONCURRENCY', '8')),
+                per_domain_concurrency=int(os.getenv('SCRAPE_PER_DOMAIN_CONCURRENCY', '2')),
+                per_domain_delay=float(os.getenv('SCRAPE_DOMAIN_DELAY', '0.5')),
+                deadline=float(os.getenv('SCRAPE_DEADLINE', '20'))
+            )
+        return _default_fetcher
+
+
+class _AsyncDomainGate:
+    """Event-loop counterpart of _DomainGate."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.delay = delay
+        self._next_start = 0.0
+
+    async def acquire(self, deadline: float) -> bool:
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return False
+        now = time.monotonic()
+        start_at = max(now, self._next_start)
+        self._next_start = start_at + self.delay
+        wait = start_at - now
+        if wait > 0:
+            if start_at >= deadline:
+                self.semaphore.release()
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+@dataclass
+class _AsyncLoopState:
+    """An AsyncPageFetcher's session and request limits on one event loop."""
+    session: aiohttp.ClientSession
+    # Requests in flight from every caller, not just one fetch_all batch
+    slots: asyncio.Semaphore
+    gates: Dict[str, _AsyncDomainGate] = field(default_factory=dict)
+    # Closes the session when the loop shuts down (see _close_at_shutdown)
+    closer: Optional[AsyncGenerator[None, None]] = None
+
+
+async def _close_at_shutdown(session: aiohttp.ClientSession) -> AsyncGenerator[None, None]:
+    """
+    Suspended until its loop shuts down its async generators, which
+    asyncio.run() does before closing the loop, then closes the session
+    while the loop can still run the close.
+    """
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+class AsyncPageFetcher:
+    """
+    asyncio version of PageFetcher for the API request path: same limits and
+    deadline semantics, but requests are awaited on the event loop instead of
+    occupying threads.
+
+    Args:
+        max_concurrency: Maximum number of requests in flight across all domains
+        per_domain_concurrency: Maximum number of requests in flight per domain
+        per_domain_delay: Minimum seconds between request starts on the same domain
+        timeout: Connect timeout (seconds)
+        deadline: Hard wall-clock budget per URL (seconds)
+        max_bytes: Maximum response body size to read
+        headers: Request headers (defaults to a desktop browser profile)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_domain_concurrency: int = 2,
+        per_domain_delay: float = 0.5,
+        timeout: float = 15.0,
+        deadline: float = 20.0,
+        max_bytes: int = 5 * 1024 * 1024,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_domain_concurrency = per_domain_concurrency
+        self.per_domain_delay = per_domain_delay
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.headers = headers or DEFAULT_HEADERS
+
+        # Sessions and semaphores are bound to the loop that created them:
+        # one set per loop using the fetcher, closed by aclose() or when the
+        # loop shuts down
+        self._loops: Dict[asyncio.AbstractEventLoop, _AsyncLoopState] = {}
+        self._loops_lock = threading.Lock()
+
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The fetcher's keep-alive session on the running event loop. Other
+        HTTP calls on the request path (e.g. search APIs) can share it; its
+        connector holds at most max_concurrency connections.
+        """
+        return self._loop_state().session
+
+    def _loop_state(self) -> _AsyncLoopState:
+        loop = asyncio.get_running_loop()
+        with self._loops_lock:
+            state = self._loops.get(loop)
+            if state is None or state.session.closed:
+                # Forget loops that have been closed; their sessions were
+                # closed as they shut down
+                for closed in [other for other in self._loops if other.is_closed()]:
+                    del self._loops[closed]
+                state = _AsyncLoopState(
+                    session=aiohttp.ClientSession(
+                        headers=self.headers,
+                        connector=aiohttp.TCPConnector(
+                            limit=self.max_concurrency,
+                            limit_per_host=self.per_domain_concurrency
+                        )
+                    ),
+                    slots=asyncio.Semaphore(self.max_concurrency)
+                )
+                state.closer = _close_at_shutdown(state.session)
+                asyncio.ensure_future(state.closer.__anext__())
+                self._loops[loop] = state
+            return state
+
+    def _gate_for(self, state: _AsyncLoopState, domain: str) -> _AsyncDomainGate:
+        gate = state.gates.get(domain)
+        if gate is None:
+            gate = _AsyncDomainGate(self.per_domain_concurrency, self.per_domain_delay)
+            state.gates[domain] = gate
+        return gate
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        Fetch a single URL, honouring the per-domain gate and the deadline.
+
+        Args:
+            url: URL to fetch
+            headers: Optional extra headers for this request
+
+        Returns:
+            FetchResult: Status, decoded body and headers, or the error
+        """
+        state = self._loop_state()
+        session, slots = state.session, state.slots
+        start = time.monotonic()
+        deadline = start + self.deadline
+
+        gate = self._gate_for(state, urlparse(url).netloc)
+        if not await gate.acquire(deadline):
+            return FetchResult(url=url, error="Deadline exceeded waiting for domain slot",
+                               elapsed=time.monotonic() - start)
+        # Taken after the domain slot, so waiting out a domain's delay does
+        # not hold up requests to other domains
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=max(0.0, deadline - time.monotonic()))
+        except BaseException as e:
+            gate.release()
+            if isinstance(e, asyncio.TimeoutError):
+                return FetchResult(url=url, error="Deadline exceeded waiting for a request slot",
+                                   elapsed=time.monotonic() - start)
+            raise
+        try:
+            remaining = max(0.1, deadline - time.monotonic())
+            timeout = aiohttp.ClientTimeout(total=remaining, connect=min(self.timeout, remaining))
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        logging.warning(f"Truncating {url} at {size} bytes")
+                        break
+                text = b"".join(chunks).decode(response.charset or 'utf-8', errors='replace')
+
+            error = None
+            if response.status >= 400:
+                error = f"HTTP {response.status}"
+            return FetchResult(
+                url=url,
+                status=response.status,
+                text=text,
+                headers=dict(response.headers),
+                error=error,
+                elapsed=time.monotonic() - start
+            )
+        except asyncio.TimeoutError:
+            return FetchResult(url=url, error="Deadline exceeded", elapsed=time.monotonic() - start)
+        except (aiohttp.ClientError, LookupError) as e:
+            return FetchResult(url=url, error=str(e) or type(e).__name__, elapsed=time.monotonic() - start)
+        finally:
+            slots.release()
+            gate.release()
+
+    async def fetch_all(
+        self,
+        urls: List[str],
+        headers: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> List[FetchResult]:
+        """
+        Fetch many URLs concurrently.
+
+        Args:
+            urls: URLs to fetch; duplicates are fetched once
+            headers: Optional per-URL extra headers (e.g. conditional request headers)
+
+        Returns:
+            List[FetchResult]: One result per input URL, in input order
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return []
+
+        headers = headers or {}
+        # Concurrent batches share the fetcher's request slots
+        fetched = await asyncio.gather(*(self.fetch(url, headers.get(url)) for url in unique_urls))
+        results = dict(zip(unique_urls, fetched))
+        return [results[url] for url in urls]
+
+    async def aclose(self) -> None:
+        """
+        Close the fetcher's sessions: awaited for the running loop, scheduled
+        on any other loop still running.
+        """
+        current = asyncio.get_running_loop()
+        with self._loops_lock:
+            states, self._loops = self._loops, {}
+        for loop, state in states.items():
+            if state.session.closed:
+                continue
+            if loop is current:
+                await state.session.close()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(state.session.close(), loop)
+
+
+_default_async_fetcher: Optional[AsyncPageFetcher] = None
+
+
+def get_default_async_fetcher() -> AsyncPageFetcher:
+    """
+    Return the process-wide async fetcher, configured from the same
+    SCRAPE_* environment variables as get_default_fetcher.
+    """
+    global _default_async_fetcher
+    with _default_fetcher_lock:
+        if _default_async_fetcher is None:
+            _default_async_fetcher = AsyncPageFetcher(
+                max_concurrency=int(os.getenv('SCRAPE_MAX_CONCURRENCY', '8')),
+                per_domain_concurrency=int(os.getenv('SCRAPE_PER_DOMAIN_CONCURRENCY', '2')),
+                per_domain_delay=float(os.getenv('SCRAPE_DOMAIN_DELAY', '0.5')),
+                deadline=float(os.getenv('SCRAPE_DEADLINE', '20'))
+            )
+        return _default_async_fetcher
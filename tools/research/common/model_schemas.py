@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, PrivateAttr, model_serializer
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple
 
 class ContentItem(BaseModel):
     """
@@ -13,6 +13,74 @@ class ContentItem(BaseModel):
     id: Optional[str] = ""
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
+    # Loads `content` from the item's id on first access (see lazy())
+    _content_loader: Optional[Callable[[str], str]] = PrivateAttr(default=None)
+
+    @classmethod
+    def lazy(cls, load_content: Callable[[str], str], **fields: Any) -> "ContentItem":
+        """
+        An item whose content is only loaded when first accessed, e.g. a
+        document body stored compressed in the database.
+
+        Args:
+            load_content: Returns the content for the item's id; called at
+                most once, so whatever it reads from must still be open then
+                (one loader can serve many items)
+            **fields: The other fields
+
+        Returns:
+            ContentItem: The item, without its content loaded
+        """
+        item = cls(**fields)
+        del item.__dict__['content']
+        item.__pydantic_private__['_content_loader'] = load_content
+        return item
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes missing from __dict__: a lazy content
+        if name == 'content':
+            private = object.__getattribute__(self, '__pydantic_private__') or {}
+            load_content = private.get('_content_loader')
+            if load_content is not None:
+                content = load_content(self.id) or ""
+                # Re-insert the fields in declaration order, so dumps list them as usual
+                fields = {**self.__dict__, 'content': content}
+                self.__dict__.clear()
+                self.__dict__.update({field: fields[field] for field in type(self).model_fields if field in fields})
+                private['_content_loader'] = None
+                return content
+        return super().__getattr__(name)
+
+    @model_serializer(mode='wrap')
+    def _serialize(self, handler):
+        self.content  # load a lazy content before dumping
+        return handler(self)
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        # Pickled items carry their content, not the loader
+        self.content
+        return super().__getstate__()
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "ContentItem":
+        # As for pickling: the loader may hold a database connection
+        self.content
+        return super().__deepcopy__(memo)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ContentItem):
+            self.content
+            other.content
+        return super().__eq__(other)
+
+    # dict(item), iteration and repr() read __dict__ directly
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        self.content
+        return super().__iter__()
+
+    def __repr_args__(self) -> Iterable[Tuple[Optional[str], Any]]:
+        self.content
+        return super().__repr_args__()
+
     def __str__(self):
         return f"{self.title}\n{self.url}\n{self.snippet}"
 
@@ -1,25 +1,27 @@
-import os, logging, requests, time
-from typing import Type, List, Optional
+import os, logging
+import asyncio
+from typing import Any, Type, List, Optional, Tuple
+import aiohttp
+import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 import instructor
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-import re
 from langchain.tools import BaseTool
 from langchain.docstore.document import Document
-from langchain_community.utilities import GoogleSerperAPIWrapper
 from pydantic import BaseModel, Field
 from prompt import Prompt
 from .common.model_schemas import ContentItem, ResearchToolOutput
-from utils.model_wrapper import model_wrapper
-from utils.json_model_wrapper import json_model_wrapper
-from utils.token_tracking import TokenUsageTracker
+from .common.fetcher import get_default_fetcher, get_default_async_fetcher
+from .common.extraction import get_extractor
+from utils.model_wrapper import model_wrapper, amodel_wrapper, stream_model_wrapper, astream_model_wrapper
+from utils.json_model_wrapper import json_model_wrapper, ajson_model_wrapper
+from utils.token_tracking import ContextTokenTracker, TokenUsageTracker
 
 load_dotenv()
 SERPER_API_KEY = os.getenv('SERPER_API_KEY')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+SERPER_API_URL = os.getenv('SERPER_API_URL', 'https://google.serper.dev')
 
 class PromptLoader:
     """
@@ -81,6 +83,9 @@ class PromptLoader:
             logging.error(f"Error listing prompts: {e}")
             return []
 
+class SourceSelection(BaseModel):
+    sources: List[int]  # Expect indices (integers)
+
 class GeneralAgentInput(BaseModel):
     query: str = Field(description="Search anything General")
 
@@ -90,17 +95,23 @@ class GeneralAgent(BaseTool):
     args_schema: Type[BaseModel] = GeneralAgentInput
     include_summary: bool = False
     custom_prompt: Optional[Prompt] = Field(default=None)
-    token_tracker: TokenUsageTracker = Field(default_factory=TokenUsageTracker)
+    token_tracker: TokenUsageTracker = Field(default_factory=ContextTokenTracker)
     current_prompt: Optional[Prompt] = Field(default=None)  # Add this line
+    content_cache: Optional[Any] = Field(default=None)  # utils.fetch_cache.FetchCache
+    summary_callback: Optional[Any] = Field(default=None)  # Called with each summary token as it streams
 
     def __init__(
         self, 
         include_summary: bool = False, 
         custom_prompt: Optional[Prompt] = None,
-        prompt_name: Optional[str] = None
+        prompt_name: Optional[str] = None,
+        content_cache: Optional[Any] = None,
+        summary_callback: Optional[Any] = None
     ):
         super().__init__()
         self.include_summary = include_summary
+        self.content_cache = content_cache
+        self.summary_callback = summary_callback
         # Determine which prompt to use
         if custom_prompt:
             # Custom prompt takes highest precedence
@@ -126,183 +137,312 @@ class GeneralAgent(BaseTool):
             )
         
         # Initialize token tracker
-        self.token_tracker = TokenUsageTracker()
+        self.token_tracker = ContextTokenTracker()
+
+    def _selection_prompt(self, content: List[dict], research_topic: str) -> str:
+        formatted_snippets = "\n".join([f"{i}: {doc['title']}: {doc['snippets'][0]}" for i, doc in enumerate(content)])
+        
+        # Use the current prompt for content selection
+        return self.current_prompt.compile(
+            research_topic=research_topic, 
+            formatted_snippets=formatted_snippets
+        )
+
+    def _apply_selection(self, content: List[dict], response: Any) -> List[dict]:
+        logging.info(f"Received response: {response}")
+        
+        if response is None or not hasattr(response, 'sources'):
+            logging.warning("No valid response received, using all articles")
+            return content
+            
+        # Ensure that the 'sources' are indices (integers), and extract them correctly
+        indices = []
+        for source in response.sources:
+            if isinstance(source, dict) and 'index' in source:
+                indices.append(source['index'])
+            elif isinstance(source, int):
+                indices.append(source)
+        
+        # Filter valid indices
+        indices = [i for i in indices if i < len(content)]
+        
+        if not indices:
+            logging.warning("No valid indices found, using all articles")
+            return content
+            
+        logging.info(f"Selected {len(indices)} articles from {len(content)} total results")
+        return [content[i] for i in indices]
 
     def decide_what_to_use(self, content: List[dict], research_topic: str) -> List[dict]:
         try:
             logging.info(f"Processing {len(content)} articles for topic: {research_topic}")
             
-            formatted_snippets = "\n".join([f"{i}: {doc['title']}: {doc['snippets'][0]}" for i, doc in enumerate(content)])
-            
-            # Use the current prompt for content selection
-            system_prompt = self.current_prompt.compile(
-                research_topic=research_topic, 
-                formatted_snippets=formatted_snippets
-            )
-            
-            class ModelResponse(BaseModel):
-                sources: List[int]  # Expect indices (integers)
-
             response = json_model_wrapper(
-                system_prompt=system_prompt,
+                system_prompt=self._selection_prompt(content, research_topic),
                 user_prompt="Pick the snippets you want to include in the summary.",
                 prompt=self.current_prompt,
-                base_model=ModelResponse,
+                base_model=SourceSelection,
                 model="gpt-3.5-turbo",
                 temperature=0,
                 token_tracker=self.token_tracker
             )
+            return self._apply_selection(content, response)
             
-            logging.info(f"Received response: {response}")
-            
-            if response is None or not hasattr(response, 'sources'):
-                logging.warning("No valid response received, using all articles")
-                return content
-                
-            # Ensure that the 'sources' are indices (integers), and extract them correctly
-            indices = []
-            for source in response.sources:
-                if isinstance(source, dict) and 'index' in source:
-                    indices.append(source['index'])
-                elif isinstance(source, int):
-                    indices.append(source)
-            
-            # Filter valid indices
-            indices = [i for i in indices if i < len(content)]
+        except Exception as e:
+            logging.error(f"Error in decide_what_to_use: {str(e)}")
+            return content
+
+    async def adecide_what_to_use(self, content: List[dict], research_topic: str) -> List[dict]:
+        try:
+            logging.info(f"Processing {len(content)} articles for topic: {research_topic}")
             
-            if not indices:
-                logging.warning("No valid indices found, using all articles")
-                return content
-                
-            logging.info(f"Selected {len(indices)} articles from {len(content)} total results")
-            return [content[i] for i in indices]
+            response = await ajson_model_wrapper(
+                system_prompt=self._selection_prompt(content, research_topic),
+                user_prompt="Pick the snippets you want to include in the summary.",
+                prompt=self.current_prompt,
+                base_model=SourceSelection,
+                model="gpt-3.5-turbo",
+                temperature=0,
+                token_tracker=self.token_tracker
+            )
+            return self._apply_selection(content, response)
             
         except Exception as e:
-            logging.error(f"Error in decide_what_to_use: {str(e)}")
+            logging.error(f"Error in adecide_what_to_use: {str(e)}")
             return content
 
+    def _parse_page(self, url: str, html: str) -> Optional[Document]:
+        extracted = get_extractor().extract(html)
+        if extracted is None:
+            logging.warning(f"Retrieved content too short from {url}")
+            return None
+
+        return Document(
+            page_content=extracted.text,
+            metadata={
+                "source": url,
+                "title": extracted.title,
+                "length": len(extracted.text)
+            }
+        )
+
+    def _parse_item(self, url: str, html: str) -> Optional[ContentItem]:
+        doc = self._parse_page(url, html)
+        if doc is None:
+            return None
+        return ContentItem(url=url, title=doc.metadata["title"] or "No title", content=doc.page_content)
+
     def scrape_pages(self, urls: List[str]) -> List[Document]:
         logging.info(f"Starting to scrape {len(urls)} news pages")
         docs = []
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Referer': 'https://www.google.com/'
-        }
-
-        for url in urls:
+
+        if self.content_cache is not None:
+            pages = self.content_cache.fetch_all(urls, get_default_fetcher(), self._parse_item)
+            docs = self._cached_documents(pages)
+            logging.info(f"Resolved {len(docs)} pages out of {len(urls)} requested (cache: {self.content_cache.snapshot()})")
+            return docs
+
+        for fetched in get_default_fetcher().fetch_all(urls):
+            if not fetched.ok:
+                logging.error(f"Error scraping {fetched.url}: {fetched.error}")
+                continue
             try:
-                time.sleep(2)
-                domain = urlparse(url).netloc
-                logging.info(f"Attempting to scrape content from {domain}")
-                response = requests.get(url, headers=headers, timeout=15, verify=True)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                for tag in soup.find_all(['script', 'style', 'meta', 'noscript', 'iframe', 'comment']):
-                    tag.decompose()
-                
-                content_strategies = [
-                    lambda: soup.find('article'),
-                    lambda: soup.find(['main', 'div'], class_=re.compile(r'(content|article|post|story)')),
-                    lambda: soup.find_all('p'),
-                ]
-                
-                content = ""
-                for strategy in content_strategies:
-                    result = strategy()
-                    if result:
-                        if isinstance(result, list):
-                            content = '\n'.join([p.get_text(strip=True) for p in result if len(p.get_text(strip=True).split()) > 5])
-                        else:
-                            content = result.get_text(separator='\n', strip=True)
-                        if len(content.strip()) > 200:
-                            break
-                
-                content = re.sub(r'\n{3,}', '\n\n', content)
-                content = re.sub(r' {2,}', ' ', content)
-                
-                if len(content.strip()) > 200:
-                    docs.append(Document(
-                        page_content=content,
-                        metadata={
-                            "source": url,
-                            "title": soup.title.string if soup.title else "No title",
-                            "length": len(content)
-                        }
-                    ))
-                    logging.info(f"Successfully scraped {url} ({len(content)} chars)")
-                else:
-                    logging.warning(f"Retrieved content too short from {url}")
-                
-            except requests.exceptions.RequestException as e:
-                logging.error(f"Error scraping {url}: {str(e)}")
+                doc = self._parse_page(fetched.url, fetched.text)
+                if doc:
+                    docs.append(doc)
+                    logging.info(f"Successfully scraped {fetched.url} ({doc.metadata['length']} chars in {fetched.elapsed:.2f}s)")
             except Exception as e:
-                logging.error(f"Unexpected error scraping {url}: {str(e)}")
+                logging.error(f"Unexpected error scraping {fetched.url}: {str(e)}")
 
         logging.info(f"Successfully scraped {len(docs)} pages out of {len(urls)} attempted")
         return docs
 
-    def _run(self, **kwargs) -> ResearchToolOutput:
-        logging.info(f"Starting news search for query: {kwargs['query']}")
-        
-        google_serper = GoogleSerperAPIWrapper(type="news", k=10, serper_api_key=SERPER_API_KEY)
-        response = google_serper.results(query=kwargs["query"])
-        news_results = response.get("news", [])
+    async def ascrape_pages(self, urls: List[str]) -> List[Document]:
+        logging.info(f"Starting to scrape {len(urls)} news pages")
+
+        if self.content_cache is not None:
+            pages = await self.content_cache.afetch_all(urls, get_default_async_fetcher(), self._parse_item)
+            docs = self._cached_documents(pages)
+            logging.info(f"Resolved {len(docs)} pages out of {len(urls)} requested (cache: {self.content_cache.snapshot()})")
+            return docs
+
+        fetched_pages = await get_default_async_fetcher().fetch_all(urls)
+
+        def parse_all() -> List[Document]:
+            docs = []
+            for fetched in fetched_pages:
+                if not fetched.ok:
+                    logging.error(f"Error scraping {fetched.url}: {fetched.error}")
+                    continue
+                try:
+                    doc = self._parse_page(fetched.url, fetched.text)
+                    if doc:
+                        docs.append(doc)
+                except Exception as e:
+                    logging.error(f"Unexpected error scraping {fetched.url}: {str(e)}")
+            return docs
+
+        # Extraction is CPU-bound, keep it off the event loop
+        docs = await asyncio.to_thread(parse_all)
+        logging.info(f"Successfully scraped {len(docs)} pages out of {len(urls)} attempted")
+        return docs
 
+    @staticmethod
+    def _cached_documents(pages: dict) -> List[Document]:
+        return [
+            Document(
+                page_content=page.content,
+                metadata={
+                    "source": url,
+                    "title": page.title,
+                    "length": len(page.content),
+                    "cache": page.metadata.get("cache")
+                }
+            )
+            for url, page in pages.items()
+        ]
+
+    @staticmethod
+    def _normalize_news(news_results: List[dict]) -> List[dict]:
         for news in news_results:
             for field in ["snippet", "date", "source", "title", "link", "imageUrl"]:
                 if field not in news:
                     news[field] = ""
-        
-        selected_results = self.decide_what_to_use(content=news_results, research_topic=kwargs["query"])
+        return news_results
 
-        webpage_urls = [result["link"] for result in selected_results]
-        webpages = self.scrape_pages(webpage_urls)
+    @staticmethod
+    def _serper_request(query: str, k: int) -> Tuple[str, dict, dict]:
+        return (
+            f"{SERPER_API_URL}/news",
+            {"X-API-KEY": SERPER_API_KEY or "", "Content-Type": "application/json"},
+            {"q": query, "gl": "us", "hl": "en", "num": k}
+        )
+
+    def _search_news(self, query: str, k: int = 10) -> List[dict]:
+        """Query Serper's news endpoint (SERPER_API_URL overrides the host)."""
+        url, headers, payload = self._serper_request(query, k)
+        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        response.raise_for_status()
+        return response.json().get("news", [])
 
+    async def _asearch_news(self, query: str, k: int = 10) -> List[dict]:
+        """Query Serper's news endpoint without blocking the event loop."""
+        url, headers, payload = self._serper_request(query, k)
+        # Reuses the page fetcher's keep-alive connections rather than a new
+        # session (and TLS handshake) per search
+        session = get_default_async_fetcher().session()
+        async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            response.raise_for_status()
+            results = await response.json()
+        return results.get("news", [])
+
+    @staticmethod
+    def _build_content(news_results: List[dict], webpages: List[Document]) -> List[ContentItem]:
         content = []
         for news in news_results:
-            webpage = next((doc.page_content for doc in webpages if doc.metadata.get("source") == news["link"]), "")
+            webpage = next((doc for doc in webpages if doc.metadata.get("source") == news["link"]), None)
             title = news.get("title", "") + " - " + news.get("date", "")
             content.append(ContentItem(
                 url=news["link"],
                 title=title,
                 snippet=news.get("text", ""),
-                content=webpage,
+                content=webpage.page_content if webpage else "",
+                metadata={"cache": webpage.metadata["cache"]} if webpage and webpage.metadata.get("cache") else {}
             ))
+        return content
 
-        summary = ""
-        if self.include_summary:
-            formatted_content = "\n\n".join([f"### {item}" for item in content])
+    @staticmethod
+    def _summary_request(content: List[ContentItem], query: str) -> Tuple[Prompt, str, str]:
+        formatted_content = "\n\n".join([f"### {item}" for item in content])
+        
+        # Use the current prompt for summary generation
+        summary_prompt = Prompt(
+            id="dynamic-summary-prompt",
+            content="""Analyze and summarize the following search results:
             
-            # Use the current prompt for summary generation
-            summary_prompt = Prompt(
-                id="dynamic-summary-prompt",
-                content="""Analyze and summarize the following search results:
-                
-                Query: {{user_prompt}}
-                
-                Search Results:
-                {{search_results_str}}
-                
-                Provide a comprehensive summary grouped by themes and include relevant links."""
-            )
+            Query: {{user_prompt}}
             
-            system_prompt = summary_prompt.compile(
-                search_results_str=formatted_content, 
-                user_prompt=kwargs["query"]
+            Search Results:
+            {{search_results_str}}
+            
+            Provide a comprehensive summary grouped by themes and include relevant links."""
+        )
+        
+        system_prompt = summary_prompt.compile(
+            search_results_str=formatted_content, 
+            user_prompt=query
+        )
+        user_prompt = f"Summarize and group the search results based on this: '{query}'. Include links, dates, and snippets from the search results."
+        return summary_prompt, system_prompt, user_prompt
+
+    def _run(self, **kwargs) -> ResearchToolOutput:
+        logging.info(f"Starting news search for query: {kwargs['query']}")
+        
+        news_results = self._normalize_news(self._search_news(kwargs["query"]))
+        
+        selected_results = self.decide_what_to_use(content=news_results, research_topic=kwargs["query"])
+
+        webpage_urls = [result["link"] for result in selected_results]
+        webpages = self.scrape_pages(webpage_urls)
+
+        content = self._build_content(news_results, webpages)
+
+        summary = ""
+        if self.include_summary:
+            summary_prompt, system_prompt, user_prompt = self._summary_request(content, kwargs["query"])
+            summary_args = dict(
+                system_prompt=system_prompt,
+                prompt=summary_prompt,
+                user_prompt=user_prompt,
+                model="llama3-70b-8192",
+                host="groq",
+                temperature=0.7,
+                token_tracker=self.token_tracker
             )
+            if self.summary_callback is None:
+                summary = model_wrapper(**summary_args)
+            else:
+                parts = []
+                for token in stream_model_wrapper(**summary_args):
+                    parts.append(token)
+                    self.summary_callback(token)
+                summary = "".join(parts)
+            logging.info("Generated summary of news articles")
+
+        return ResearchToolOutput(content=content, summary=summary)
+
+    async def _arun(self, **kwargs) -> ResearchToolOutput:
+        logging.info(f"Starting async news search for query: {kwargs['query']}")
+
+        news_results = self._normalize_news(await self._asearch_news(kwargs["query"]))
 
-            summary = model_wrapper(
+        selected_results = await self.adecide_what_to_use(content=news_results, research_topic=kwargs["query"])
+
+        webpage_urls = [result["link"] for result in selected_results]
+        webpages = await self.ascrape_pages(webpage_urls)
+
+        content = self._build_content(news_results, webpages)
+
+        summary = ""
+        if self.include_summary:
+            summary_prompt, system_prompt, user_prompt = self._summary_request(content, kwargs["query"])
+            summary_args = dict(
                 system_prompt=system_prompt,
                 prompt=summary_prompt,
-                user_prompt=f"Summarize and group the search results based on this: '{kwargs['query']}'. Include links, dates, and snippets from the search results.",
+                user_prompt=user_prompt,
                 model="llama3-70b-8192",
                 host="groq",
                 temperature=0.7,
                 token_tracker=self.token_tracker
             )
+            if self.summary_callback is None:
+                summary = await amodel_wrapper(**summary_args)
+            else:
+                parts = []
+                async for token in astream_model_wrapper(**summary_args):
+                    parts.append(token)
+                    self.summary_callback(token)
+                summary = "".join(parts)
             logging.info("Generated summary of news articles")
 
         return ResearchToolOutput(content=content, summary=summary)
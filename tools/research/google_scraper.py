@@ -1,13 +1,16 @@
-from typing import Optional, Any, Type, Dict
+from typing import Optional, Any, Type, Dict, List
 from pydantic import BaseModel, Field
 from langchain.tools import BaseTool
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
+from prompt import Prompt
 from .common.model_schemas import ContentItem, ResearchToolOutput
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from .common.driver_pool import get_default_driver_pool
+from .common.extraction import get_extractor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -84,33 +87,34 @@ class WebScraper(BaseTool):
     name: str = Field(default="web_scraper")
     description: str = Field(default="A tool for scraping web content from URLs and performing Google searches")
     args_schema: Type[BaseModel] = WebScraperInput
+    content_cache: Optional[Any] = Field(default=None)  # utils.fetch_cache.FetchCache
+    driver_pool: Optional[Any] = Field(default=None)  # common.driver_pool.DriverPool
     
-    def __init__(self):
+    def __init__(self, content_cache: Optional[Any] = None, driver_pool: Optional[Any] = None):
         super().__init__()
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--headless')
-        self.chrome_options.add_argument('--no-sandbox')
-        self.chrome_options.add_argument('--disable-dev-shm-usage')
+        self.content_cache = content_cache
+        self.driver_pool = driver_pool
 
-    def _setup_driver(self):
-        return webdriver.Chrome(options=self.chrome_options)
+    def _pool(self):
+        return self.driver_pool or get_default_driver_pool()
 
     def search(self, query: str) -> str:
         """
         Perform a Google search and return formatted results
         """
         try:
-            driver = self._setup_driver()
-            search_url = f"https://www.google.com/search?q={quote_plus(query)}"
-            driver.get(search_url)
-            
-            # Wait for search results to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "g"))
-            )
+            with self._pool().checkout() as driver:
+                search_url = f"https://www.google.com/search?q={quote_plus(query)}"
+                driver.get(search_url)
+                
+                # Wait for search results to load
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "g"))
+                )
+                page_source = driver.page_source
             
             # Parse the page with BeautifulSoup
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
+            soup = BeautifulSoup(page_source, 'html.parser')
             search_results = []
             
             # Find all search result divs
@@ -131,7 +135,6 @@ class WebScraper(BaseTool):
                             "snippet": snippet
                         })
             
-            driver.quit()
             return json.dumps(search_results[:5], ensure_ascii=False)
             
         except Exception as e:
@@ -140,33 +143,49 @@ class WebScraper(BaseTool):
         
     def scrape_url(self, url: str) -> Optional[str]:
         """
-        Scrape content from a given URL
+        Scrape content from a given URL, serving it from the content cache when
+        a fresh copy exists. Rendered pages cannot be revalidated conditionally,
+        so only the TTL applies here.
         """
+        if self.content_cache is None:
+            return self._scrape_url(url)
+
+        entry = self.content_cache.lookup(url)
+        if entry.state == "fresh":
+            self.content_cache.record("hits")
+            return entry.doc.content
+        if entry.state == "negative":
+            self.content_cache.record("negative_hits")
+            logging.info(f"Skipping recently failed URL {url}: {entry.error}")
+            return None
+
+        text = self._scrape_url(url)
+        if text:
+            self.content_cache.store(url, ContentItem(url=url, title=url.split('/')[-1], content=text, source="Web Scraper"))
+            self.content_cache.record("misses")
+        else:
+            self.content_cache.store_failure(url, "No content scraped")
+            if entry.doc is not None:
+                self.content_cache.record("stale_served")
+                return entry.doc.content
+        return text
+
+    def _scrape_url(self, url: str) -> Optional[str]:
         try:
-            driver = self._setup_driver()
-            driver.get(url)
-            
-            # Wait for body to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Get page content
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            with self._pool().checkout() as driver:
+                driver.get(url)
                 
-            # Get text content
-            text = soup.get_text()
+                # Wait for body to load
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                page_source = driver.page_source
             
-            # Clean up text
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+            # Prefer the main article text; fall back to all visible text
+            extractor = get_extractor()
+            extracted = extractor.extract(page_source)
+            text = extracted.text if extracted else extractor.extract_page_text(page_source)
             
-            driver.quit()
             return text
             
         except Exception as e:
@@ -196,8 +215,11 @@ class WebScraper(BaseTool):
             else:
                 # Treat input as search query
                 search_results = json.loads(self.search(url))
-                for result in search_results:
-                    scraped_content = self.scrape_url(result['url'])
+                # Scrape results in parallel, one worker per pooled browser
+                workers = max(1, min(self._pool().size, len(search_results)))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="web-scrape") as executor:
+                    scraped = list(executor.map(self.scrape_url, [result['url'] for result in search_results]))
+                for result, scraped_content in zip(search_results, scraped):
                     if scraped_content:
                         content.append(
                             ContentItem(
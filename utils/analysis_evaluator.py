@@ -2,43 +2,8 @@ import logging
 from typing import Dict, Any
 import numpy as np
 import re
-import sys
-from datetime import datetime
 
-# Configure logging
-def setup_logging():
-    """Configure logging with both file and console handlers."""
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Create file handler
-    file_handler = logging.FileHandler(f'analysis_evaluator_{datetime.now().strftime("%Y%m%d")}.log')
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    
-    # Get root logger
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    
-    # Remove existing handlers to avoid duplicates
-    logger.handlers = []
-    
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
-
-# Set up logging
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 # Suppress watchdog logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
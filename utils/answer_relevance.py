@@ -1,76 +1,20 @@
 import logging
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from tools.research.common.model_schemas import ResearchToolOutput, ContentItem
-from typing import List, Dict, Tuple, Union, Any
+from utils.nlp_preprocessing import nlp, analyze_text, PreprocessedDocument
+from utils.async_logging import Sampler, lazy
+from typing import List, Dict, Tuple, Union, Any, Optional
 import json
-import sys
-from logging.handlers import RotatingFileHandler
-import os
-from datetime import datetime
-from collections import Counter
+import math
+import numpy as np
 
-def setup_logging(log_dir: str = "logs") -> logging.Logger:
-    """
-    Sets up logging configuration with both file and console handlers.
-    
-    Args:
-        log_dir: Directory to store log files
-        
-    Returns:
-        logging.Logger: Configured logger instance
-    """
-    # Create logs directory if it doesn't exist
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Generate log filename with timestamp
-    timestamp = datetime.now().strftime('%Y%m%d')
-    log_file = os.path.join(log_dir, f'relevance_evaluator_{timestamp}.log')
-    
-    # Create logger
-    logger = logging.getLogger('relevance_evaluator')
-    logger.setLevel(logging.DEBUG)
-    
-    # Create formatters
-    file_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-    )
-    console_formatter = logging.Formatter(
-        '%(levelname)s - %(message)s'
-    )
-    
-    # Create rotating file handler (10MB per file, max 5 backup files)
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=10*1024*1024,
-        backupCount=5
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(file_formatter)
-    
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(console_formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
-
-# Initialize logger
-logger = setup_logging()
+logger = logging.getLogger('relevance_evaluator')
 
-# Load spaCy model with error handling
-try:
-    nlp = spacy.blank('en')
-    nlp.add_pipe('sentencizer')
-    logger.info("Successfully initialized spaCy model")
-except Exception as e:
-    logger.critical(f"Failed to initialize spaCy model: {str(e)}", exc_info=True)
-    raise
+# calculate_similarity runs once per evaluated answer and list items are
+# extracted one by one; their debug messages are sampled
+_similarity_sample = Sampler()
+_item_sample = Sampler()
 
 class AnswerRelevanceEvaluator:
     """
@@ -103,11 +47,11 @@ class AnswerRelevanceEvaluator:
         """
         Calculate cosine similarity between two texts using TF-IDF vectors.
         """
-        self.logger.debug("Calculating similarity between texts")
-        self.logger.debug(f"Text1 length: {len(text1)}, Text2 length: {len(text2)}")
-        self.logger.debug(f"Text1 sample: {text1[:50]}...")
-        self.logger.debug(f"Text2 sample: {text2[:50]}...")
-        self.logger.debug("Vectorizer config: max_features=5000, using english stop words")
+        if _similarity_sample():
+            self.logger.debug(lazy(lambda: (
+                f"Calculating similarity - Text1 length: {len(text1)}, Text2 length: {len(text2)}, "
+                f"Text1 sample: {text1[:50]}..., Text2 sample: {text2[:50]}..."
+            )))
         
         if not text1.strip() or not text2.strip():
             self.logger.warning("Empty text provided for similarity calculation")
@@ -116,26 +60,84 @@ class AnswerRelevanceEvaluator:
         try:
             vectors = self.vectorizer.fit_transform([text1, text2])
             similarity = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
-            self.logger.debug(f"Similarity calculation successful: {similarity:.4f}")
             return similarity
         except Exception as e:
             self.logger.error(f"Error calculating similarity: {str(e)}", exc_info=True)
             return 0.0
     
+    def calculate_similarities(self, query: str, texts: List[str]) -> List[float]:
+        """
+        calculate_similarity(query, text) for many texts with a single fit.
+
+        Each pairwise score is the cosine of TF-IDF vectors fitted on just the
+        two texts, where a term in both gets idf 1 and a term in one gets
+        1 + ln(3/2). One CountVectorizer fit over the query and all texts
+        yields every pair's shared and unshared term counts, so all scores
+        come from a few sparse products.
+        """
+        self.logger.debug(f"Calculating similarity of {len(texts)} texts to the query")
+        if not texts:
+            return []
+        if not query.strip():
+            return [0.0] * len(texts)
+
+        params = self.vectorizer.get_params()
+        counter = CountVectorizer(
+            stop_words=params['stop_words'],
+            strip_accents=params['strip_accents'],
+            lowercase=params['lowercase'],
+            dtype=np.float64
+        )
+        try:
+            counts = counter.fit_transform([query] + texts).tocsr()
+        except ValueError:
+            # Nothing but stop words anywhere: every pairwise fit would fail
+            self.logger.warning("Empty vocabulary for similarity calculation")
+            return [0.0] * len(texts)
+
+        query_counts = counts[0].toarray().ravel()
+        text_counts = counts[1:]
+        in_query = (query_counts > 0).astype(np.float64)
+        unshared_idf_sq = (1 + math.log(1.5)) ** 2
+
+        dot = text_counts @ query_counts
+        squared = text_counts.multiply(text_counts)
+        text_shared_sq = squared @ in_query
+        text_total_sq = np.asarray(squared.sum(axis=1)).ravel()
+        present = text_counts.copy()
+        present.data[:] = 1
+        query_shared_sq = present @ (query_counts ** 2)
+        query_total_sq = float(query_counts @ query_counts)
+
+        query_norm = np.sqrt(query_shared_sq + unshared_idf_sq * (query_total_sq - query_shared_sq))
+        text_norm = np.sqrt(text_shared_sq + unshared_idf_sq * (text_total_sq - text_shared_sq))
+        denominator = query_norm * text_norm
+        similarities = np.divide(dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+
+        # A pair with more distinct terms than max_features would have been
+        # truncated by its own fit; score those the slow way
+        shared_terms = present @ in_query
+        distinct = np.diff(text_counts.indptr) + np.count_nonzero(query_counts) - shared_terms
+        scores = similarities.tolist()
+        for i in np.flatnonzero(distinct > params['max_features']):
+            scores[i] = self.calculate_similarity(query, texts[i])
+        for i, text in enumerate(texts):
+            if not text.strip():
+                scores[i] = 0.0
+        return scores
+
     def _extract_text_from_output(self, research_output: Union[ResearchToolOutput, str, List]) -> str:
         """
         Extract text content from research output or return the string directly.
         Handles string, ResearchToolOutput, ContentItem, and list inputs.
         """
-        self.logger.debug(f"Extracting text from output of type: {type(research_output)}")
+        self.logger.debug(lazy(lambda: f"Extracting text from output of type: {type(research_output)}"))
         
         try:
             if isinstance(research_output, str):
-                self.logger.debug("Processing string input")
                 return research_output
                 
             if isinstance(research_output, ResearchToolOutput):
-                self.logger.debug("Processing ResearchToolOutput")
                 return research_output.get_full_text()
                 
             if isinstance(research_output, list):
@@ -144,7 +146,8 @@ class AnswerRelevanceEvaluator:
                 texts = []
                 for item in research_output:
                     if hasattr(item, 'text'):
-                        self.logger.debug(f"Extracting text from ContentItem: {type(item)}")
+                        if _item_sample():
+                            self.logger.debug(lazy(lambda: f"Extracting text from ContentItem: {type(item)}"))
                         texts.append(item.text)
                     elif isinstance(item, str):
                         texts.append(item)
@@ -155,7 +158,6 @@ class AnswerRelevanceEvaluator:
             
             # Handle single ContentItem
             if hasattr(research_output, 'text'):
-                self.logger.debug("Processing ContentItem")
                 return research_output.text
             
             self.logger.warning(f"Unexpected input type: {type(research_output)}")
@@ -169,78 +171,78 @@ class AnswerRelevanceEvaluator:
             )
             return ""
 
-    def evaluate_answer_relevance(self, research_output: Union[ResearchToolOutput, str], query: str) -> Tuple[float, Dict]:
+    def evaluate_answer_relevance(
+        self,
+        research_output: Union[ResearchToolOutput, str],
+        query: str,
+        document: Optional[PreprocessedDocument] = None
+    ) -> Tuple[float, Dict]:
         """
         Evaluates the relevance of a research output to a query.
+        A PreprocessedDocument of the output, when given, supplies the
+        analyzed answer text instead of running the pipeline again.
         """
         self.logger.info(f"Starting relevance evaluation for query: {query[:100]}...")
-        self.logger.debug(f"Full query length: {len(query)}")
         
         try:
-            full_text = self._extract_text_from_output(research_output)
+            if document is not None:
+                full_text = document.full_text
+            else:
+                full_text = self._extract_text_from_output(research_output)
             
             if not full_text.strip():
                 self.logger.warning("Empty text extracted from research output")
                 return 0.0, self._create_empty_evaluation()
                 
-            self.logger.debug(f"Extracted text length: {len(full_text)}")
-            
             # Process documents with spaCy
-            self.logger.debug("Processing documents with spaCy")
-            self.logger.debug(f"Query processing started: {query[:100]}...")
-            query_doc = self.nlp(query)
-            self.logger.debug(f"Query tokens: {[token.text for token in query_doc][:10]}")
-            
-            self.logger.debug("Processing answer document")
-            answer_doc = self.nlp(full_text)
-            self.logger.debug(f"Answer document length: {len(answer_doc)}, sentences: {len(list(answer_doc.sents))}")
-            self.logger.debug(f"First few tokens: {[token.text for token in answer_doc][:10]}")
+            query_doc = analyze_text(query)
+            answer_doc = document.full if document is not None else analyze_text(full_text)
+            self.logger.debug(lazy(lambda: (
+                f"Query length: {len(query)}, tokens: {query_doc.tokens[:10]}; "
+                f"answer text length: {len(full_text)}, tokens: {len(answer_doc.tokens)}, "
+                f"sentences: {len(answer_doc.sentences)}, first tokens: {answer_doc.tokens[:10]}"
+            )))
             
             # Calculate semantic similarity
             similarity = self.calculate_similarity(query, full_text)
             self.logger.info(f"Semantic similarity score: {similarity:.4f}")
             
             # Calculate keyword coverage
-            query_keywords = {token.lemma_.lower() for token in query_doc 
-                            if token.pos_ in ['NOUN', 'VERB', 'ADJ'] and not token.is_stop}
-            answer_keywords = {token.lemma_.lower() for token in answer_doc 
-                             if token.pos_ in ['NOUN', 'VERB', 'ADJ'] and not token.is_stop}
-            
-            self.logger.debug(f"Query keywords found: {len(query_keywords)}")
-            self.logger.debug(f"Query keywords: {list(query_keywords)[:10]}")
-            self.logger.debug(f"Answer keywords found: {len(answer_keywords)}")
-            self.logger.debug(f"Common keywords: {list(query_keywords.intersection(answer_keywords))}")
-            self.logger.debug(f"POS distribution in query: {dict(Counter(token.pos_ for token in query_doc))}")
-            self.logger.debug(f"POS distribution in answer: {dict(Counter(token.pos_ for token in answer_doc))}")
+            query_keywords = query_doc.keywords
+            answer_keywords = answer_doc.keywords
             
+            self.logger.debug(lazy(lambda: (
+                f"Query keywords: {len(query_keywords)} {list(query_keywords)[:10]}; "
+                f"answer keywords: {len(answer_keywords)}; "
+                f"common: {list(query_keywords.intersection(answer_keywords))}"
+            )))
             
             keyword_coverage = (len(query_keywords.intersection(answer_keywords)) / len(query_keywords) 
                               if query_keywords else 0)
             self.logger.info(f"Keyword coverage score: {keyword_coverage:.4f}")
             
             # Entity coverage calculation
-            query_entities = set(ent.text.lower() for ent in query_doc.ents)
-            answer_entities = set(ent.text.lower() for ent in answer_doc.ents)
+            query_entities = query_doc.entities
+            answer_entities = answer_doc.entities
             entity_coverage = len(query_entities.intersection(answer_entities))
             
-            self.logger.debug(f"Query entities found: {list(query_entities)}")
-            self.logger.debug(f"Answer entities found: {list(answer_entities)[:10]}")
-            self.logger.debug(f"Matching entities: {list(query_entities.intersection(answer_entities))}")
-            self.logger.debug(f"Entity types in query: {[ent.label_ for ent in query_doc.ents]}")
-            self.logger.debug(f"Entity coverage count: {entity_coverage}")
-            self.logger.debug(f"Entity coverage percentage: {(entity_coverage / len(query_entities) * 100) if query_entities else 0:.2f}%")
+            self.logger.debug(lazy(lambda: (
+                f"Query entities: {list(query_entities)}; answer entities: {list(answer_entities)[:10]}; "
+                f"matching: {list(query_entities.intersection(answer_entities))} "
+                f"({(entity_coverage / len(query_entities) * 100) if query_entities else 0:.2f}%)"
+            )))
             
             # Process sentences
-            sentences = list(answer_doc.sents)
-            self.logger.debug(f"Processing {len(sentences)} sentences")
-            self.logger.debug(f"Average sentence length: {sum(len(sent) for sent in sentences) / len(sentences) if sentences else 0:.1f} tokens")
-            self.logger.debug(f"First 3 sentences: {[sent.text for sent in sentences[:3]]}")
-            self.logger.debug(f"Sentence length distribution: {[(i, len([s for s in sentences if len(s) == i])) for i in range(1, 6)]}")
+            sentences = answer_doc.sentences
+            lengths = answer_doc.sentence_lengths
+            self.logger.debug(lazy(lambda: (
+                f"Processing {len(sentences)} sentences, average length "
+                f"{sum(lengths) / len(lengths) if lengths else 0:.1f} tokens, "
+                f"length distribution: {[(i, lengths.count(i)) for i in range(1, 6)]}, "
+                f"first 3: {sentences[:3]}"
+            )))
             
-            sentence_similarities = [
-                (sent.text, self.calculate_similarity(query, sent.text))
-                for sent in sentences
-            ]
+            sentence_similarities = list(zip(sentences, self.calculate_similarities(query, sentences)))
             
             # Identify off-topic sentences
             off_topic_threshold = 0.2
@@ -0,0 +1,144 @@
+import atexit
+import itertools
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Optional
+
+# Application code only ever enqueues records: formatting and file/console
+# I/O happen on one background thread, so a request thread never waits on
+# a handler lock or a disk write. Entry points (main.py, app.py, run_tool)
+# call configure_logging(); library modules only get loggers.
+
+LOG_FORMAT = '%(asctime)s [%(levelname)s] %(name)s: %(message)s'
+
+# Per-item messages in loops are logged for one call in LOG_SAMPLE_EVERY
+DEFAULT_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that skips the per-handler lock (SimpleQueue.put is already
+    thread-safe) and the record copy and full format of QueueHandler.prepare:
+    the calling thread only renders the message, so lazy payloads see the
+    state they were logged with, and the writer thread does the rest.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            # Tracebacks hold frames; keep only their text on the queue
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    console: bool = True
+) -> QueueListener:
+    """
+    Route the root logger through a queue to a background writer thread.
+
+    Safe to call repeatedly (Streamlit reruns, several entry points): only
+    the first call installs handlers.
+
+    Args:
+        level: Root log level (default: LOG_LEVEL, INFO)
+        log_file: Rotating log file, "" for none (default: LOG_FILE,
+            research_agent.log)
+        console: Also write to stderr
+
+    Returns:
+        QueueListener: The background writer
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = []
+        if console:
+            handlers.append(logging.StreamHandler(sys.stderr))
+        log_file = os.getenv("LOG_FILE", "research_agent.log") if log_file is None else log_file
+        if log_file:
+            handlers.append(RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.handlers = [_NonBlockingQueueHandler(log_queue)]
+        root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+class _LazyMessage:
+    __slots__ = ("build",)
+
+    def __init__(self, build: Callable[[], Any]):
+        self.build = build
+
+    def __str__(self) -> str:
+        return str(self.build())
+
+
+def lazy(build: Callable[[], Any]) -> _LazyMessage:
+    """
+    Log message that is only built if the record is emitted.
+
+    `logger.debug(lazy(lambda: f"... {expensive()}"))` costs a level check
+    when DEBUG is off.
+    """
+    return _LazyMessage(build)
+
+
+class Sampler:
+    """
+    Lets one call in `every` through, for per-item messages in loops.
+
+    `if sample(): logger.debug(...)`. The counter is an itertools.count, so
+    concurrent callers never contend on a lock.
+
+    Args:
+        every: Keep one call in this many (default: LOG_SAMPLE_EVERY, 100)
+    """
+
+    def __init__(self, every: Optional[int] = None):
+        self.every = max(1, every or DEFAULT_SAMPLE_EVERY)
+        self._counter = itertools.count()
+
+    def __call__(self) -> bool:
+        return next(self._counter) % self.every == 0
@@ -0,0 +1,140 @@
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; bodies fall back to zlib
+    zstandard = None
+
+# Document bodies live compressed in content_bodies (one row per content id),
+# apart from the content metadata, so listings and lookups never read them;
+# ContentItem.content loads a body on first access. Rows of the content
+# table written before this layout may still hold their body inline in
+# content.content, which is used when a document has no content_bodies row.
+
+# Codec for newly written bodies: 'zstd' (needs the zstandard package),
+# 'zlib' or 'raw'. Stored bodies keep the codec they were written with until
+# compact_db.py recompresses them.
+BODY_CODEC = os.getenv("CONTENT_BODY_CODEC", "zstd" if zstandard is not None else "zlib")
+
+# Compression levels: zstd 1-22, zlib 1-9. Bodies are compressed on the
+# ingest path, so the zstd default stays fast; compact_db.py --level can
+# recompress them harder offline.
+ZSTD_LEVEL = int(os.getenv("CONTENT_ZSTD_LEVEL", "3"))
+ZLIB_LEVEL = int(os.getenv("CONTENT_ZLIB_LEVEL", "6"))
+
+# Bodies shorter than this many bytes are stored raw: compressing them saves
+# little and costs a decompression on every read
+MIN_COMPRESS_BYTES = 256
+
+CODECS = ('zstd', 'zlib', 'raw')
+
+# Upsert of a document body, keyed by its content id
+BODY_UPSERT_SQL = """
+    INSERT INTO content_bodies (doc_id, codec, size, body)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(doc_id) DO UPDATE SET
+        codec = excluded.codec,
+        size = excluded.size,
+        body = excluded.body
+"""
+
+logger = logging.getLogger(__name__)
+
+# zstd decompression contexts are not thread-safe; each thread reuses one
+# rather than setting one up per body
+_local = threading.local()
+
+if BODY_CODEC == 'zstd' and zstandard is None:
+    logger.warning("CONTENT_BODY_CODEC=zstd but zstandard is not installed; compressing bodies with zlib")
+    BODY_CODEC = 'zlib'
+
+
+def compress_body(text: str, codec: Optional[str] = None, level: Optional[int] = None) -> Tuple[str, bytes]:
+    """
+    Compress a document body for content_bodies.
+
+    Args:
+        text: The body
+        codec: 'zstd', 'zlib' or 'raw' (default: BODY_CODEC)
+        level: Compression level (default: ZSTD_LEVEL or ZLIB_LEVEL)
+
+    Returns:
+        Tuple[str, bytes]: The codec actually used and the stored bytes
+    """
+    codec = codec or BODY_CODEC
+    data = (text or "").encode('utf-8')
+    if len(data) < MIN_COMPRESS_BYTES or codec == 'raw':
+        return 'raw', data
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd bodies need the zstandard package")
+        # Compressor objects are not thread-safe; creating one is cheap
+        return 'zstd', zstandard.ZstdCompressor(level=level or ZSTD_LEVEL).compress(data)
+    if codec == 'zlib':
+        return 'zlib', zlib.compress(data, level or ZLIB_LEVEL)
+    raise ValueError(f"Unknown body codec: {codec}")
+
+
+def body_row(doc_id: str, text: str, codec: Optional[str] = None, level: Optional[int] = None) -> Tuple[str, str, int, bytes]:
+    """Parameters of BODY_UPSERT_SQL for a document body (size: uncompressed bytes)."""
+    text = text or ""
+    codec, data = compress_body(text, codec, level)
+    return doc_id, codec, len(text.encode('utf-8')), data
+
+
+def decompress_body(codec: Optional[str], data: Optional[bytes]) -> Optional[str]:
+    """
+    Decode a body stored by compress_body (None stays None, for SQL NULLs).
+
+    Raises:
+        ValueError: If the codec is unknown or zstandard is missing for a zstd body
+    """
+    if data is None:
+        return None
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd bodies need the zstandard package")
+        decompressor = getattr(_local, 'decompressor', None)
+        if decompressor is None:
+            decompressor = _local.decompressor = zstandard.ZstdDecompressor()
+        data = decompressor.decompress(data)
+    elif codec == 'zlib':
+        data = zlib.decompress(data)
+    elif codec != 'raw':
+        raise ValueError(f"Unknown body codec: {codec}")
+    return bytes(data).decode('utf-8')
+
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    """
+    Make content_body(codec, body) available to SQL on `conn`: the search
+    index reads bodies through it (see utils.db). Called for every
+    connection of a ContentDB pool, and by tools opening the database
+    directly.
+    """
+    conn.create_function("content_body", 2, decompress_body, deterministic=True)
+
+
+def read_body(conn: sqlite3.Connection, doc_id: str) -> str:
+    """
+    The body of a stored document: its content_bodies row, or the inline
+    body of a row written before bodies were stored apart.
+
+    Args:
+        conn: Connection to read with
+        doc_id: Content id
+
+    Returns:
+        str: The body ("" if the document has none or is gone)
+    """
+    row = conn.execute("SELECT codec, body FROM content_bodies WHERE doc_id = ?", (doc_id,)).fetchone()
+    if row is not None:
+        return decompress_body(*row)
+    row = conn.execute("SELECT content FROM content WHERE id = ?", (doc_id,)).fetchone()
+    return (row[0] or "") if row else ""
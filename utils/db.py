@@ -1,27 +1,70 @@
 from tools.research.common.model_schemas import ContentItem
 from typing import Optional, Dict, Any, List
-import threading
+import hashlib
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import sqlite3
 import os
 import json
+import re
 from datetime import datetime
+from utils.sqlite_pool import SQLitePool
+from utils.migrations import migrate
+from utils.content_store import BODY_UPSERT_SQL, body_row, read_body, register_functions
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the entry point (utils.async_logging)
 logger = logging.getLogger(__name__)
 
+# Content metadata: bodies are stored apart and loaded lazily (see utils.content_store)
+_CONTENT_COLUMNS = ["id", "url", "title", "snippet", "source"]
+
+# BM25 weights of the indexed columns: title, snippet, content
+_SEARCH_WEIGHTS = (3.0, 2.0, 1.0)
+
+# Words too common to help rank content; matching them would only make the
+# index walk most of its postings
+_SEARCH_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "their this to was were what when where which who why will with".split()
+)
+
+# Documents per id/URL lookup in upsert_docs (well under SQLite's variable limit)
+_UPSERT_CHUNK = 500
+
+# One statement for new and stored documents: a stored URL keeps its id. The
+# body goes to content_bodies; content.content only held it before that.
+_UPSERT_SQL = """
+    INSERT INTO content (id, url, title, snippet, content, source)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title = excluded.title,
+        snippet = excluded.snippet,
+        content = excluded.content,
+        source = excluded.source
+"""
+
+
+def _url_hash(url: str) -> str:
+    """Deterministic document id for a URL."""
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
 class ContentDB:
     def __init__(self, db_path: str):
           # Initial breakpoint
-        self.lock = threading.Lock()
-        
         db_dir = os.path.dirname(db_path)
         if not os.path.exists(db_dir):
-            os.makedirs(db_dir)
+            # exist_ok: another ContentDB may be creating it at the same time
+            os.makedirs(db_dir, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL database: reads use pooled reader connections; every write
+        # goes through the single writer `conn`, serialized by `lock`, and
+        # is group-committed (see SQLitePool; flush() forces a commit)
+        self.pool = SQLitePool(db_path, on_connect=register_functions)
+        self.conn = self.pool.writer
+        self.lock = self.pool.write_lock
+        # Body loader shared by the lazy items this database returns
+        self._load_body = self.get_body
 
         with self.lock:
             self.conn.executescript("""
@@ -113,104 +156,306 @@ class ContentDB:
                 );
             """)
             self.conn.commit()
+            migrate(self.conn)
+            self._search_enabled = self._init_search_index()
+
+    def _init_search_index(self) -> bool:
+        """
+        Create the full-text index over content titles, snippets and bodies.
+
+        An FTS5 table over the content_text view (content metadata joined
+        with its decompressed body), kept in sync by triggers on content and
+        content_bodies, and filled from existing rows when first created.
+        The triggers call content_body(), so the database can only be
+        written through connections that registered it
+        (utils.content_store.register_functions). It is keyed by the content
+        rowid, so anything that VACUUMs the database must call
+        rebuild_search_index() afterwards. Must be called with the lock held.
+
+        Returns:
+            bool: Whether the index is available (FTS5 may be compiled out)
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'content_fts'"
+        ).fetchone() is not None
+        try:
+            # A document's indexed body is its content_bodies row, or the
+            # inline body of a row written before bodies were stored apart.
+            # Each trigger removes exactly what was indexed before the change.
+            self.conn.executescript("""
+                CREATE VIEW IF NOT EXISTS content_text AS
+                    SELECT c.rowid AS doc_rowid, c.title, c.snippet,
+                           COALESCE(content_body(b.codec, b.body), c.content) AS content
+                    FROM content c LEFT JOIN content_bodies b ON b.doc_id = c.id;
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS content_fts USING fts5(
+                    title, snippet, content,
+                    content='content_text', content_rowid='doc_rowid',
+                    tokenize='porter unicode61'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS content_fts_insert AFTER INSERT ON content BEGIN
+                    INSERT INTO content_fts(rowid, title, snippet, content)
+                    VALUES (new.rowid, new.title, new.snippet, COALESCE(
+                        (SELECT content_body(codec, body) FROM content_bodies WHERE doc_id = new.id), new.content));
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS content_fts_delete AFTER DELETE ON content BEGIN
+                    INSERT INTO content_fts(content_fts, rowid, title, snippet, content)
+                    VALUES ('delete', old.rowid, old.title, old.snippet, COALESCE(
+                        (SELECT content_body(codec, body) FROM content_bodies WHERE doc_id = old.id), old.content));
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS content_fts_update AFTER UPDATE ON content
+                WHEN old.title IS NOT new.title OR old.snippet IS NOT new.snippet
+                    OR old.content IS NOT new.content OR old.id IS NOT new.id BEGIN
+                    INSERT INTO content_fts(content_fts, rowid, title, snippet, content)
+                    VALUES ('delete', old.rowid, old.title, old.snippet, COALESCE(
+                        (SELECT content_body(codec, body) FROM content_bodies WHERE doc_id = old.id), old.content));
+                    INSERT INTO content_fts(rowid, title, snippet, content)
+                    VALUES (new.rowid, new.title, new.snippet, COALESCE(
+                        (SELECT content_body(codec, body) FROM content_bodies WHERE doc_id = new.id), new.content));
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS content_bodies_fts_insert AFTER INSERT ON content_bodies BEGIN
+                    INSERT INTO content_fts(content_fts, rowid, title, snippet, content)
+                    SELECT 'delete', rowid, title, snippet, content FROM content WHERE id = new.doc_id;
+                    INSERT INTO content_fts(rowid, title, snippet, content)
+                    SELECT rowid, title, snippet, content_body(new.codec, new.body) FROM content WHERE id = new.doc_id;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS content_bodies_fts_delete AFTER DELETE ON content_bodies BEGIN
+                    INSERT INTO content_fts(content_fts, rowid, title, snippet, content)
+                    SELECT 'delete', rowid, title, snippet, content_body(old.codec, old.body) FROM content WHERE id = old.doc_id;
+                    INSERT INTO content_fts(rowid, title, snippet, content)
+                    SELECT rowid, title, snippet, content FROM content WHERE id = old.doc_id;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS content_bodies_fts_update AFTER UPDATE ON content_bodies
+                WHEN old.body IS NOT new.body OR old.codec IS NOT new.codec OR old.doc_id IS NOT new.doc_id BEGIN
+                    INSERT INTO content_fts(content_fts, rowid, title, snippet, content)
+                    SELECT 'delete', rowid, title, snippet, content_body(old.codec, old.body) FROM content WHERE id = old.doc_id;
+                    INSERT INTO content_fts(rowid, title, snippet, content)
+                    SELECT rowid, title, snippet, content_body(new.codec, new.body) FROM content WHERE id = new.doc_id;
+                END;
+            """)
+            if not exists:
+                logger.info("Building content search index")
+                self.conn.execute("INSERT INTO content_fts(content_fts) VALUES ('rebuild')")
+            self.conn.commit()
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Content search index unavailable, falling back to recency order: {e}")
+            self.conn.rollback()
+            return False
+
+    def rebuild_search_index(self) -> None:
+        """Rebuild the content search index from the content and content_bodies tables."""
+        if not self._search_enabled:
+            return
+        with self.lock:
+            self.conn.execute("INSERT INTO content_fts(content_fts) VALUES ('rebuild')")
+            self.conn.commit()
+
+    @staticmethod
+    def _search_query(text: str) -> str:
+        """FTS5 query matching any of the words of `text` (each quoted, so no operators leak in)."""
+        terms = []
+        for word in re.findall(r"\w+", text.lower()):
+            if len(word) > 1 and word not in _SEARCH_STOP_WORDS and word not in terms:
+                terms.append(word)
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def get_content(self, exclude_ids: Optional[List[str]] = None, limit: Optional[int] = None) -> List[ContentItem]:
+        """
+        Stored content, most recent first.
+
+        Args:
+            exclude_ids: IDs to leave out
+            limit: Maximum number of items (all when None)
+
+        Returns:
+            List[ContentItem]: The content items
+        """
+        excluded = set(exclude_ids or [])
+        sql = f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content ORDER BY created_at DESC, rowid DESC"
+        params: tuple = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit + len(excluded),)
+        with self.pool.read() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        items = [self._lazy_item(row) for row in rows if row[0] not in excluded]
+        return items if limit is None else items[:limit]
+
+    def search_content(self, query: str, limit: int = 30, exclude_ids: Optional[List[str]] = None) -> List[ContentItem]:
+        """
+        Content ranked by BM25 relevance to a query, best first.
+
+        Only items sharing at least one word with the query are returned, so
+        the result may be shorter than `limit`. Without a usable index or
+        query words this is get_content(exclude_ids, limit).
+
+        Args:
+            query: Free text, e.g. a research topic
+            limit: Maximum number of items
+            exclude_ids: IDs to leave out
+
+        Returns:
+            List[ContentItem]: The best matching content items
+        """
+        match = self._search_query(query)
+        if not match or not self._search_enabled:
+            return self.get_content(exclude_ids=exclude_ids, limit=limit)
+
+        excluded = set(exclude_ids or [])
+        columns = ", ".join(f"c.{column}" for column in _CONTENT_COLUMNS)
+        weights = ", ".join(str(weight) for weight in _SEARCH_WEIGHTS)
+        with self.pool.read() as conn:
+            # Excluded rows are dropped afterwards, so fetch enough to cover them
+            rows = conn.execute(
+                f"""
+                SELECT {columns}
+                FROM content_fts f JOIN content c ON c.rowid = f.rowid
+                WHERE content_fts MATCH ?
+                ORDER BY bm25(content_fts, {weights})
+                LIMIT ?
+                """,
+                (match, limit + len(excluded)),
+            ).fetchall()
+        items = [self._lazy_item(row) for row in rows if row[0] not in excluded]
+        return items[:limit]
                 
+    def _lazy_item(self, row: tuple) -> ContentItem:
+        """A ContentItem from a _CONTENT_COLUMNS row; its body is read on first access."""
+        return ContentItem.lazy(self._load_body, **dict(zip(_CONTENT_COLUMNS, row)))
+
+    def get_body(self, id: str) -> str:
+        """
+        The body of a stored document, decompressed.
+
+        Args:
+            id: Document ID
+
+        Returns:
+            str: The body ("" if the document has none or is gone)
+        """
+        with self.pool.read(fresh=True) as conn:
+            return read_body(conn, id)
+
     def get_doc_by_id(self, id: str) -> Optional[ContentItem]:
           # Breakpoint before ID retrieval
         logger.info(f"Retrieving document with ID: {id}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read(fresh=True) as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, url, title, snippet, content, source FROM content WHERE id = ?",
+                f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content WHERE id = ?",
                 (id,),
             )
             row = cursor.fetchone()
-            return (
-                ContentItem(
-                    **dict(
-                        zip(["id", "url", "title", "snippet", "content", "source"], row)
-                    )
-                )
-                if row
-                else None
-            )
+        return self._lazy_item(row) if row else None
 
     def get_doc_by_url(self, url: str) -> Optional[ContentItem]:
           # Breakpoint before URL retrieval
         logger.info(f"Retrieving document with URL: {url}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read(fresh=True) as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "SELECT id, url, title, snippet, content, source FROM content WHERE url = ?",
+                f"SELECT {', '.join(_CONTENT_COLUMNS)} FROM content WHERE url = ?",
                 (url,),
             )
             row = cursor.fetchone()
-            return (
-                ContentItem(
-                    **dict(
-                        zip(["id", "url", "title", "snippet", "content", "source"], row)
-                    )
-                )
-                if row
-                else None
-            )
+        return self._lazy_item(row) if row else None
 
     def upsert_doc(self, doc: ContentItem) -> bool:
-          # Breakpoint before upsert
-        logger.info(f"Upserting document: {doc.id}")
-        
-        with self.lock:
-            cursor = self.conn.cursor()
+        """
+        Insert or update one document, keyed by URL (see upsert_docs).
+
+        Returns:
+            bool: True if the document was new, False if its URL was stored
+        """
+        return self.upsert_docs([doc])['inserted'] == 1
+
+    def upsert_docs(self, docs: List[ContentItem]) -> Dict[str, int]:
+        """
+        Insert or update documents in one transaction, keyed by URL.
+
+        A document whose URL is stored updates that row and takes its id. A
+        new document keeps its id unless another URL holds it, in which case
+        the id gets a suffix hashed from its URL; documents without an id
+        get a URL hash. Ids are therefore deterministic, and each document's
+        `id` is set to the id it is stored under. When a URL repeats within
+        `docs` the last copy wins.
+
+        Args:
+            docs: Documents to store
+
+        Returns:
+            Dict[str, int]: Numbers of 'inserted' and 'updated' documents
+
+        Raises:
+            sqlite3.IntegrityError: If the batch cannot be stored (nothing is written)
+        """
+        counts = {'inserted': 0, 'updated': 0}
+        if not docs:
+            return counts
+
+        # Compressed before taking the write lock (this also loads lazy bodies)
+        bodies = [body_row(doc.id, doc.content) for doc in docs]
+
+        with self.pool.write():
             try:
-                # Check if document with this ID already exists
-                cursor.execute("SELECT 1 FROM content WHERE id = ?", (doc.id,))
-                id_exists = cursor.fetchone() is not None
-                
-                # If ID exists, generate a new unique ID
-                if id_exists:
-                    base_id = doc.id
-                    counter = 1
-                    while id_exists:
-                        new_id = f"{base_id}_{counter}"
-                        cursor.execute("SELECT 1 FROM content WHERE id = ?", (new_id,))
-                        id_exists = cursor.fetchone() is not None
-                        counter += 1
-                    doc.id = new_id
-                    logging.info(f"Generated new ID for document: {doc.id}")
-
-                # Check if URL exists (for determining if this is an insert or update)
-                cursor.execute("SELECT 1 FROM content WHERE url = ?", (doc.url,))
-                is_new = cursor.fetchone() is None
-
-                # Insert or update the document
-                cursor.execute(
-                    """
-                    INSERT INTO content (id, url, title, snippet, content, source)
-                    VALUES (:id, :url, :title, :snippet, :content, :source)
-                    ON CONFLICT(id) DO UPDATE SET  
-                        title=excluded.title,
-                        snippet=excluded.snippet,
-                        content=excluded.content,
-                        source=excluded.source
-                    """,
-                    doc.to_dict(),
-                )
-                self.conn.commit()
-                logging.info(f"Document {'inserted' if is_new else 'updated'} successfully: {doc.id}")
-                  # Breakpoint after upsert
-                return is_new
-                
+                # Ids and URLs already stored, looked up in chunks
+                ids_by_url: Dict[str, str] = {}
+                urls_by_id: Dict[str, str] = {}
+                for start in range(0, len(docs), _UPSERT_CHUNK):
+                    chunk = docs[start:start + _UPSERT_CHUNK]
+                    for column, keys in (('url', [doc.url for doc in chunk]), ('id', [doc.id for doc in chunk if doc.id])):
+                        if not keys:
+                            continue
+                        placeholders = ', '.join('?' * len(keys))
+                        for doc_id, url in self.conn.execute(
+                            f"SELECT id, url FROM content WHERE {column} IN ({placeholders})", keys
+                        ):
+                            ids_by_url[url] = doc_id
+                            urls_by_id[doc_id] = url
+
+                rows = []
+                body_rows = []
+                for doc, body in zip(docs, bodies):
+                    if doc.url in ids_by_url:
+                        doc.id = ids_by_url[doc.url]
+                        counts['updated'] += 1
+                    else:
+                        doc_id = doc.id or _url_hash(doc.url)
+                        if urls_by_id.get(doc_id, doc.url) != doc.url:
+                            doc_id = f"{doc_id}_{_url_hash(doc.url)[:8]}"
+                        doc.id = doc_id
+                        ids_by_url[doc.url] = doc_id
+                        urls_by_id[doc_id] = doc.url
+                        counts['inserted'] += 1
+                    rows.append((doc.id, doc.url, doc.title, doc.snippet, "", doc.source))
+                    body_rows.append((doc.id,) + body[1:])
+
+                # Bodies first: a new row is then indexed for search once, with its body
+                self.conn.executemany(BODY_UPSERT_SQL, body_rows)
+                self.conn.executemany(_UPSERT_SQL, rows)
+                self.pool.commit()
+                logger.debug(f"Upserted {len(docs)} documents: {counts['inserted']} inserted, {counts['updated']} updated")
+                return counts
+
             except sqlite3.IntegrityError as e:
-                logging.error(f"Error inserting/updating document: {e}")
-                self.conn.rollback()
+                logger.error(f"Error inserting/updating documents: {e}")
+                self.pool.rollback()
                 raise
 
     def store_source_coverage(self, data: Dict[str, Any]) -> int:
           # Breakpoint before storing source coverage
         logger.info("Storing source coverage evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 cursor = self.conn.cursor()
                 cursor.execute(
@@ -236,16 +481,16 @@ class ContentDB:
                         'domain_variety_score': data.get('domain_variety_score', 0.0)
                     }
                 )
-                self.conn.commit()
+                self.pool.commit()
                   # Breakpoint after storing source coverage
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logging.error(f"Error storing source coverage: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
             
     def store_test_results(self, query: str, overall_score: float, details: Dict[str, Any]) -> int:
-        with self.lock:
+        with self.pool.write():
             try:
                 cursor = self.conn.execute("""
                     INSERT INTO automated_tests (
@@ -264,18 +509,18 @@ class ContentDB:
                     details['hallucination_score'],
                     json.dumps(details['suspicious_segments'])
                 ))
-                self.conn.commit()
+                self.pool.commit()
                 return cursor.lastrowid
             except Exception as e:
                 logging.error(f"Error storing test results: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
                 
     def store_logical_coherence(self, data: Dict[str, Any]) -> int:
           # Breakpoint before storing logical coherence
         logger.info("Storing logical coherence evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 cursor = self.conn.cursor()
                 cursor.execute(
@@ -305,19 +550,19 @@ class ContentDB:
                         'logical_fallacies_count': data.get('logical_fallacies_count', 0)
                     }
                 )
-                self.conn.commit()
+                self.pool.commit()
                   # Breakpoint after storing logical coherence
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logging.error(f"Error storing logical coherence: {e}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
 
     def store_analysis_evaluation(self, evaluation_data: Dict[str, Any]) -> int:
         """Store analysis evaluation results in the database."""
         logger.info("Storing analysis evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 insert_data = {
                     'query': evaluation_data.get('query', 'Unknown'),
@@ -346,27 +591,27 @@ class ContentDB:
                     )
                 """, insert_data)
                 
-                self.conn.commit()
+                self.pool.commit()
                 return cursor.lastrowid
                 
             except Exception as e:
                 logger.error(f"Error storing analysis evaluation: {str(e)}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
 
     def get_analysis_evaluations(self, query: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Retrieve analysis evaluation results from the database."""
         logger.info(f"Retrieving analysis evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
                         """
                         SELECT * FROM analysis_evaluations 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -375,7 +620,7 @@ class ContentDB:
                     cursor.execute(
                         """
                         SELECT * FROM analysis_evaluations 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (limit,)
@@ -406,7 +651,7 @@ class ContentDB:
     def store_answer_relevance(self, data: Dict[str, Any]) -> int:
         logger.info("Storing answer relevance evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 formatted_data = {
                     'query': str(data.get('query', 'Unknown')),
@@ -438,18 +683,18 @@ class ContentDB:
                     """,
                     formatted_data
                 )
-                self.conn.commit()
+                self.pool.commit()
                 return cursor.lastrowid
             except sqlite3.Error as e:
                 logger.error(f"Error storing answer relevance: {e}", exc_info=True)
-                self.conn.rollback()
+                self.pool.rollback()
                 return -1
                 
     def store_accuracy_evaluation(self, accuracy_data: Dict[str, Any]):
           # Breakpoint before storing accuracy evaluation
         logger.info("Storing accuracy evaluation")
         
-        with self.lock:
+        with self.pool.write():
             try:
                 insert_data = {
                     'query': accuracy_data.get('query', 'Unknown'),
@@ -481,31 +726,31 @@ class ContentDB:
                     insert_data
                 )
                 
-                self.conn.commit()
+                self.pool.commit()
                   # Breakpoint after storing accuracy evaluation
                 return cursor.lastrowid
             except Exception as e:
                 logger.error(f"Error storing factual accuracy: {str(e)}")
-                self.conn.rollback()
+                self.pool.rollback()
                 return None
     def get_test_results(self, query: str = None, limit: int = 50):
-        with self.lock:
+        with self.pool.read() as conn:
             try:
                 if query:
-                    cursor = self.conn.execute(
+                    cursor = conn.execute(
                         """
                         SELECT * FROM automated_tests 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
                     )
                 else:
-                    cursor = self.conn.execute(
+                    cursor = conn.execute(
                         """
                         SELECT * FROM automated_tests 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """,
                         (limit,)
@@ -525,8 +770,8 @@ class ContentDB:
         # Breakpoint before retrieving accuracy evaluations
         logger.info(f"Retrieving accuracy evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -537,7 +782,7 @@ class ContentDB:
                         source_credibility_score, fact_check_coverage
                         FROM factual_accuracy 
                         WHERE query LIKE ? 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -550,7 +795,7 @@ class ContentDB:
                         verified_claims, unverified_claims, 
                         source_credibility_score, fact_check_coverage
                         FROM factual_accuracy 
-                        ORDER BY timestamp DESC 
+                        ORDER BY recorded_at DESC 
                         LIMIT ?
                         """, 
                         (limit,)
@@ -578,8 +823,8 @@ class ContentDB:
         # Breakpoint before retrieving source coverage evaluations
         logger.info(f"Retrieving source coverage evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -590,7 +835,7 @@ class ContentDB:
                             cross_referencing_score, domain_variety_score
                         FROM source_coverage_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
@@ -603,7 +848,7 @@ class ContentDB:
                             unique_domains, source_depth, 
                             cross_referencing_score, domain_variety_score
                         FROM source_coverage_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (limit,)
@@ -631,8 +876,8 @@ class ContentDB:
     # Breakpoint before retrieving logical coherence evaluations
         logger.info(f"Retrieving logical coherence evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -645,7 +890,7 @@ class ContentDB:
                         logical_fallacies_count
                         FROM logical_coherence_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (f'%{query}%', limit)
@@ -660,7 +905,7 @@ class ContentDB:
                         semantic_connection_score, idea_progression_score,
                         logical_fallacies_count
                         FROM logical_coherence_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """,
                         (limit,)
@@ -690,8 +935,8 @@ class ContentDB:
         # Breakpoint before retrieving answer relevance evaluations
         logger.info(f"Retrieving answer relevance evaluations for query: {query}")
         
-        with self.lock:
-            cursor = self.conn.cursor()
+        with self.pool.read() as conn:
+            cursor = conn.cursor()
             try:
                 if query:
                     cursor.execute(
@@ -702,7 +947,7 @@ class ContentDB:
                             information_density, context_alignment_score
                         FROM answer_relevance_evaluations
                         WHERE query LIKE ?
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """, 
                         (f'%{query}%', limit)
@@ -715,7 +960,7 @@ class ContentDB:
                             off_topic_sentences, total_sentences, query_match_percentage, 
                             information_density, context_alignment_score
                         FROM answer_relevance_evaluations
-                        ORDER BY timestamp DESC
+                        ORDER BY recorded_at DESC
                         LIMIT ?
                         """, 
                         (limit,)
@@ -743,10 +988,11 @@ class ContentDB:
     # Breakpoint before document deletion
         logger.info(f"Deleting document with ID: {id}")
         
-        with self.lock:
+        with self.pool.write():
             cursor = self.conn.cursor()
             cursor.execute("DELETE FROM content WHERE id = ?", (id,))
-            self.conn.commit()
+            cursor.execute("DELETE FROM content_bodies WHERE doc_id = ?", (id,))
+            self.pool.commit()
 
     def generate_snippet(self, text: str) -> str:
     # Breakpoint before snippet generation
@@ -754,9 +1000,16 @@ class ContentDB:
 
         return f"{text[:150]}..." 
 
+    def flush(self) -> None:
+        """
+        Commit buffered writes now, making them durable and visible to
+        readers (they are otherwise group-committed within
+        WRITE_BEHIND_MAX_DELAY).
+        """
+        self.pool.flush()
+
     def close(self):
     # Breakpoint before closing connection
         logger.info("Closing database connection")
         
-        with self.lock:
-            self.conn.close()
\ No newline at end of file
+        self.pool.close()
\ No newline at end of file
@@ -1,20 +1,11 @@
-import spacy
 import numpy as np
-from typing import List, Dict, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Dict, Tuple, Optional
 from tools.research.common.model_schemas import ResearchToolOutput
-
-nlp = spacy.blank('en')
-nlp.add_pipe('sentencizer')
+from utils.nlp_preprocessing import nlp, PreprocessedDocument
 
 class FactualAccuracyEvaluator:
     def __init__(self):
         self.nlp = nlp
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            stop_words='english'
-        )
 
     def _check_entailment(self, claim: str, source_text: str) -> float:
         claim_doc = self.nlp(claim)
@@ -22,20 +13,47 @@ class FactualAccuracyEvaluator:
         similarity = claim_doc.similarity(source_doc)
         return min(max(similarity, 0), 1)
 
-    def evaluate_factual_accuracy(self, research_output: ResearchToolOutput) -> Tuple[float, Dict]:
+    def _entailment_matrix(self, left: List, right: List) -> np.ndarray:
+        """
+        _check_entailment for every pair of parsed docs at once: cosine of the
+        averaged word vectors, 1.0 for identical token sequences, 0 where a
+        doc has no vector, clipped to [0, 1].
+
+        Args:
+            left: Docs for the rows
+            right: Docs for the columns
+
+        Returns:
+            np.ndarray: len(left) x len(right) similarity matrix
+        """
+        scores = np.zeros((len(left), len(right)))
+        if left and right:
+            def unit_rows(docs):
+                vectors = np.vstack([doc.vector for doc in docs]).astype(np.float64)
+                norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+                return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+            scores = unit_rows(left) @ unit_rows(right).T
+
+        orths = {}
+        for j, doc in enumerate(right):
+            orths.setdefault(tuple(token.orth for token in doc), []).append(j)
+        for i, doc in enumerate(left):
+            for j in orths.get(tuple(token.orth for token in doc), ()):
+                scores[i, j] = 1.0
+        return np.clip(scores, 0, 1)
+
+    def evaluate_factual_accuracy(
+        self,
+        research_output: ResearchToolOutput,
+        document: Optional[PreprocessedDocument] = None
+    ) -> Tuple[float, Dict]:
+        document = document or PreprocessedDocument(research_output)
         all_sources = [
-            {
-                'text': content.content or content.snippet, 
-                'url': content.url
-            } for content in research_output.content
+            {'text': text, 'url': url}
+            for text, url in zip(document.source_texts, document.source_urls)
         ]
         
-        full_text = research_output.summary or " ".join(
-            content.content for content in research_output.content
-        )
-        
-        doc = self.nlp(full_text)
-        claims = [sent.text for sent in doc.sents if any(token.dep_ == 'ROOT' for token in sent)]
+        claims = document.summary.claims
         
         claim_scores = []
         claim_details = []
@@ -47,42 +65,42 @@ class FactualAccuracyEvaluator:
         if not claims:
             return 0, {'message': 'No claims to evaluate'}
 
-        for idx, claim in enumerate(claims, 1):
-            max_score = 0
-            best_source = None
-            source_credibility = 0
-            
-            if not all_sources:  # Check if there are no sources
-                continue
+        if all_sources:
+            # Parse every claim and source once and score all pairs in two
+            # matrix products, rather than two parses per pair
+            docs = list(self.nlp.pipe(claims + [source['text'] for source in all_sources]))
+            claim_docs, source_docs = docs[:len(claims)], docs[len(claims):]
+            source_matrix = self._entailment_matrix(claim_docs, source_docs)
+            claim_matrix = self._entailment_matrix(claim_docs, claim_docs)
+
+            # A claim contradicts when any differently-worded claim scores below 0.3
+            texts = np.array(claims, dtype=object)
+            differs = texts[:, None] != texts[None, :]
+            contradicts = ((claim_matrix < 0.3) & differs).any(axis=1)
 
-            for source in all_sources:
-                score = self._check_entailment(claim, source['text'])
-                if score > max_score:
-                    max_score = score
-                    best_source = source
-                source_credibility = max(source_credibility, score)
-            
-            if max_score > 0.7:
-                verified_claims += 1
-            else:
-                unverified_claims += 1
-            
-            # Check for contradictions between claims
-            for other_claim in claims:
-                if other_claim != claim:
-                    contradiction_score = self._check_entailment(claim, other_claim)
-                    if contradiction_score < 0.3:
-                        contradicting_claims += 1
-                        break
-            
-            claim_scores.append(max_score)
-            source_credibility_scores.append(source_credibility)
-            
-            claim_details.append({
-                'claim': claim,
-                'score': max_score,
-                'best_source': best_source['url'] if best_source else None
-            })
+            for idx, claim in enumerate(claims):
+                # First best source, as a strict > scan over the sources would pick
+                best = int(np.argmax(source_matrix[idx]))
+                max_score = float(source_matrix[idx, best])
+                best_source = all_sources[best] if max_score > 0 else None
+                if best_source is None:
+                    max_score = 0
+                
+                if max_score > 0.7:
+                    verified_claims += 1
+                else:
+                    unverified_claims += 1
+                
+                contradicting_claims += int(contradicts[idx])
+                
+                claim_scores.append(max_score)
+                source_credibility_scores.append(max_score)
+                
+                claim_details.append({
+                    'claim': claim,
+                    'score': max_score,
+                    'best_source': best_source['url'] if best_source else None
+                })
         
         # Check if claim_scores are empty
         citation_accuracy = sum(1 for score in claim_scores if score > 0.7) / len(claims) if claims else 0
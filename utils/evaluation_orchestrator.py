@@ -0,0 +1,334 @@
+from concurrent.futures import (
+    FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import multiprocessing
+import threading
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import atexit
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for evaluations waiting for a worker (their
+# deadline starts when they get one)
+START_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class EvaluatorSpec:
+    """
+    How to build and call one evaluator.
+
+    Args:
+        factory: Dotted path of the module-level factory, e.g.
+            'utils.evaluation:create_factual_accuracy_evaluator'
+        method: Name of the evaluation method on the evaluator
+        cpu_bound: Run in the process pool rather than a thread
+        timeout: Seconds before the evaluation is abandoned (None: orchestrator default)
+    """
+    factory: str
+    method: str
+    cpu_bound: bool = True
+    timeout: Optional[float] = None
+
+
+EVALUATORS: Dict[str, EvaluatorSpec] = {
+    "factual_accuracy": EvaluatorSpec("utils.evaluation:create_factual_accuracy_evaluator", "evaluate_factual_accuracy"),
+    "source_coverage": EvaluatorSpec("utils.source_coverage:create_source_coverage_evaluator", "evaluate_source_coverage"),
+    "logical_coherence": EvaluatorSpec("utils.logical_coherence:create_logical_coherence_evaluator", "evaluate_logical_coherence"),
+    "answer_relevance": EvaluatorSpec("utils.answer_relevance:create_answer_relevance_evaluator", "evaluate_answer_relevance"),
+    # Plain Python string matching; cheaper to run in a thread than to ship the text to a worker
+    "automated_tests": EvaluatorSpec("utils.automated_tests:create_automated_test_evaluator", "evaluate_automated_tests", cpu_bound=False),
+    "analysis": EvaluatorSpec("utils.analysis_evaluator:create_analysis_evaluator", "evaluate_analysis", cpu_bound=False),
+}
+
+
+@dataclass
+class EvaluationOutcome:
+    """Result of a single evaluator run."""
+    name: str
+    result: Any = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Evaluators mutate themselves while scoring (e.g. TfidfVectorizer.fit), so
+# each thread and each worker process keeps its own instances.
+_local = threading.local()
+
+
+def _get_evaluator(name: str) -> Any:
+    cache = getattr(_local, "evaluators", None)
+    if cache is None:
+        cache = _local.evaluators = {}
+    if name not in cache:
+        module_name, factory_name = EVALUATORS[name].factory.split(":")
+        module = __import__(module_name, fromlist=[factory_name])
+        cache[name] = getattr(module, factory_name)()
+    return cache[name]
+
+
+def _run_evaluator(name: str, args: Tuple[Any, ...]) -> Tuple[Any, float]:
+    """Entry point for both pools; module level so worker processes can unpickle it."""
+    start = time.perf_counter()
+    evaluator = _get_evaluator(name)
+    result = getattr(evaluator, EVALUATORS[name].method)(*args)
+    return result, time.perf_counter() - start
+
+
+def _warm_worker(names: Tuple[str, ...]) -> int:
+    for name in names:
+        _get_evaluator(name)
+    return os.getpid()
+
+
+class EvaluationOrchestrator:
+    """
+    Runs independent evaluators concurrently over the same research output.
+
+    CPU-heavy evaluators go to a process pool (so they do not contend for the
+    GIL with each other or with the API), the rest to a thread pool. Every
+    evaluation has a deadline, counted from when it starts running; one that
+    misses it is reported as timed out and its result discarded, without
+    holding up the others. A timed-out process-pool evaluation is stopped by
+    replacing the pool; a thread cannot be interrupted and runs to completion.
+
+    Args:
+        max_workers: Worker processes (and threads) available to evaluations
+        timeout: Default per-evaluator timeout in seconds
+        use_processes: Use a process pool for CPU-bound evaluators; when False
+            everything runs in threads
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 60.0, use_processes: bool = True):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self._lock = threading.Lock()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Process-pool calls in flight, at most one per worker
+        self._process_slots = threading.BoundedSemaphore(self.max_workers)
+        self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="evaluator")
+
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                # spawn, not fork: the API process runs threads and holds
+                # sqlite connections that must not be duplicated into workers
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    def _reset_processes(self, pool: Optional[ProcessPoolExecutor] = None, terminate: bool = False) -> None:
+        """
+        Shut down the process pool, so the next evaluation starts a new one.
+
+        Args:
+            pool: Only reset if this is still the current pool (several runs
+                may see the same pool break)
+            terminate: Kill its worker processes, stopping the evaluations
+                running in them; their futures fail with BrokenProcessPool
+        """
+        with self._lock:
+            if pool is not None and pool is not self._process_pool:
+                return
+            pool, self._process_pool = self._process_pool, None
+        if pool is None:
+            return
+        # shutdown() drops the executor's process table
+        workers = list((pool._processes or {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in workers:
+            process.terminate()
+
+    def warm(self) -> None:
+        """Start the worker processes and build their evaluators ahead of the first request."""
+        if not self.use_processes:
+            return
+        names = tuple(name for name, spec in EVALUATORS.items() if spec.cpu_bound)
+        pool = self._processes()
+        futures = [pool.submit(_warm_worker, names) for _ in range(self.max_workers)]
+        wait(futures)
+
+    def submit(self, name: str, *args: Any) -> Future:
+        return self._submit(name, args)[0]
+
+    def _submit(
+        self, name: str, args: Tuple[Any, ...], block: bool = True
+    ) -> Optional[Tuple[Future, Optional[ProcessPoolExecutor]]]:
+        """
+        Submit an evaluation. Returns its future and the process pool running
+        it (None: the thread pool), or None if every worker process is busy
+        and `block` is False.
+        """
+        spec = EVALUATORS[name]
+        if not (spec.cpu_bound and self.use_processes):
+            return self._thread_pool.submit(_run_evaluator, name, args), None
+        # The pool gets no more calls than it has workers, so a submitted
+        # evaluation starts right away rather than queueing inside the pool
+        if not self._process_slots.acquire(blocking=block):
+            return None
+        try:
+            pool = self._processes()
+            future = pool.submit(_run_evaluator, name, args)
+        except BaseException:
+            self._process_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._process_slots.release())
+        return future, pool
+
+    def run(
+        self,
+        calls: Dict[str, Tuple[Any, ...]],
+        on_result: Optional[Callable[[EvaluationOutcome], None]] = None,
+        timeouts: Optional[Dict[str, float]] = None
+    ) -> Dict[str, EvaluationOutcome]:
+        """
+        Run evaluators concurrently and collect their outcomes.
+
+        Args:
+            calls: Positional arguments for each evaluator, by evaluator name
+            on_result: Called in the calling thread with each outcome as soon
+                as it is available (completion order, not submission order)
+            timeouts: Per-evaluator timeouts overriding the spec/default ones,
+                counted from when the evaluator starts running
+
+        Returns:
+            Dict[str, EvaluationOutcome]: Outcomes by evaluator name
+        """
+        timeouts = timeouts or {}
+        submitted = time.monotonic()
+        pending: Dict[Future, str] = {}
+        pools: Dict[Future, Optional[ProcessPoolExecutor]] = {}
+        limits: Dict[str, float] = {}
+        started: Dict[str, Optional[float]] = {}
+        waiting: List[str] = []  # for a free worker process
+        retried: Set[str] = set()
+        outcomes: Dict[str, EvaluationOutcome] = {}
+
+        def finish(outcome: EvaluationOutcome) -> None:
+            outcomes[outcome.name] = outcome
+            if on_result is not None:
+                try:
+                    on_result(outcome)
+                except Exception as e:
+                    logger.error(f"Error handling {outcome.name} result: {str(e)}", exc_info=True)
+
+        def start(name: str) -> None:
+            try:
+                submitted_call = self._submit(name, calls[name], block=False)
+            except Exception as e:
+                finish(EvaluationOutcome(name=name, error=f"Could not start evaluator: {str(e)}"))
+                return
+            if submitted_call is None:
+                waiting.append(name)
+                return
+            future, pool = submitted_call
+            pending[future] = name
+            pools[future] = pool
+            # A thread-pool call may queue behind other runs' evaluations;
+            # it has started once its future is marked running
+            started[name] = time.monotonic() if pool is not None else None
+
+        for name in calls:
+            spec = EVALUATORS[name]
+            limits[name] = timeouts.get(name, spec.timeout if spec.timeout is not None else self.timeout)
+            start(name)
+
+        while pending or waiting:
+            retry, waiting[:] = list(waiting), []
+            for name in retry:
+                start(name)
+
+            now = time.monotonic()
+            for future, name in pending.items():
+                if started[name] is None and (future.running() or future.done()):
+                    started[name] = now
+            deadlines = [started[name] + limits[name] for name in pending.values() if started[name] is not None]
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            if waiting or any(started[name] is None for name in pending.values()):
+                timeout = START_POLL_INTERVAL if timeout is None else min(timeout, START_POLL_INTERVAL)
+            if not pending:
+                time.sleep(timeout)
+                continue
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                pool = pools.pop(future)
+                elapsed = time.monotonic() - (started[name] or submitted)
+                try:
+                    result, elapsed = future.result()
+                    finish(EvaluationOutcome(name=name, result=result, elapsed=elapsed))
+                except (BrokenProcessPool, CancelledError) as e:
+                    # A worker died (e.g. OOM) or the pool was replaced to
+                    # stop a timed-out evaluation; replace it for later runs
+                    self._reset_processes(pool)
+                    if name not in retried:
+                        retried.add(name)
+                        logger.warning(f"Evaluator {name} lost its worker process; retrying")
+                        start(name)
+                        continue
+                    logger.error(f"Evaluator {name} lost its worker process: {str(e)}")
+                    finish(EvaluationOutcome(name=name, error=f"Worker process died: {str(e)}", elapsed=elapsed))
+                except Exception as e:
+                    logger.error(f"Evaluator {name} failed: {str(e)}", exc_info=True)
+                    finish(EvaluationOutcome(name=name, error=str(e), elapsed=elapsed))
+
+            now = time.monotonic()
+            for future, name in list(pending.items()):
+                if started[name] is None or now < started[name] + limits[name]:
+                    continue
+                del pending[future]
+                pool = pools.pop(future)
+                if pool is not None:
+                    # A running process cannot be interrupted: kill the pool's
+                    # workers so it does not stay occupied. Evaluations they
+                    # were also running are retried in a new pool.
+                    self._reset_processes(pool, terminate=True)
+                # A thread runs to completion in the background and its
+                # result is dropped
+                limit = limits[name]
+                logger.warning(f"Evaluator {name} timed out after {limit:.0f}s")
+                finish(EvaluationOutcome(name=name, error=f"Timed out after {limit:.0f}s",
+                                         timed_out=True, elapsed=now - started[name]))
+
+        return outcomes
+
+    def close(self) -> None:
+        self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        self._reset_processes()
+
+
+_default_orchestrator: Optional[EvaluationOrchestrator] = None
+_default_orchestrator_lock = threading.Lock()
+
+
+def get_default_orchestrator() -> EvaluationOrchestrator:
+    """
+    Return the process-wide orchestrator. Tunable with EVAL_MAX_WORKERS,
+    EVAL_TIMEOUT (seconds per evaluator) and EVAL_EXECUTOR ('process' or
+    'thread').
+    """
+    global _default_orchestrator
+    with _default_orchestrator_lock:
+        if _default_orchestrator is None:
+            _default_orchestrator = EvaluationOrchestrator(
+                max_workers=int(os.getenv('EVAL_MAX_WORKERS', str(min(4, os.cpu_count() or 1)))),
+                timeout=float(os.getenv('EVAL_TIMEOUT', '60')),
+                use_processes=os.getenv('EVAL_EXECUTOR', 'process') == 'process'
+            )
+            atexit.register(_default_orchestrator.close)
+        return _default_orchestrator
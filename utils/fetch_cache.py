@@ -0,0 +1,320 @@
+from tools.research.common.model_schemas import ContentItem
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import threading
+import hashlib
+import asyncio
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+# Freshness windows (seconds). Successful fetches are served from the cache for
+# CONTENT_CACHE_TTL; failed URLs are skipped for CONTENT_CACHE_NEGATIVE_TTL,
+# doubling with each consecutive failure up to CONTENT_CACHE_NEGATIVE_MAX_TTL.
+DEFAULT_TTL = float(os.getenv('CONTENT_CACHE_TTL', str(24 * 3600)))
+DEFAULT_NEGATIVE_TTL = float(os.getenv('CONTENT_CACHE_NEGATIVE_TTL', '900'))
+DEFAULT_NEGATIVE_MAX_TTL = float(os.getenv('CONTENT_CACHE_NEGATIVE_MAX_TTL', str(24 * 3600)))
+
+
+@dataclass
+class CacheEntry:
+    """Cache state for a single URL."""
+    url: str
+    state: str  # 'fresh', 'stale', 'negative' or 'miss'
+    doc: Optional[ContentItem] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+
+
+class FetchCache:
+    """
+    Read-through cache of scraped page content, layered on a ContentDB.
+
+    Page bodies live in the existing `content` table; this class keeps the HTTP
+    validators and fetch bookkeeping for each URL in a side table so repeated
+    research runs can skip the network entirely (fresh hit), revalidate with a
+    conditional request (stale hit), or avoid re-hammering URLs that recently
+    failed (negative hit).
+
+    Args:
+        db: ContentDB instance (either implementation) exposing `conn`, `lock` and `pool`
+        ttl: Seconds a successful fetch is served without revalidation
+        negative_ttl: Seconds a failed URL is skipped after its first failure
+        negative_max_ttl: Upper bound for the negative backoff window
+    """
+
+    def __init__(
+        self,
+        db,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        negative_max_ttl: float = DEFAULT_NEGATIVE_MAX_TTL
+    ):
+        self.db = db
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_max_ttl = negative_max_ttl
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "revalidated": 0,
+            "stale_served": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "failures": 0
+        }
+
+        with self.db.lock:
+            self.db.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS fetch_cache (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    failure_count INTEGER DEFAULT 0,
+                    error TEXT
+                );
+            """)
+            self.db.conn.commit()
+
+    def record(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def lookup(self, url: str) -> CacheEntry:
+        """
+        Classify a URL against the cache.
+
+        Args:
+            url: URL to look up
+
+        Returns:
+            CacheEntry: Cache state and, for fresh/stale entries, the stored document
+        """
+        # fresh: also see cache updates still waiting for their group commit
+        with self.db.pool.read(fresh=True) as conn:
+            row = conn.execute(
+                "SELECT status, etag, last_modified, fetched_at, failure_count, error "
+                "FROM fetch_cache WHERE url = ?",
+                (url,),
+            ).fetchone()
+
+        if row is None:
+            return CacheEntry(url=url, state="miss")
+
+        status, etag, last_modified, fetched_at, failure_count, error = row
+        age = time.time() - (fetched_at or 0)
+
+        if failure_count:
+            window = min(self.negative_ttl * 2 ** (failure_count - 1), self.negative_max_ttl)
+            if age < window:
+                return CacheEntry(url=url, state="negative", error=error)
+
+        doc = self.db.get_doc_by_url(url)
+        if doc is None or not doc.content:
+            return CacheEntry(url=url, state="miss")
+
+        state = "fresh" if not failure_count and age < self.ttl else "stale"
+        return CacheEntry(url=url, state=state, doc=doc, etag=etag, last_modified=last_modified)
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, doc: ContentItem, headers: Optional[Dict[str, str]] = None, status: int = 200) -> ContentItem:
+        """
+        Persist a freshly fetched document and its validators.
+
+        Args:
+            url: URL the document was fetched from
+            doc: Parsed document
+            headers: Response headers (used for ETag / Last-Modified)
+            status: HTTP status of the response
+
+        Returns:
+            ContentItem: The stored document
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        doc.url = url
+        doc.id = doc.id or hashlib.sha1(url.encode()).hexdigest()[:16]
+        # Keyed by URL: a URL we already hold is updated in place under its id
+        self.db.upsert_doc(doc)
+
+        # Group-committed with the document writes (see SQLitePool.write)
+        with self.db.pool.write():
+            self.db.conn.execute(
+                """
+                INSERT INTO fetch_cache (url, status, etag, last_modified, fetched_at, failure_count, error)
+                VALUES (?, ?, ?, ?, ?, 0, NULL)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    fetched_at = excluded.fetched_at,
+                    failure_count = 0,
+                    error = NULL
+                """,
+                (url, status, headers.get("etag"), headers.get("last-modified"), time.time()),
+            )
+            self.db.pool.commit()
+        return doc
+
+    def mark_revalidated(self, url: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Refresh the freshness window of a URL after a 304 Not Modified."""
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        with self.db.pool.write():
+            self.db.conn.execute(
+                """
+                UPDATE fetch_cache SET
+                    fetched_at = ?,
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    failure_count = 0,
+                    error = NULL
+                WHERE url = ?
+                """,
+                (time.time(), headers.get("etag"), headers.get("last-modified"), url),
+            )
+            self.db.pool.commit()
+
+    def store_failure(self, url: str, error: str, status: Optional[int] = None) -> None:
+        """Record a failed fetch so the URL is skipped for the negative TTL."""
+        with self.db.pool.write():
+            self.db.conn.execute(
+                """
+                INSERT INTO fetch_cache (url, status, fetched_at, failure_count, error)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    status = excluded.status,
+                    fetched_at = excluded.fetched_at,
+                    failure_count = fetch_cache.failure_count + 1,
+                    error = excluded.error
+                """,
+                (url, status, time.time(), error),
+            )
+            self.db.pool.commit()
+        self.record("failures")
+
+    def fetch_all(
+        self,
+        urls: List[str],
+        fetcher,
+        parse: Callable[[str, str], Optional[ContentItem]]
+    ) -> Dict[str, ContentItem]:
+        """
+        Resolve URLs through the cache, fetching only what is missing or stale.
+
+        Args:
+            urls: URLs to resolve
+            fetcher: PageFetcher used for misses and revalidation
+            parse: Callable turning (url, html) into a ContentItem, or None when
+                the page has no usable content
+
+        Returns:
+            Dict[str, ContentItem]: Documents by URL. Each document's
+            metadata['cache'] is 'hit', 'revalidated', 'stale' or 'miss'.
+        """
+        results, entries, to_fetch, conditional = self._plan(urls)
+        fetched = fetcher.fetch_all(to_fetch, headers=conditional)
+        self._absorb(fetched, entries, parse, results)
+        return results
+
+    async def afetch_all(
+        self,
+        urls: List[str],
+        fetcher,
+        parse: Callable[[str, str], Optional[ContentItem]]
+    ) -> Dict[str, ContentItem]:
+        """
+        Async counterpart of fetch_all for use with AsyncPageFetcher. Database
+        access and parsing run in worker threads so the event loop stays free.
+        """
+        results, entries, to_fetch, conditional = await asyncio.to_thread(self._plan, urls)
+        fetched = await fetcher.fetch_all(to_fetch, headers=conditional)
+        await asyncio.to_thread(self._absorb, fetched, entries, parse, results)
+        return results
+
+    def _plan(self, urls: List[str]):
+        """Split URLs into cache hits and the fetches (conditional or not) still needed."""
+        results: Dict[str, ContentItem] = {}
+        entries: Dict[str, CacheEntry] = {}
+        conditional: Dict[str, Dict[str, str]] = {}
+        to_fetch = []
+
+        for url in dict.fromkeys(urls):
+            entry = self.lookup(url)
+            entries[url] = entry
+            if entry.state == "fresh":
+                results[url] = self._tag(entry.doc, "hit")
+                self.record("hits")
+            elif entry.state == "negative":
+                logger.info(f"Skipping recently failed URL {url}: {entry.error}")
+                self.record("negative_hits")
+            else:
+                to_fetch.append(url)
+                headers = self.conditional_headers(entry)
+                if headers:
+                    conditional[url] = headers
+
+        return results, entries, to_fetch, conditional
+
+    def _absorb(
+        self,
+        fetched_results,
+        entries: Dict[str, CacheEntry],
+        parse: Callable[[str, str], Optional[ContentItem]],
+        results: Dict[str, ContentItem]
+    ) -> None:
+        """Parse and persist fetch results, adding the resolved documents to `results`."""
+        for fetched in fetched_results:
+            url = fetched.url
+            entry = entries[url]
+
+            if fetched.not_modified and entry.doc is not None:
+                self.mark_revalidated(url, fetched.headers)
+                results[url] = self._tag(entry.doc, "revalidated")
+                self.record("revalidated")
+                continue
+
+            doc = None
+            error = fetched.error
+            if fetched.ok:
+                try:
+                    doc = parse(url, fetched.text)
+                    if doc is None:
+                        error = "No extractable content"
+                except Exception as e:
+                    error = f"Parse error: {e}"
+
+            if doc is not None:
+                results[url] = self._tag(self.store(url, doc, fetched.headers, fetched.status), "miss")
+                self.record("misses")
+                continue
+
+            self.store_failure(url, error or f"HTTP {fetched.status}", fetched.status)
+            if entry.doc is not None:
+                # Serve the previous copy rather than losing the source entirely
+                logger.warning(f"Refetch of {url} failed ({error}), serving stale copy")
+                results[url] = self._tag(entry.doc, "stale")
+                self.record("stale_served")
+            else:
+                logger.error(f"Error scraping {url}: {error}")
+
+    @staticmethod
+    def _tag(doc: ContentItem, state: str) -> ContentItem:
+        doc.metadata = {**(doc.metadata or {}), "cache": state}
+        return doc
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
@@ -1,16 +1,122 @@
-from typing import Optional, Type, Any
+from typing import Optional, Type, Any, Dict
 from pydantic import BaseModel, ValidationError
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import time
 import json
 import os
 from dotenv import load_dotenv
+from utils.async_logging import lazy
 
 # Load environment variables
 load_dotenv()
 
+_async_client: Optional[AsyncOpenAI] = None
+
+
+def _get_async_client() -> AsyncOpenAI:
+    """Shared async client so concurrent requests reuse one connection pool."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
+
+
+def _parse_json_response(
+    response: Any,
+    base_model: Type[BaseModel],
+    model: str,
+    start_time: float,
+    attempt: int
+) -> Optional[BaseModel]:
+    """
+    Validate a JSON-mode completion against base_model.
+
+    Returns:
+        Optional[BaseModel]: The validated (or partially constructed) object, or
+        None when the response should be retried
+    """
+    # Extract response content
+    response_text = response.choices[0].message.content.strip()
+    
+    # Log performance metrics
+    duration = time.time() - start_time
+    input_tokens = response.usage.prompt_tokens
+    output_tokens = response.usage.completion_tokens
+    total_tokens = response.usage.total_tokens
+
+    logging.debug(lazy(lambda: (
+        f"JSON Inference completed in {duration:.2f}s - Input: {input_tokens}, Output: {output_tokens}, "
+        f"Total: {total_tokens}, {total_tokens/duration:.2f} tokens/second"
+    )))
+
+    # Attempt to parse JSON
+    try:
+        # First, try to parse as dictionary
+        parsed_response = json.loads(response_text)
+        
+        # Validate against Pydantic model
+        try:
+            validated_obj = base_model.model_validate(parsed_response)
+            return validated_obj
+        
+        except ValidationError as val_error:
+            logging.warning(f"Pydantic validation failed: {str(val_error)}")
+            logging.warning(f"Problematic JSON: {response_text}")
+            
+            # Optional: attempt to partially validate or transform
+            try:
+                # Try to create object with partial validation
+                partially_validated = base_model.model_construct(**parsed_response)
+                return partially_validated
+            except Exception as partial_error:
+                logging.error(f"Partial validation failed: {str(partial_error)}")
+    
+    except json.JSONDecodeError as json_error:
+        logging.warning(f"JSON parsing failed (Attempt {attempt + 1}): {str(json_error)}")
+        logging.warning(f"Problematic response: {response_text}")
+
+    return None
+
+
+def _record_usage(
+    token_tracker: Optional[Any],
+    response: Any,
+    model: str,
+    prompt: Any,
+    final: bool,
+    first_start: float,
+    attempt: int
+) -> None:
+    """
+    Track the token usage of one attempt. Responses that end up retried are
+    billed too, so every attempt counts towards tokens and cost; the call's
+    latency (from the first attempt) and retry count are recorded once, with
+    the final attempt.
+    """
+    if not token_tracker or not hasattr(token_tracker, 'add_usage'):
+        return
+    token_tracker.add_usage(
+        prompt_tokens=response.usage.prompt_tokens,
+        completion_tokens=response.usage.completion_tokens,
+        model=model,
+        prompt_id=getattr(prompt, 'id', None),
+        processing_time=time.time() - first_start if final else None,
+        retries=attempt if final else 0
+    )
+
+
+def _retry_guidance(base_model: Type[BaseModel]) -> Dict[str, str]:
+    return {
+        "role": "system",
+        "content": (
+            f"The previous JSON response was invalid. "
+            f"Please ensure your response is a valid JSON that matches the {base_model.__name__} schema. " 
+            "The expected field is 'sources', not 'selected_sources'. Double-check your JSON formatting."
+        )
+    }
+
 def json_model_wrapper(
     system_prompt: str,
     user_prompt: str,
@@ -57,6 +163,7 @@ def json_model_wrapper(
 
     # Track total attempts
     attempts = 0
+    first_start = time.time()
 
     while attempts < max_retries:
         try:
@@ -71,54 +178,11 @@ def json_model_wrapper(
                 response_format={"type": "json_object"}
             )
 
-            # Extract response content
-            response_text = response.choices[0].message.content.strip()
-            
-            # Log performance metrics
-            duration = time.time() - start_time
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
-            total_tokens = response.usage.total_tokens
-
-            logging.info(f"JSON Inference completed in {duration:.2f}s")
-            logging.info(f"Tokens used - Input: {input_tokens}, Output: {output_tokens}, Total: {total_tokens}")
-            logging.info(f"Processing speed - {total_tokens/duration:.2f} tokens/second")
-
-            # Attempt to parse JSON
-            try:
-                # First, try to parse as dictionary
-                parsed_response = json.loads(response_text)
-                
-                # Validate against Pydantic model
-                try:
-                    validated_obj = base_model.model_validate(parsed_response)
-                    
-                    # Track token usage if tracker is provided
-                    if token_tracker and hasattr(token_tracker, 'add_usage'):
-                        token_tracker.add_usage(
-                            prompt_tokens=input_tokens,
-                            completion_tokens=output_tokens,
-                            model=model,
-                            prompt_id=getattr(prompt, 'id', None)
-                        )
-                    
-                    return validated_obj
-                
-                except ValidationError as val_error:
-                    logging.warning(f"Pydantic validation failed: {str(val_error)}")
-                    logging.warning(f"Problematic JSON: {response_text}")
-                    
-                    # Optional: attempt to partially validate or transform
-                    try:
-                        # Try to create object with partial validation
-                        partially_validated = base_model.model_construct(**parsed_response)
-                        return partially_validated
-                    except Exception as partial_error:
-                        logging.error(f"Partial validation failed: {str(partial_error)}")
-            
-            except json.JSONDecodeError as json_error:
-                logging.warning(f"JSON parsing failed (Attempt {attempts + 1}): {str(json_error)}")
-                logging.warning(f"Problematic response: {response_text}")
+            result = _parse_json_response(response, base_model, model, start_time, attempts)
+            final = result is not None or attempts + 1 >= max_retries
+            _record_usage(token_tracker, response, model, prompt, final, first_start, attempts)
+            if result is not None:
+                return result
         
         except Exception as api_error:
             logging.error(f"API call failed (Attempt {attempts + 1}): {str(api_error)}")
@@ -128,13 +192,74 @@ def json_model_wrapper(
         
         # Optional: add a more specific error prompt on subsequent attempts
         if attempts < max_retries:
-            error_guidance = (
-                f"The previous JSON response was invalid. "
-                f"Please ensure your response is a valid JSON that matches the {base_model.__name__} schema. " 
-                "The expected field is 'sources', not 'selected_sources'. Double-check your JSON formatting."
-            )
-            messages.append({"role": "system", "content": error_guidance})
+            messages.append(_retry_guidance(base_model))
 
     # Final fallback if all attempts fail
     logging.error(f"Failed to generate valid JSON response after {max_retries} attempts")
-    return None
\ No newline at end of file
+    return None
+
+
+async def ajson_model_wrapper(
+    system_prompt: str,
+    user_prompt: str,
+    prompt: Any,
+    base_model: Type[BaseModel],
+    model: str = "gpt-3.5-turbo",
+    temperature: float = 0,
+    max_retries: int = 3,
+    token_tracker: Optional[Any] = None
+) -> Optional[BaseModel]:
+    """
+    Async counterpart of json_model_wrapper
+    
+    Args:
+        system_prompt: The system prompt to guide the model's behavior
+        user_prompt: The user's input prompt
+        prompt: The original prompt object containing metadata
+        base_model: The Pydantic model class to validate the response against
+        model: The model to use (default: "gpt-3.5-turbo")
+        temperature: Controls randomness in the response (default: 0)
+        max_retries: Maximum number of retry attempts for JSON parsing (default: 3)
+        token_tracker: Optional token usage tracker object
+        
+    Returns:
+        Optional[BaseModel]: The validated response object or None if validation fails
+    """
+    if not system_prompt or not user_prompt:
+        logging.error("Missing system or user prompt")
+        return None
+
+    try:
+        client = _get_async_client()
+    except Exception as init_error:
+        logging.error(f"Failed to initialize OpenAI client: {str(init_error)}")
+        return None
+
+    messages = [
+        {"role": "system", "content": f"{system_prompt}. Respond with a valid JSON object."},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    first_start = time.time()
+    for attempt in range(max_retries):
+        try:
+            start_time = time.time()
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"}
+            )
+            result = _parse_json_response(response, base_model, model, start_time, attempt)
+            final = result is not None or attempt + 1 >= max_retries
+            _record_usage(token_tracker, response, model, prompt, final, first_start, attempt)
+            if result is not None:
+                return result
+        except Exception as api_error:
+            logging.error(f"API call failed (Attempt {attempt + 1}): {str(api_error)}")
+
+        if attempt + 1 < max_retries:
+            messages.append(_retry_guidance(base_model))
+
+    logging.error(f"Failed to generate valid JSON response after {max_retries} attempts")
+    return None
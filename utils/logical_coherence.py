@@ -1,47 +1,36 @@
-import spacy
 import numpy as np
-from typing import List, Dict, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Dict, Tuple, Optional
 from tools.research.common.model_schemas import ResearchToolOutput
-
-nlp = spacy.blank('en')
-nlp.add_pipe('sentencizer')
+from utils.nlp_preprocessing import PreprocessedDocument, adjacent_similarities, tfidf_vectorizer
 
 class LogicalCoherenceEvaluator:
-    def __init__(self):
-        self.nlp = nlp
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            stop_words='english'
-        )
-
     def calculate_sentence_similarity(self, sentences: List[str]) -> List[float]:
         if len(sentences) < 2:
             return []
-        vectors = self.vectorizer.fit_transform(sentences)
-        return [cosine_similarity(vectors[i:i+1], vectors[i+1:i+2])[0][0] for i in range(len(sentences) - 1)]
+        return adjacent_similarities(tfidf_vectorizer().fit_transform(sentences))
 
-    def evaluate_logical_coherence(self, research_output: ResearchToolOutput) -> Tuple[float, Dict]:
-        full_text = research_output.summary or " ".join(content.content for content in research_output.content)
-        
-        if not full_text.strip():  # Check if the full text is empty
+    def evaluate_logical_coherence(
+        self,
+        research_output: ResearchToolOutput,
+        document: Optional[PreprocessedDocument] = None
+    ) -> Tuple[float, Dict]:
+        document = document or PreprocessedDocument(research_output)
+        
+        if not document.summary_text.strip():  # Check if the full text is empty
             return 0.0, {'message': 'No valid text to evaluate'}
         
-        doc = self.nlp(full_text)
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]  # Remove empty sentences
+        sentences = document.sentences
         
         if len(sentences) < 2:  # Ensure there are enough sentences to evaluate
             return 0.0, {'message': 'Not enough sentences to evaluate coherence'}
         
-        transition_scores = self.calculate_sentence_similarity(sentences)
+        # Rows of a TF-IDF fit on the sentences: adjacent rows are both the
+        # transitions and the semantic connections
+        transition_scores = adjacent_similarities(document.sentence_vectors)
         rough_transitions = [{'sentence1': sentences[i], 'sentence2': sentences[i + 1], 'score': score} 
                              for i, score in enumerate(transition_scores) if score < 0.3]
         
-        semantic_connection_scores = [cosine_similarity(self.vectorizer.transform([sentences[i]]), 
-                                      self.vectorizer.transform([sentences[i+1]]))[0][0] 
-                                      for i in range(len(sentences) - 1)]
-        semantic_connection_score = np.mean(semantic_connection_scores) if semantic_connection_scores else 0
+        semantic_connection_score = np.mean(transition_scores) if transition_scores else 0
         
         idea_progression_scores = [1 / (1 + abs(len(sentences[i+1].split()) - len(sentences[i].split()))) 
                                    for i in range(len(sentences) - 1)]
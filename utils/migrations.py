@@ -0,0 +1,166 @@
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import sqlite3
+from typing import Callable, List, Set, Tuple
+from utils.content_store import BODY_UPSERT_SQL, body_row
+
+# Versioned schema changes for the content database, applied in order by
+# migrate() and recorded in schema_migrations. Every migration must be
+# idempotent (a database created by a newer CREATE TABLE may already have
+# its columns) and skip tables the database does not have: both ContentDB
+# classes, init_db.py and older deployments share this list. Append new
+# migrations with the next version; never edit or reorder applied ones.
+
+logger = logging.getLogger(__name__)
+
+# Evaluation history tables: listed newest first, optionally filtered by a
+# query substring, and aggregated over recent time windows
+EVALUATION_TABLES = [
+    'automated_tests',
+    'factual_accuracy',
+    'source_coverage_evaluations',
+    'logical_coherence_evaluations',
+    'answer_relevance_evaluations',
+    'analysis_evaluations',
+]
+
+
+def _tables(conn: sqlite3.Connection) -> Set[str]:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> Set[str]:
+    # table_xinfo also lists generated columns
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def _evaluation_recorded_at(conn: sqlite3.Connection) -> None:
+    """
+    recorded_at: the evaluation timestamp normalized by datetime() (stored
+    values mix ISO 'T' timestamps and CURRENT_TIMESTAMP defaults), as a
+    virtual generated column, indexed with query so newest-first listings
+    and substring filters are answered from the index.
+    """
+    tables = _tables(conn)
+    for table in EVALUATION_TABLES:
+        if table not in tables:
+            continue
+        if 'recorded_at' not in _columns(conn, table):
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN recorded_at TEXT "
+                "GENERATED ALWAYS AS (datetime(timestamp)) VIRTUAL"
+            )
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_recorded_at ON {table} (recorded_at, query)")
+
+
+def _content_created_at(conn: sqlite3.Connection) -> None:
+    """Index for listing content newest first."""
+    if 'content' in _tables(conn):
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_content_created_at ON content (created_at)")
+
+
+def _content_bodies(conn: sqlite3.Connection) -> None:
+    """
+    Store document bodies compressed in content_bodies, apart from the
+    content metadata (see utils.content_store), and move the inline bodies
+    there. The search index read bodies from content.content, so it is
+    dropped; utils.db recreates and rebuilds it over the new layout. The
+    emptied pages are only returned to the filesystem by compact_db.py.
+    """
+    if 'content' not in _tables(conn):
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS content_bodies (
+            doc_id TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            body BLOB NOT NULL
+        )
+    """)
+    if 'content_fts' in _tables(conn):
+        # One statement at a time: executescript() would commit the migration
+        for statement in (
+            "DROP TRIGGER IF EXISTS content_fts_insert",
+            "DROP TRIGGER IF EXISTS content_fts_delete",
+            "DROP TRIGGER IF EXISTS content_fts_update",
+            "DROP TABLE content_fts",
+        ):
+            conn.execute(statement)
+
+    moved = 0
+    last_rowid = 0
+    while True:
+        rows = conn.execute(
+            "SELECT rowid, id, content FROM content WHERE rowid > ? AND content != '' ORDER BY rowid LIMIT 500",
+            (last_rowid,),
+        ).fetchall()
+        if not rows:
+            break
+        last_rowid = rows[-1][0]
+        conn.executemany(BODY_UPSERT_SQL, [body_row(doc_id, content) for _, doc_id, content in rows])
+        moved += len(rows)
+    conn.execute("UPDATE content SET content = '' WHERE content != ''")
+    if moved:
+        logger.info(f"Moved {moved} document bodies to content_bodies; run compact_db.py to reclaim the space")
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "evaluation recorded_at column and (recorded_at, query) indexes", _evaluation_recorded_at),
+    (2, "content created_at index", _content_created_at),
+    (3, "compressed document bodies in content_bodies", _content_bodies),
+]
+
+
+def migrate(conn: sqlite3.Connection) -> List[int]:
+    """
+    Apply the migrations a database has not had yet, each in its own
+    transaction. Safe to run on every start: applied versions are skipped.
+
+    Args:
+        conn: Connection to the database, with no transaction open (callers
+            sharing it hold its write lock)
+
+    Returns:
+        List[int]: Versions applied by this call
+
+    Raises:
+        sqlite3.Error: If a migration fails; it is rolled back and later
+            ones are not attempted
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+    done = []
+    for version, name, apply in MIGRATIONS:
+        if version in applied:
+            continue
+        # IMMEDIATE: take the write lock before reading the schema, so two
+        # processes starting together apply each migration once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                conn.rollback()
+                continue
+            logger.info(f"Applying schema migration {version}: {name}")
+            apply(conn)
+            conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Schema migration {version} failed: {e}")
+            raise
+        done.append(version)
+
+    if done:
+        # Refresh planner statistics for the new indexes (sampled, so cheap
+        # on large tables)
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("ANALYZE")
+        conn.commit()
+    return done
@@ -1,12 +1,14 @@
-from typing import Optional, Any
+from typing import Optional, Any, AsyncIterator, Iterator
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 import time
-from openai import OpenAI
-from groq import Groq
+from types import SimpleNamespace
+from openai import OpenAI, AsyncOpenAI
+from groq import Groq, AsyncGroq
 from dotenv import load_dotenv
 import os
 from datetime import datetime
+from utils.async_logging import lazy
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +20,98 @@ groq_api_key = os.getenv("GROQ_API_KEY")
 openai_client = OpenAI(api_key=openai_api_key)
 groq_client = Groq(api_key=groq_api_key)
 
+# Async clients share a connection pool per process and are used by the
+# FastAPI request path so LLM calls never block the event loop
+async_openai_client = AsyncOpenAI(api_key=openai_api_key)
+async_groq_client = AsyncGroq(api_key=groq_api_key)
+
+
+def _record_completion(completion: Any, model: str, start: float, prompt: Any, token_tracker: Optional[Any]) -> str:
+    """Log performance metrics for a completion, track its usage and return its text."""
+    _record_usage(completion.usage, model, start, prompt, token_tracker)
+    return completion.choices[0].message.content
+
+def _record_usage(usage: Any, model: str, start: float, prompt: Any, token_tracker: Optional[Any],
+                  first_token_at: Optional[float] = None) -> None:
+    duration = time.time() - start
+
+    # Log performance metrics
+    input_tokens = usage.prompt_tokens
+    output_tokens = usage.completion_tokens
+    total_tokens = usage.total_tokens
+
+    logging.debug(lazy(lambda: (
+        f"Inference completed in {duration:.2f}s - Input: {input_tokens}, Output: {output_tokens}, "
+        f"Total: {total_tokens}, {total_tokens / duration:.2f} tokens/second"
+    )))
+
+    # Track token usage if token_tracker is provided
+    if token_tracker and hasattr(token_tracker, 'add_usage'):
+        token_tracker.add_usage(
+            prompt_tokens=input_tokens,
+            completion_tokens=output_tokens,
+            model=model,
+            prompt_id=prompt.id if hasattr(prompt, 'id') else None,
+            processing_time=duration,
+            time_to_first_token=first_token_at - start if first_token_at is not None else None,
+            queue_wait=_queue_time(usage)
+        )
+
+def _queue_time(usage: Any) -> Optional[float]:
+    # Groq reports how long the request waited in its queue; OpenAI does not
+    queue_time = getattr(usage, "queue_time", None)
+    return float(queue_time) if isinstance(queue_time, (int, float)) else None
+
+# Rough prompt size for usage estimates when a stream ends without a report
+_CHARS_PER_TOKEN = 4
+
+class _StreamState:
+    """Accumulates the usage report of a streamed completion."""
+
+    def __init__(self):
+        self.usage = None
+        self.first_token_at = None
+        self.chunks = 0
+
+    def consume(self, chunk: Any) -> str:
+        """Return the text delta of a chunk and remember usage if it carries it."""
+        # OpenAI reports usage on a final, choice-less chunk when asked to via
+        # stream_options; Groq attaches it to the last chunk under x_groq.
+        usage = getattr(chunk, "usage", None)
+        if usage is None:
+            x_groq = getattr(chunk, "x_groq", None)
+            usage = getattr(x_groq, "usage", None)
+        if usage is not None:
+            self.usage = usage
+
+        if not chunk.choices:
+            return ""
+        delta = chunk.choices[0].delta.content or ""
+        if delta:
+            self.chunks += 1
+            if self.first_token_at is None:
+                self.first_token_at = time.time()
+        return delta
+
+    def finish(self, model: str, start: float, prompt: Any, token_tracker: Optional[Any], messages: list) -> None:
+        if self.first_token_at is not None:
+            logging.debug(f"Time to first token: {self.first_token_at - start:.2f}s")
+        usage = self.usage
+        if usage is None:
+            # Stopped early (the report comes last) or the provider sent none:
+            # the tokens are billed anyway, so record an estimate (providers
+            # stream about one token per chunk)
+            prompt_tokens = sum(len(message["content"] or "") for message in messages) // _CHARS_PER_TOKEN
+            usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=self.chunks,
+                                    total_tokens=prompt_tokens + self.chunks)
+            logging.warning(f"Stream from {model} ended without a usage report; recording an estimate "
+                            f"({prompt_tokens} prompt, {self.chunks} completion tokens)")
+        _record_usage(usage, model, start, prompt, token_tracker, self.first_token_at)
+
+def _stream_options(host: str) -> dict:
+    # Groq always reports usage at the end of a stream; OpenAI only on request
+    return {"stream_options": {"include_usage": True}} if host == "openai" else {}
+
 def model_wrapper(
     system_prompt: str,
     user_prompt: str,
@@ -69,30 +163,199 @@ def model_wrapper(
         else:
             raise ValueError(f"Unsupported host: {host}")
 
-        # Extract the result and performance metrics
-        result = completion.choices[0].message.content
-        duration = time.time() - start
+        return _record_completion(completion, model, start, prompt, token_tracker)
 
-        # Log performance metrics
-        input_tokens = completion.usage.prompt_tokens
-        output_tokens = completion.usage.completion_tokens
-        total_tokens = completion.usage.total_tokens
+    except Exception as e:
+        logging.error(f"Error in model_wrapper: {str(e)}", exc_info=True)
+        raise
 
-        logging.info(f"Inference completed in {duration:.2f}s")
-        logging.info(f"Tokens used - Input: {input_tokens}, Output: {output_tokens}, Total: {total_tokens}")
-        logging.info(f"Processing speed - {total_tokens / duration:.2f} tokens/second")
 
-        # Track token usage if token_tracker is provided
-        if token_tracker and hasattr(token_tracker, 'add_usage'):
-            token_tracker.add_usage(
-                prompt_tokens=input_tokens,
-                completion_tokens=output_tokens,
-                model=model,
-                prompt_id=prompt.id if hasattr(prompt, 'id') else None
-            )
+async def amodel_wrapper(
+    system_prompt: str,
+    user_prompt: str,
+    prompt: Any,
+    model: str = "gpt-4",
+    temperature: float = 0,
+    host: str = "openai",
+    token_tracker: Optional[Any] = None
+) -> str:
+    """
+    Async counterpart of model_wrapper; awaits the provider instead of blocking
+    the calling thread.
 
-        return result
+    Args:
+        system_prompt: The system prompt to guide the model's behavior
+        user_prompt: The user's input prompt
+        prompt: The original prompt object containing metadata
+        model: The model to use (default: "gpt-4")
+        temperature: Controls randomness in the response (default: 0)
+        host: The API host to use ("openai" or "groq") (default: "openai")
+        token_tracker: Optional token usage tracker object
+
+    Returns:
+        str: The model's response text
+    """
+    logging.info(f"Start async inference with model {model} on host {host}")
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    start = time.time()
+
+    try:
+        if host == "openai":
+            client = async_openai_client
+        elif host == "groq":
+            client = async_groq_client
+        else:
+            raise ValueError(f"Unsupported host: {host}")
+
+        completion = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+        )
+        return _record_completion(completion, model, start, prompt, token_tracker)
 
     except Exception as e:
-        logging.error(f"Error in model_wrapper: {str(e)}", exc_info=True)
+        logging.error(f"Error in amodel_wrapper: {str(e)}", exc_info=True)
+        raise
+
+
+def stream_model_wrapper(
+    system_prompt: str,
+    user_prompt: str,
+    prompt: Any,
+    model: str = "gpt-4",
+    temperature: float = 0,
+    host: str = "openai",
+    token_tracker: Optional[Any] = None
+) -> Iterator[str]:
+    """
+    Streaming variant of model_wrapper that yields text deltas as they arrive.
+    Token usage reported by the provider at the end of the stream is recorded
+    in `token_tracker` when the generator finishes; if it is closed early
+    (e.g. the client disconnected), the upstream stream is closed and an
+    estimate of the usage so far is recorded instead.
+
+    Args:
+        system_prompt: The system prompt to guide the model's behavior
+        user_prompt: The user's input prompt
+        prompt: The original prompt object containing metadata
+        model: The model to use (default: "gpt-4")
+        temperature: Controls randomness in the response (default: 0)
+        host: The API host to use ("openai" or "groq") (default: "openai")
+        token_tracker: Optional token usage tracker object
+
+    Yields:
+        str: Successive pieces of the model's response text
+    """
+    logging.info(f"Start streaming inference with model {model} on host {host}")
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    start = time.time()
+    state = _StreamState()
+    stream = None
+
+    try:
+        if host == "openai":
+            client = openai_client
+        elif host == "groq":
+            client = groq_client
+        else:
+            raise ValueError(f"Unsupported host: {host}")
+
+        stream = client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+            stream=True,
+            **_stream_options(host)
+        )
+        for chunk in stream:
+            delta = state.consume(chunk)
+            if delta:
+                yield delta
+
+    except Exception as e:
+        logging.error(f"Error in stream_model_wrapper: {str(e)}", exc_info=True)
         raise
+
+    finally:
+        # Also runs when the consumer stops early and closes the generator
+        if stream is not None:
+            stream.close()
+            state.finish(model, start, prompt, token_tracker, messages)
+
+
+async def astream_model_wrapper(
+    system_prompt: str,
+    user_prompt: str,
+    prompt: Any,
+    model: str = "gpt-4",
+    temperature: float = 0,
+    host: str = "openai",
+    token_tracker: Optional[Any] = None
+) -> AsyncIterator[str]:
+    """
+    Async counterpart of stream_model_wrapper.
+
+    Args:
+        system_prompt: The system prompt to guide the model's behavior
+        user_prompt: The user's input prompt
+        prompt: The original prompt object containing metadata
+        model: The model to use (default: "gpt-4")
+        temperature: Controls randomness in the response (default: 0)
+        host: The API host to use ("openai" or "groq") (default: "openai")
+        token_tracker: Optional token usage tracker object
+
+    Yields:
+        str: Successive pieces of the model's response text
+    """
+    logging.info(f"Start async streaming inference with model {model} on host {host}")
+
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    start = time.time()
+    state = _StreamState()
+    stream = None
+
+    try:
+        if host == "openai":
+            client = async_openai_client
+        elif host == "groq":
+            client = async_groq_client
+        else:
+            raise ValueError(f"Unsupported host: {host}")
+
+        stream = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+            stream=True,
+            **_stream_options(host)
+        )
+        async for chunk in stream:
+            delta = state.consume(chunk)
+            if delta:
+                yield delta
+
+    except Exception as e:
+        logging.error(f"Error in astream_model_wrapper: {str(e)}", exc_info=True)
+        raise
+
+    finally:
+        # Also runs when the consumer stops early (e.g. an SSE client
+        # disconnected and the generator was closed)
+        if stream is not None:
+            await stream.close()
+            state.finish(model, start, prompt, token_tracker, messages)
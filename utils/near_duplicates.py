@@ -0,0 +1,97 @@
+import re
+import zlib
+import numpy as np
+from typing import List, Set, Tuple
+
+# Mersenne prime for the universal hash family h(x) = (a*x + b) mod p
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """
+    Hashed word n-grams of a text.
+
+    Args:
+        text: Text to shingle
+        size: Words per shingle
+
+    Returns:
+        Set[int]: 32-bit CRC of each distinct shingle (stable across processes)
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+def minhash_signatures(texts: List[str], num_perm: int = 128, shingle_size: int = 3, seed: int = 1) -> np.ndarray:
+    """
+    MinHash signature of each text's shingle set.
+
+    Args:
+        texts: Texts to sign
+        num_perm: Hash functions (signature length)
+        shingle_size: Words per shingle
+        seed: Seed for the hash functions; signatures are only comparable
+            when computed with the same seed and num_perm
+
+    Returns:
+        np.ndarray: len(texts) x num_perm signatures. The fraction of equal
+            positions in two rows estimates the texts' Jaccard similarity.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint64)
+    for row, text in enumerate(texts):
+        hashed = np.fromiter(shingles(text, shingle_size), dtype=np.uint64)
+        if hashed.size:
+            # uint64 products wrap; still a fine hash family for 32-bit inputs
+            permuted = ((hashed[:, None] * a + b) % _PRIME) & _MAX_HASH
+            signatures[row] = permuted.min(axis=0)
+    return signatures
+
+
+def near_duplicate_pairs(signatures: np.ndarray, threshold: float = 0.8, bands: int = 16) -> List[Tuple[int, int, float]]:
+    """
+    Pairs of rows whose estimated Jaccard similarity reaches `threshold`,
+    found by locality-sensitive hashing instead of comparing every pair.
+
+    Rows that agree on every position of at least one band become candidates;
+    only candidates have their signatures compared.
+
+    Args:
+        signatures: Output of minhash_signatures
+        threshold: Minimum estimated Jaccard similarity
+        bands: Bands to split each signature into; must divide its length.
+            More bands find less similar candidates at the cost of more
+            checks. 16 bands of 8 rows make pairs above ~0.7 likely
+            candidates (95% at 0.8) and pairs below 0.5 rarely.
+
+    Returns:
+        List[Tuple[int, int, float]]: (i, j, similarity) with i < j
+    """
+    count, num_perm = signatures.shape
+    if count < 2:
+        return []
+    rows = num_perm // bands
+    if rows * bands != num_perm:
+        raise ValueError(f"{bands} bands do not divide a signature of length {num_perm}")
+
+    candidates: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets = {}
+        for index, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets.setdefault(key, []).append(index)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    candidates.add((i, j))
+
+    if not candidates:
+        return []
+    left, right = np.array(sorted(candidates)).T
+    similarities = np.mean(signatures[left] == signatures[right], axis=1)
+    keep = similarities >= threshold
+    return [(int(i), int(j), float(sim)) for i, j, sim in zip(left[keep], right[keep], similarities[keep])]
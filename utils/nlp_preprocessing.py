@@ -0,0 +1,152 @@
+import spacy
+import urllib.parse
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional, Set
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from tools.research.common.model_schemas import ResearchToolOutput
+
+# One pipeline shared by every evaluator
+nlp = spacy.blank('en')
+nlp.add_pipe('sentencizer')
+# The default 1M-character cap guards parser/NER memory; tokenizing and
+# sentence splitting are linear, and a full text of many long sources exceeds it
+nlp.max_length = 10_000_000
+
+KEYWORD_POS = ('NOUN', 'VERB', 'ADJ')
+
+
+def tfidf_vectorizer(**params) -> TfidfVectorizer:
+    """TF-IDF settings shared by the evaluators."""
+    return TfidfVectorizer(max_features=5000, stop_words='english', **params)
+
+
+def adjacent_similarities(vectors: csr_matrix) -> List[float]:
+    """
+    Cosine similarity of each row with the next one.
+
+    Args:
+        vectors: L2-normalized rows, as produced by TfidfVectorizer
+
+    Returns:
+        List[float]: len(rows) - 1 similarities
+    """
+    if vectors.shape[0] < 2:
+        return []
+    return vectors[:-1].multiply(vectors[1:]).sum(axis=1).A1.tolist()
+
+
+@dataclass
+class AnalyzedText:
+    """A spaCy analysis reduced to plain data, so it pickles cheaply to worker processes."""
+    text: str
+    sentences: List[str]
+    sentence_lengths: List[int]
+    tokens: List[str]
+    lemmas: List[str]
+    keywords: Set[str]
+    entities: Set[str]
+    claims: List[str]
+
+
+def analyze_text(text: str) -> AnalyzedText:
+    """
+    Run the shared pipeline over a text once and keep what the evaluators read.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        AnalyzedText: Sentences, tokens, lemmas, content keywords, entities
+            and claims (sentences with a syntactic root)
+    """
+    doc = nlp(text)
+    sents = list(doc.sents)
+    return AnalyzedText(
+        text=text,
+        sentences=[sent.text for sent in sents],
+        sentence_lengths=[len(sent) for sent in sents],
+        tokens=[token.text for token in doc],
+        lemmas=[token.lemma_ for token in doc],
+        keywords={token.lemma_.lower() for token in doc
+                  if token.pos_ in KEYWORD_POS and not token.is_stop},
+        entities={ent.text.lower() for ent in doc.ents},
+        claims=[sent.text for sent in sents if any(token.dep_ == 'ROOT' for token in sent)]
+    )
+
+
+class PreprocessedDocument:
+    """
+    Text analysis of one ResearchToolOutput, shared by the evaluators.
+
+    Every artifact is computed on first access and then cached on the
+    instance. Call prepare() before handing the document to several
+    evaluators (or pickling it to worker processes) so the work is done once;
+    an evaluator given a fresh document only computes what it reads.
+
+    Args:
+        research_output: The research output to analyze
+    """
+
+    ARTIFACTS = ('summary', 'full', 'sentences', 'sentence_vectors', 'source_vectors')
+
+    def __init__(self, research_output: ResearchToolOutput):
+        self.summary_text = research_output.summary or " ".join(
+            content.content for content in research_output.content
+        )
+        self.full_text = research_output.get_full_text()
+        self.source_urls = [content.url for content in research_output.content]
+        self.source_texts = [content.content or content.snippet for content in research_output.content]
+        self.domains = [urllib.parse.urlparse(url).netloc for url in self.source_urls if url]
+
+    @cached_property
+    def summary(self) -> AnalyzedText:
+        """The summary, or the joined content when there is none."""
+        return analyze_text(self.summary_text)
+
+    @cached_property
+    def full(self) -> AnalyzedText:
+        """Summary plus all source content (ResearchToolOutput.get_full_text)."""
+        if self.full_text == self.summary_text:
+            return self.summary
+        return analyze_text(self.full_text)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Non-empty, stripped summary sentences."""
+        return [sent.strip() for sent in self.summary.sentences if sent.strip()]
+
+    @cached_property
+    def sentence_vectors(self) -> Optional[csr_matrix]:
+        """TF-IDF rows of `sentences`, fitted on the sentences themselves."""
+        if not self.sentences:
+            return None
+        return tfidf_vectorizer().fit_transform(self.sentences)
+
+    @cached_property
+    def non_empty_source_texts(self) -> List[str]:
+        return [text for text in self.source_texts if text]
+
+    @cached_property
+    def source_vectors(self) -> Optional[csr_matrix]:
+        """TF-IDF rows of the non-empty source texts, fitted on the sources."""
+        if not self.non_empty_source_texts:
+            return None
+        return tfidf_vectorizer().fit_transform(self.non_empty_source_texts)
+
+    def prepare(self) -> 'PreprocessedDocument':
+        """Compute every artifact now; returns self."""
+        for name in self.ARTIFACTS:
+            try:
+                getattr(self, name)
+            except ValueError:
+                # e.g. a TF-IDF vocabulary that is all stop words; left for
+                # the evaluator that needs it to recompute and report
+                pass
+        return self
+
+
+def preprocess_research_output(research_output: ResearchToolOutput) -> PreprocessedDocument:
+    """Analyze a research output once for all evaluators."""
+    return PreprocessedDocument(research_output).prepare()
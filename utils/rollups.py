@@ -0,0 +1,56 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Upper bounds of the duration histogram buckets, in seconds: log-spaced from
+# 0.1s to about an hour, so a percentile read from the histogram is within
+# one bucket width (25%) of the exact value. Longer durations share the last
+# bucket.
+DURATION_BUCKETS: List[float] = [round(0.1 * 1.25 ** i, 6) for i in range(48)]
+
+# Scores in [0, 1] are counted in SCORE_BUCKETS equal-width buckets
+SCORE_BUCKETS = 20
+
+
+def duration_bucket(seconds: float) -> int:
+    """Index of the DURATION_BUCKETS bucket holding a duration."""
+    return min(bisect_left(DURATION_BUCKETS, seconds), len(DURATION_BUCKETS) - 1)
+
+
+def score_bucket(score: float) -> int:
+    """Index of the score bucket holding a score (clipped to [0, 1])."""
+    return min(max(int(score * SCORE_BUCKETS), 0), SCORE_BUCKETS - 1)
+
+
+def score_bucket_bounds(bucket: int) -> List[float]:
+    """[lower, upper] bounds of a score bucket."""
+    return [bucket / SCORE_BUCKETS, (bucket + 1) / SCORE_BUCKETS]
+
+
+def histogram_percentile(counts: Dict[int, int], q: float) -> Optional[float]:
+    """
+    Estimate a duration percentile from a DURATION_BUCKETS histogram.
+
+    The value is interpolated linearly inside the bucket the percentile
+    falls in.
+
+    Args:
+        counts: Observations per bucket index
+        q: Percentile, between 0 and 100
+
+    Returns:
+        Optional[float]: Estimated duration in seconds, or None for an empty
+            histogram
+    """
+    total = sum(counts.values())
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for bucket in sorted(counts):
+        count = counts[bucket]
+        if count and seen + count >= rank:
+            lower = DURATION_BUCKETS[bucket - 1] if bucket else 0.0
+            upper = DURATION_BUCKETS[bucket]
+            return lower + (upper - lower) * max(rank - seen, 0) / count
+        seen += count
+    return DURATION_BUCKETS[max(counts)]
@@ -1,23 +1,55 @@
-import spacy
+import os
 import numpy as np
 import urllib.parse
-from typing import List, Dict, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from typing import List, Dict, Tuple, Optional
+from scipy.sparse import csr_matrix
 from tools.research.common.model_schemas import ResearchToolOutput
-from itertools import combinations
+from utils.nlp_preprocessing import PreprocessedDocument
+from utils.near_duplicates import minhash_signatures, near_duplicate_pairs
 
-nlp = spacy.blank('en')
-nlp.add_pipe('sentencizer')
+def count_similar_pairs(vectors: csr_matrix, threshold: float = 0.3, chunk_size: int = 256) -> int:
+    """
+    Number of row pairs i < j whose cosine similarity exceeds `threshold`.
+
+    The similarity matrix is the product of the (L2-normalized) rows with
+    themselves, computed a block of rows at a time so memory stays
+    proportional to chunk_size x rows however many sources there are.
+    """
+    count = 0
+    for start in range(0, vectors.shape[0], chunk_size):
+        block = (vectors[start:start + chunk_size] @ vectors.T).tocoo()
+        upper = block.col > block.row + start
+        count += int(np.count_nonzero(block.data[upper] > threshold))
+    return count
 
 class SourceCoverageEvaluator:
-    def __init__(self):
-        self.nlp = nlp
-        self.vectorizer = TfidfVectorizer(max_features=5000, stop_words='english')
+    """
+    Args:
+        near_duplicate_min_sources: Look for near-duplicate sources (MinHash
+            LSH) when at least this many have text; 0 disables. Defaults to
+            SOURCE_COVERAGE_NEAR_DUPLICATE_MIN_SOURCES or 50.
+        near_duplicate_threshold: Estimated Jaccard similarity of word
+            shingles at which two sources count as near duplicates
+    """
+
+    def __init__(self, near_duplicate_min_sources: Optional[int] = None, near_duplicate_threshold: float = 0.8):
+        if near_duplicate_min_sources is None:
+            near_duplicate_min_sources = int(os.getenv('SOURCE_COVERAGE_NEAR_DUPLICATE_MIN_SOURCES', '50'))
+        self.near_duplicate_min_sources = near_duplicate_min_sources
+        self.near_duplicate_threshold = near_duplicate_threshold
 
-    def evaluate_source_coverage(self, research_output: ResearchToolOutput) -> Tuple[float, Dict]:
-        all_sources = [{'url': content.url, 'text': content.content or content.snippet} for content in research_output.content]
-        unique_domains = set(urllib.parse.urlparse(source['url']).netloc for source in all_sources if source['url'])
+    def find_near_duplicates(self, texts: List[str]) -> List[Tuple[int, int, float]]:
+        """Index pairs (and estimated similarity) of near-duplicate texts."""
+        return near_duplicate_pairs(minhash_signatures(texts), self.near_duplicate_threshold)
+
+    def evaluate_source_coverage(
+        self,
+        research_output: ResearchToolOutput,
+        document: Optional[PreprocessedDocument] = None
+    ) -> Tuple[float, Dict]:
+        document = document or PreprocessedDocument(research_output)
+        all_sources = [{'url': url, 'text': text} for url, text in zip(document.source_urls, document.source_texts)]
+        unique_domains = set(document.domains)
         
         def calculate_source_depth(url):
             return len(urllib.parse.urlparse(url).path.strip('/').split('/'))
@@ -27,16 +59,19 @@ class SourceCoverageEvaluator:
         source_depth = np.mean(source_depths) if source_depths else 0  # Avoid empty slice warning
         
         # Ensure there are texts to process before fitting the vectorizer
-        all_texts = [source['text'] for source in all_sources if source['text']]
+        all_texts = document.non_empty_source_texts
         if all_texts:
-            self.vectorizer.fit(all_texts)
-            vectors = self.vectorizer.transform(all_texts)
-            pairs = list(combinations(range(len(all_texts)), 2))
-            cross_references = sum(cosine_similarity(vectors[i:i+1], vectors[j:j+1])[0][0] > 0.3 for i, j in pairs)
-            cross_referencing_score = cross_references / len(pairs) if pairs else 0
+            pairs = len(all_texts) * (len(all_texts) - 1) // 2
+            cross_references = count_similar_pairs(document.source_vectors) if pairs else 0
+            cross_referencing_score = cross_references / pairs if pairs else 0
         else:
             cross_referencing_score = 0
         
+        # Sources that (nearly) repeat an earlier one, e.g. syndicated copies
+        near_duplicates = []
+        if self.near_duplicate_min_sources and len(all_texts) >= self.near_duplicate_min_sources:
+            near_duplicates = self.find_near_duplicates(all_texts)
+        
         domain_variety_score = len(unique_domains) / len(all_sources) if all_sources else 0
         
         # Check if coverage ratio and diversity score calculations are valid before using them
@@ -54,7 +89,9 @@ class SourceCoverageEvaluator:
             'unique_domains': len(unique_domains),
             'source_depth': source_depth,
             'cross_referencing_score': cross_referencing_score,
-            'domain_variety_score': domain_variety_score
+            'domain_variety_score': domain_variety_score,
+            'near_duplicate_pairs': len(near_duplicates),
+            'near_duplicate_sources': len({j for _, j, _ in near_duplicates})
         }
 
 def create_source_coverage_evaluator() -> SourceCoverageEvaluator:
@@ -0,0 +1,326 @@
+import atexit
+import logging
+logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+# Connections opened for reads; each is checked out by one thread at a time,
+# so reads run concurrently with each other and with the writer
+READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+
+# Page cache per connection, in KiB
+CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+
+# Bytes of the database file read through mmap (0 disables it)
+MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# How long a connection waits on another process's lock before failing
+BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+
+# Compiled statements kept per connection, keyed by SQL text: queries are
+# built from constant strings with bound parameters, so repeated calls
+# reuse the prepared statement instead of re-parsing it
+STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+# Write-behind: committed writes are held in one open transaction and made
+# durable together (one fsync) once WRITE_BEHIND_MAX_PENDING have gathered
+# or the oldest has waited WRITE_BEHIND_MAX_DELAY seconds. Readers see them
+# from then on. A delay of 0 commits every write immediately.
+WRITE_BEHIND_MAX_DELAY = float(os.getenv("WRITE_BEHIND_MAX_DELAY", "0.05"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "64"))
+
+# Times the flusher retries a group commit that failed with its transaction
+# still open (e.g. another process held the database past BUSY_TIMEOUT)
+# before rolling the writes back
+WRITE_BEHIND_COMMIT_RETRIES = int(os.getenv("WRITE_BEHIND_COMMIT_RETRIES", "3"))
+
+logger = logging.getLogger(__name__)
+
+# Open pools, flushed at interpreter exit
+_pools: "weakref.WeakSet[SQLitePool]" = weakref.WeakSet()
+
+
+class SQLitePool:
+    """
+    One writer and a pool of reader connections to a WAL-mode database.
+
+    In WAL mode readers see the last committed state without blocking the
+    writer or each other. Writes go through the single writer connection,
+    serialized by `write_lock` (SQLite allows one writer at a time anyway,
+    and one connection keeps a transaction's reads and writes consistent).
+    Reads check out an idle reader, opening up to `read_pool_size` of them.
+
+    Databases that cannot use WAL (e.g. ":memory:", where every connection
+    would see its own database) read through the writer instead.
+
+    Writes made through write() are group-committed: each runs in its own
+    savepoint, so commit() and rollback() only affect that write, while the
+    enclosing transaction is committed for many writes (from any thread) at
+    once by a background flusher. flush() commits them synchronously. If a
+    background group commit fails for good, its writes are lost and the
+    error is raised by the next write() or flush().
+
+    Args:
+        db_path: Path of the database file
+        read_pool_size: Maximum reader connections (default:
+            SQLITE_READ_POOL_SIZE, 4)
+        max_delay: Seconds a committed write may wait for its group commit
+            (default: WRITE_BEHIND_MAX_DELAY, 0.05; 0 commits immediately)
+        max_pending: Writes that trigger a group commit without waiting
+            (default: WRITE_BEHIND_MAX_PENDING, 64)
+        on_connect: Called with every connection the pool opens, e.g. to
+            register SQL functions
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        read_pool_size: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        on_connect: Optional[Callable[[sqlite3.Connection], None]] = None
+    ):
+        self.db_path = db_path
+        self.on_connect = on_connect
+        self.read_pool_size = max(1, read_pool_size or READ_POOL_SIZE)
+        self.write_lock = threading.Lock()
+        self.writer = self._connect()
+        journal_mode = self.writer.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        self.wal = journal_mode.lower() == "wal"
+        if not self.wal:
+            logger.warning(f"{db_path} cannot use WAL (journal_mode={journal_mode}); reads share the writer")
+        # Durable at every checkpoint; a crash can only lose the last commits
+        self.writer.execute("PRAGMA synchronous = NORMAL")
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        self.max_delay = WRITE_BEHIND_MAX_DELAY if max_delay is None else max_delay
+        self.max_pending = max(1, max_pending or WRITE_BEHIND_MAX_PENDING)
+        self._flush_due = threading.Condition(self.write_lock)
+        self._pending = 0
+        self._first_pending_at = 0.0
+        self._savepoint = False
+        # Background group commit failure not yet raised to a caller
+        self._failure: Optional[sqlite3.Error] = None
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        # writer.total_changes as of the last commit, for change detection
+        self.committed_changes = 0
+        _pools.add(self)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._readers) < self.read_pool_size:
+                conn = self._connect(read_only=True)
+                self._readers.append(conn)
+                return conn
+        # Pool exhausted: wait for a reader to be returned
+        return self._idle.get()
+
+    @contextmanager
+    def read(self, fresh: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        A reader connection for the duration of the block.
+
+        Args:
+            fresh: Also see writes still waiting for their group commit
+                (reads through the writer while any are pending), for
+                lookups that decide what to write next
+
+        Yields:
+            sqlite3.Connection: Read-only connection; do not keep it past the block
+        """
+        if not self.wal or (fresh and self._pending):
+            with self.write_lock:
+                yield self.writer
+            return
+
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """
+        The writer connection, held exclusively for the duration of the block.
+
+        The block runs in its own savepoint: end it with commit() or
+        rollback(); leaving the block without either rolls it back.
+
+        Yields:
+            sqlite3.Connection: The writer
+
+        Raises:
+            sqlite3.Error: If a background group commit lost earlier writes
+        """
+        with self.write_lock:
+            self._raise_failure()
+            if not self.writer.in_transaction:
+                self.committed_changes = self.writer.total_changes
+                # IMMEDIATE: take the database's write lock up front (waiting
+                # up to BUSY_TIMEOUT for other connections), so a block that
+                # reads before it writes cannot fail to upgrade its lock
+                self.writer.execute("BEGIN IMMEDIATE")
+            self.writer.execute("SAVEPOINT pending_write")
+            self._savepoint = True
+            try:
+                yield self.writer
+            finally:
+                if self._savepoint:
+                    self.rollback()
+
+    def commit(self) -> None:
+        """
+        Commit the current write() block.
+
+        The write is final (later rollbacks cannot undo it) and becomes
+        durable and visible to readers with the next group commit. Must be
+        called inside write().
+        """
+        if not self._savepoint:
+            return
+        self.writer.execute("RELEASE pending_write")
+        self._savepoint = False
+        self._pending += 1
+        if self._pending >= self.max_pending or self.max_delay <= 0:
+            self._commit_pending()
+        elif self._pending == 1:
+            self._first_pending_at = time.monotonic()
+            self._start_flusher()
+            self._flush_due.notify()
+
+    def rollback(self) -> None:
+        """Undo the current write() block, leaving other pending writes intact."""
+        if not self._savepoint:
+            return
+        self.writer.execute("ROLLBACK TO pending_write")
+        self.writer.execute("RELEASE pending_write")
+        self._savepoint = False
+        if not self._pending:
+            self.writer.rollback()
+
+    def _commit_pending(self) -> None:
+        # Caller holds write_lock
+        try:
+            self.writer.commit()
+        except sqlite3.Error as e:
+            if self.writer.in_transaction:
+                # The transaction survived (e.g. the database was busy): the
+                # writes stay pending and the flusher retries the commit
+                logger.warning(f"Group commit of {self._pending} writes failed: {e}")
+                raise
+            logger.error(f"Group commit of {self._pending} writes failed; they are lost: {e}")
+            self._reset_pending()
+            raise
+        self._reset_pending()
+
+    def _reset_pending(self) -> None:
+        self._pending = 0
+        self.committed_changes = self.writer.total_changes
+
+    def _raise_failure(self) -> None:
+        # Caller holds write_lock
+        if self._failure is not None:
+            failure, self._failure = self._failure, None
+            raise sqlite3.OperationalError(f"A background group commit lost earlier writes: {failure}") from failure
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="sqlite-write-behind", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        retries = 0
+        with self._flush_due:
+            while not self._closed:
+                if not self._pending:
+                    self._flush_due.wait()
+                    continue
+                remaining = self._first_pending_at + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._flush_due.wait(remaining)
+                    continue
+                try:
+                    self._commit_pending()
+                    retries = 0
+                except sqlite3.Error as e:
+                    if self._pending and retries < WRITE_BEHIND_COMMIT_RETRIES:
+                        retries += 1
+                        self._first_pending_at = time.monotonic()
+                        continue
+                    if self._pending:
+                        logger.error(f"Giving up on group commit of {self._pending} writes; they are lost")
+                        self.writer.rollback()
+                        self._reset_pending()
+                    # Reported to the next caller rather than dropped
+                    self._failure = e
+                    retries = 0
+
+    def flush(self) -> None:
+        """
+        Commit pending writes now (for tests, shutdown and read-your-writes).
+
+        Raises:
+            sqlite3.Error: If the commit fails, or a background group commit
+                lost earlier writes
+        """
+        with self.write_lock:
+            if self._pending and not self._closed:
+                self._commit_pending()
+            self._raise_failure()
+
+    def close(self) -> None:
+        """Commit pending writes, then close the writer and every reader connection."""
+        with self.write_lock:
+            if self._closed:
+                return
+            if self._pending:
+                self._commit_pending()
+            self._closed = True
+            self._flush_due.notify_all()
+            self.writer.close()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+
+
+@atexit.register
+def _flush_all() -> None:
+    for pool in list(_pools):
+        try:
+            pool.flush()
+        except Exception as e:
+            logger.error(f"Flushing {pool.db_path} at exit failed: {e}")
@@ -0,0 +1,21 @@
+import json
+from typing import Any, Optional
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_KEEPALIVE = ": keep-alive\n\n"
+
+
+def format_sse(event: str, data: Any, event_id: Optional[Any] = None) -> str:
+    """
+    Format one Server-Sent Events message.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+        event_id: Optional id, echoed back by clients as Last-Event-ID
+
+    Returns:
+        str: The encoded message, terminated by a blank line
+    """
+    message = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{message}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -1,10 +1,33 @@
 import pdb
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, Iterator, List, Optional, Any
 from datetime import datetime
 import logging
 logging.getLogger('watchdog.observers.inotify_buffer').setLevel(logging.WARNING)
 from dataclasses import dataclass
 import time
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+import numpy as np
+
+# Percentiles reported for latency, time to first token and queue wait
+LATENCY_PERCENTILES = (50, 95, 99)
+
+# Calls kept for percentile summaries by each tracker (the process-wide
+# aggregate and every request ledger); totals are running sums over all calls
+USAGE_HISTORY = int(os.getenv("TOKEN_USAGE_HISTORY", "10000"))
+
+# Cost per 1K tokens
+COST_RATES = {
+    'gpt-3.5-turbo': {'prompt': 0.0015, 'completion': 0.002},
+    'gpt-4': {'prompt': 0.03, 'completion': 0.06},
+    'gpt-4-turbo': {'prompt': 0.01, 'completion': 0.03},
+    'claude-3-opus': {'prompt': 0.015, 'completion': 0.075},
+    'claude-3-sonnet': {'prompt': 0.003, 'completion': 0.015},
+    'llama3-70b-8192': {'prompt': 0.0007, 'completion': 0.0007}
+}
 
 @dataclass
 class TokenUsageEntry:
@@ -18,76 +41,147 @@ class TokenUsageEntry:
     total_tokens: int = 0
     processing_time: float = 0.0
     processing_speed: float = 0.0
+    time_to_first_token: Optional[float] = None
+    queue_wait: Optional[float] = None
+    retries: int = 0
+    measured: bool = False
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    """
+    Count, mean and percentiles of a list of durations.
+
+    Args:
+        values: Durations in seconds
+
+    Returns:
+        Dict[str, Any]: count, mean, p50, p95, p99 and max (None when empty)
+    """
+    if not values:
+        return {'count': 0, 'mean': None, **{f'p{q}': None for q in LATENCY_PERCENTILES}, 'max': None}
+    array = np.asarray(values, dtype=float)
+    percentiles = np.percentile(array, LATENCY_PERCENTILES)
+    return {
+        'count': len(values),
+        'mean': float(array.mean()),
+        **{f'p{q}': float(value) for q, value in zip(LATENCY_PERCENTILES, percentiles)},
+        'max': float(array.max())
+    }
+
+
+def timing_summary(entries: List[TokenUsageEntry]) -> Dict[str, Any]:
+    """
+    Latency breakdown of usage entries: wall time of the measured calls,
+    time to first token (streamed calls only), provider queue wait (where
+    the provider reports it) and retries.
+    """
+    measured = [entry for entry in entries if entry.measured]
+    return {
+        'calls': len(entries),
+        'latency': latency_summary([entry.processing_time for entry in measured]),
+        'time_to_first_token': latency_summary(
+            [entry.time_to_first_token for entry in measured if entry.time_to_first_token is not None]
+        ),
+        'queue_wait': latency_summary(
+            [entry.queue_wait for entry in measured if entry.queue_wait is not None]
+        ),
+        'retries': sum(entry.retries for entry in entries)
+    }
 
 class TokenUsageTracker:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TokenUsageTracker, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if not self._initialized:
-            self.instance_id = id(self)
-            self.logger = logging.getLogger(__name__)
-            self.logger.info(f"Creating TokenUsageTracker singleton instance {self.instance_id}")
-            
-            self._usage_timeline = []
-            self._total_prompt_tokens = 0
-            self._total_completion_tokens = 0
-            self._total_tokens = 0
-            self._model_usage = {}
-            
-            self._cost_rates = {
-                'gpt-3.5-turbo': {'prompt': 0.0015, 'completion': 0.002},
-                'gpt-4': {'prompt': 0.03, 'completion': 0.06},
-                'gpt-4-turbo': {'prompt': 0.01, 'completion': 0.03},
-                'claude-3-opus': {'prompt': 0.015, 'completion': 0.075},
-                'claude-3-sonnet': {'prompt': 0.003, 'completion': 0.015},
-                'llama3-70b-8192': {'prompt': 0.0007, 'completion': 0.0007}
-            }
-            self._initialized = True
-    def _get_processing_time(self) -> float:
-        """Simulate processing time based on token count"""
-        return 0.5  # Simulated processing time in seconds
+    """
+    Ledger of LLM token usage, cost and latency.
+
+    Each request gets its own tracker (QueryTrace creates one), so its stats
+    cover that request only. Every entry is also folded into `parent`, by
+    default the process-wide aggregate (see get_default_usage_aggregate).
+    Totals are running sums and the per-call entries behind the percentile
+    summaries are a ring buffer of the last `max_entries` calls, so a
+    tracker's memory stays flat however long it lives. Safe to share
+    between threads.
+
+    Args:
+        max_entries: Calls kept for percentile summaries (default:
+            TOKEN_USAGE_HISTORY, 10000)
+        parent: Tracker every entry is also recorded in; defaults to the
+            process-wide aggregate
+        is_aggregate: Create a root tracker with no parent
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        parent: Optional["TokenUsageTracker"] = None,
+        is_aggregate: bool = False
+    ):
+        self.instance_id = id(self)
+        self.logger = logging.getLogger(__name__)
+        self.logger.debug(f"Creating TokenUsageTracker instance {self.instance_id}")
+
+        self._lock = threading.Lock()
+        self._parent = None if is_aggregate else (parent or get_default_usage_aggregate())
+        self._usage_timeline: Deque[TokenUsageEntry] = deque(maxlen=max_entries or USAGE_HISTORY)
+        self._calls = 0
+        self._total_prompt_tokens = 0
+        self._total_completion_tokens = 0
+        self._total_tokens = 0
+        self._total_cost = 0.0
+        self._total_time = 0.0
+        self._measured_tokens = 0
+        self._model_usage: Dict[str, int] = {}
+        self._prompt_totals: Dict[str, Dict[str, Any]] = {}
+        self._cost_rates = COST_RATES
 
     def add_usage(
         self,
         prompt_tokens: int,
         completion_tokens: int,
         model: str,
-        prompt_id: Optional[str] = None
+        prompt_id: Optional[str] = None,
+        processing_time: Optional[float] = None,
+        time_to_first_token: Optional[float] = None,
+        queue_wait: Optional[float] = None,
+        retries: int = 0
     ) -> None:
-        """Add a new token usage entry"""
-        self.logger.info(f"Adding usage to instance {self.instance_id}")
-        self.logger.info(f"Adding new token usage entry - Model: {model}, Prompt ID: {prompt_id or 'N/A'}")
-        
+        """
+        Add a new token usage entry
+
+        Args:
+            prompt_tokens: Input tokens of the call
+            completion_tokens: Output tokens of the call
+            model: Model name
+            prompt_id: Prompt the call was made for
+            processing_time: Measured wall time of the call in seconds; calls
+                without it count towards tokens and cost but not latency
+            time_to_first_token: Seconds until the first streamed token
+            queue_wait: Seconds the provider queued the request, when it
+                reports it
+            retries: Attempts before the one that succeeded
+        """
         try:
             # Calculate cost
             cost = 0.0
             if model in self._cost_rates:
-                self.logger.info(f"Calculating costs using rates for model {model}")
                 rates = self._cost_rates[model]
                 prompt_cost = (prompt_tokens / 1000) * rates['prompt']
                 completion_cost = (completion_tokens / 1000) * rates['completion']
                 cost = prompt_cost + completion_cost
-                self.logger.info(f"Calculated costs - Prompt: ${prompt_cost:.6f}, Completion: ${completion_cost:.6f}, Total: ${cost:.6f}")
             else:
                 self.logger.warning(f"No cost rates available for model {model}")
 
             # Calculate metrics
             total_tokens = prompt_tokens + completion_tokens
-            processing_time = self._get_processing_time()
+            measured = processing_time is not None
+            processing_time = processing_time if measured else 0.0
             processing_speed = total_tokens / processing_time if processing_time > 0 else 0
 
-            self.logger.info(f"Starting inference with model {model} at {datetime.now().isoformat()}")
-            self.logger.info(f"Inference completed in {processing_time:.2f}s")
-            self.logger.info(f"Tokens used - Input: {prompt_tokens:,d}, Output: {completion_tokens:,d}, Total: {total_tokens:,d}")
-            self.logger.info(f"Processing speed - {processing_speed:.2f} tokens/second")
+            # One line per call: this runs for every LLM request
+            self.logger.info(
+                f"Token usage - Model: {model}, Prompt ID: {prompt_id or 'N/A'}, "
+                f"Input: {prompt_tokens:,d}, Output: {completion_tokens:,d}, Cost: ${cost:.6f}, "
+                f"Time: {processing_time:.2f}s, Retries: {retries}"
+            )
             
-            # Create and store usage entry
             usage_entry = TokenUsageEntry(
                 timestamp=datetime.now().isoformat(),
                 prompt_tokens=prompt_tokens,
@@ -97,115 +191,215 @@ class TokenUsageTracker:
                 cost=cost,
                 total_tokens=total_tokens,
                 processing_time=processing_time,
-                processing_speed=processing_speed
+                processing_speed=processing_speed,
+                time_to_first_token=time_to_first_token,
+                queue_wait=queue_wait,
+                retries=retries,
+                measured=measured
             )
-            
-            self.logger.debug(f"Created usage entry: {usage_entry}")
-            
-            # Store entry and update stats
-            self._usage_timeline.append(usage_entry)
-            self.logger.info(f"Usage timeline updated - Current entries: {len(self._usage_timeline)} for instance {self.instance_id}")
-            
-            # Update running totals
-            self._total_prompt_tokens += prompt_tokens
-            self._total_completion_tokens += completion_tokens
-            self._total_tokens += total_tokens
-            
-            self.logger.info(f"Cumulative statistics updated - Total tokens: {self._total_tokens:,d}")
-            self.logger.debug(f"Timeline state after add: {[e.model for e in self._usage_timeline]}")
+            self._record(usage_entry)
 
         except Exception as e:
             self.logger.error(f"Error adding token usage: {str(e)}", exc_info=True)
             self.logger.error(f"Failed parameters - Model: {model}, Prompt tokens: {prompt_tokens}, Completion tokens: {completion_tokens}")
             raise
 
+    def _record(self, entry: TokenUsageEntry) -> None:
+        """Store an entry, update the running totals and pass it up to the parent."""
+        with self._lock:
+            self._usage_timeline.append(entry)
+            self._calls += 1
+            self._total_prompt_tokens += entry.prompt_tokens
+            self._total_completion_tokens += entry.completion_tokens
+            self._total_tokens += entry.total_tokens
+            self._total_cost += entry.cost
+            self._total_time += entry.processing_time
+            if entry.measured:
+                self._measured_tokens += entry.total_tokens
+            self._model_usage[entry.model] = self._model_usage.get(entry.model, 0) + 1
+            if entry.prompt_id:
+                totals = self._prompt_totals.setdefault(entry.prompt_id, {
+                    'total_tokens': 0,
+                    'prompt_tokens': 0,
+                    'completion_tokens': 0,
+                    'total_cost': 0
+                })
+                totals['total_tokens'] += entry.total_tokens
+                totals['prompt_tokens'] += entry.prompt_tokens
+                totals['completion_tokens'] += entry.completion_tokens
+                totals['total_cost'] += entry.cost
+        if self._parent is not None:
+            self._parent._record(entry)
+
+    def _entries(self) -> List[TokenUsageEntry]:
+        with self._lock:
+            return list(self._usage_timeline)
+
     def get_usage_stats(self) -> Dict:
-        """Get comprehensive usage statistics"""
-        self.logger.info(f"Getting stats from instance {self.instance_id}")
-        self.logger.debug(f"Current timeline state: {[e.model for e in self._usage_timeline]}")
-        
-        try:
-            if not self._usage_timeline:
-                self.logger.warning(f"No usage timeline found for instance {self.instance_id} - returning default stats")
-                return {
-                    'model': 'no_model',
-                    'tokens': {
-                        'input': 0,
-                        'output': 0,
-                        'total': 0
-                    },
-                    'processing': {
-                        'time': 0,
-                        'speed': 0
-                    },
-                    'cost': 0.0
-                }
-
-            self.logger.info(f"Processing {len(self._usage_timeline)} entries for instance {self.instance_id}")
-            
-            # Calculate totals from timeline
-            total_prompt_tokens = sum(entry.prompt_tokens for entry in self._usage_timeline)
-            total_completion_tokens = sum(entry.completion_tokens for entry in self._usage_timeline)
-            total_tokens = total_prompt_tokens + total_completion_tokens
-            total_cost = sum(entry.cost for entry in self._usage_timeline)
-            total_time = sum(entry.processing_time for entry in self._usage_timeline)
-            
-            # Calculate speed
-            avg_speed = total_tokens / total_time if total_time > 0 else 0
+        """
+        Get comprehensive usage statistics
 
-            # Get most used model
-            model_counts = {}
-            for entry in self._usage_timeline:
-                model_counts[entry.model] = model_counts.get(entry.model, 0) + 1
-            
-            self.logger.debug(f"Model usage distribution: {model_counts}")
-            most_used_model = max(model_counts.items(), key=lambda x: x[1])[0] if model_counts else 'no_model'
-            
-            stats = {
-                'model': most_used_model,
+        Token, cost and processing totals cover every call recorded; the
+        timing percentiles cover the calls still in the ring buffer.
+        """
+        with self._lock:
+            entries = list(self._usage_timeline)
+            calls = self._calls
+            total_prompt_tokens = self._total_prompt_tokens
+            total_completion_tokens = self._total_completion_tokens
+            total_tokens = self._total_tokens
+            total_cost = self._total_cost
+            total_time = self._total_time
+            measured_tokens = self._measured_tokens
+            model_counts = dict(self._model_usage)
+
+        if not calls:
+            self.logger.debug(f"No usage recorded by instance {self.instance_id} - returning default stats")
+            return {
+                'model': 'no_model',
                 'tokens': {
-                    'input': total_prompt_tokens,
-                    'output': total_completion_tokens,
-                    'total': total_tokens
+                    'input': 0,
+                    'output': 0,
+                    'total': 0
                 },
                 'processing': {
-                    'time': total_time,
-                    'speed': avg_speed
+                    'time': 0,
+                    'speed': 0
                 },
-                'cost': total_cost
+                'cost': 0.0,
+                'timing': timing_summary([]),
+                'timing_by_model': {}
             }
-            
-            self.logger.info(f"Final statistics compiled - Total tokens: {total_tokens:,d}, Total cost: ${total_cost:.6f}")
-            return stats
 
-        except Exception as e:
-            self.logger.error(f"Error getting usage stats for instance {self.instance_id}: {str(e)}", exc_info=True)
-            raise
+        # Calculate speed over the calls whose wall time was measured
+        avg_speed = measured_tokens / total_time if total_time > 0 else 0
+        most_used_model = max(model_counts.items(), key=lambda x: x[1])[0]
+        timing = timing_summary(entries)
+        timing['calls'] = calls
+
+        stats = {
+            'model': most_used_model,
+            'tokens': {
+                'input': total_prompt_tokens,
+                'output': total_completion_tokens,
+                'total': total_tokens
+            },
+            'processing': {
+                'time': total_time,
+                'speed': avg_speed
+            },
+            'cost': total_cost,
+            'timing': timing,
+            'timing_by_model': self._get_model_timing(entries)
+        }
+
+        self.logger.debug(f"Final statistics compiled - Total tokens: {total_tokens:,d}, Total cost: ${total_cost:.6f}")
+        return stats
 
     def _get_prompt_usage(self) -> Dict:
-        """Aggregate token usage by prompt ID"""
-        prompt_usage = {}
-        for entry in self._usage_timeline:
+        """Aggregate token usage and latency by prompt ID, and by model within each prompt"""
+        entries = self._entries()
+        with self._lock:
+            prompt_usage = {prompt_id: dict(totals) for prompt_id, totals in self._prompt_totals.items()}
+
+        prompt_entries: Dict[str, List[TokenUsageEntry]] = {}
+        for entry in entries:
             if entry.prompt_id:
-                if entry.prompt_id not in prompt_usage:
-                    prompt_usage[entry.prompt_id] = {
-                        'total_tokens': 0,
-                        'prompt_tokens': 0,
-                        'completion_tokens': 0,
-                        'total_cost': 0
-                    }
-                
-                prompt_usage[entry.prompt_id]['total_tokens'] += entry.total_tokens
-                prompt_usage[entry.prompt_id]['prompt_tokens'] += entry.prompt_tokens
-                prompt_usage[entry.prompt_id]['completion_tokens'] += entry.completion_tokens
-                prompt_usage[entry.prompt_id]['total_cost'] += entry.cost
-        
+                prompt_entries.setdefault(entry.prompt_id, []).append(entry)
+        for prompt_id, usage in prompt_usage.items():
+            usage['timing'] = timing_summary(prompt_entries.get(prompt_id, []))
+            usage['timing_by_model'] = self._get_model_timing(prompt_entries.get(prompt_id, []))
         return prompt_usage
 
+    def _get_model_timing(self, entries: Optional[List[TokenUsageEntry]] = None) -> Dict[str, Dict[str, Any]]:
+        """Latency breakdown (see timing_summary) per model"""
+        by_model: Dict[str, List[TokenUsageEntry]] = {}
+        for entry in self._entries() if entries is None else entries:
+            by_model.setdefault(entry.model, []).append(entry)
+        return {model: timing_summary(model_entries) for model, model_entries in by_model.items()}
+
     def get_total_usage(self) -> Dict:
         """Get total usage across all interactions"""
-        return {
-            'total_tokens': self._total_tokens,
-            'total_prompt_tokens': self._total_prompt_tokens,
-            'total_completion_tokens': self._total_completion_tokens
-        }
\ No newline at end of file
+        with self._lock:
+            return {
+                'total_tokens': self._total_tokens,
+                'total_prompt_tokens': self._total_prompt_tokens,
+                'total_completion_tokens': self._total_completion_tokens
+            }
+
+
+class ContextTokenTracker(TokenUsageTracker):
+    """
+    Tracker for long-lived objects such as agents: usage is recorded in,
+    and stats are read from, the tracker active in the current context (see
+    use_token_tracker), so an agent shared between requests bills each call
+    to the request that made it. Outside any request its own ledger is used.
+    """
+
+    def _target(self) -> TokenUsageTracker:
+        return _current_tracker.get() or self
+
+    def _record(self, entry: TokenUsageEntry) -> None:
+        target = self._target()
+        if target is self:
+            super()._record(entry)
+        else:
+            target._record(entry)
+
+    def get_usage_stats(self) -> Dict:
+        target = self._target()
+        return super().get_usage_stats() if target is self else target.get_usage_stats()
+
+    def _get_prompt_usage(self) -> Dict:
+        target = self._target()
+        return super()._get_prompt_usage() if target is self else target._get_prompt_usage()
+
+    def get_total_usage(self) -> Dict:
+        target = self._target()
+        return super().get_total_usage() if target is self else target.get_total_usage()
+
+
+_current_tracker: ContextVar[Optional[TokenUsageTracker]] = ContextVar("token_tracker", default=None)
+_default_aggregate: Optional[TokenUsageTracker] = None
+_default_aggregate_lock = threading.Lock()
+
+
+def get_default_usage_aggregate() -> TokenUsageTracker:
+    """Process-wide tracker every request ledger rolls up into."""
+    global _default_aggregate
+    if _default_aggregate is None:
+        with _default_aggregate_lock:
+            if _default_aggregate is None:
+                _default_aggregate = TokenUsageTracker(is_aggregate=True)
+    return _default_aggregate
+
+
+def current_token_tracker() -> Optional[TokenUsageTracker]:
+    """The tracker of the request running in this context, if any."""
+    return _current_tracker.get()
+
+
+def set_token_tracker(tracker: TokenUsageTracker) -> Token:
+    """
+    Make `tracker` the current context's tracker.
+
+    Context variables follow asyncio tasks and asyncio.to_thread calls, so
+    every call made on behalf of a request is billed to it. Pass the
+    returned token to reset_token_tracker when the request ends.
+    """
+    return _current_tracker.set(tracker)
+
+
+def reset_token_tracker(token: Token) -> None:
+    """Restore the tracker that was current before set_token_tracker."""
+    _current_tracker.reset(token)
+
+
+@contextmanager
+def use_token_tracker(tracker: TokenUsageTracker) -> Iterator[TokenUsageTracker]:
+    """Context manager form of set_token_tracker/reset_token_tracker."""
+    token = set_token_tracker(tracker)
+    try:
+        yield tracker
+    finally:
+        reset_token_tracker(token)